@@ -76,7 +76,9 @@ export class NlpEmbeddingClient implements EmbeddingClient {
     const response = await fetch(`${this.baseUrl}/embed`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ texts: [text] }),
+      // Search queries: the NLP service embeds them with its distilled query
+      // encoder when one is built; the vectors match the stored chunk vectors.
+      body: JSON.stringify({ texts: [text], query: true }),
     });
 
     if (!response.ok) {
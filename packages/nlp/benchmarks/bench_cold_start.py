@@ -0,0 +1,100 @@
+"""
+Cold-start latency to first embedding: Hub/HF-cache load vs prebuilt snapshot.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--model nlpaueb/legal-bert-base-uncased]
+        [--snapshot models/snapshots/...] [--repeat 5] [--drop-caches]
+
+Each run is a fresh Python process that imports torch and sentence-transformers,
+loads the model and embeds one text.  The snapshot is built first if missing.
+Reports the median of each phase per mode, and the process RSS after the first
+embedding.  With ``--drop-caches`` (root only) the OS page cache is flushed
+before every run, so file reads are truly cold; without it the runs measure a
+restart on a warm host, the common autoscale case.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def _child(model: str, snapshot: str | None) -> None:
+    """Measure one cold start in this (fresh) process and print it as JSON."""
+    t0 = time.perf_counter()
+    import sentence_transformers  # noqa: F401
+    import torch  # noqa: F401
+
+    from forge_nlp.embeddings.backends import load_sentence_transformer
+    from forge_nlp.embeddings.model_registry import _resident_bytes
+
+    t1 = time.perf_counter()
+    st = load_sentence_transformer(model, snapshot=snapshot)
+    t2 = time.perf_counter()
+    st.encode(["The contractor shall deliver the monthly status report."], show_progress_bar=False)
+    t3 = time.perf_counter()
+    print(json.dumps({
+        "import_s": t1 - t0,
+        "load_s": t2 - t1,
+        "first_embedding_s": t3 - t2,
+        "total_s": t3 - t0,
+        "rss_mb": (_resident_bytes() or 0) / 2**20,
+    }))
+
+
+def _drop_caches() -> None:
+    subprocess.run(["sync"], check=True)
+    Path("/proc/sys/vm/drop_caches").write_text("3\n")
+
+
+def _run(model: str, snapshot: str | None, drop_caches: bool) -> dict[str, float]:
+    if drop_caches:
+        _drop_caches()
+    cmd = [sys.executable, __file__, "--child", "--model", model]
+    if snapshot:
+        cmd += ["--snapshot", snapshot]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parser.add_argument("--snapshot", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--drop-caches", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.model, args.snapshot)
+        return
+
+    from forge_nlp.embeddings.snapshot import build_snapshot, default_snapshot_dir, is_snapshot
+
+    snapshot = Path(args.snapshot) if args.snapshot else default_snapshot_dir(args.model)
+    if not is_snapshot(snapshot):
+        start = time.perf_counter()
+        build_snapshot(args.model, snapshot)
+        print(f"Built snapshot {snapshot} in {time.perf_counter() - start:.1f}s")
+
+    _run(args.model, None, False)  # make sure the HF cache holds the model
+    phases = ("import_s", "load_s", "first_embedding_s", "total_s")
+    print(f"{'mode':<10} " + " ".join(f"{p:>18}" for p in phases) + f" {'rss_mb':>8}")
+    for mode, source in (("hub-cache", None), ("snapshot", str(snapshot))):
+        runs = [_run(args.model, source, args.drop_caches) for _ in range(args.repeat)]
+        medians = {k: float(np.median([r[k] for r in runs])) for k in (*phases, "rss_mb")}
+        print(
+            f"{mode:<10} " + " ".join(f"{medians[p]:>18.3f}" for p in phases)
+            + f" {medians['rss_mb']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Memory and conversion time of per-chunk float lists vs ``EmbeddedChunkBatch``.
+
+Usage:
+    python benchmarks/bench_embedded_chunks.py [--chunks 2000] [--dimensions 768]
+
+Takes DocumentProcessor output for the sample contracts (tiled to
+``--chunks``) and random vectors standing in for model output, so no model
+runs.  Compares wrapping the vector matrix as ``list[EmbeddedChunk]`` (one
+``tolist()`` row and one metadata copy per chunk, what ``embed_chunks``
+returned before) against one ``EmbeddedChunkBatch``, and reports the peak
+traced allocation and wall time of each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+from corpus import load_chunks
+
+from forge_nlp.embeddings.embedding_service import EmbeddedChunk, EmbeddedChunkBatch
+
+
+def _measure(build: Callable[[], object]) -> tuple[float, float]:
+    """Peak MB allocated while building (and holding) the result, and seconds taken."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 2**20, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    args = parser.parse_args()
+
+    base = load_chunks()
+    chunks = (base * (args.chunks // len(base) + 1))[:args.chunks]
+    vectors = np.random.default_rng(0).standard_normal((len(chunks), args.dimensions))
+    vectors = vectors.astype(np.float32)
+
+    def as_lists() -> list[EmbeddedChunk]:
+        return [EmbeddedChunk.from_chunk(c, v) for c, v in zip(chunks, vectors.tolist())]
+
+    def as_batch() -> EmbeddedChunkBatch:
+        return EmbeddedChunkBatch(chunks, vectors)
+
+    print(f"{len(chunks)} chunks × {args.dimensions} dims "
+          f"({vectors.nbytes / 2**20:.1f} MB of float32 model output)")
+    print(f"{'container':<24} {'peak MB':>9} {'ms':>9}")
+    for name, build in (("list[EmbeddedChunk]", as_lists), ("EmbeddedChunkBatch", as_batch)):
+        peak_mb, seconds = _measure(build)
+        print(f"{name:<24} {peak_mb:>9.1f} {seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
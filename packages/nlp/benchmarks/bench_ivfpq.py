@@ -0,0 +1,113 @@
+"""
+Recall vs memory of the IVF-PQ index against exact float32 search.
+
+Usage:
+    python benchmarks/bench_ivfpq.py [--rows 100000] [--dims 768] [--queries 200]
+        [--k 10] [--train-size 20000] [--subquantizers 24 48 96]
+        [--nprobe 4 16 64] [--refine-factor 1 10] [--output report.json]
+
+Uses the synthetic clustered vectors of ``bench_vector_search.py``.  Trains
+one index per ``--subquantizers`` on a sample of the corpus, then reports
+for each ``--nprobe`` × ``--refine-factor``:
+
+* bytes of RAM per vector (codes, cell ids and quantizers; the full vectors
+  used for refinement stay in the memory-mapped store on disk),
+* recall@k against exact search,
+* single-query latency (p50/p99).
+
+``--refine-factor 1`` re-scores only the k best codes, so its recall is
+that of the PQ ranking alone.  ``--output`` writes the rows as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from bench_vector_search import (
+    clustered_vectors,
+    latencies_ms,
+    measure_exact,
+    query_vectors,
+    recall_at_k,
+)
+
+from forge_nlp.search.ivfpq_index import IvfPqIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--block-rows", type=int, default=8192)
+    parser.add_argument("--train-size", type=int, default=20_000)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--subquantizers", type=int, nargs="+", default=[24, 48, 96])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--refine-factor", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    corpus = clustered_vectors(args.rows, args.dims)
+    queries = query_vectors(corpus, args.queries)
+    sample = corpus[
+        np.random.default_rng(2).choice(args.rows, min(args.train_size, args.rows), replace=False)
+    ]
+    ids = [f"chunk-{i}" for i in range(args.rows)]
+    results = []
+
+    print(f"{args.rows} × {args.dims} vectors, {args.queries} queries, k={args.k}, "
+          f"trained on {len(sample)}")
+    print(
+        f"{'index':<24} {'B/vector':>9} {'ratio':>6} {f'R@{args.k}':>7} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        truth, _, single, _ = measure_exact(Path(tmp) / "exact", corpus, queries, args)
+        float_bytes = args.dims * 4
+        print(f"{'exact float32':<24} {float_bytes:>9} {1:>6.1f} {1:>7.3f} "
+              f"{np.percentile(single, 50):>8.2f} {np.percentile(single, 99):>8.2f}")
+        results.append({"index": "exact", "bytes_per_vector": float_bytes, "recall": 1.0,
+                        "p50_ms": float(np.percentile(single, 50)),
+                        "p99_ms": float(np.percentile(single, 99))})
+
+        for subquantizers in args.subquantizers:
+            started = time.perf_counter()
+            index = IvfPqIndex.train(Path(tmp) / f"pq{subquantizers}", sample, "bench",
+                                     nlist=args.nlist, subquantizers=subquantizers)
+            train_s = time.perf_counter() - started
+            index.add(ids, ["OTHER"] * args.rows, corpus)
+            stats = index.stats()
+            for nprobe in args.nprobe:
+                for refine in args.refine_factor:
+                    search = functools.partial(index.search, nprobe=nprobe, refine_factor=refine)
+                    single = latencies_ms(search, queries, args.k)
+                    recall = recall_at_k(search(queries, args.k), truth)
+                    name = f"pq{subquantizers} nprobe={nprobe} rf={refine}"
+                    print(f"{name:<24} {stats.bytes_per_vector:>9.1f} "
+                          f"{float_bytes / stats.bytes_per_vector:>6.1f} {recall:>7.3f} "
+                          f"{np.percentile(single, 50):>8.2f} {np.percentile(single, 99):>8.2f}")
+                    results.append({
+                        "index": "ivfpq", "subquantizers": subquantizers, "nlist": stats.nlist,
+                        "nprobe": nprobe, "refine_factor": refine, "train_s": train_s,
+                        "bytes_per_vector": stats.bytes_per_vector, "recall": recall,
+                        "p50_ms": float(np.percentile(single, 50)),
+                        "p99_ms": float(np.percentile(single, 99)),
+                    })
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "rows": args.rows, "dims": args.dims, "queries": args.queries, "k": args.k,
+            "train_size": len(sample), "results": results,
+        }, indent=2))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Encoder cost and retrieval quality of late chunking vs per-chunk encoding.
+
+Usage:
+    python benchmarks/bench_late_chunking.py [--model nlpaueb/legal-bert-base-uncased]
+        [--target-tokens 500] [--max-tokens 600] [--overlap-tokens 50] [--k 5]
+        [--repeat 1]
+
+Chunks the sample documents with the given ``DocumentProcessor`` budgets and
+embeds them twice — every chunk on its own (current ``embed_chunks``) and
+with ``late_chunking=True``.  Reports, for each mode:
+
+* encoder tokens (the FLOP proxy: BERT cost is linear in tokens at these
+  lengths) and wall time,
+* recall@k and MRR of the queries in ``retrieval_queries.jsonl``, where a
+  chunk is relevant if it contains the query's answer phrase,
+
+plus the cosine similarity between the two vectors of each chunk.  Smaller
+budgets than the defaults produce more overlapping chunks per section and
+show the difference more clearly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from corpus import RetrievalQuery, load_chunks, load_retrieval_queries
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk, DocumentProcessor
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def retrieval_scores(
+    query_vectors: np.ndarray,
+    chunk_vectors: np.ndarray,
+    relevant: list[set[int]],
+    k: int,
+) -> tuple[float, float]:
+    """``(recall@k, MRR)`` of cosine ranking; a query counts if any relevant chunk ranks."""
+    scores = _normalize(query_vectors) @ _normalize(chunk_vectors).T
+    hits, reciprocal = 0, 0.0
+    for row, wanted in zip(scores, relevant):
+        ranking = np.argsort(-row)
+        ranks = [r for r, i in enumerate(ranking) if int(i) in wanted]
+        if ranks:
+            hits += ranks[0] < k
+            reciprocal += 1.0 / (ranks[0] + 1)
+    return hits / len(relevant), reciprocal / len(relevant)
+
+
+def _embed(
+    svc: EmbeddingService, chunks: list[DocumentChunk], late: bool,
+) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    vectors = svc.embed_chunks(chunks, late_chunking=late).embeddings
+    return vectors, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parser.add_argument("--target-tokens", type=int, default=500)
+    parser.add_argument("--max-tokens", type=int, default=600)
+    parser.add_argument("--overlap-tokens", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(
+        target_tokens=args.target_tokens,
+        max_tokens=args.max_tokens,
+        overlap_tokens=args.overlap_tokens,
+    )
+    chunks = load_chunks(repeat=args.repeat, processor=processor)
+    queries: list[RetrievalQuery] = load_retrieval_queries()
+    relevant = [q.relevant(chunks) for q in queries]
+
+    svc = EmbeddingService(model_name=args.model, cache=None)
+    query_vectors = np.asarray(svc.embed_batch([q.query for q in queries]))
+    svc.embed_batch([c.chunk_text for c in chunks[:8]])  # warm-up
+
+    per_chunk, per_chunk_s = _embed(svc, chunks, late=False)
+    per_chunk_tokens = sum(svc.token_lengths([c.chunk_text for c in chunks]))
+    late, late_s = _embed(svc, chunks, late=True)
+    stats = svc.late_chunking_stats()
+    late_tokens = per_chunk_tokens - (stats.chunk_tokens - stats.window_tokens)
+
+    cosine = np.sum(_normalize(per_chunk) * _normalize(late), axis=1)
+    print(
+        f"{len(chunks)} chunks, {stats.chunks} late-chunked into {stats.windows} windows; "
+        f"{len(queries)} queries"
+    )
+    print(f"{'mode':<12} {'tokens':>9} {'seconds':>8} {f'recall@{args.k}':>10} {'MRR':>6}")
+    for name, vectors, tokens, seconds in (
+        ("per-chunk", per_chunk, per_chunk_tokens, per_chunk_s),
+        ("late", late, late_tokens, late_s),
+    ):
+        recall, mrr = retrieval_scores(query_vectors, vectors, relevant, args.k)
+        print(f"{name:<12} {tokens:>9} {seconds:>8.2f} {recall:>10.3f} {mrr:>6.3f}")
+    print(
+        f"tokens saved {1 - late_tokens / per_chunk_tokens:.1%}; "
+        f"cosine late vs per-chunk mean {cosine.mean():.4f}, min {cosine.min():.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
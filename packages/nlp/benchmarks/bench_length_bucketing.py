@@ -0,0 +1,83 @@
+"""
+Padding waste and throughput of length-bucketed vs fixed-size batching.
+
+Usage:
+    python benchmarks/bench_length_bucketing.py [--model nlpaueb/legal-bert-base-uncased]
+        [--repeat 4] [--batch-size 32] [--max-tokens 16384] [--no-encode]
+
+Reports, over DocumentProcessor output for the sample contracts:
+
+* arrival order, fixed ``batch_size`` (the request order the API receives),
+* sentence-transformers' own character-length sort with fixed ``batch_size``
+  (what ``encode`` did for us before bucketing), and
+* token-length buckets under a padded-token budget (current ``embed_batch``).
+
+With ``--no-encode`` only the tokenizer is used and no forward passes run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from corpus import load_chunks
+
+from forge_nlp.embeddings.batching import (
+    PaddingStats,
+    fixed_batches,
+    padding_stats,
+    plan_token_batches,
+)
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+
+
+def _char_sorted_batches(texts: list[str], batch_size: int) -> list[list[int]]:
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def _time_plan(svc: EmbeddingService, texts: list[str], batches: list[list[int]]) -> float:
+    start = time.perf_counter()
+    for batch in batches:
+        svc._encode_batch([texts[i] for i in batch], len(batch))
+    return time.perf_counter() - start
+
+
+def _row(name: str, stats: PaddingStats, seconds: float | None, n: int) -> str:
+    throughput = f"{n / seconds:10.1f}" if seconds else f"{'-':>10}"
+    return (
+        f"{name:<28} {stats.batches:>7} {stats.real_tokens:>9} {stats.padded_tokens:>9} "
+        f"{stats.padding_ratio:>8.1%} {throughput}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parser.add_argument("--repeat", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=16_384)
+    parser.add_argument("--no-encode", action="store_true")
+    args = parser.parse_args()
+
+    texts = [c.chunk_text for c in load_chunks(repeat=args.repeat)]
+    svc = EmbeddingService(model_name=args.model, batch_size=args.batch_size, cache=None)
+    lengths = svc.token_lengths(texts)
+
+    plans = {
+        "arrival order, fixed": fixed_batches(len(texts), args.batch_size),
+        "char-sorted, fixed": _char_sorted_batches(texts, args.batch_size),
+        "token buckets, budget": plan_token_batches(lengths, args.max_tokens, args.batch_size),
+    }
+
+    print(f"{len(texts)} chunks, {sum(lengths)} tokens, max {max(lengths)} tokens/chunk")
+    print(f"{'plan':<28} {'batches':>7} {'real':>9} {'padded':>9} {'padding':>8} {'texts/s':>10}")
+    if not args.no_encode:
+        _time_plan(svc, texts, plans["token buckets, budget"][:1])  # warm-up
+    for name, batches in plans.items():
+        seconds = None if args.no_encode else _time_plan(svc, texts, batches)
+        print(_row(name, padding_stats(lengths, batches), seconds, len(texts)))
+
+
+if __name__ == "__main__":
+    main()
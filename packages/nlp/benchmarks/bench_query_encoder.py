@@ -0,0 +1,70 @@
+"""
+Retrieval quality and query latency of the distilled query encoder vs LegalBERT.
+
+Usage:
+    python benchmarks/bench_query_encoder.py [--model nlpaueb/legal-bert-base-uncased]
+        [--encoder DIR] [--k 5] [--repeat 1]
+
+Embeds DocumentProcessor output for the sample contracts with the full
+model (the stored document vectors), then the queries of
+``retrieval_queries.jsonl`` twice: with the full model and with the query
+encoder (``query_encoder distill`` output; default: the model's).  Reports
+for each:
+
+* recall@k and MRR, where a chunk is relevant if it contains the query's
+  answer phrase,
+* single-query encode latency (p50/p99, one query per forward pass as
+  search sends them),
+
+plus the overlap of the two top-k lists and the cosine between the two
+vectors of each query.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from bench_late_chunking import retrieval_scores
+from corpus import load_chunks, load_retrieval_queries
+
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+from forge_nlp.embeddings.query_encoder import evaluate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parser.add_argument("--encoder", default=None)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    chunks = load_chunks(repeat=args.repeat)
+    queries = load_retrieval_queries()
+    relevant = [q.relevant(chunks) for q in queries]
+    texts = [q.query for q in queries]
+
+    svc = EmbeddingService(model_name=args.model, cache=None, query_encoder=args.encoder)
+    if svc.query_encoder is None:
+        parser.error(f"no query encoder built for {args.model}; run query_encoder distill first")
+    chunk_vectors = svc.embed_chunks(chunks).embeddings
+    teacher = svc.encode(texts)
+    student = svc._encode_queries(texts)
+    report = evaluate(svc, texts, chunk_vectors, args.k)
+
+    print(f"{len(chunks)} chunks, {len(queries)} queries, encoder {svc.query_encoder}")
+    print(f"{'query path':<14} {f'recall@{args.k}':>10} {'MRR':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, vectors, p50, p99 in (
+        ("LegalBERT", teacher, report.teacher_p50_ms, report.teacher_p99_ms),
+        ("query encoder", student, report.student_p50_ms, report.student_p99_ms),
+    ):
+        recall, mrr = retrieval_scores(vectors, chunk_vectors, relevant, args.k)
+        print(f"{name:<14} {recall:>10.3f} {mrr:>6.3f} {p50:>8.2f} {p99:>8.2f}")
+    print(
+        f"top-{args.k} overlap with LegalBERT {report.recall_at_k:.3f}; "
+        f"query cosine mean {report.mean_cosine:.4f}; {report.speedup:.1f}× faster at p50"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Encoder throughput across batch sizes, input lengths, backends and threads.
+
+Usage:
+    python benchmarks/bench_throughput.py [--model nlpaueb/legal-bert-base-uncased]
+        [--backends torch,torch-compile,onnx-int8] [--onnx-dir DIR]
+        [--threads 8/1,4/1] [--batch-sizes 8,16,32,64] [--max-tokens 16384]
+        [--repeats 5] [--output throughput.json]
+        [--compare BASELINE.json] [--tolerance 0.1]
+
+Workloads are the length distributions the encoder actually sees:
+
+* ``chunks``: DocumentProcessor output for the sample contracts with the
+  default budgets (what ingestion embeds),
+* ``short-chunks``: the same documents with a 128-token target, and
+* ``queries``: the questions in ``retrieval_queries.jsonl`` (what search
+  embeds).
+
+Every backend × thread setting runs in its own spawned process (torch's
+inter-op pool can only be sized once per process), and times each workload ×
+batch size through ``EmbeddingService.encode`` — the length-bucketed
+batching ``embed_batch`` uses, without the cache or the per-call dedup.
+Reported per cell: texts/s and tokens/s (real, non-padding WordPiece tokens)
+from the median of ``--repeats`` runs, plus the run-to-run spread.
+
+The JSON report records the git commit, host fingerprint and library
+versions next to the results.  ``--compare`` matches cells against an
+earlier report and exits non-zero if any lost more than ``--tolerance`` of
+its tokens/s; comparisons across different host fingerprints are flagged,
+since they say nothing about the code.  Backends that cannot load (e.g.
+``onnx-int8`` without an export) are skipped and listed in the report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+from corpus import load_chunks, load_retrieval_queries
+
+from forge_nlp.chunking.clause_chunker import DocumentProcessor
+from forge_nlp.embeddings.autotune import (
+    _cpu_model,
+    _run_isolated,
+    host_fingerprint,
+    thread_candidates,
+)
+from forge_nlp.embeddings.encoder_pool import available_cpus
+
+REPORT_SCHEMA = 1
+_VERSIONED_PACKAGES = ("torch", "transformers", "sentence-transformers", "onnxruntime", "optimum")
+
+
+@dataclass
+class Cell:
+    """Throughput of one workload × batch size under one backend and thread setting."""
+
+    workload: str
+    backend: str
+    intra_op_threads: int
+    inter_op_threads: int
+    batch_size: int
+    texts: int
+    tokens: int
+    seconds: float  # median over repeats
+    spread: float   # (slowest - fastest) / median
+
+    @property
+    def key(self) -> str:
+        return (f"{self.workload}|{self.backend}|{self.intra_op_threads}/"
+                f"{self.inter_op_threads}|{self.batch_size}")
+
+    @property
+    def texts_per_s(self) -> float:
+        return self.texts / self.seconds
+
+    @property
+    def tokens_per_s(self) -> float:
+        return self.tokens / self.seconds
+
+
+def load_workloads() -> dict[str, list[str]]:
+    """Distinct input texts of each workload (see module docstring)."""
+    def distinct(texts: list[str]) -> list[str]:
+        return list(dict.fromkeys(texts))
+
+    return {
+        "chunks": distinct([c.chunk_text for c in load_chunks()]),
+        "short-chunks": distinct([
+            c.chunk_text
+            for c in load_chunks(processor=DocumentProcessor(target_tokens=128, max_tokens=160))
+        ]),
+        "queries": distinct([q.query for q in load_retrieval_queries()]),
+    }
+
+
+def measure(
+    model_name: str,
+    backend: str,
+    onnx_dir: str | None,
+    intra_op_threads: int,
+    inter_op_threads: int,
+    workloads: dict[str, list[str]],
+    batch_sizes: tuple[int, ...],
+    max_tokens_per_batch: int | None,
+    repeats: int,
+) -> tuple[list[dict], dict[str, list[int]]]:
+    """Time every workload × batch size under one backend and thread setting.
+
+    Runs in a fresh process.  Returns the cells (as dicts, for pickling) and
+    each workload's token lengths.
+    """
+    import torch
+
+    torch.set_num_threads(intra_op_threads)
+    torch.set_num_interop_threads(inter_op_threads)
+
+    from forge_nlp.embeddings.embedding_service import EmbeddingService
+    from forge_nlp.embeddings.model_registry import ModelRegistry
+
+    svc = EmbeddingService(
+        model_name=model_name,
+        backend=backend,
+        onnx_dir=onnx_dir,
+        cache=None,
+        max_tokens_per_batch=max_tokens_per_batch,
+        registry=ModelRegistry(),
+    )
+    cells: list[dict] = []
+    lengths: dict[str, list[int]] = {}
+    for name, texts in workloads.items():
+        lengths[name] = svc.token_lengths(texts)
+        tokens = sum(lengths[name])
+        svc.encode(texts[:max(batch_sizes)], max(batch_sizes))  # warm-up (and compile)
+        for batch_size in batch_sizes:
+            runs = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                svc.encode(texts, batch_size)
+                runs.append(time.perf_counter() - start)
+            median = float(np.median(runs))
+            cells.append(asdict(Cell(
+                workload=name,
+                backend=backend,
+                intra_op_threads=intra_op_threads,
+                inter_op_threads=inter_op_threads,
+                batch_size=batch_size,
+                texts=len(texts),
+                tokens=tokens,
+                seconds=median,
+                spread=(max(runs) - min(runs)) / median,
+            )))
+    return cells, lengths
+
+
+# ─── Report ────────────────────────────────────────────────────────────
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _versions() -> dict[str, str | None]:
+    versions: dict[str, str | None] = {"python": platform.python_version()}
+    for package in _VERSIONED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def _length_summary(lengths: list[int]) -> dict[str, float]:
+    return {
+        "texts": len(lengths),
+        "tokens": int(sum(lengths)),
+        "p50": float(np.percentile(lengths, 50)),
+        "p90": float(np.percentile(lengths, 90)),
+        "max": int(max(lengths)),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print tokens/s against ``baseline``; return the keys that regressed."""
+    if report["host"]["fingerprint"] != baseline["host"]["fingerprint"]:
+        print("warning: baseline is from another host fingerprint; deltas include hardware")
+    before = {Cell(**c).key: Cell(**c) for c in baseline["results"]}
+    regressed: list[str] = []
+    print(f"\nvs {baseline['git']['commit'] or '?'}:")
+    print(f"{'cell':<44} {'before':>10} {'after':>10} {'change':>8}")
+    for data in report["results"]:
+        cell = Cell(**data)
+        old = before.get(cell.key)
+        if old is None:
+            continue
+        change = cell.tokens_per_s / old.tokens_per_s - 1
+        flag = ""
+        if change < -tolerance:
+            regressed.append(cell.key)
+            flag = "  REGRESSED"
+        print(f"{cell.key:<44} {old.tokens_per_s:>10.0f} {cell.tokens_per_s:>10.0f} "
+              f"{change:>+8.1%}{flag}")
+    return regressed
+
+
+def _int_list(value: str) -> tuple[int, ...]:
+    return tuple(int(v) for v in value.split(","))
+
+
+def _thread_list(value: str) -> list[tuple[int, int]]:
+    return [tuple(int(n) for n in v.split("/")) for v in value.split(",")]  # type: ignore[misc]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parser.add_argument("--backends", default="torch,torch-compile,onnx-int8")
+    parser.add_argument("--onnx-dir", default=None)
+    parser.add_argument("--threads", type=_thread_list, default=None,
+                        help="intra/inter pairs, default: autotune's candidates")
+    parser.add_argument("--batch-sizes", type=_int_list, default=(8, 16, 32, 64))
+    parser.add_argument("--max-tokens", type=int, default=16_384,
+                        help="padded-token budget per batch; 0 for fixed-size batches")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="throughput.json")
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    workloads = load_workloads()
+    threads = args.threads or thread_candidates(len(available_cpus()))
+    results: list[dict] = []
+    lengths: dict[str, list[int]] = {}
+    skipped: dict[str, str] = {}
+    started = time.time()
+    for backend in args.backends.split(","):
+        for intra, inter in threads:
+            print(f"{backend} threads={intra}/{inter} …", file=sys.stderr)
+            try:
+                cells, lengths = _run_isolated(
+                    measure, args.model, backend, args.onnx_dir, intra, inter, workloads,
+                    args.batch_sizes, args.max_tokens or None, args.repeats,
+                )
+            except Exception as exc:  # noqa: BLE001 — report and move on to the next backend
+                skipped[backend] = f"{type(exc).__name__}: {exc}"
+                print(f"  skipped: {skipped[backend]}", file=sys.stderr)
+                break
+            results.extend(cells)
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "created_at": started,
+        "git": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        },
+        "host": {
+            "fingerprint": host_fingerprint(),
+            "machine": platform.machine(),
+            "cpu": _cpu_model(),
+            "cpus": len(available_cpus()),
+            "versions": _versions(),
+        },
+        "model": args.model,
+        "settings": {
+            "batch_sizes": list(args.batch_sizes),
+            "max_tokens_per_batch": args.max_tokens or None,
+            "repeats": args.repeats,
+        },
+        "workloads": {name: _length_summary(ls) for name, ls in lengths.items()},
+        "skipped": skipped,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    for name, summary in report["workloads"].items():
+        print(f"{name}: {summary['texts']} texts, {summary['tokens']} tokens, "
+              f"p50 {summary['p50']:.0f} / p90 {summary['p90']:.0f} / max {summary['max']} tokens")
+    print(f"{'workload':<13} {'backend':<14} {'threads':>7} {'batch':>6} "
+          f"{'texts/s':>9} {'tokens/s':>10} {'spread':>7}")
+    for data in results:
+        cell = Cell(**data)
+        print(f"{cell.workload:<13} {cell.backend:<14} "
+              f"{cell.intra_op_threads:>4}/{cell.inter_op_threads:<2} {cell.batch_size:>6} "
+              f"{cell.texts_per_s:>9.1f} {cell.tokens_per_s:>10.0f} {cell.spread:>7.1%}")
+    print(f"report → {args.output}")
+
+    if args.compare:
+        regressed = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressed:
+            print(f"{len(regressed)} cells lost more than {args.tolerance:.0%} tokens/s")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Query latency and throughput of in-process vector search.
+
+Usage:
+    python benchmarks/bench_vector_search.py [--rows 200000] [--dims 768]
+        [--queries 200] [--k 10] [--block-rows 8192]
+        [--hnsw-rows 20000] [--m 16] [--ef-construction 200] [--ef-search 16 32 64 128]
+
+Searching does not depend on the encoder, and a corpus large enough for
+search cost to matter would take hours to embed on CPU, so the vectors are
+synthetic: Gaussian clusters around random centres, which is closer to
+real embeddings (many near-duplicate clauses, a few topics) than uniform
+noise.  Queries are perturbed corpus rows.  Reports, for the exact index
+and for the HNSW index at each ``--ef-search``:
+
+* build time,
+* recall@k against the exact answer,
+* single-query latency (p50/p99, one query per call as ``/search`` sends
+  them),
+* batched throughput (all queries in one call).
+
+HNSW inserts run in Python at a few ms each, so the HNSW rows are built
+over the first ``--hnsw-rows`` vectors only (0: skip), and the exact index
+is measured on the same subset for its recall baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+from forge_nlp.search.exact_index import ExactIndex, SearchHit
+from forge_nlp.search.hnsw_index import HnswIndex
+
+
+def clustered_vectors(
+    rows: int, dims: int, clusters: int = 256, spread: float = 0.35, seed: int = 0,
+) -> np.ndarray:
+    """``rows`` float32 vectors drawn around ``clusters`` random centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dims)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    noise = rng.standard_normal((rows, dims)).astype(np.float32)
+    return centres[labels] + spread * noise
+
+
+def query_vectors(corpus: np.ndarray, n: int, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of ``n`` random corpus rows."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(corpus), n, replace=False)
+    return corpus[picks] + 0.1 * rng.standard_normal((n, corpus.shape[1])).astype(np.float32)
+
+
+def latencies_ms(search, queries: np.ndarray, k: int) -> np.ndarray:
+    """Wall time of one ``search(query, k)`` call per query."""
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query, k)
+        times.append((time.perf_counter() - started) * 1000)
+    return np.asarray(times)
+
+
+def recall_at_k(found: list[list[SearchHit]], truth: list[list[SearchHit]]) -> float:
+    """Mean fraction of the exact top-k each approximate result list recovers."""
+    return float(np.mean([
+        len({h.chunk_id for h in a} & {h.chunk_id for h in b}) / max(len(b), 1)
+        for a, b in zip(found, truth)
+    ]))
+
+
+def report(name: str, build_s: float, recall: float, single: np.ndarray, batch_qps: float) -> None:
+    print(
+        f"{name:<14} {build_s:>8.2f} {recall:>7.3f} {np.percentile(single, 50):>8.2f} "
+        f"{np.percentile(single, 99):>8.2f} {1000 / single.mean():>8.0f} {batch_qps:>10.0f}"
+    )
+
+
+def measure_exact(path: Path, corpus: np.ndarray, queries: np.ndarray, args) -> tuple:
+    """Build an exact index over ``corpus``; its answers, build time, latencies and batch QPS."""
+    started = time.perf_counter()
+    index = ExactIndex(path, dimensions=corpus.shape[1], embedding_version="bench",
+                       block_rows=args.block_rows)
+    index.add([f"chunk-{i}" for i in range(len(corpus))], ["OTHER"] * len(corpus), corpus)
+    build_s = time.perf_counter() - started
+    index.search(queries[:1], args.k)  # warm the page cache
+    single = latencies_ms(index.search, queries, args.k)
+    started = time.perf_counter()
+    truth = index.search(queries, args.k)
+    return truth, build_s, single, len(queries) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--block-rows", type=int, default=8192)
+    parser.add_argument("--hnsw-rows", type=int, default=20_000)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    corpus = clustered_vectors(args.rows, args.dims)
+    queries = query_vectors(corpus, args.queries)
+    header = (f"{'index':<14} {'build s':>8} {f'R@{args.k}':>7} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'QPS':>8} {'batch QPS':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.rows} × {args.dims} vectors, {args.queries} queries, k={args.k}")
+        print(header)
+        _, build_s, single, batch_qps = measure_exact(Path(tmp) / "exact", corpus, queries, args)
+        report("exact", build_s, 1.0, single, batch_qps)
+        if not args.hnsw_rows:
+            return
+
+        subset = corpus[:args.hnsw_rows]
+        sub_queries = query_vectors(subset, min(args.queries, len(subset)))
+        print(f"\n{len(subset)} × {args.dims} vectors (HNSW subset), m={args.m}, "
+              f"ef_construction={args.ef_construction}")
+        print(header)
+        truth, build_s, single, batch_qps = measure_exact(
+            Path(tmp) / "subset", subset, sub_queries, args
+        )
+        report("exact", build_s, 1.0, single, batch_qps)
+
+        started = time.perf_counter()
+        hnsw = HnswIndex(Path(tmp) / "hnsw", dimensions=args.dims, embedding_version="bench",
+                         m=args.m, ef_construction=args.ef_construction)
+        hnsw.add([f"chunk-{i}" for i in range(len(subset))], ["OTHER"] * len(subset), subset)
+        build_s = time.perf_counter() - started
+        for ef in args.ef_search:
+            search = functools.partial(hnsw.search, ef_search=ef)
+            single = latencies_ms(search, sub_queries, args.k)
+            started = time.perf_counter()
+            found = search(sub_queries, args.k)
+            batch_qps = len(sub_queries) / (time.perf_counter() - started)
+            report(f"hnsw ef={ef}", build_s, recall_at_k(found, truth), single, batch_qps)
+        hnsw.close()
+
+
+if __name__ == "__main__":
+    main()
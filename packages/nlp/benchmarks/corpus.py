@@ -0,0 +1,41 @@
+"""
+Benchmark fixtures over the sample contracts in the repo.
+
+The documents and their chunks come from ``forge_nlp.embeddings.corpus``
+and are re-exported here; this module adds the retrieval queries the quality
+benchmarks score, and puts ``src`` on the path for benchmarks run from a
+checkout.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+_SRC = Path(__file__).resolve().parent.parent / "src"  # packages/nlp/src
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.corpus import load_chunks, load_documents  # noqa: F401
+
+_RETRIEVAL_QUERIES = Path(__file__).resolve().parent / "retrieval_queries.jsonl"
+
+
+@dataclass
+class RetrievalQuery:
+    """A search query and a phrase that only the chunks answering it contain."""
+
+    query: str
+    answer: str
+
+    def relevant(self, chunks: list[DocumentChunk]) -> set[int]:
+        return {i for i, c in enumerate(chunks) if self.answer in c.chunk_text}
+
+
+def load_retrieval_queries() -> list[RetrievalQuery]:
+    """Retrieval fixture over the sample documents: queries with answer phrases."""
+    with _RETRIEVAL_QUERIES.open() as fh:
+        return [RetrievalQuery(**json.loads(line)) for line in fh if line.strip()]
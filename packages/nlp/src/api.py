@@ -1,7 +1,7 @@
 """
 FastAPI application for the Forge NLP service.
 
-Serves embedding, NER, and combined extraction endpoints.
+Serves embedding, NER, combined extraction and vector search endpoints.
 
 Run locally:
     uvicorn api:app --host 0.0.0.0 --port 8000 --reload
@@ -11,16 +11,50 @@ In Docker the entrypoint calls this module directly.
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
 import logging
+import os
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
 from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.autotune import DEFAULT_MAX_LATENCY_MS, autotune
+from forge_nlp.embeddings.embedding_cache import EmbeddingCache
 from forge_nlp.embeddings.embedding_service import EmbeddedChunk, EmbeddingService
+from forge_nlp.embeddings.encoder_pool import EncoderPool, EncoderPoolError
+from forge_nlp.embeddings.micro_batcher import MicroBatcher, QueueFullError
+from forge_nlp.embeddings.model_registry import ModelRegistry
+from forge_nlp.embeddings.quantization import Precision
+from forge_nlp.embeddings.singleflight import SingleFlight
+from forge_nlp.embeddings.wire_format import (
+    MEDIA_FRAME,
+    MEDIA_JSON,
+    MEDIA_NDJSON,
+    MEDIA_NPY,
+    WireFormatError,
+    encode_frame,
+    encode_ndjson_line,
+    encode_npy,
+    ndjson_batches,
+    negotiate,
+)
+from forge_nlp.search.bm25_index import DEFAULT_LEXICAL_INDEX_PATH, Bm25Index
+from forge_nlp.search.exact_index import SearchHit, default_index_path
+from forge_nlp.search.hnsw_index import HnswIndex
+from forge_nlp.search.hybrid import DEFAULT_CANDIDATES, DEFAULT_RRF_K, dense_stage
+from forge_nlp.search.index import SearchIndex, index_kind, open_index
+from forge_nlp.search.ivfpq_index import IvfPqIndex
+from forge_nlp.search.latency import LatencyWindow
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +62,30 @@ logger = logging.getLogger(__name__)
 
 class EmbedRequest(BaseModel):
     texts: list[str] = Field(..., min_length=1, description="Texts to embed")
-    model: str | None = Field(None, description="Model override (unused in local mode)")
+    model: str | None = Field(
+        None, description="Model to embed with: the default model or one listed in EMBED_MODELS",
+    )
+    precision: Precision = Field(
+        Precision.FLOAT32,
+        description="float32, float16, int8 (calibrated codes) or binary (packed sign bits)",
+    )
+    dimensions: int | None = Field(
+        None,
+        gt=0,
+        description="Reduced output size via the fitted projection (e.g. 128, 256, 384)",
+    )
+    query: bool = Field(
+        False,
+        description="Texts are search queries: embed them with the distilled query encoder "
+        "if built",
+    )
 
 
 class EmbedResponse(BaseModel):
-    embeddings: list[list[float]]
+    embeddings: list[list[float]] | list[list[int]]
     model: str
     dimensions: int
+    precision: Precision = Precision.FLOAT32
 
 
 class ChunkInput(BaseModel):
@@ -51,15 +102,43 @@ class EmbeddedChunkOutput(BaseModel):
     clause_number: str | None
     chunk_index: int
     metadata: dict[str, Any]
-    embedding: list[float]
+    embedding: list[float] | list[int]
+    embedding_float32: list[float] | None = None
 
 
 class EmbedChunksRequest(BaseModel):
     chunks: list[ChunkInput] = Field(..., min_length=1)
+    precision: Precision = Precision.FLOAT32
+    dimensions: int | None = Field(None, gt=0)
+    include_float32: bool = Field(
+        False,
+        description="Also return full-precision vectors for later rescoring (JSON responses only)",
+    )
 
 
 class EmbedChunksResponse(BaseModel):
     embedded_chunks: list[EmbeddedChunkOutput]
+    embedding_version: str  # store alongside the vectors (see reembedding.py)
+
+
+class LoadedModelOutput(BaseModel):
+    model_name: str
+    backend: str
+    size_bytes: int
+    uses: int
+    load_seconds: float
+
+
+class TuningOutput(BaseModel):
+    fingerprint: str
+    batch_size: int
+    max_tokens_per_batch: int
+    intra_op_threads: int
+    inter_op_threads: int
+    tokens_per_s: float
+    max_ms: float
+    max_latency_ms: float
+    tuned_at: float
 
 
 class HealthResponse(BaseModel):
@@ -67,6 +146,128 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     model_name: str
     dimensions: int
+    model_dimensions: int
+    backend: str
+    pool_workers: int = 0
+    pool_workers_alive: int = 0
+    models: list[LoadedModelOutput] = Field(default_factory=list)
+    model_memory_used_bytes: int = 0
+    model_memory_budget_bytes: int | None = None
+    tuning: TuningOutput | None = None
+    snapshot: str | None = None
+    query_encoder: str | None = None
+
+
+class CacheStatsOutput(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    memory_hits: int
+    disk_hits: int
+    evictions: int
+    memory_entries: int
+    max_memory_entries: int
+    disk_entries: int
+
+
+class BatcherStatsOutput(BaseModel):
+    max_batch_size: int
+    max_wait_ms: float
+    max_queue_depth: int
+    max_in_flight: int
+    queue_depth: int
+    in_flight: int
+    requests: int
+    texts: int
+    batches: int
+    rejected: int
+    mean_batch_size: float
+    last_batch_size: int
+    encode_seconds: float
+
+
+class PoolWorkerOutput(BaseModel):
+    index: int
+    pid: int | None
+    alive: bool
+    cpus: list[int]
+    threads: int
+    texts: int
+    calls: int
+
+
+class TruncationStatsOutput(BaseModel):
+    texts: int
+    truncated: int
+    tokens_dropped: int
+
+
+class DedupStatsOutput(BaseModel):
+    texts: int
+    in_batch_duplicates: int
+    single_flight_calls: int
+    single_flight_shared: int
+    encodes_avoided: int
+
+
+class LateChunkingStatsOutput(BaseModel):
+    chunks: int
+    windows: int
+    chunk_tokens: int
+    window_tokens: int
+    tokens_saved: int
+
+
+class ClauseLibraryStatsOutput(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+
+
+class StartupStatsOutput(BaseModel):
+    embedding_model_s: float | None  # None: the model failed to load
+    ner_model_s: float | None        # None: no NER model
+    warmup_s: float | None
+    startup_s: float                 # whole startup hook
+    ready_after_process_start_s: float | None
+    snapshot: str | None
+
+
+class SearchStatsOutput(BaseModel):
+    index_kind: str
+    chunks: int
+    deleted: int = 0
+    requests: int
+    p50_ms: float           # whole request, query embedding included
+    p99_ms: float
+    index_p50_ms: float     # index lookup only
+    index_p99_ms: float
+    filter_strategies: dict[str, int] = Field(default_factory=dict)  # searches per strategy
+
+
+class LexicalStatsOutput(BaseModel):
+    chunks: int
+    deleted: int
+    terms: int
+    postings_bytes: int
+    requests: int           # hybrid searches
+    lexical_p50_ms: float   # BM25 stage
+    lexical_p99_ms: float
+    dense_p50_ms: float     # dense rerank stage
+    dense_p99_ms: float
+
+
+class MetricsResponse(BaseModel):
+    cache: CacheStatsOutput | None
+    batcher: BatcherStatsOutput | None
+    pool: list[PoolWorkerOutput] | None = None
+    truncation: TruncationStatsOutput | None = None
+    dedup: DedupStatsOutput | None = None
+    late_chunking: LateChunkingStatsOutput | None = None
+    clause_library: ClauseLibraryStatsOutput | None = None
+    startup: StartupStatsOutput | None = None
+    search: SearchStatsOutput | None = None
+    lexical: LexicalStatsOutput | None = None
 
 
 # ─── NER Pydantic models ──────────────────────────────────────────────
@@ -100,24 +301,315 @@ class NerBatchResponse(BaseModel):
 
 # Lazy-initialized on first request (or at startup via lifespan)
 _service: EmbeddingService | None = None
+_registry: ModelRegistry | None = None
+# Services for the extra models /embed can route to, by model name
+_model_services: dict[str, EmbeddingService] = {}
+_model_loads: SingleFlight[EmbeddingService] = SingleFlight()
+
+
+def _get_registry() -> ModelRegistry:
+    """Model registry shared by every service in the process.
+
+    EMBED_MODEL_MEMORY_MB — budget for resident models; least recently used
+                            ones are evicted beyond it (default: unlimited)
+    """
+    global _registry
+    if _registry is None:
+        budget = os.environ.get("EMBED_MODEL_MEMORY_MB")
+        _registry = ModelRegistry(budget_bytes=int(float(budget) * 2**20) if budget else None)
+    return _registry
+
+
+def _build_cache() -> EmbeddingCache | None:
+    """Embedding cache configured from the environment.
+
+    EMBED_CACHE_SIZE   — in-memory LRU entries (0 disables the cache)
+    EMBED_CACHE_DIR    — optional directory for the persistent disk tier
+    """
+    max_entries = int(os.environ.get("EMBED_CACHE_SIZE", "10000"))
+    disk_dir = os.environ.get("EMBED_CACHE_DIR") or None
+    if max_entries <= 0 and disk_dir is None:
+        return None
+    return EmbeddingCache(max_entries=max_entries, disk_dir=disk_dir)
 
 
 def _get_service() -> EmbeddingService:
+    """Embedding service configured from the environment.
+
+    EMBED_BACKEND     — torch (default), torch-compile or onnx-int8
+    EMBED_ONNX_DIR    — exported ONNX model directory for onnx-int8
+    EMBED_SNAPSHOT    — model snapshot directory (default: the one
+                        ``snapshot build`` writes for the model, if any)
+    EMBED_DIMENSIONS  — default output size; below the model's needs a fitted projection
+    EMBED_CLAUSE_LIBRARY — precomputed clause library directory (default: the
+                           one ``clause_library build`` writes for the model, if any)
+    EMBED_AUTOTUNE    — 1 to calibrate batch size and torch threads for this
+                        host at startup (reuses the persisted result if any)
+    EMBED_AUTOTUNE_MAX_LATENCY_MS — latency ceiling for one encoder batch (default 1000)
+    EMBED_QUERY_ENCODER — distilled query encoder directory (default: the one
+                          ``query_encoder distill`` writes for the model, if any)
+    """
     global _service  # noqa: PLW0603
     if _service is None:
-        _service = EmbeddingService()
+        dimensions = os.environ.get("EMBED_DIMENSIONS")
+        backend = os.environ.get("EMBED_BACKEND", "torch")
+        onnx_dir = os.environ.get("EMBED_ONNX_DIR") or None
+        snapshot = os.environ.get("EMBED_SNAPSHOT") or None
+        tune = os.environ.get("EMBED_AUTOTUNE", "0") not in ("", "0", "false")
+        max_latency_ms = float(
+            os.environ.get("EMBED_AUTOTUNE_MAX_LATENCY_MS", DEFAULT_MAX_LATENCY_MS),
+        )
+        pool = _build_pool(backend, onnx_dir, snapshot, max_latency_ms if tune else None)
+        _service = EmbeddingService(
+            cache=_build_cache(),
+            backend=backend,
+            onnx_dir=onnx_dir,
+            snapshot=snapshot,
+            output_dimensions=int(dimensions) if dimensions else None,
+            pool=pool,
+            clause_library=os.environ.get("EMBED_CLAUSE_LIBRARY") or None,
+            registry=_get_registry(),
+            autotune=pool.tuning if pool is not None and pool.tuning is not None else tune,
+            autotune_max_latency_ms=max_latency_ms,
+            query_encoder=os.environ.get("EMBED_QUERY_ENCODER") or None,
+        )
     return _service
 
 
+async def _get_model_service(model: str | None) -> EmbeddingService:
+    """Service for a request's ``model``, the default service if unset.
+
+    A model's service is loaded in a worker thread, once for all the
+    requests that ask for it meanwhile.
+
+    EMBED_MODELS — comma-separated models /embed may route to besides the
+                   default one (e.g. a smaller query model)
+    """
+    default = _get_service()
+    if model is None or model == default.model_name:
+        return default
+    allowed = [m.strip() for m in os.environ.get("EMBED_MODELS", "").split(",") if m.strip()]
+    if model not in allowed:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model {model!r} is not served; available: {[default.model_name, *allowed]}",
+        )
+    if model not in _model_services:
+        try:
+            _model_services[model] = await _model_loads.do(
+                model,
+                lambda: asyncio.to_thread(
+                    EmbeddingService,
+                    model_name=model,
+                    cache=default.cache,
+                    backend=default.backend,
+                    registry=_get_registry(),
+                ),
+            )
+        except OSError as exc:
+            raise HTTPException(status_code=503, detail=f"Could not load {model}: {exc}") from exc
+    return _model_services[model]
+
+
+def _build_pool(
+    backend: str,
+    onnx_dir: str | None,
+    snapshot: str | None,
+    autotune_max_latency_ms: float | None = None,
+) -> EncoderPool | None:
+    """Encoder worker pool configured from the environment.
+
+    With ``autotune_max_latency_ms`` the host's tuning is loaded (or swept)
+    first and applied in every worker.
+
+    EMBED_POOL_WORKERS  — worker processes (0, the default, encodes in-process)
+    EMBED_POOL_THREADS  — torch threads per worker (default: its share of the CPUs)
+    """
+    workers = int(os.environ.get("EMBED_POOL_WORKERS", "0"))
+    if workers <= 0:
+        return None
+    threads = os.environ.get("EMBED_POOL_THREADS")
+    pool = EncoderPool(
+        workers=workers,
+        threads_per_worker=int(threads) if threads else None,
+        backend=backend,
+        onnx_dir=onnx_dir,
+        snapshot=snapshot,
+    )
+    if autotune_max_latency_ms is not None:
+        pool.tuning = autotune(
+            pool.model_name, backend, onnx_dir=onnx_dir, max_latency_ms=autotune_max_latency_ms,
+        )
+    return pool.start()
+
+
+# One micro-batcher per model, by model name
+_batchers: dict[str, MicroBatcher] = {}
+
+
+def _get_batcher(svc: EmbeddingService | None = None) -> MicroBatcher:
+    """Micro-batcher of ``svc``'s model (default: the default service), shared by
+    /embed and /embed-chunks.
+
+    EMBED_MAX_BATCH_SIZE   — texts per coalesced encode call
+    EMBED_MAX_WAIT_MS      — how long a request waits for others to join
+    EMBED_MAX_QUEUE_DEPTH  — waiting requests before new ones get a 503
+
+    With an encoder pool, one batch per worker encodes at a time.
+    """
+    svc = svc or _get_service()
+    if svc.model_name not in _batchers:
+        _batchers[svc.model_name] = MicroBatcher(
+            encode_fn=svc.embed_array,
+            max_batch_size=int(os.environ.get("EMBED_MAX_BATCH_SIZE", "64")),
+            max_wait_ms=float(os.environ.get("EMBED_MAX_WAIT_MS", "5")),
+            max_queue_depth=int(os.environ.get("EMBED_MAX_QUEUE_DEPTH", "1024")),
+            max_in_flight=svc.pool.size if svc.pool is not None else 1,
+        )
+    return _batchers[svc.model_name]
+
+
+# Concurrent single-text requests for the same text and model share one encode.
+_single_flight: SingleFlight[np.ndarray] = SingleFlight()
+
+
+async def _embed_texts(texts: list[str], svc: EmbeddingService | None = None) -> np.ndarray:
+    svc = svc or _get_service()
+    batcher = _get_batcher(svc)
+    try:
+        if len(texts) == 1:
+            return await _single_flight.do(
+                (svc.model_name, texts[0]), lambda: batcher.submit(texts),
+            )
+        return await batcher.submit(texts)
+    except (QueueFullError, EncoderPoolError) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+async def _embed_queries(texts: list[str], svc: EmbeddingService) -> np.ndarray:
+    """Full-size query vectors from the service's query encoder (or its model)."""
+    try:
+        if svc.query_encoder is None:
+            return await _embed_texts(texts, svc)
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    if len(texts) == 1:
+        return await _single_flight.do(
+            (svc.query_cache_namespace, texts[0]),
+            lambda: asyncio.to_thread(svc.embed_query_array, texts),
+        )
+    return await asyncio.to_thread(svc.embed_query_array, texts)
+
+
+def _project(svc: EmbeddingService, vectors: np.ndarray, dimensions: int | None) -> np.ndarray:
+    try:
+        return svc.project(vectors, dimensions)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+def _quantize(svc: EmbeddingService, vectors: np.ndarray, precision: Precision) -> np.ndarray:
+    try:
+        return svc.quantize(vectors, precision)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+def _binary_response(
+    media_type: str,
+    vectors: np.ndarray,
+    metadata: dict[str, Any],
+) -> Response:
+    """Serve ``vectors`` as a Forge frame or ``.npy`` file.
+
+    Frames carry ``metadata`` inline; for ``.npy`` it goes in the
+    ``X-Embedding-Metadata`` header as compact JSON.
+    """
+    if media_type == MEDIA_FRAME:
+        return Response(content=encode_frame(vectors, metadata), media_type=MEDIA_FRAME)
+    return Response(
+        content=encode_npy(vectors),
+        media_type=MEDIA_NPY,
+        headers={"X-Embedding-Metadata": json.dumps(metadata, separators=(",", ":"))},
+    )
+
+
+_BINARY_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {
+        "content": {
+            MEDIA_FRAME: {"schema": {"type": "string", "format": "binary"}},
+            MEDIA_NPY: {"schema": {"type": "string", "format": "binary"}},
+        },
+        "description": "JSON by default; raw float32 frame or .npy via the Accept header.",
+    },
+}
+
+
+_startup: StartupStatsOutput | None = None
+
+
+def _process_age_s() -> float | None:
+    """Seconds since this process started (Linux), or ``None`` where unavailable."""
+    try:
+        with open("/proc/self/stat") as fh:
+            start_ticks = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as fh:
+            uptime = float(fh.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+async def _timed_load(name: str, load: Any) -> float | None:
+    """Run a blocking model load off the event loop; its duration, or ``None`` on failure."""
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(load)
+    except FileNotFoundError as exc:
+        logger.info("%s not loaded at startup: %s", name, exc)
+        return None
+    except Exception:
+        logger.exception("Failed to load %s at startup", name)
+        return None
+    return time.perf_counter() - started
+
+
 @asynccontextmanager
 async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Pre-load the model at startup so the first request is fast."""
-    try:
-        _get_service()
+    """Pre-load the models at startup so the first request is fast.
+
+    The embedding and NER models load concurrently, then a warm-up encode
+    pages in the embedding weights.  Timings are reported under ``startup``
+    on /metrics.
+    """
+    global _startup
+    started = time.perf_counter()
+    embedding_s, ner_s = await asyncio.gather(
+        _timed_load("embedding model", _get_service),
+        _timed_load("NER model", _get_ner_service),
+    )
+    warmup_s = None
+    if embedding_s is not None:
+        svc = _get_service()
+        if svc.pool is None:
+            warmup_started = time.perf_counter()
+            await asyncio.to_thread(svc.warm_up)
+            warmup_s = time.perf_counter() - warmup_started
         logger.info("Embedding service ready")
-    except Exception:
-        logger.exception("Failed to load embedding model at startup")
+    _startup = StartupStatsOutput(
+        embedding_model_s=embedding_s,
+        ner_model_s=ner_s,
+        warmup_s=warmup_s,
+        startup_s=time.perf_counter() - started,
+        ready_after_process_start_s=_process_age_s(),
+        snapshot=str(_service.snapshot) if _service is not None and _service.snapshot else None,
+    )
+    logger.info("Startup took %.2fs", _startup.startup_s)
     yield
+    for batcher in _batchers.values():
+        await batcher.close()
+    if _service is not None and _service.pool is not None:
+        _service.pool.shutdown()
 
 
 app = FastAPI(title="Forge NLP Embedding Service", version="0.1.0", lifespan=_lifespan)
@@ -128,60 +620,316 @@ app = FastAPI(title="Forge NLP Embedding Service", version="0.1.0", lifespan=_li
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     svc = _get_service()
+    workers = svc.pool.health() if svc.pool is not None else []
+    alive = sum(w.alive for w in workers)
+    registry = svc.registry.stats()
     return HealthResponse(
-        status="ok",
-        model_loaded=True,
+        status="ok" if alive == len(workers) else "degraded",
+        model_loaded=svc.model_key in svc.registry,
         model_name=svc.model_name,
-        dimensions=svc.dimensions,
+        dimensions=svc.output_dimensions,
+        model_dimensions=svc.dimensions,
+        backend=svc.backend.value,
+        pool_workers=len(workers),
+        pool_workers_alive=alive,
+        models=[
+            LoadedModelOutput(
+                model_name=m.model_name,
+                backend=m.backend.value,
+                size_bytes=m.size_bytes,
+                uses=m.uses,
+                load_seconds=m.load_seconds,
+            )
+            for m in svc.registry.loaded()
+        ],
+        model_memory_used_bytes=registry.used_bytes,
+        model_memory_budget_bytes=registry.budget_bytes,
+        tuning=TuningOutput(
+            fingerprint=svc.tuning.fingerprint,
+            batch_size=svc.tuning.batch_size,
+            max_tokens_per_batch=svc.tuning.max_tokens_per_batch,
+            intra_op_threads=svc.tuning.intra_op_threads,
+            inter_op_threads=svc.tuning.inter_op_threads,
+            tokens_per_s=svc.tuning.tokens_per_s,
+            max_ms=svc.tuning.max_ms,
+            max_latency_ms=svc.tuning.max_latency_ms,
+            tuned_at=svc.tuning.tuned_at,
+        ) if svc.tuning is not None else None,
+        snapshot=str(svc.snapshot) if svc.snapshot is not None else None,
+        query_encoder=str(svc.query_encoder) if svc.query_encoder is not None else None,
+    )
+
+
+@app.get("/metrics", response_model=MetricsResponse)
+async def metrics() -> MetricsResponse:
+    svc = _get_service()
+    cache_stats = svc.cache_stats()
+    batcher = _batchers.get(svc.model_name)
+    batcher_stats = batcher.stats() if batcher is not None else None
+    pool_health = svc.pool.health() if svc.pool is not None else None
+    truncation = svc.truncation_stats()
+    dedup = svc.dedup_stats()
+    late = svc.late_chunking_stats()
+    flights = _single_flight.stats()
+    library_stats = svc.clause_library.stats() if svc.clause_library is not None else None
+    return MetricsResponse(
+        cache=CacheStatsOutput(
+            hits=cache_stats.hits,
+            misses=cache_stats.misses,
+            hit_rate=cache_stats.hit_rate,
+            memory_hits=cache_stats.memory_hits,
+            disk_hits=cache_stats.disk_hits,
+            evictions=cache_stats.evictions,
+            memory_entries=cache_stats.memory_entries,
+            max_memory_entries=cache_stats.max_memory_entries,
+            disk_entries=cache_stats.disk_entries,
+        ) if cache_stats is not None else None,
+        batcher=BatcherStatsOutput(
+            max_batch_size=batcher_stats.max_batch_size,
+            max_wait_ms=batcher_stats.max_wait_ms,
+            max_queue_depth=batcher_stats.max_queue_depth,
+            max_in_flight=batcher_stats.max_in_flight,
+            queue_depth=batcher_stats.queue_depth,
+            in_flight=batcher_stats.in_flight,
+            requests=batcher_stats.requests,
+            texts=batcher_stats.texts,
+            batches=batcher_stats.batches,
+            rejected=batcher_stats.rejected,
+            mean_batch_size=batcher_stats.mean_batch_size,
+            last_batch_size=batcher_stats.last_batch_size,
+            encode_seconds=batcher_stats.encode_seconds,
+        ) if batcher_stats is not None else None,
+        pool=[
+            PoolWorkerOutput(
+                index=w.index,
+                pid=w.pid,
+                alive=w.alive,
+                cpus=w.cpus,
+                threads=w.threads,
+                texts=w.texts,
+                calls=w.calls,
+            )
+            for w in pool_health
+        ] if pool_health is not None else None,
+        truncation=TruncationStatsOutput(
+            texts=truncation.texts,
+            truncated=truncation.truncated,
+            tokens_dropped=truncation.tokens_dropped,
+        ),
+        dedup=DedupStatsOutput(
+            texts=dedup.texts,
+            in_batch_duplicates=dedup.duplicates,
+            single_flight_calls=flights.calls,
+            single_flight_shared=flights.shared,
+            encodes_avoided=dedup.duplicates + flights.shared,
+        ),
+        late_chunking=LateChunkingStatsOutput(
+            chunks=late.chunks,
+            windows=late.windows,
+            chunk_tokens=late.chunk_tokens,
+            window_tokens=late.window_tokens,
+            tokens_saved=late.chunk_tokens - late.window_tokens,
+        ),
+        clause_library=ClauseLibraryStatsOutput(
+            entries=library_stats.entries,
+            hits=library_stats.hits,
+            misses=library_stats.misses,
+        ) if library_stats is not None else None,
+        startup=_startup,
+        search=_search_stats(),
+        lexical=_lexical_stats(),
     )
 
 
-@app.post("/embed", response_model=EmbedResponse)
-async def embed(request: EmbedRequest) -> EmbedResponse:
+@app.post("/embed", response_model=EmbedResponse, responses=_BINARY_RESPONSES)
+async def embed(
+    request: EmbedRequest,
+    accept: str | None = Header(None),
+) -> EmbedResponse | Response:
     if not request.texts:
         raise HTTPException(status_code=422, detail="texts must not be empty")
-    svc = _get_service()
-    embeddings = svc.embed_batch(request.texts)
+    svc = await _get_model_service(request.model)
+    embed_texts = _embed_queries if request.query else _embed_texts
+    projected = _project(svc, await embed_texts(request.texts, svc), request.dimensions)
+    vectors = _quantize(svc, projected, request.precision)
+
+    media_type = negotiate(accept)
+    if media_type != MEDIA_JSON:
+        return _binary_response(media_type, vectors, {
+            "model": svc.model_name,
+            "dimensions": projected.shape[1],
+            "precision": request.precision.value,
+        })
     return EmbedResponse(
-        embeddings=embeddings,
+        embeddings=vectors.tolist(),
         model=svc.model_name,
-        dimensions=svc.dimensions,
+        dimensions=projected.shape[1],
+        precision=request.precision,
     )
 
 
-@app.post("/embed-chunks", response_model=EmbedChunksResponse)
-async def embed_chunks(request: EmbedChunksRequest) -> EmbedChunksResponse:
-    svc = _get_service()
+def _to_document_chunk(c: ChunkInput) -> DocumentChunk:
+    return DocumentChunk(
+        chunk_text=c.chunk_text,
+        section_type=c.section_type,
+        clause_number=c.clause_number,
+        chunk_index=c.chunk_index,
+        metadata=dict(c.metadata),
+    )
 
-    # Convert Pydantic inputs to DocumentChunk dataclasses
-    chunks = [
-        DocumentChunk(
-            chunk_text=c.chunk_text,
-            section_type=c.section_type,
-            clause_number=c.clause_number,
-            chunk_index=c.chunk_index,
-            metadata=dict(c.metadata),
+
+async def _embed_document_chunks(
+    svc: EmbeddingService,
+    chunks: list[DocumentChunk],
+    dimensions: int | None,
+    precision: Precision,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Projected float32 vectors of ``chunks`` and the same at ``precision``."""
+    # Standard clauses come from the precomputed library; only the rest are embedded.
+    full, pending = svc.library_vectors(chunks)
+    if pending:
+        full[pending] = await _embed_texts([chunks[i].chunk_text for i in pending])
+    full = _project(svc, full, dimensions)
+    return full, _quantize(svc, full, precision)
+
+
+def _chunk_outputs(
+    chunks: list[DocumentChunk],
+    vectors: np.ndarray,
+    full: np.ndarray,
+    version: str,
+    include_float32: bool,
+) -> list[EmbeddedChunkOutput]:
+    embedded: list[EmbeddedChunk] = [
+        EmbeddedChunk.from_chunk(chunk, vector, version)
+        for chunk, vector in zip(chunks, vectors.tolist())
+    ]
+    full_vectors: list[list[float] | None] = (
+        full.tolist()
+        if include_float32
+        else [None] * len(embedded)
+    )
+    return [
+        EmbeddedChunkOutput(
+            chunk_text=ec.chunk_text,
+            section_type=ec.section_type,
+            clause_number=ec.clause_number,
+            chunk_index=ec.chunk_index,
+            metadata=ec.metadata,
+            embedding=ec.embedding,
+            embedding_float32=full_vec,
         )
-        for c in request.chunks
+        for ec, full_vec in zip(embedded, full_vectors)
     ]
 
-    embedded: list[EmbeddedChunk] = svc.embed_chunks(chunks)
+
+@app.post("/embed-chunks", response_model=EmbedChunksResponse, responses=_BINARY_RESPONSES)
+async def embed_chunks(
+    request: EmbedChunksRequest,
+    accept: str | None = Header(None),
+) -> EmbedChunksResponse | Response:
+    svc = _get_service()
+    chunks = [_to_document_chunk(c) for c in request.chunks]
+    full, vectors = await _embed_document_chunks(
+        svc, chunks, request.dimensions, request.precision,
+    )
+    version = svc.embedding_version(full.shape[1])
+
+    media_type = negotiate(accept)
+    if media_type != MEDIA_JSON:
+        # Row i of the matrix belongs to request chunk i; the text itself is
+        # not echoed back since the caller already has it.
+        return _binary_response(media_type, vectors, {
+            "model": svc.model_name,
+            "embedding_version": version,
+            "dimensions": full.shape[1],
+            "precision": request.precision.value,
+            "chunks": [
+                {
+                    "section_type": c.section_type,
+                    "clause_number": c.clause_number,
+                    "chunk_index": c.chunk_index,
+                    "metadata": c.metadata,
+                }
+                for c in chunks
+            ],
+        })
 
     return EmbedChunksResponse(
-        embedded_chunks=[
-            EmbeddedChunkOutput(
-                chunk_text=ec.chunk_text,
-                section_type=ec.section_type,
-                clause_number=ec.clause_number,
-                chunk_index=ec.chunk_index,
-                metadata=ec.metadata,
-                embedding=ec.embedding,
-            )
-            for ec in embedded
-        ]
+        embedded_chunks=_chunk_outputs(
+            chunks, vectors, full, version,
+            request.include_float32 and request.precision is not Precision.FLOAT32,
+        ),
+        embedding_version=version,
     )
 
 
+class _DuplexStreamingResponse(StreamingResponse):
+    """A ``StreamingResponse`` whose body iterator reads the request as it goes.
+
+    Starlette's listens for client disconnects on the ASGI receive channel,
+    which would swallow request body messages; here a disconnect surfaces as
+    ``ClientDisconnect`` from ``request.stream()`` instead.
+    """
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post(
+    "/embed-chunks/stream",
+    response_class=_DuplexStreamingResponse,
+    responses={200: {
+        "content": {MEDIA_NDJSON: {"schema": {"type": "string"}}},
+        "description": "One EmbeddedChunkOutput per line, then a summary line.",
+    }},
+)
+async def embed_chunks_stream(
+    request: Request,
+    precision: Precision = Precision.FLOAT32,
+    dimensions: int | None = Query(None, gt=0),
+    include_float32: bool = False,
+) -> _DuplexStreamingResponse:
+    """Embed an NDJSON stream of ``ChunkInput`` objects, one per line.
+
+    Chunks are read, embedded and written back in batches of
+    EMBED_STREAM_BATCH_SIZE (default 64) as the request body arrives, so
+    memory is bounded by the batch rather than the document and the first
+    lines go out before the last chunks are sent.  Each output line is an
+    ``EmbeddedChunkOutput``; the last is ``{"done": true, "chunks": n,
+    "embedding_version": …}``, or ``{"error": …, "chunks": n}`` if a line
+    failed to parse or embed after the response had started.
+    """
+    svc = _get_service()
+    # Settings errors are still reportable as a status code.
+    projected = _project(svc, np.empty((0, svc.dimensions), dtype=np.float32), dimensions)
+    _quantize(svc, projected, precision)
+    version = svc.embedding_version(projected.shape[1])
+    include_float32 = include_float32 and precision is not Precision.FLOAT32
+    batch_size = int(os.environ.get("EMBED_STREAM_BATCH_SIZE", "64"))
+
+    async def lines() -> AsyncIterator[bytes]:
+        count = 0
+        try:
+            async for batch in ndjson_batches(request.stream(), batch_size):
+                chunks = [_to_document_chunk(ChunkInput.model_validate(obj)) for obj in batch]
+                full, vectors = await _embed_document_chunks(svc, chunks, dimensions, precision)
+                for out in _chunk_outputs(chunks, vectors, full, version, include_float32):
+                    yield out.model_dump_json().encode("utf-8") + b"\n"
+                count += len(chunks)
+        except (WireFormatError, ValidationError) as exc:
+            yield encode_ndjson_line({"error": str(exc), "chunks": count})
+            return
+        except HTTPException as exc:
+            yield encode_ndjson_line({"error": exc.detail, "chunks": count})
+            return
+        yield encode_ndjson_line({"done": True, "chunks": count, "embedding_version": version})
+
+    return _DuplexStreamingResponse(lines(), media_type=MEDIA_NDJSON)
+
+
 # ─── NER endpoints ───────────────────────────────────────────────────
 
 _ner_service: object | None = None  # NERService or None
@@ -272,11 +1020,19 @@ class IngestionResultOutput(BaseModel):
     annotations_stored: int
     metadata: ContractMetadataOutput
     duration_ms: int
+    truncated_chunks: int = 0
 
 
 class IngestRequest(BaseModel):
     s3_key: str = Field(..., min_length=1)
     document_type: str = Field(default="docx", pattern="^(docx|pdf)$")
+    token_aware_chunking: bool = Field(
+        False, description="Budget chunks with the embedding tokenizer and embed from token ids",
+    )
+    late_chunking: bool = Field(
+        False,
+        description="Encode each section once and pool chunk vectors from its token embeddings",
+    )
 
 
 class IngestResponse(BaseModel):
@@ -291,17 +1047,21 @@ async def pipeline_ingest(request: IngestRequest) -> IngestResponse:
         IngestionPipeline,
         LocalFileS3Client,
     )
-    import os
 
     # For local dev: use local filesystem as S3 mock
     s3_base = os.environ.get("S3_LOCAL_DIR", "/tmp/forge-documents")
     s3_client = LocalFileS3Client(base_dir=s3_base)
     db_client = InMemoryDbClient()
 
+    svc = _get_service()
     pipeline = IngestionPipeline(
         s3_client=s3_client,
         db_client=db_client,
-        embedding_service=_get_service(),
+        embedding_service=svc,
+        token_aware_chunking=request.token_aware_chunking,
+        late_chunking=request.late_chunking,
+        search_index=_ingest_search_index(svc),
+        lexical_index=_get_lexical_index(create=True),
     )
 
     result = pipeline.ingest(s3_key=request.s3_key, document_type=request.document_type)
@@ -332,6 +1092,7 @@ async def pipeline_ingest(request: IngestRequest) -> IngestResponse:
                 dfars_clauses=result.metadata.dfars_clauses,
             ),
             duration_ms=result.duration_ms,
+            truncated_chunks=result.truncated_chunks,
         ),
         quality=QualityReportOutput(
             issues=[
@@ -349,3 +1110,403 @@ async def pipeline_ingest(request: IngestRequest) -> IngestResponse:
             chunk_count=result.quality.chunk_count,
         ),
     )
+
+
+# ─── Search endpoint ─────────────────────────────────────────────────
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    k: int = Field(10, ge=1, le=1000)
+    section_types: list[str] | None = Field(
+        None, description="Only return chunks of these sections"
+    )
+    contract_ids: list[str] | None = Field(
+        None, description="Only return chunks of these contracts"
+    )
+    clause_numbers: list[str] | None = Field(
+        None,
+        description="Only return chunks whose FAR/DFARS clause number starts with one of these",
+    )
+    ef_search: int | None = Field(
+        None, ge=1, le=10000,
+        description="HNSW beam width for this query: higher is slower with better recall",
+    )
+    nprobe: int | None = Field(None, ge=1, description="IVF-PQ cells scanned for this query")
+    refine_factor: int | None = Field(
+        None, ge=1, le=100, description="IVF-PQ: re-score k × this many candidates exactly",
+    )
+
+
+class SearchHitOutput(BaseModel):
+    chunk_id: str
+    score: float
+    section_type: str
+    contract_id: str | None = None
+    clause_number: str | None = None
+
+
+class SearchResponse(BaseModel):
+    hits: list[SearchHitOutput]
+    embedding_version: str
+    embed_ms: float
+    search_ms: float
+
+
+_search_index: SearchIndex | None = None
+_search_latency = LatencyWindow()  # whole request
+_index_latency = LatencyWindow()   # index lookup only
+
+
+def _search_index_path(svc: EmbeddingService) -> Path:
+    """Search index directory configured from the environment.
+
+    SEARCH_INDEX_DIR — index directory, exact, HNSW or IVF-PQ (default: the
+                       one the ``build`` commands write for the service's
+                       embedding version)
+    """
+    return Path(os.environ.get("SEARCH_INDEX_DIR") or default_index_path(svc.embedding_version()))
+
+
+def _get_search_index(svc: EmbeddingService) -> SearchIndex:
+    global _search_index
+    if _search_index is None:
+        path = _search_index_path(svc)
+        if index_kind(path) is None:
+            raise HTTPException(status_code=404, detail=f"No search index at {path}")
+        _search_index = open_index(path)
+    return _search_index
+
+
+def _ingest_search_index(svc: EmbeddingService) -> HnswIndex | None:
+    """The search index, if ingestion can keep it current: an HNSW index of svc's vectors."""
+    try:
+        index = _get_search_index(svc)
+    except HTTPException:
+        return None
+    if isinstance(index, HnswIndex) and index.embedding_version == svc.embedding_version():
+        return index
+    return None
+
+
+def _search_stats() -> SearchStatsOutput | None:
+    if _search_index is None:
+        return None
+    total = _search_latency.stats()
+    lookup = _index_latency.stats()
+    return SearchStatsOutput(
+        index_kind=index_kind(_search_index.path) or "exact",
+        chunks=len(_search_index),
+        deleted=_search_index.stats().deleted if isinstance(_search_index, HnswIndex) else 0,
+        requests=total.count,
+        p50_ms=total.p50_ms,
+        p99_ms=total.p99_ms,
+        index_p50_ms=lookup.p50_ms,
+        index_p99_ms=lookup.p99_ms,
+        filter_strategies=dict(_search_index.filter_strategies),
+    )
+
+
+@app.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest) -> SearchResponse:
+    svc = _get_service()
+    index = _get_search_index(svc)
+    version = svc.embedding_version(index.dimensions)
+    if index.embedding_version != version:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"Search index holds {index.embedding_version} vectors; "
+                f"queries would be {version}"
+            ),
+        )
+    started = time.perf_counter()
+    query = _project(svc, await _embed_queries([request.query], svc), index.dimensions)
+    embedded = time.perf_counter()
+    if isinstance(index, HnswIndex):
+        lookup = functools.partial(index.search, ef_search=request.ef_search)
+    elif isinstance(index, IvfPqIndex):
+        lookup = functools.partial(
+            index.search, nprobe=request.nprobe, refine_factor=request.refine_factor,
+        )
+    else:
+        lookup = index.search
+    [hits] = await asyncio.to_thread(
+        lookup, query, request.k, request.section_types,
+        contract_ids=request.contract_ids, clause_numbers=request.clause_numbers,
+    )
+    finished = time.perf_counter()
+    _index_latency.record((finished - embedded) * 1000)
+    _search_latency.record((finished - started) * 1000)
+    return SearchResponse(
+        hits=[
+            SearchHitOutput(
+                chunk_id=h.chunk_id, score=h.score, section_type=h.section_type,
+                contract_id=h.contract_id, clause_number=h.clause_number,
+            )
+            for h in hits
+        ],
+        embedding_version=index.embedding_version,
+        embed_ms=(embedded - started) * 1000,
+        search_ms=(finished - embedded) * 1000,
+    )
+
+
+# ─── IVF-PQ index operations ─────────────────────────────────────────
+
+class IvfPqTrainRequest(BaseModel):
+    texts: list[str] = Field(
+        ..., min_length=256, max_length=200_000,
+        description="Training sample, embedded as documents (256+ texts; ~39 per cell)",
+    )
+    nlist: int | None = Field(None, ge=1, le=65536, description="Cells (default: sample size / 39)")
+    subquantizers: int = Field(
+        48, ge=1, description="Bytes per vector code; must divide the dimensions"
+    )
+
+
+class IndexChunkInput(BaseModel):
+    chunk_id: str = Field(..., min_length=1)
+    chunk_text: str
+    section_type: str = "OTHER"
+    contract_id: str | None = None
+    clause_number: str | None = None
+
+
+class IvfPqAddRequest(BaseModel):
+    chunks: list[IndexChunkInput] = Field(..., min_length=1)
+
+
+class IvfPqStatsOutput(BaseModel):
+    path: str
+    embedding_version: str
+    chunks: int
+    nlist: int
+    subquantizers: int
+    unsaved: int
+    bytes_per_vector: float  # codes, cell ids and quantizers in RAM; full vectors stay on disk
+
+
+def _ivfpq_stats(index: IvfPqIndex) -> IvfPqStatsOutput:
+    stats = index.stats()
+    return IvfPqStatsOutput(
+        path=str(index.path),
+        embedding_version=index.embedding_version,
+        chunks=stats.chunks,
+        nlist=stats.nlist,
+        subquantizers=stats.subquantizers,
+        unsaved=stats.unsaved,
+        bytes_per_vector=stats.bytes_per_vector,
+    )
+
+
+def _get_ivfpq_index(svc: EmbeddingService) -> IvfPqIndex:
+    index = _get_search_index(svc)
+    if not isinstance(index, IvfPqIndex):
+        raise HTTPException(status_code=409, detail=f"Search index at {index.path} is not IVF-PQ")
+    if index.embedding_version != svc.embedding_version():
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"Search index holds {index.embedding_version} vectors, "
+                f"not {svc.embedding_version()}"
+            ),
+        )
+    return index
+
+
+@app.post("/search/ivfpq/train", response_model=IvfPqStatsOutput)
+async def ivfpq_train(request: IvfPqTrainRequest) -> IvfPqStatsOutput:
+    """Train the quantizers on embedded sample texts and start an empty index."""
+    global _search_index
+    svc = _get_service()
+    path = _search_index_path(svc)
+    if index_kind(path) is not None:
+        raise HTTPException(status_code=409, detail=f"A search index already exists at {path}")
+    sample = await _embed_texts(request.texts, svc)
+    try:
+        index = await asyncio.to_thread(
+            IvfPqIndex.train, path, sample, svc.embedding_version(),
+            request.nlist, request.subquantizers,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    _search_index = index
+    return _ivfpq_stats(index)
+
+
+@app.post("/search/ivfpq/add", response_model=IvfPqStatsOutput)
+async def ivfpq_add(request: IvfPqAddRequest) -> IvfPqStatsOutput:
+    """Embed and encode chunks into the IVF-PQ index (their codes are written by ``save``)."""
+    svc = _get_service()
+    index = _get_ivfpq_index(svc)
+    vectors = await _embed_texts([c.chunk_text for c in request.chunks], svc)
+    try:
+        await asyncio.to_thread(
+            index.add,
+            [c.chunk_id for c in request.chunks],
+            [c.section_type for c in request.chunks],
+            vectors,
+            [c.contract_id for c in request.chunks],
+            [c.clause_number for c in request.chunks],
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return _ivfpq_stats(index)
+
+
+@app.post("/search/ivfpq/save", response_model=IvfPqStatsOutput)
+async def ivfpq_save() -> IvfPqStatsOutput:
+    index = _get_ivfpq_index(_get_service())
+    await asyncio.to_thread(index.save)
+    return _ivfpq_stats(index)
+
+
+@app.post("/search/ivfpq/load", response_model=IvfPqStatsOutput)
+async def ivfpq_load() -> IvfPqStatsOutput:
+    """(Re)open the IVF-PQ index from disk; rows added after the last save are re-encoded."""
+    global _search_index
+    svc = _get_service()
+    path = _search_index_path(svc)
+    if index_kind(path) != "ivfpq":
+        raise HTTPException(status_code=404, detail=f"No IVF-PQ index at {path}")
+    _search_index = await asyncio.to_thread(IvfPqIndex, path)
+    return _ivfpq_stats(_search_index)
+
+
+# ─── Hybrid search ───────────────────────────────────────────────────
+
+class HybridSearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    k: int = Field(10, ge=1, le=1000)
+    candidates: int = Field(
+        DEFAULT_CANDIDATES, ge=1, le=10000, description="BM25 hits the dense stage reranks",
+    )
+    rrf_k: int = Field(DEFAULT_RRF_K, ge=1, description="Rank offset of reciprocal rank fusion")
+    section_types: list[str] | None = None
+    contract_ids: list[str] | None = None
+    clause_numbers: list[str] | None = Field(None, description="Clause number prefixes")
+
+
+class HybridHitOutput(BaseModel):
+    chunk_id: str
+    score: float
+    section_type: str
+    contract_id: str | None = None
+    clause_number: str | None = None
+    lexical_score: float | None  # BM25; None on the dense fallback
+    dense_score: float | None    # cosine; None if the chunk is not in the vector index
+
+
+class HybridSearchResponse(BaseModel):
+    hits: list[HybridHitOutput]
+    embedding_version: str
+    candidates: int
+    fallback: bool  # no lexical match: plain dense search
+    embed_ms: float
+    lexical_ms: float
+    dense_ms: float
+
+
+_lexical_index: Bm25Index | None = None
+_lexical_latency = LatencyWindow()
+_hybrid_dense_latency = LatencyWindow()
+
+
+def _get_lexical_index(create: bool = False) -> Bm25Index | None:
+    """The BM25 index, opened on first use; ``create`` starts an empty one.
+
+    LEXICAL_INDEX_DIR — BM25 index directory (default: models/search/bm25),
+                        created by the first ingestion
+    """
+    global _lexical_index
+    if _lexical_index is None:
+        path = Path(os.environ.get("LEXICAL_INDEX_DIR") or DEFAULT_LEXICAL_INDEX_PATH)
+        if create or Bm25Index.exists(path):
+            _lexical_index = Bm25Index(path)
+    return _lexical_index
+
+
+def _lexical_stats() -> LexicalStatsOutput | None:
+    if _lexical_index is None:
+        return None
+    stats = _lexical_index.stats()
+    lexical = _lexical_latency.stats()
+    dense = _hybrid_dense_latency.stats()
+    return LexicalStatsOutput(
+        chunks=stats.chunks,
+        deleted=stats.deleted,
+        terms=stats.terms,
+        postings_bytes=stats.postings_bytes,
+        requests=lexical.count,
+        lexical_p50_ms=lexical.p50_ms,
+        lexical_p99_ms=lexical.p99_ms,
+        dense_p50_ms=dense.p50_ms,
+        dense_p99_ms=dense.p99_ms,
+    )
+
+
+@app.post("/search/hybrid", response_model=HybridSearchResponse)
+async def search_hybrid(request: HybridSearchRequest) -> HybridSearchResponse:
+    """BM25 candidates reranked by dense similarity (see ``forge_nlp.search.hybrid``).
+
+    The BM25 stage runs while the query is embedded; each stage is timed
+    on its own.
+    """
+    svc = _get_service()
+    index = _get_search_index(svc)
+    version = svc.embedding_version(index.dimensions)
+    if index.embedding_version != version:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"Search index holds {index.embedding_version} vectors; "
+                f"queries would be {version}"
+            ),
+        )
+    lexical = _get_lexical_index()
+    if lexical is None:
+        raise HTTPException(status_code=404, detail="No lexical index; ingest contracts first")
+    filters = {
+        "section_types": request.section_types,
+        "contract_ids": request.contract_ids,
+        "clause_numbers": request.clause_numbers,
+    }
+
+    async def lexical_stage() -> tuple[list[SearchHit], float]:
+        started = time.perf_counter()
+        hits = await asyncio.to_thread(
+            lexical.search, request.query, max(request.candidates, request.k), **filters,
+        )
+        return hits, (time.perf_counter() - started) * 1000
+
+    async def embed_stage() -> tuple[np.ndarray, float]:
+        started = time.perf_counter()
+        query = _project(svc, await _embed_queries([request.query], svc), index.dimensions)
+        return query, (time.perf_counter() - started) * 1000
+
+    (lexical_hits, lexical_ms), (query, embed_ms) = await asyncio.gather(
+        lexical_stage(), embed_stage()
+    )
+    started = time.perf_counter()
+    hits = await asyncio.to_thread(
+        dense_stage, index, query, lexical_hits, request.k, request.rrf_k, **filters,
+    )
+    dense_ms = (time.perf_counter() - started) * 1000
+    _lexical_latency.record(lexical_ms)
+    _hybrid_dense_latency.record(dense_ms)
+    return HybridSearchResponse(
+        hits=[
+            HybridHitOutput(
+                chunk_id=h.chunk_id, score=h.score, section_type=h.section_type,
+                contract_id=h.contract_id, clause_number=h.clause_number,
+                lexical_score=h.lexical_score, dense_score=h.dense_score,
+            )
+            for h in hits
+        ],
+        embedding_version=index.embedding_version,
+        candidates=len(lexical_hits),
+        fallback=not lexical_hits,
+        embed_ms=embed_ms,
+        lexical_ms=lexical_ms,
+        dense_ms=dense_ms,
+    )
@@ -4,6 +4,11 @@ Document chunking for federal contracts.
 Splits contracts at natural clause boundaries following the Uniform Contract
 Format (UCF) rather than arbitrary token windows, producing chunks sized for
 BERT-512 context windows.
+
+By default chunk sizes are budgeted in whitespace words, which under-counts
+WordPiece tokens on citation-heavy text.  Given the embedding model's fast
+tokenizer, the chunker budgets in real tokens instead and attaches each
+chunk's encoder input ids so the embedding step does not tokenize again.
 """
 
 from __future__ import annotations
@@ -11,6 +16,7 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import Any
 
 
 # ─── Constants ────────────────────────────────────────────────────────
@@ -68,6 +74,8 @@ class DocumentChunk:
     clause_number: str | None
     chunk_index: int
     metadata: dict = field(default_factory=dict)
+    # Encoder input ids (special tokens included), set in token-aware mode
+    token_ids: list[int] | None = None
 
 
 # ─── Token counting ──────────────────────────────────────────────────
@@ -77,6 +85,30 @@ def _word_count(text: str) -> int:
     return len(text.split())
 
 
+_EDGE_PUNCT = "\"'“”‘’.,;:!?()[]{}<>*•"
+
+
+def word_tokens(text: str) -> list[str]:
+    """The words ``_word_count`` counts, lowercased, for lexical search.
+
+    Surrounding punctuation is stripped but inner punctuation kept, so
+    clause numbers, CLINs and DFARS references stay one term
+    ("52.204-21," → ``52.204-21``).  A word with a parenthesized suffix
+    also yields its stem, so "52.204-21(b)(1)" matches a search for
+    "52.204-21".
+    """
+    tokens = []
+    for word in text.split():
+        word = word.strip(_EDGE_PUNCT).lower()
+        if not word:
+            continue
+        tokens.append(word)
+        stem = word.split("(", 1)[0]
+        if stem and stem != word:
+            tokens.append(stem)
+    return tokens
+
+
 def _has_table(text: str) -> bool:
     """Heuristic: text has table-like content (pipes, tab-aligned columns)."""
     return bool(re.search(r"\|.*\||\t{2,}", text))
@@ -209,19 +241,121 @@ _CLAUSE_HEADER_RE = re.compile(
     re.VERBOSE,
 )
 
+_ALTERNATE_RE = re.compile(r"\bAlt(?:ernate)?\.?\s+([IVX]+|\d+)\b", re.IGNORECASE)
+_DEVIATION_RE = re.compile(r"\bDev(?:iation)?\b(?:\s+(\d{4}-O\d{4}))?", re.IGNORECASE)
+
+
+def clause_variant(title: str) -> str:
+    """Alternate/deviation marker of a clause title, e.g. ``"ALT III"``, ``"DEV"``.
+
+    Empty for the basic clause.  Used with the clause number to tell apart
+    clause versions that share a number.
+    """
+    parts: list[str] = []
+    dev = _DEVIATION_RE.search(title)
+    if dev:
+        parts.append(f"DEV {dev.group(1).upper()}" if dev.group(1) else "DEV")
+    alt = _ALTERNATE_RE.search(title)
+    if alt:
+        parts.append(f"ALT {alt.group(1).upper()}")
+    return " ".join(parts)
+
 
 class ClauseChunker:
-    """Chunk document text respecting clause and section boundaries."""
+    """Chunk document text respecting clause and section boundaries.
+
+    Pass a Hugging Face fast ``tokenizer`` (e.g. ``EmbeddingService.tokenizer``)
+    for token-aware mode: budgets count WordPiece tokens, ``max_tokens`` is
+    capped so every chunk fits ``max_length`` encoder positions, and each
+    chunk carries ``token_ids`` plus a ``token_count`` metadata entry.
+    """
 
     def __init__(
         self,
         target_tokens: int = _TARGET_TOKENS,
         max_tokens: int = _MAX_TOKENS,
         overlap_tokens: int = _OVERLAP_TOKENS,
+        tokenizer: Any | None = None,
+        max_length: int = 512,
     ):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        if tokenizer is not None:
+            max_tokens = min(
+                max_tokens, max_length - tokenizer.num_special_tokens_to_add(pair=False)
+            )
+            target_tokens = min(target_tokens, max_tokens)
         self.target_tokens = target_tokens
         self.max_tokens = max_tokens
         self.overlap_tokens = overlap_tokens
+        self._token_counts: dict[str, int] = {}
+
+    # ─── Token budgeting ─────────────────────────────────────────────
+
+    def _count(self, text: str) -> int:
+        """Size of ``text`` in budget units: words, or tokens in token-aware mode."""
+        if self.tokenizer is None:
+            return _word_count(text)
+        if text not in self._token_counts:
+            self._prime([text])
+        return self._token_counts[text]
+
+    def _prime(self, texts: list[str]) -> None:
+        """Tokenize the uncounted ``texts`` in one batch call (token-aware mode)."""
+        if self.tokenizer is None:
+            return
+        todo = list(dict.fromkeys(t for t in texts if t not in self._token_counts))
+        if not todo:
+            return
+        encoded = self.tokenizer(
+            todo,
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        for text, ids in zip(todo, encoded["input_ids"]):
+            self._token_counts[text] = len(ids)
+
+    def _split_by_tokens(self, text: str) -> list[str]:
+        """Cut a run-on sentence into pieces of at most ``max_tokens`` tokens."""
+        encoded = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        offsets = encoded["offset_mapping"]
+        pieces: list[str] = []
+        for i in range(0, len(offsets), self.max_tokens):
+            window = offsets[i:i + self.max_tokens]
+            piece = text[window[0][0]:window[-1][1]].strip()
+            if piece:
+                pieces.append(piece)
+        return pieces
+
+    def _attach_token_ids(self, chunks: list[DocumentChunk]) -> None:
+        """Tokenize every final chunk once and store the encoder input on it.
+
+        ``metadata["token_count"]`` is the untruncated length; a chunk longer
+        than ``max_length`` keeps its leading tokens and closing special token.
+        """
+        if self.tokenizer is None or not chunks:
+            return
+        encoded = self.tokenizer(
+            [c.chunk_text for c in chunks],
+            add_special_tokens=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        for chunk, ids in zip(chunks, encoded["input_ids"]):
+            chunk.metadata["token_count"] = len(ids)
+            if len(ids) > self.max_length:
+                ids = ids[:self.max_length - 1] + ids[-1:]
+            chunk.token_ids = list(ids)
 
     def chunk_document(
         self,
@@ -229,9 +363,12 @@ class ClauseChunker:
         sections: list[DetectedSection],
     ) -> list[DocumentChunk]:
         """Chunk the document using detected sections."""
+        self._token_counts.clear()
         if not sections:
             # Fallback: treat entire document as OTHER, paragraph-chunk it
-            return self._chunk_paragraphs(text, SectionType.OTHER, clause_number=None)
+            chunks = self._chunk_paragraphs(text, SectionType.OTHER, clause_number=None)
+            self._attach_token_ids(chunks)
+            return chunks
 
         chunks: list[DocumentChunk] = []
         for section in sections:
@@ -251,6 +388,7 @@ class ClauseChunker:
         for i, chunk in enumerate(chunks):
             chunk.chunk_index = i
 
+        self._attach_token_ids(chunks)
         return chunks
 
     # ─── Section I: clause-level chunking ────────────────────────────
@@ -291,20 +429,22 @@ class ClauseChunker:
             if not clause_text:
                 continue
 
-            wc = _word_count(clause_text)
+            wc = self._count(clause_text)
             if wc <= self.max_tokens:
                 # Fits in one chunk
-                chunks.append(self._make_chunk(
+                clause_chunks = [self._make_chunk(
                     clause_text, SectionType.SECTION_I, clause_number,
-                ))
+                )]
             else:
                 # Long clause — split at paragraph boundaries with overlap
-                chunks.extend(
-                    self._chunk_paragraphs(
-                        clause_text, SectionType.SECTION_I,
-                        clause_number=clause_number,
-                    )
+                clause_chunks = self._chunk_paragraphs(
+                    clause_text, SectionType.SECTION_I,
+                    clause_number=clause_number,
                 )
+            variant = clause_variant(m.group(2))
+            for chunk in clause_chunks:
+                chunk.metadata["clause_variant"] = variant
+            chunks.extend(clause_chunks)
 
         return chunks
 
@@ -327,13 +467,14 @@ class ClauseChunker:
 
         if not paragraphs:
             return []
+        self._prime(paragraphs)
 
         chunks: list[DocumentChunk] = []
         current_parts: list[str] = []
         current_wc = 0
 
         for para in paragraphs:
-            para_wc = _word_count(para)
+            para_wc = self._count(para)
 
             # Single paragraph exceeds max — force-split it by sentences
             if para_wc > self.max_tokens:
@@ -356,17 +497,7 @@ class ClauseChunker:
                 chunks.append(self._make_chunk(
                     chunk_text, section_type, clause_number,
                 ))
-                # Overlap: keep the last paragraph(s) up to overlap_tokens
-                overlap_parts: list[str] = []
-                overlap_wc = 0
-                for p in reversed(current_parts):
-                    p_wc = _word_count(p)
-                    if overlap_wc + p_wc > self.overlap_tokens:
-                        break
-                    overlap_parts.insert(0, p)
-                    overlap_wc += p_wc
-                current_parts = overlap_parts
-                current_wc = overlap_wc
+                current_parts, current_wc = self._overlap(current_parts, para_wc)
 
             current_parts.append(para)
             current_wc += para_wc
@@ -388,27 +519,27 @@ class ClauseChunker:
         """Force-split a large paragraph by sentences with overlap."""
         # Split by sentence-ending punctuation
         sentences = re.split(r"(?<=[.!?])\s+", text)
+        if self.tokenizer is not None:
+            self._prime(sentences)
+            sentences = [
+                piece
+                for sent in sentences
+                for piece in (
+                    self._split_by_tokens(sent) if self._count(sent) > self.max_tokens else [sent]
+                )
+            ]
+            self._prime(sentences)
         chunks: list[DocumentChunk] = []
         current_parts: list[str] = []
         current_wc = 0
 
         for sent in sentences:
-            sent_wc = _word_count(sent)
+            sent_wc = self._count(sent)
             if current_wc + sent_wc > self.target_tokens and current_parts:
                 chunks.append(self._make_chunk(
                     " ".join(current_parts), section_type, clause_number,
                 ))
-                # Overlap: keep last sentences up to overlap_tokens
-                overlap_parts: list[str] = []
-                overlap_wc = 0
-                for s in reversed(current_parts):
-                    s_wc = _word_count(s)
-                    if overlap_wc + s_wc > self.overlap_tokens:
-                        break
-                    overlap_parts.insert(0, s)
-                    overlap_wc += s_wc
-                current_parts = overlap_parts
-                current_wc = overlap_wc
+                current_parts, current_wc = self._overlap(current_parts, sent_wc)
             current_parts.append(sent)
             current_wc += sent_wc
 
@@ -419,6 +550,23 @@ class ClauseChunker:
 
         return chunks
 
+    def _overlap(self, parts: list[str], next_wc: int) -> tuple[list[str], int]:
+        """Trailing ``parts`` to repeat at the start of the next chunk, and their size.
+
+        Keeps up to ``overlap_tokens``, less if the next part of ``next_wc``
+        would otherwise push that chunk past ``max_tokens``.
+        """
+        budget = min(self.overlap_tokens, self.max_tokens - next_wc)
+        overlap_parts: list[str] = []
+        overlap_wc = 0
+        for part in reversed(parts):
+            part_wc = self._count(part)
+            if overlap_wc + part_wc > budget:
+                break
+            overlap_parts.insert(0, part)
+            overlap_wc += part_wc
+        return overlap_parts, overlap_wc
+
     # ─── Chunk factory ───────────────────────────────────────────────
 
     @staticmethod
@@ -456,12 +604,16 @@ class DocumentProcessor:
         target_tokens: int = _TARGET_TOKENS,
         max_tokens: int = _MAX_TOKENS,
         overlap_tokens: int = _OVERLAP_TOKENS,
+        tokenizer: Any | None = None,
+        max_length: int = 512,
     ):
         self.detector = SectionDetector()
         self.chunker = ClauseChunker(
             target_tokens=target_tokens,
             max_tokens=max_tokens,
             overlap_tokens=overlap_tokens,
+            tokenizer=tokenizer,
+            max_length=max_length,
         )
 
     def process(self, text: str, document_id: str = "") -> list[DocumentChunk]:
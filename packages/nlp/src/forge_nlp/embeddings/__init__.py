@@ -1,5 +1,49 @@
 """Embedding service for federal contract documents using LegalBERT."""
 
-from .embedding_service import EmbeddedChunk, EmbeddingService
+from .backends import Backend
+from .clause_library import ClauseLibrary, ClauseLibraryStats
+from .embedding_cache import CacheStats, EmbeddingCache
+from .embedding_service import (
+    DedupStats,
+    EmbeddedChunk,
+    EmbeddedChunkBatch,
+    EmbeddedChunkRow,
+    EmbeddingService,
+    LateChunkingStats,
+    TruncationStats,
+)
+from .encoder_pool import EncoderPool, EncoderPoolError
+from .micro_batcher import MicroBatcher, QueueFullError
+from .model_registry import LoadedModel, ModelRegistry, RegistryStats
+from .projection import PcaProjection
+from .quantization import Precision, ScalarQuantizer, rescore
+from .singleflight import SingleFlight
+from .vector_store import MmapVectorStore
 
-__all__ = ["EmbeddedChunk", "EmbeddingService"]
+__all__ = [
+    "Backend",
+    "CacheStats",
+    "ClauseLibrary",
+    "ClauseLibraryStats",
+    "DedupStats",
+    "EmbeddedChunk",
+    "EmbeddedChunkBatch",
+    "EmbeddedChunkRow",
+    "EmbeddingCache",
+    "EmbeddingService",
+    "EncoderPool",
+    "EncoderPoolError",
+    "LateChunkingStats",
+    "LoadedModel",
+    "MicroBatcher",
+    "MmapVectorStore",
+    "ModelRegistry",
+    "PcaProjection",
+    "Precision",
+    "QueueFullError",
+    "RegistryStats",
+    "ScalarQuantizer",
+    "SingleFlight",
+    "TruncationStats",
+    "rescore",
+]
@@ -0,0 +1,421 @@
+"""
+Startup calibration of encoder batch size and torch thread settings.
+
+``_DEFAULT_BATCH_SIZE`` and torch's default threading suit few of the hosts
+the service is deployed on.  ``autotune`` runs a short sweep on this host:
+
+* torch intra-op/inter-op thread counts (each combination in its own spawned
+  process — torch only lets the inter-op pool be sized once per process),
+* sequence-length buckets (synthetic inputs cut from the bundled sample
+  contract to exactly that many tokens),
+* batch sizes, from small to large, until a batch takes longer than the
+  latency ceiling.
+
+For every thread setting and bucket the fastest batch size whose slowest
+timed batch stays under ``max_latency_ms`` wins (a handful of repeats bounds
+the worst case seen, not a tail percentile).  The thread setting with the
+best geometric-mean throughput across buckets is chosen.  It is mapped onto the two
+batching knobs the service has: ``batch_size`` (the row cap, which binds for
+short inputs) is the winner of the shortest bucket, and
+``max_tokens_per_batch`` (the padded-token budget, which binds for long ones)
+is the winner's batch × length in the longest bucket.
+
+Results are persisted per model, backend and host fingerprint (CPU model,
+usable CPUs, memory, torch version), so the sweep runs once per host type and
+later starts only read the file.
+
+Usage:
+    python -m forge_nlp.embeddings.autotune run [--model nlpaueb/legal-bert-base-uncased]
+        [--backend torch] [--onnx-dir DIR] [--max-latency-ms 1000] [--force]
+    python -m forge_nlp.embeddings.autotune show [--model ...] [--backend torch]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .backends import Backend
+from .corpus import sample_contract_text
+from .encoder_pool import available_cpus
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_AUTOTUNE_ROOT = _PKG_ROOT / "models" / "autotune"
+
+DEFAULT_BATCH_SIZES = (1, 4, 8, 16, 32, 64)
+DEFAULT_SEQ_BUCKETS = (64, 256, 512)
+DEFAULT_MAX_LATENCY_MS = 1000.0
+_DEFAULT_REPEATS = 5
+
+
+# ─── Host identity ─────────────────────────────────────────────────────
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as fh:
+            for line in fh:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _memory_bytes() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (OSError, ValueError):
+        return 0
+
+
+def host_fingerprint() -> str:
+    """Short stable id of the hardware and torch build a tuning applies to."""
+    import torch
+
+    host = {
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": len(available_cpus()),
+        "memory_gb": round(_memory_bytes() / 2**30),
+        "torch": torch.__version__,
+    }
+    return hashlib.sha256(json.dumps(host, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def default_tuning_path(
+    model_name: str,
+    backend: Backend | str = Backend.TORCH,
+    fingerprint: str | None = None,
+) -> Path:
+    """Where ``autotune`` persists (and looks for) this host's tuning of a model."""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", f"{model_name}#{Backend(backend).value}")
+    return _DEFAULT_AUTOTUNE_ROOT / slug / f"{fingerprint or host_fingerprint()}.json"
+
+
+# ─── Results ───────────────────────────────────────────────────────────
+
+@dataclass
+class Measurement:
+    """Timing of one batch size on one bucket under one thread setting."""
+
+    intra_op_threads: int
+    inter_op_threads: int
+    seq_len: int
+    batch_size: int
+    texts_per_s: float
+    p50_ms: float
+    max_ms: float
+
+    @property
+    def tokens_per_s(self) -> float:
+        return self.texts_per_s * self.seq_len
+
+
+@dataclass
+class TuningResult:
+    """Settings chosen for a model on one host, and the sweep behind them."""
+
+    model_name: str
+    backend: str
+    fingerprint: str
+    batch_size: int
+    max_tokens_per_batch: int
+    intra_op_threads: int
+    inter_op_threads: int
+    tokens_per_s: float  # geometric mean over buckets at the chosen settings
+    max_ms: float        # slowest batch of the chosen cells
+    max_latency_ms: float
+    tuned_at: float = field(default_factory=time.time)
+    measurements: list[Measurement] = field(default_factory=list)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> TuningResult:
+        data = json.loads(Path(path).read_text())
+        data["measurements"] = [Measurement(**m) for m in data.get("measurements", [])]
+        return cls(**data)
+
+
+# ─── Sweep ─────────────────────────────────────────────────────────────
+
+def thread_candidates(cpus: int) -> list[tuple[int, int]]:
+    """``(intra_op, inter_op)`` settings to try on a host with ``cpus`` CPUs.
+
+    Intra-op threads are all CPUs and successive halvings down to one (at
+    most four values); inter-op is 1 or 2.
+    """
+    intra = sorted({max(cpus // 2**k, 1) for k in range(4)}, reverse=True)
+    inter = (1, 2) if cpus > 1 else (1,)
+    return [(i, j) for i in intra for j in inter]
+
+
+def synthetic_texts(tokenizer: Any, seq_len: int, n: int, text: str | None = None) -> list[str]:
+    """``n`` passages of contract text that tokenize to ``seq_len`` tokens each.
+
+    Windows are cut from ``text`` (default: the bundled sample contract) on
+    token boundaries at staggered offsets, so a batch does not repeat one
+    input and the per-call dedup does not hide any work.  ``seq_len``
+    includes the special tokens.
+    """
+    text = text or sample_contract_text()
+    width = max(seq_len - tokenizer.num_special_tokens_to_add(pair=False), 1)
+    offsets = tokenizer(
+        text, add_special_tokens=False, return_offsets_mapping=True, verbose=False,
+    )["offset_mapping"]
+    while len(offsets) < width + n:
+        text = f"{text}\n\n{text}"
+        offsets = tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False,
+        )["offset_mapping"]
+    stride = max((len(offsets) - width) // n, 1)
+    return [
+        text[offsets[k * stride][0]:offsets[k * stride + width - 1][1]]
+        for k in range(n)
+    ]
+
+
+def measure_threads(
+    model_name: str,
+    backend: str,
+    onnx_dir: str | None,
+    intra_op_threads: int,
+    inter_op_threads: int,
+    seq_buckets: tuple[int, ...] = DEFAULT_SEQ_BUCKETS,
+    batch_sizes: tuple[int, ...] = DEFAULT_BATCH_SIZES,
+    max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+    repeats: int = _DEFAULT_REPEATS,
+) -> list[Measurement]:
+    """Time every bucket × batch size under one thread setting.
+
+    Meant to run in a fresh process: the thread settings apply to the whole
+    process.  Batch sizes stop growing once a batch's median exceeds
+    ``max_latency_ms``, since larger ones can only be slower.
+    """
+    import torch
+
+    torch.set_num_threads(intra_op_threads)
+    torch.set_num_interop_threads(inter_op_threads)
+
+    from .embedding_service import EmbeddingService
+    from .model_registry import ModelRegistry
+
+    svc = EmbeddingService(
+        model_name=model_name,
+        backend=backend,
+        onnx_dir=onnx_dir,
+        max_tokens_per_batch=None,
+        registry=ModelRegistry(),
+    )
+    results: list[Measurement] = []
+    for seq_len in sorted({min(s, svc.max_seq_length) for s in seq_buckets}):
+        texts = synthetic_texts(svc.tokenizer, seq_len, max(batch_sizes))
+        svc._encode_batch(texts[:1], 1)  # warm-up
+        for batch_size in sorted(batch_sizes):
+            batch = texts[:batch_size]
+            latencies = []
+            for _ in range(repeats + 1):
+                start = time.perf_counter()
+                svc._encode_batch(batch, batch_size)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies = latencies[1:]  # first run allocates
+            results.append(Measurement(
+                intra_op_threads=intra_op_threads,
+                inter_op_threads=inter_op_threads,
+                seq_len=seq_len,
+                batch_size=batch_size,
+                texts_per_s=batch_size * 1000 / float(np.mean(latencies)),
+                p50_ms=float(np.percentile(latencies, 50)),
+                max_ms=float(np.max(latencies)),
+            ))
+            if results[-1].p50_ms > max_latency_ms:
+                break
+    return results
+
+
+def choose_settings(
+    measurements: list[Measurement],
+    max_latency_ms: float,
+) -> tuple[tuple[int, int], dict[int, Measurement]]:
+    """Pick the thread setting and per-bucket batch size (see module docstring).
+
+    A bucket where no batch size meets ``max_latency_ms`` falls back to its
+    lowest-latency cell.
+
+    Returns:
+        ``((intra_op, inter_op), {seq_len: chosen measurement})``.
+    """
+    by_threads: dict[tuple[int, int], dict[int, list[Measurement]]] = {}
+    for m in measurements:
+        key = (m.intra_op_threads, m.inter_op_threads)
+        by_threads.setdefault(key, {}).setdefault(m.seq_len, []).append(m)
+    buckets = {m.seq_len for m in measurements}
+
+    best: tuple[float, tuple[int, int], dict[int, Measurement]] | None = None
+    for threads, cells in by_threads.items():
+        if set(cells) != buckets:
+            continue  # incomplete sweep (e.g. the worker failed part way)
+        chosen: dict[int, Measurement] = {}
+        for seq_len, cell in cells.items():
+            within = [m for m in cell if m.max_ms <= max_latency_ms]
+            chosen[seq_len] = (
+                max(within, key=lambda m: m.texts_per_s) if within
+                else min(cell, key=lambda m: m.max_ms)
+            )
+        score = sum(math.log(m.tokens_per_s) for m in chosen.values()) / len(chosen)
+        if best is None or score > best[0]:
+            best = (score, threads, chosen)
+    if best is None:
+        raise ValueError("No complete sweep to choose settings from")
+    return best[1], best[2]
+
+
+def _run_isolated(fn: Any, *args: Any) -> Any:
+    ctx = get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def autotune(
+    model_name: str,
+    backend: Backend | str = Backend.TORCH,
+    onnx_dir: str | None = None,
+    max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+    path: str | Path | None = None,
+    force: bool = False,
+    seq_buckets: tuple[int, ...] = DEFAULT_SEQ_BUCKETS,
+    batch_sizes: tuple[int, ...] = DEFAULT_BATCH_SIZES,
+    repeats: int = _DEFAULT_REPEATS,
+) -> TuningResult:
+    """This host's tuning for a model: loaded if persisted, else swept and saved.
+
+    Args:
+        max_latency_ms: Ceiling on a single encoder batch's latency, over every
+            timed repeat.
+        path: Result file (default: ``default_tuning_path``).
+        force: Sweep again even if a result exists.
+    """
+    backend = Backend(backend)
+    fingerprint = host_fingerprint()
+    path = Path(path) if path else default_tuning_path(model_name, backend, fingerprint)
+    if path.exists() and not force:
+        try:
+            result = TuningResult.load(path)
+        except (KeyError, TypeError):
+            logger.info("Tuning at %s is in an older format; re-running", path)
+        else:
+            if result.fingerprint == fingerprint and result.max_latency_ms == max_latency_ms:
+                logger.info("Using tuning from %s", path)
+                return result
+            logger.info("Tuning at %s is for another host or latency ceiling; re-running", path)
+
+    candidates = thread_candidates(len(available_cpus()))
+    logger.info(
+        "Autotuning %s on host %s: %d thread settings …", model_name, fingerprint, len(candidates)
+    )
+    started = time.perf_counter()
+    measurements: list[Measurement] = []
+    for intra, inter in candidates:
+        measurements.extend(_run_isolated(
+            measure_threads, model_name, backend.value, onnx_dir, intra, inter,
+            tuple(seq_buckets), tuple(batch_sizes), max_latency_ms, repeats,
+        ))
+
+    (intra, inter), chosen = choose_settings(measurements, max_latency_ms)
+    shortest, longest = chosen[min(chosen)], chosen[max(chosen)]
+    result = TuningResult(
+        model_name=model_name,
+        backend=backend.value,
+        fingerprint=fingerprint,
+        batch_size=shortest.batch_size,
+        max_tokens_per_batch=longest.batch_size * longest.seq_len,
+        intra_op_threads=intra,
+        inter_op_threads=inter,
+        tokens_per_s=math.exp(sum(math.log(m.tokens_per_s) for m in chosen.values()) / len(chosen)),
+        max_ms=max(m.max_ms for m in chosen.values()),
+        max_latency_ms=max_latency_ms,
+        measurements=measurements,
+    )
+    result.save(path)
+    logger.info(
+        "Autotuned in %.0fs: batch_size=%d max_tokens_per_batch=%d threads=%d/%d → %s",
+        time.perf_counter() - started, result.batch_size, result.max_tokens_per_batch,
+        intra, inter, path,
+    )
+    return result
+
+
+def apply_threads(result: TuningResult) -> None:
+    """Set this process's torch thread counts to the tuned ones.
+
+    The inter-op pool can only be sized before torch first uses it; if that
+    already happened the current size is kept and a warning logged.
+    """
+    import torch
+
+    torch.set_num_threads(result.intra_op_threads)
+    if torch.get_num_interop_threads() != result.inter_op_threads:
+        try:
+            torch.set_num_interop_threads(result.inter_op_threads)
+        except RuntimeError:
+            logger.warning(
+                "Inter-op thread pool already started; keeping %d threads (tuned: %d)",
+                torch.get_num_interop_threads(), result.inter_op_threads,
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Encoder batch size and thread autotuning")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("run", "Sweep this host (or reuse its result)"),
+                            ("show", "Print this host's persisted result")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+        p.add_argument("--backend", default=Backend.TORCH.value, choices=[b.value for b in Backend])
+        if name == "run":
+            p.add_argument("--onnx-dir", default=None)
+            p.add_argument("--max-latency-ms", type=float, default=DEFAULT_MAX_LATENCY_MS)
+            p.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        res = autotune(args.model, args.backend, onnx_dir=args.onnx_dir,
+                       max_latency_ms=args.max_latency_ms, force=args.force)
+    else:
+        res = TuningResult.load(default_tuning_path(args.model, args.backend))
+    print(f"{'threads':>8} {'seq':>5} {'batch':>6} {'texts/s':>9} {'p50 ms':>8} {'max ms':>8}")
+    for m in res.measurements:
+        print(
+            f"{m.intra_op_threads:>4}/{m.inter_op_threads:<3} {m.seq_len:>5} {m.batch_size:>6} "
+            f"{m.texts_per_s:>9.1f} {m.p50_ms:>8.1f} {m.max_ms:>8.1f}"
+        )
+    print(
+        f"host {res.fingerprint}: batch_size={res.batch_size} "
+        f"max_tokens_per_batch={res.max_tokens_per_batch} "
+        f"threads={res.intra_op_threads}/{res.inter_op_threads} "
+        f"({res.tokens_per_s:.0f} tokens/s, max {res.max_ms:.0f} ms ≤ {res.max_latency_ms:.0f})"
+    )
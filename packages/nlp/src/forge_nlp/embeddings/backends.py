@@ -0,0 +1,221 @@
+"""
+Inference backends for the embedding model.
+
+Every backend yields a ``SentenceTransformer`` so ``EmbeddingService`` keeps
+one ``encode`` code path regardless of how the forward pass runs:
+
+* ``torch``          — eager PyTorch (the default, as shipped in the Dockerfile)
+* ``torch-compile``  — the transformer wrapped in ``torch.compile``
+* ``onnx-int8``      — an exported ONNX Runtime graph with dynamic int8
+                        quantization; needs ``pip install forge-nlp[onnx]``
+
+Usage:
+    # Export and quantize LegalBERT to models/onnx/<model>
+    python -m forge_nlp.embeddings.backends export [--model nlpaueb/legal-bert-base-uncased]
+        [--output models/onnx/...] [--quantization avx2]
+
+    # Report cosine drift of a backend against eager PyTorch
+    python -m forge_nlp.embeddings.backends parity --backend onnx-int8
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+from .corpus import sample_chunk_texts
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_ONNX_ROOT = _PKG_ROOT / "models" / "onnx"
+_DEFAULT_QUANTIZATION = "avx2"
+
+
+class Backend(str, Enum):
+    TORCH = "torch"
+    TORCH_COMPILE = "torch-compile"
+    ONNX_INT8 = "onnx-int8"
+
+
+def default_onnx_dir(model_name: str) -> Path:
+    """Where ``export`` writes (and ``onnx-int8`` looks for) a model's ONNX files."""
+    return _DEFAULT_ONNX_ROOT / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def _quantized_file_name(path: Path, quantization: str) -> str | None:
+    """Relative path of the quantized graph, e.g. ``onnx/model_quint8_avx2.onnx``.
+
+    sentence-transformers names the file after the weight dtype the
+    quantization target uses (``qint8`` or ``quint8``), so look for either.
+    """
+    for candidate in sorted((path / "onnx").glob(f"model_q*int8_{quantization}.onnx")):
+        return f"onnx/{candidate.name}"
+    return None
+
+
+# ─── Loading ──────────────────────────────────────────────────────────
+
+def load_sentence_transformer(
+    model_name: str,
+    backend: Backend | str = Backend.TORCH,
+    onnx_dir: str | Path | None = None,
+    quantization: str = _DEFAULT_QUANTIZATION,
+    snapshot: str | Path | None = None,
+) -> object:
+    """Build a ``SentenceTransformer`` running on the requested backend.
+
+    PyTorch backends load from ``snapshot`` (see ``snapshot.py``) when given.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = Backend(backend)
+
+    if backend is Backend.ONNX_INT8:
+        path = Path(onnx_dir) if onnx_dir is not None else default_onnx_dir(model_name)
+        file_name = _quantized_file_name(path, quantization)
+        if file_name is None:
+            raise FileNotFoundError(
+                f"Quantized ONNX model ({quantization}) not found in {path / 'onnx'}. "
+                f"Run `python -m forge_nlp.embeddings.backends export --model {model_name}` first."
+            )
+        return SentenceTransformer(
+            str(path), backend="onnx", model_kwargs={"file_name": file_name},
+        )
+
+    if snapshot is not None:
+        from .snapshot import load_snapshot
+
+        model = load_snapshot(snapshot, model_name)
+    else:
+        model = SentenceTransformer(model_name)
+    if backend is Backend.TORCH_COMPILE:
+        _compile_transformer(model)
+    return model
+
+
+def _compile_transformer(model: object) -> None:
+    """Wrap the transformer in ``torch.compile``, falling back to eager on failure.
+
+    Compilation happens lazily on the first forward pass, so a warm-up encode
+    runs here to surface compiler errors at load time instead of mid-request.
+    """
+    import torch
+
+    transformer = model[0]  # type: ignore[index]
+    eager = transformer.auto_model
+    transformer.auto_model = torch.compile(eager, dynamic=True)
+    try:
+        model.encode(  # type: ignore[union-attr]
+            ["warm-up", "warm-up text for torch.compile"], show_progress_bar=False,
+        )
+    except Exception:
+        logger.exception("torch.compile failed; falling back to eager PyTorch")
+        transformer.auto_model = eager
+
+
+# ─── Export ───────────────────────────────────────────────────────────
+
+def export_onnx_int8(
+    model_name: str,
+    output_dir: str | Path | None = None,
+    quantization: str = _DEFAULT_QUANTIZATION,
+) -> Path:
+    """Export ``model_name`` to ONNX and write a dynamically int8-quantized copy.
+
+    Args:
+        model_name: Hub id or local path of the sentence-transformers model.
+        output_dir: Target directory (defaults to ``default_onnx_dir``).
+        quantization: ONNX Runtime target: ``arm64``, ``avx2``, ``avx512``
+            or ``avx512_vnni``. Pick the newest one the serving CPUs support.
+
+    Returns:
+        The output directory.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    output = Path(output_dir) if output_dir is not None else default_onnx_dir(model_name)
+    logger.info("Exporting %s to ONNX at %s …", model_name, output)
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save(str(output))
+    logger.info("Quantizing (dynamic int8, %s) …", quantization)
+    export_dynamic_quantized_onnx_model(model, quantization, str(output))
+    return output
+
+
+# ─── Parity ───────────────────────────────────────────────────────────
+
+@dataclass
+class ParityReport:
+    """Cosine agreement between a backend and the eager PyTorch baseline."""
+
+    backend: str
+    n_texts: int
+    mean_cosine: float
+    min_cosine: float
+
+    @property
+    def max_drift(self) -> float:
+        return 1.0 - self.min_cosine
+
+
+def parity_check(
+    model_name: str,
+    backend: Backend | str,
+    texts: list[str] | None = None,
+    onnx_dir: str | Path | None = None,
+    quantization: str = _DEFAULT_QUANTIZATION,
+) -> ParityReport:
+    """Embed ``texts`` with eager PyTorch and ``backend`` and compare row-wise."""
+    texts = texts if texts is not None else sample_chunk_texts()
+    baseline = load_sentence_transformer(model_name, Backend.TORCH)
+    candidate = load_sentence_transformer(model_name, backend, onnx_dir, quantization)
+
+    a = baseline.encode(texts, show_progress_bar=False)  # type: ignore[union-attr]
+    b = candidate.encode(texts, show_progress_bar=False)  # type: ignore[union-attr]
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    cos = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return ParityReport(
+        backend=Backend(backend).value,
+        n_texts=len(texts),
+        mean_cosine=float(cos.mean()),
+        min_cosine=float(cos.min()),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Embedding inference backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_p = sub.add_parser("export", help="Export and int8-quantize an ONNX model")
+    export_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    export_p.add_argument("--output", default=None)
+    export_p.add_argument("--quantization", default=_DEFAULT_QUANTIZATION)
+
+    parity_p = sub.add_parser("parity", help="Cosine drift of a backend vs eager PyTorch")
+    parity_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    parity_p.add_argument("--backend", default=Backend.ONNX_INT8.value,
+                          choices=[b.value for b in Backend])
+    parity_p.add_argument("--onnx-dir", default=None)
+    parity_p.add_argument("--quantization", default=_DEFAULT_QUANTIZATION)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        out = export_onnx_int8(args.model, args.output, args.quantization)
+        print(f"Wrote {out / (_quantized_file_name(out, args.quantization) or 'onnx')}")
+    else:
+        report = parity_check(args.model, args.backend, onnx_dir=args.onnx_dir,
+                              quantization=args.quantization)
+        print(
+            f"{report.backend}: {report.n_texts} texts, mean cosine {report.mean_cosine:.6f}, "
+            f"min cosine {report.min_cosine:.6f}, max drift {report.max_drift:.6f}"
+        )
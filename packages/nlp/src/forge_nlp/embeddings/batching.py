@@ -0,0 +1,92 @@
+"""
+Length-bucketed batch planning for the encoder.
+
+A BERT batch is padded to its longest member, so one 600-word Section I
+clause in a batch of short Section A/B paragraphs makes every row cost 512
+tokens.  Sorting inputs by tokenized length and filling each batch up to a
+padded-token budget (rows × longest row) keeps padding low and lets short
+texts run in large batches while long texts run in small ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class PaddingStats:
+    """How much of the encoder's work went into padding tokens."""
+
+    batches: int
+    real_tokens: int
+    padded_tokens: int
+
+    @property
+    def padding_tokens(self) -> int:
+        return self.padded_tokens - self.real_tokens
+
+    @property
+    def padding_ratio(self) -> float:
+        """Fraction of processed tokens that were padding."""
+        return self.padding_tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+
+def plan_token_batches(
+    lengths: list[int],
+    max_tokens_per_batch: int,
+    max_batch_size: int,
+) -> list[list[int]]:
+    """Group input indices into batches sorted by length under a token budget.
+
+    Inputs are ordered longest first and packed greedily so that
+    ``len(batch) * max(lengths in batch)`` stays within
+    ``max_tokens_per_batch`` and no batch has more than ``max_batch_size``
+    rows.  A single input longer than the budget still gets its own batch.
+
+    Args:
+        lengths: Token length of each input (special tokens included).
+        max_tokens_per_batch: Padded-token budget per batch.
+        max_batch_size: Hard cap on rows per batch.
+
+    Returns:
+        Lists of indices into ``lengths``; callers must scatter results back
+        to the original positions.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_max = 0
+
+    for idx in order:
+        length = max(lengths[idx], 1)
+        longest = max(current_max, length)
+        if current and (
+            len(current) >= max_batch_size
+            or (len(current) + 1) * longest > max_tokens_per_batch
+        ):
+            batches.append(current)
+            current, longest = [], length
+        current.append(idx)
+        current_max = longest
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def fixed_batches(n: int, batch_size: int) -> list[list[int]]:
+    """Arrival-order batches of ``batch_size`` — the unbucketed baseline."""
+    return [list(range(i, min(i + batch_size, n))) for i in range(0, n, batch_size)]
+
+
+def padding_stats(lengths: list[int], batches: list[list[int]]) -> PaddingStats:
+    """Compute real vs padded token counts for a batch plan."""
+    real = 0
+    padded = 0
+    for batch in batches:
+        if not batch:
+            continue
+        batch_lengths = [lengths[i] for i in batch]
+        real += sum(batch_lengths)
+        padded += len(batch) * max(batch_lengths)
+    return PaddingStats(batches=len(batches), real_tokens=real, padded_tokens=padded)
@@ -0,0 +1,253 @@
+"""
+Precomputed embeddings of standard FAR/DFARS clauses.
+
+Section I of every award incorporates the same standard clauses (52.204-21,
+252.204-7012, …) in full text.  The clause library holds their vectors ahead
+of time so ingestion never runs the model on them.  Entries are keyed by
+clause number, alternate/deviation variant and the fingerprint of the exact
+chunk text the ``ClauseChunker`` produces, so a chunk only reuses a vector if
+its text matches what was embedded.
+
+Layout of a library directory (one per model)::
+
+    meta.json, vectors.f32   an ``MmapVectorStore`` shared by every worker
+    entries.jsonl            one {"clause_number", "variant", "fingerprint",
+                             "row"} line per vector row
+
+Usage:
+    # Build from a corpus of clause texts in Section I format (header line
+    # "52.204-21 Title (DATE)" followed by the clause body)
+    python -m forge_nlp.embeddings.clause_library build --corpus far_dfars_clauses.txt
+        [--model nlpaueb/legal-bert-base-uncased] [--output models/clause_library/...]
+        [--token-aware]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from forge_nlp.chunking.clause_chunker import (
+    ClauseChunker,
+    DetectedSection,
+    DocumentChunk,
+    SectionType,
+)
+
+from .embedding_cache import text_fingerprint
+from .vector_store import MmapVectorStore
+
+if TYPE_CHECKING:
+    from .embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_LIBRARY_ROOT = _PKG_ROOT / "models" / "clause_library"
+_ENTRIES_FILE = "entries.jsonl"
+
+ClauseKey = tuple[str, str, str]  # (clause_number, variant, fingerprint)
+
+
+def default_library_path(model_name: str) -> Path:
+    """Where ``build`` writes (and the service looks for) a model's clause library."""
+    return _DEFAULT_LIBRARY_ROOT / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def chunk_key(chunk: DocumentChunk) -> ClauseKey | None:
+    """Library key of a chunk, or ``None`` if it is not part of a numbered clause."""
+    if chunk.clause_number is None:
+        return None
+    return (
+        chunk.clause_number,
+        chunk.metadata.get("clause_variant", ""),
+        text_fingerprint(chunk.chunk_text),
+    )
+
+
+def chunk_clause_corpus(text: str, chunker: ClauseChunker | None = None) -> list[DocumentChunk]:
+    """Chunk a clause corpus exactly as Section I of an award would be chunked."""
+    chunker = chunker or ClauseChunker()
+    section = DetectedSection(SectionType.SECTION_I, 0, len(text))
+    return [c for c in chunker.chunk_document(text, [section]) if c.clause_number is not None]
+
+
+@dataclass
+class ClauseLibraryStats:
+    entries: int = 0
+    hits: int = 0
+    misses: int = 0
+
+
+class ClauseLibrary:
+    """Memory-mapped store of precomputed clause vectors.
+
+    Opening a library only reads the small entry table; vectors stay on disk
+    and are paged in on use, shared between processes through the OS page
+    cache.
+    """
+
+    def __init__(self, path: str | Path, dimensions: int | None = None) -> None:
+        self.path = Path(path)
+        if dimensions is None and not MmapVectorStore.exists(self.path):
+            raise FileNotFoundError(
+                f"No clause library at {self.path}. Run "
+                "`python -m forge_nlp.embeddings.clause_library build --corpus <clauses.txt>` "
+                "first."
+            )
+        self.store = MmapVectorStore(self.path, dimensions=dimensions)
+        self._entries_path = self.path / _ENTRIES_FILE
+        self._index: dict[ClauseKey, int] = {}
+        self._lock = threading.Lock()
+        self._stats = ClauseLibraryStats()
+
+        if self._entries_path.exists():
+            rows = len(self.store)
+            with self._entries_path.open() as fh:
+                for i, line in enumerate(fh):
+                    if not line.endswith("\n"):
+                        break  # torn write
+                    entry = json.loads(line)
+                    # Entries without a row number predate it: the line is the row.
+                    row = entry.get("row", i)
+                    if row < rows:
+                        self._index[
+                            (entry["clause_number"], entry["variant"], entry["fingerprint"])
+                        ] = row
+            # Vectors of an interrupted ``add`` have no entry and are never
+            # read; another process may still be adding them, so they stay.
+        logger.info("Clause library %s: %d entries", self.path, len(self._index))
+
+    @property
+    def dimensions(self) -> int:
+        return self.store.dimensions
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: ClauseKey) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[ClauseKey]:
+        return iter(self.keys())
+
+    def keys(self) -> list[ClauseKey]:
+        return list(self._index)
+
+    def add(self, chunks: list[DocumentChunk], vectors: np.ndarray) -> int:
+        """Store vectors for numbered-clause ``chunks``; returns how many were new."""
+        with self._lock:
+            new: list[tuple[ClauseKey, np.ndarray]] = []
+            seen: set[ClauseKey] = set()
+            for chunk, vector in zip(chunks, vectors):
+                key = chunk_key(chunk)
+                if key is None or key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new.append((key, vector))
+            if not new:
+                return 0
+
+            def write_entries(start: int) -> None:
+                # Called under the store's append lock, so processes adding to
+                # one library agree on which row an entry names.
+                with self._entries_path.open("a") as fh:
+                    for offset, ((number, variant, fingerprint), _) in enumerate(new):
+                        fh.write(json.dumps({
+                            "clause_number": number, "variant": variant,
+                            "fingerprint": fingerprint, "row": start + offset,
+                        }) + "\n")
+
+            start = self.store.append(np.stack([v for _, v in new]), on_commit=write_entries)
+            for offset, (key, _) in enumerate(new):
+                self._index[key] = start + offset
+            return len(new)
+
+    def lookup(self, chunks: list[DocumentChunk]) -> list[np.ndarray | None]:
+        """Precomputed vector for each chunk, or ``None`` where there is none."""
+        results: list[np.ndarray | None] = [None] * len(chunks)
+        keys = [chunk_key(chunk) for chunk in chunks]
+        positions, rows = [], []
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._index.get(key) if key is not None else None
+                if row is not None:
+                    positions.append(i)
+                    rows.append(row)
+            self._stats.hits += len(rows)
+            self._stats.misses += len(chunks) - len(rows)
+        if rows:
+            for i, vector in zip(positions, self.store.take(rows)):
+                results[i] = vector
+        return results
+
+    def stats(self) -> ClauseLibraryStats:
+        with self._lock:
+            return ClauseLibraryStats(
+                entries=len(self._index), hits=self._stats.hits, misses=self._stats.misses,
+            )
+
+
+def build_library(
+    service: EmbeddingService,
+    corpus: str,
+    output: str | Path,
+    token_aware: bool = False,
+) -> ClauseLibrary:
+    """Chunk ``corpus`` like Section I, embed every clause chunk and store it.
+
+    Args:
+        service: The ``EmbeddingService`` ingestion will use (same model,
+            backend and chunking mode, or lookups will not match).
+        corpus: Clause texts in Section I format.
+        output: Library directory; existing entries are kept.
+        token_aware: Chunk with the model tokenizer, for pipelines that run
+            with ``token_aware_chunking``.
+    """
+    chunker = (
+        ClauseChunker(tokenizer=service.tokenizer, max_length=service.max_seq_length)
+        if token_aware else ClauseChunker()
+    )
+    chunks = chunk_clause_corpus(corpus, chunker)
+    library = ClauseLibrary(output, dimensions=service.dimensions)
+    todo = [c for c in chunks if chunk_key(c) not in library]
+    if todo:
+        vectors = service.embed_array(
+            [c.chunk_text for c in todo],
+            token_ids=[c.token_ids for c in todo] if token_aware else None,
+        )
+        added = library.add(todo, vectors)
+        logger.info("Added %d clause chunks to %s", added, output)
+    return library
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .embedding_service import EmbeddingService
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Precomputed FAR/DFARS clause embeddings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="Embed a clause corpus into the library")
+    build_p.add_argument("--corpus", required=True, nargs="+", help="Clause text file(s)")
+    build_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    build_p.add_argument("--output", default=None)
+    build_p.add_argument("--token-aware", action="store_true")
+    args = parser.parse_args()
+
+    svc = EmbeddingService(model_name=args.model)
+    output = Path(args.output) if args.output else default_library_path(svc.cache_namespace)
+    text = "\n\n".join(Path(p).read_text() for p in args.corpus)
+    lib = build_library(svc, text, output, token_aware=args.token_aware)
+    clauses = {number for number, _, _ in lib}
+    print(f"{len(lib)} clause chunks ({len(clauses)} clauses) in {output}")
@@ -0,0 +1,97 @@
+"""
+Text corpora used by the offline embedding tools and the benchmarks.
+
+The bundled sample documents are chunked with ``DocumentProcessor`` so tools
+default to the same chunk length distribution production ingestion produces.
+Larger corpora of already-embedded chunks are exchanged as JSONL.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from forge_nlp.chunking.clause_chunker import DocumentChunk, DocumentProcessor
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_SRC = _PKG_ROOT / "src" / "forge_nlp"
+_SAMPLE_CONTRACT = _SRC / "chunking" / "test_data" / "sample_contract.txt"
+_TEXT_SOURCES = [
+    _SAMPLE_CONTRACT,
+    _SRC / "extractors" / "test_data" / "sample_award.txt",
+    _SRC / "extractors" / "test_data" / "sample_modification.txt",
+    _SRC / "extractors" / "test_data" / "sample_nda.txt",
+]
+_DOCX_SOURCES = [
+    _PKG_ROOT / "tests" / "fixtures" / "sample_contract.docx",
+]
+
+
+def sample_contract_text() -> str:
+    """Full text of the bundled sample contract."""
+    return _SAMPLE_CONTRACT.read_text()
+
+
+def sample_chunk_texts() -> list[str]:
+    """Chunk texts of the bundled sample contract."""
+    from forge_nlp.chunking.clause_chunker import DocumentProcessor
+
+    chunks = DocumentProcessor().process(sample_contract_text(), document_id="sample")
+    return [c.chunk_text for c in chunks]
+
+
+def load_documents() -> dict[str, str]:
+    """Return ``{document_id: text}`` for every sample document in the repo."""
+    docs = {path.name: path.read_text() for path in _TEXT_SOURCES}
+    try:
+        from forge_nlp.pipeline.ingestion_pipeline import extract_text_from_docx
+
+        for path in _DOCX_SOURCES:
+            docs[path.name] = extract_text_from_docx(path.read_bytes())
+    except ImportError:
+        pass
+    return docs
+
+
+def load_chunks(
+    repeat: int = 1, processor: DocumentProcessor | None = None,
+) -> list[DocumentChunk]:
+    """Chunk every sample document; ``repeat`` tiles the corpus for larger runs."""
+    from forge_nlp.chunking.clause_chunker import DocumentProcessor
+
+    processor = processor or DocumentProcessor()
+    chunks: list[DocumentChunk] = []
+    for doc_id, text in load_documents().items():
+        chunks.extend(processor.process(text, document_id=doc_id))
+    return chunks * repeat
+
+
+def read_texts(path: str | Path) -> list[str]:
+    """Read a corpus file with one text per line, skipping blank lines."""
+    return [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+
+
+def load_embedded_chunks(path: str | Path) -> tuple[list[dict], np.ndarray]:
+    """Read a JSONL corpus of embedded chunks.
+
+    Each line is one ``EmbeddedChunk`` as produced by ``/embed-chunks`` (an
+    object with ``chunk_text``, ``section_type``, …, ``embedding``).
+
+    Returns:
+        ``(records, vectors)`` — the records without their embeddings and a
+        ``(n, dim)`` float32 matrix in the same order.
+    """
+    records: list[dict] = []
+    vectors: list[list[float]] = []
+    with Path(path).open() as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            vectors.append(record.pop("embedding"))
+            records.append(record)
+    return records, np.asarray(vectors, dtype=np.float32)
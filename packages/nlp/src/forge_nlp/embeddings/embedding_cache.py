@@ -0,0 +1,224 @@
+"""
+Content-addressed cache for embedding vectors.
+
+Contracts repeat large amounts of identical FAR/DFARS boilerplate and the
+same documents are re-ingested, so most texts we are asked to embed have been
+embedded before.  Vectors are cached under a key derived from the model name
+and a whitespace-normalized hash of the text:
+
+* a bounded in-memory LRU tier holding the hottest vectors, and
+* an optional on-disk tier (``MmapVectorStore`` + key log) that survives
+  restarts and is shared through the page cache by every process that opens it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .vector_store import MmapVectorStore
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_ENTRIES = 10_000
+_KEYS_FILE = "keys.log"
+
+
+# ─── Keys ─────────────────────────────────────────────────────────────
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace so formatting-only differences share a key.
+
+    The BERT tokenizer splits on whitespace, so this never changes the tokens
+    the model sees.
+    """
+    return " ".join(text.split())
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Cache key for ``text`` embedded by ``model_name``."""
+    return hashlib.sha256(f"{model_name}\x00{normalize_text(text)}".encode()).hexdigest()
+
+
+def _model_dir_name(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+# ─── Stats ────────────────────────────────────────────────────────────
+
+@dataclass
+class CacheStats:
+    """Counters for sizing the cache."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    memory_entries: int = 0
+    max_memory_entries: int = 0
+    disk_entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# ─── Disk tier ────────────────────────────────────────────────────────
+
+class _DiskTier:
+    """Per-model persistent tier: a vector store plus an append-only key log.
+
+    Each key log line is ``<key> <row>``.  The lines are written under the
+    store's append lock, so every process sharing the directory agrees on
+    which row a key names.
+    """
+
+    def __init__(self, path: Path, dimensions: int) -> None:
+        self.store = MmapVectorStore(path, dimensions=dimensions)
+        self._keys_path = path / _KEYS_FILE
+        self._index: dict[str, int] = {}
+
+        if self._keys_path.exists():
+            rows = len(self.store)
+            # The last line is dropped unless it ends in a newline: a torn
+            # write. Rows without a key line (a crash between the two writes)
+            # are never looked up; they are left alone because another
+            # process may still be committing them.
+            for i, line in enumerate(self._keys_path.read_text().split("\n")[:-1]):
+                key, _, row = line.partition(" ")
+                # Lines without a row number predate it: the line is the row.
+                row = row or str(i)
+                if row.isdigit() and int(row) < rows:
+                    self._index[key] = int(row)
+            logger.info("Embedding cache disk tier %s: %d entries", path, len(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> np.ndarray | None:
+        row = self._index.get(key)
+        return None if row is None else self.store.get(row)
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        new = [(k, v) for k, v in zip(keys, vectors) if k not in self._index]
+        if not new:
+            return
+
+        def commit_keys(start: int) -> None:
+            with self._keys_path.open("a") as fh:
+                fh.write("".join(f"{k} {start + i}\n" for i, (k, _) in enumerate(new)))
+
+        start = self.store.append(np.stack([v for _, v in new]), on_commit=commit_keys)
+        for offset, (k, _) in enumerate(new):
+            self._index[k] = start + offset
+
+
+# ─── Cache ────────────────────────────────────────────────────────────
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + optional memory-mapped disk) embedding cache.
+
+    Args:
+        max_entries: Maximum number of vectors kept in the in-memory LRU tier.
+        disk_dir: Directory for the persistent tier. ``None`` disables it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        disk_dir: str | Path | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._disk: dict[str, _DiskTier] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_memory_entries=max_entries)
+
+    def _disk_tier(self, model_name: str, dimensions: int | None) -> _DiskTier | None:
+        if self.disk_dir is None:
+            return None
+        tier = self._disk.get(model_name)
+        if tier is None:
+            path = self.disk_dir / _model_dir_name(model_name)
+            if dimensions is None and not MmapVectorStore.exists(path):
+                return None
+            tier = _DiskTier(path, dimensions or MmapVectorStore(path).dimensions)
+            self._disk[model_name] = tier
+        return tier
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats.evictions += 1
+
+    def get_many(self, model_name: str, texts: list[str]) -> list[np.ndarray | None]:
+        """Look up vectors for ``texts``. Returns ``None`` for each miss."""
+        results: list[np.ndarray | None] = []
+        with self._lock:
+            disk = self._disk_tier(model_name, None)
+            for text in texts:
+                key = cache_key(model_name, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._stats.memory_hits += 1
+                elif disk is not None and (vector := disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self._stats.disk_hits += 1
+                if vector is None:
+                    self._stats.misses += 1
+                else:
+                    self._stats.hits += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, model_name: str, texts: list[str], vectors: np.ndarray) -> None:
+        """Store freshly computed vectors for ``texts`` in every enabled tier."""
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [cache_key(model_name, t) for t in texts]
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            disk = self._disk_tier(model_name, vectors.shape[1])
+            if disk is not None:
+                disk.put_many(keys, vectors)
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the current counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                memory_hits=self._stats.memory_hits,
+                disk_hits=self._stats.disk_hits,
+                evictions=self._stats.evictions,
+                memory_entries=len(self._memory),
+                max_memory_entries=self.max_entries,
+                disk_entries=sum(len(t) for t in self._disk.values()),
+            )
+
+    def clear(self) -> None:
+        """Drop the in-memory tier. The disk tier is left untouched."""
+        with self._lock:
+            self._memory.clear()
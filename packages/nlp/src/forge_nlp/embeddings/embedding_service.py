@@ -4,20 +4,45 @@ Embedding service using a legal-domain BERT model.
 Locally uses sentence-transformers with nlpaueb/legal-bert-base-uncased.
 In production this runs behind a SageMaker endpoint; locally it runs in a
 Docker container exposing a FastAPI server.
+
+Standard clauses take their vector from a prebuilt ``ClauseLibrary``; other
+texts are deduplicated within the call, looked up in the ``EmbeddingCache``,
+packed into token-budget batches and encoded in process or on an
+``EncoderPool``.  Each of those stages lives in its own module here.
 """
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
-from typing import ClassVar
+from pathlib import Path
+from typing import overload
+
+import numpy as np
 
 from forge_nlp.chunking.clause_chunker import DocumentChunk
 
+from .autotune import DEFAULT_MAX_LATENCY_MS, TuningResult, apply_threads, autotune
+from .backends import Backend
+from .batching import fixed_batches, plan_token_batches
+from .clause_library import ClauseLibrary, default_library_path
+from .embedding_cache import CacheStats, EmbeddingCache
+from .encoder_pool import EncoderPool
+from .late_chunking import plan_late_chunks
+from .model_registry import ModelKey, ModelRegistry, default_registry, model_key
+from .projection import PcaProjection, default_projection_path
+from .quantization import Precision, ScalarQuantizer, default_calibration_path, quantize
+from .query_encoder import default_query_encoder_dir, is_query_encoder
+from .query_encoder import read_manifest as read_query_encoder_manifest
+from .snapshot import default_snapshot_dir, is_snapshot, read_manifest
+
 logger = logging.getLogger(__name__)
 
 _DEFAULT_MODEL = "nlpaueb/legal-bert-base-uncased"
 _DEFAULT_BATCH_SIZE = 32
+# Padded tokens per encoder batch: 32 rows of a full 512-token window.
+_DEFAULT_MAX_TOKENS_PER_BATCH = 16_384
 _EMBEDDING_DIM = 768
 
 
@@ -31,9 +56,13 @@ class EmbeddedChunk:
     chunk_index: int
     metadata: dict = field(default_factory=dict)
     embedding: list[float] = field(default_factory=list)
+    # EmbeddingService.embedding_version() of the service that produced it
+    embedding_version: str = ""
 
     @classmethod
-    def from_chunk(cls, chunk: DocumentChunk, embedding: list[float]) -> EmbeddedChunk:
+    def from_chunk(
+        cls, chunk: DocumentChunk, embedding: list[float], embedding_version: str = "",
+    ) -> EmbeddedChunk:
         return cls(
             chunk_text=chunk.chunk_text,
             section_type=chunk.section_type,
@@ -41,86 +70,880 @@ class EmbeddedChunk:
             chunk_index=chunk.chunk_index,
             metadata=dict(chunk.metadata),
             embedding=embedding,
+            embedding_version=embedding_version,
         )
 
 
+class EmbeddedChunkRow:
+    """One chunk of an ``EmbeddedChunkBatch``: same fields as ``EmbeddedChunk``.
+
+    ``embedding`` is a read-only float32 view of the batch's matrix row, and
+    the text and metadata are the source ``DocumentChunk``'s own, not copies.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: EmbeddedChunkBatch, index: int) -> None:
+        self._batch = batch
+        self._index = index
+
+    @property
+    def _chunk(self) -> DocumentChunk:
+        return self._batch.chunks[self._index]
+
+    @property
+    def chunk_text(self) -> str:
+        return self._chunk.chunk_text
+
+    @property
+    def section_type(self) -> str:
+        return self._chunk.section_type
+
+    @property
+    def clause_number(self) -> str | None:
+        return self._chunk.clause_number
+
+    @property
+    def chunk_index(self) -> int:
+        return self._chunk.chunk_index
+
+    @property
+    def metadata(self) -> dict:
+        return self._chunk.metadata
+
+    @property
+    def embedding(self) -> np.ndarray:
+        return self._batch.embeddings[self._index]
+
+    @property
+    def embedding_version(self) -> str:
+        return self._batch.embedding_version
+
+    def to_embedded_chunk(self) -> EmbeddedChunk:
+        """A standalone ``EmbeddedChunk`` with the vector as a Python list."""
+        return EmbeddedChunk.from_chunk(
+            self._chunk, self.embedding.tolist(), self.embedding_version
+        )
+
+    def __repr__(self) -> str:
+        return f"EmbeddedChunkRow({self._index}, chunk_index={self.chunk_index})"
+
+
+class EmbeddedChunkBatch(Sequence[EmbeddedChunkRow]):
+    """Embedded chunks whose vectors share one contiguous float32 matrix.
+
+    ``embeddings`` is ``(len(chunks), dimensions)``; row ``i`` belongs to
+    ``chunks[i]``.  Indexing and iteration yield ``EmbeddedChunkRow`` views,
+    so a 2,000-chunk document holds one array instead of 2,000 lists of
+    boxed floats.
+    """
+
+    __slots__ = ("chunks", "embedding_version", "embeddings")
+
+    def __init__(
+        self, chunks: list[DocumentChunk], embeddings: np.ndarray, embedding_version: str = "",
+    ) -> None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(chunks):
+            raise ValueError(
+                f"Expected {len(chunks)} embedding rows, got array of shape {embeddings.shape}"
+            )
+        embeddings.flags.writeable = False
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.embedding_version = embedding_version
+
+    @classmethod
+    def empty(cls, dimensions: int, embedding_version: str = "") -> EmbeddedChunkBatch:
+        return cls([], np.empty((0, dimensions), dtype=np.float32), embedding_version)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @overload
+    def __getitem__(self, index: int) -> EmbeddedChunkRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> EmbeddedChunkBatch: ...
+
+    def __getitem__(self, index: int | slice) -> EmbeddedChunkRow | EmbeddedChunkBatch:
+        if isinstance(index, slice):
+            return EmbeddedChunkBatch(
+                self.chunks[index], self.embeddings[index], self.embedding_version,
+            )
+        if index < 0:
+            index += len(self.chunks)
+        if not 0 <= index < len(self.chunks):
+            raise IndexError(index)
+        return EmbeddedChunkRow(self, index)
+
+    def __iter__(self) -> Iterator[EmbeddedChunkRow]:
+        return (EmbeddedChunkRow(self, i) for i in range(len(self.chunks)))
+
+    def to_embedded_chunks(self) -> list[EmbeddedChunk]:
+        """Standalone ``EmbeddedChunk`` objects, vectors as Python lists."""
+        return [row.to_embedded_chunk() for row in self]
+
+
+@dataclass
+class TruncationStats:
+    """How many encoder inputs exceeded the model window and lost tokens."""
+
+    texts: int = 0  # inputs whose token length was measured
+    truncated: int = 0
+    tokens_dropped: int = 0
+
+
+@dataclass
+class LateChunkingStats:
+    """Chunks embedded by late chunking and the encoder tokens it ran.
+
+    ``chunk_tokens`` is what encoding the same chunks one by one would have
+    cost, ``window_tokens`` what the shared windows actually cost.
+    """
+
+    chunks: int = 0
+    windows: int = 0
+    chunk_tokens: int = 0
+    window_tokens: int = 0
+
+
+@dataclass
+class DedupStats:
+    """Inputs seen by the service and how many were duplicates within their call."""
+
+    texts: int = 0
+    duplicates: int = 0
+
+
 class EmbeddingService:
     """Generate embeddings for contract text using a legal-domain BERT model.
 
-    The underlying ``SentenceTransformer`` model is cached as a class-level
-    singleton keyed by model name so it is loaded only once per process.
-    """
+    The underlying ``SentenceTransformer`` model lives in a ``ModelRegistry``
+    (by default one shared by the whole process) keyed by model name, backend
+    and the export or snapshot it loads from, and is fetched from it on every
+    use so the registry can evict it under memory pressure.  Pass an
+    ``EmbeddingCache`` to skip re-encoding texts seen before, and a started
+    ``EncoderPool`` to run the model in worker processes; the service then
+    loads it itself only if it needs the tokenizer.  PyTorch backends load
+    from ``snapshot`` (default: the model's ``snapshot build`` output, if
+    present) with memory-mapped weights.
+
+    With ``autotune=True`` the host's persisted calibration is loaded (or
+    swept under ``autotune_max_latency_ms`` per batch, and saved) before the
+    model loads.  Its batch size and token budget replace ``batch_size`` and
+    ``max_tokens_per_batch``, and its thread counts are applied to this
+    process.  A ``TuningResult`` is applied as is; give the same one to an
+    ``EncoderPool`` to apply it in the workers.
 
-    _model_cache: ClassVar[dict[str, object]] = {}
+    ``embed_queries`` runs search queries through ``query_encoder`` (default:
+    the model's ``query_encoder distill`` output, if present), a distilled
+    student whose vectors are comparable with the model's own.
+    """
 
     def __init__(
         self,
         model_name: str = _DEFAULT_MODEL,
         batch_size: int = _DEFAULT_BATCH_SIZE,
+        cache: EmbeddingCache | None = None,
+        max_tokens_per_batch: int | None = _DEFAULT_MAX_TOKENS_PER_BATCH,
+        backend: Backend | str = Backend.TORCH,
+        onnx_dir: str | None = None,
+        snapshot: str | Path | None = None,
+        int8_calibration: str | Path | ScalarQuantizer | None = None,
+        projection: str | Path | PcaProjection | None = None,
+        output_dimensions: int | None = None,
+        pool: EncoderPool | None = None,
+        clause_library: str | Path | ClauseLibrary | None = None,
+        registry: ModelRegistry | None = None,
+        autotune: bool | TuningResult = False,
+        autotune_max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+        query_encoder: str | Path | None = None,
     ) -> None:
         self.model_name = model_name
         self.batch_size = batch_size
-        self._model = self._load_model(model_name)
+        self.cache = cache
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.backend = Backend(backend)
+        self.tuning: TuningResult | None = None
+        if autotune:
+            self._apply_tuning(autotune, onnx_dir, autotune_max_latency_ms)
+        if pool is not None and (pool.model_name, pool.backend) != (model_name, self.backend):
+            raise ValueError(
+                f"Encoder pool runs {pool.model_name} ({pool.backend.value}), "
+                f"service expects {model_name} ({self.backend.value})"
+            )
+        self.pool = pool
+        self.registry = registry or default_registry()
+        self._onnx_dir = onnx_dir
+        self.snapshot = self._resolve_snapshot(snapshot)
+        # Read once: it is part of the version stamped on every vector.
+        self._weights_digest: str | None = (
+            read_manifest(self.snapshot).get("weights_sha256") if self.snapshot else None
+        )
+        if pool is not None and pool.dimensions is not None:
+            # Reported by the workers at startup: the parent never loads the model.
+            self._dimensions = pool.dimensions
+        else:
+            model = self._model
+            self._dimensions = model.get_sentence_embedding_dimension()  # type: ignore[union-attr]
+        self._truncation = TruncationStats()
+        self._dedup = DedupStats()
+        self._late = LateChunkingStats()
+        self._int8_calibration = int8_calibration
+        self._projection = projection
+        self._clause_library = clause_library
+        self._query_encoder = query_encoder
+        self._query_manifest: dict | None = None
+        self.output_dimensions = output_dimensions or self.dimensions
+        if self.output_dimensions != self.dimensions:
+            self._require_projection(self.output_dimensions)
 
     # ─── Model loading ─────────────────────────────────────────────
 
-    @classmethod
-    def _load_model(cls, model_name: str) -> object:
-        """Load (or retrieve from cache) a SentenceTransformer model."""
-        if model_name not in cls._model_cache:
-            from sentence_transformers import SentenceTransformer
+    def _apply_tuning(
+        self, tuning: bool | TuningResult, onnx_dir: str | None, max_latency_ms: float,
+    ) -> None:
+        if tuning is True:
+            tuning = autotune(
+                self.model_name, self.backend, onnx_dir=onnx_dir, max_latency_ms=max_latency_ms,
+            )
+        if (tuning.model_name, tuning.backend) != (self.model_name, self.backend.value):
+            raise ValueError(
+                f"Tuning is for {tuning.model_name} ({tuning.backend}), "
+                f"service runs {self.model_name} ({self.backend.value})"
+            )
+        apply_threads(tuning)
+        self.batch_size = tuning.batch_size
+        self.max_tokens_per_batch = tuning.max_tokens_per_batch
+        self.tuning = tuning
+
+    def _resolve_snapshot(self, snapshot: str | Path | None) -> Path | None:
+        """Snapshot to load from: the given one, else the model's default if built.
 
-            logger.info("Loading model %s …", model_name)
-            model = SentenceTransformer(model_name)
-            cls._model_cache[model_name] = model
-            logger.info("Model %s loaded — dimension=%d", model_name, model.get_sentence_embedding_dimension())
-        return cls._model_cache[model_name]
+        The ONNX backend loads its own exported graph and never uses one.
+        """
+        if self.backend is Backend.ONNX_INT8:
+            return None
+        if snapshot is not None:
+            return Path(snapshot)
+        default = default_snapshot_dir(self.model_name)
+        return default if is_snapshot(default) else None
+
+    @property
+    def _model(self) -> object:
+        """The SentenceTransformer, loaded (again) by the registry if needed."""
+        return self.registry.get(self.model_name, self.backend, self._onnx_dir, self.snapshot)
+
+    @property
+    def model_key(self) -> ModelKey:
+        """Registry key of this service's model."""
+        return model_key(self.model_name, self.backend, self._onnx_dir, self.snapshot)
+
+    @property
+    def cache_namespace(self) -> str:
+        """Model identity used for cache keys and the clause library.
+
+        Quantized backends and snapshots with other weights produce different
+        vectors, so they must not share entries with the published model.
+        """
+        namespace = self.model_name
+        if self.backend is Backend.ONNX_INT8:
+            namespace += f"#{self.backend.value}"
+        if self._weights_digest:
+            namespace += f"@{self._weights_digest[:12]}"
+        return namespace
+
+    def embedding_version(self, dimensions: int | None = None) -> str:
+        """Identity of the vectors this service produces, stored alongside each one.
+
+        Vectors of two versions are not comparable.  A new model, a rebuilt
+        snapshot with other weights, a quantized backend or a projection to
+        fewer dimensions each make a new version, as does refitting that
+        projection.
+        """
+        version = self.cache_namespace
+        dims = dimensions or self.output_dimensions
+        if dims != self.dimensions:
+            version += f"/{dims}d"
+            if self.projection is not None:
+                version += f"@{self.projection.digest[:12]}"
+        return version
 
     @property
     def dimensions(self) -> int:
-        return self._model.get_sentence_embedding_dimension()  # type: ignore[union-attr]
+        return self._dimensions
+
+    @property
+    def tokenizer(self) -> object:
+        """The model's fast tokenizer, for token-aware chunking."""
+        return self._model.tokenizer  # type: ignore[union-attr]
+
+    @property
+    def max_seq_length(self) -> int:
+        """Encoder window in tokens, special tokens included."""
+        return self._model.max_seq_length  # type: ignore[union-attr]
 
     # ─── Embedding methods ─────────────────────────────────────────
 
-    def embed_text(self, text: str) -> list[float]:
-        """Embed a single text string. Returns a 768-dimensional vector."""
+    def embed_text(self, text: str, dimensions: int | None = None) -> list[float]:
+        """Embed a single text string. Returns an ``output_dimensions`` vector (768 by default)."""
+        dims = dimensions or self.output_dimensions
+        if self.cache is not None or self.pool is not None or dims != self.dimensions:
+            return self.embed_batch([text], dimensions=dims)[0]
         embedding = self._model.encode(text, show_progress_bar=False)  # type: ignore[union-attr]
         return embedding.tolist()
 
-    def embed_batch(self, texts: list[str], batch_size: int | None = None) -> list[list[float]]:
+    def embed_batch(
+        self,
+        texts: list[str],
+        batch_size: int | None = None,
+        dimensions: int | None = None,
+    ) -> list[list[float]]:
         """Embed multiple texts efficiently in batches.
 
         Args:
             texts: List of text strings to embed.
             batch_size: Override the default batch size.
+            dimensions: Output size (e.g. 128/256/384); defaults to
+                ``output_dimensions``. Reduced sizes need a fitted projection.
 
         Returns:
             List of embedding vectors, one per input text.
         """
+        return self.project(self.embed_array(texts, batch_size), dimensions).tolist()
+
+    def embed_array(
+        self,
+        texts: list[str],
+        batch_size: int | None = None,
+        token_ids: list[list[int]] | None = None,
+    ) -> np.ndarray:
+        """``embed_batch`` as a ``(len(texts), dimensions)`` float32 array, unprojected.
+
+        Byte-identical texts are embedded once and share the vector.  Cached
+        vectors are reused; only the misses are sent to the model.  With
+        ``token_ids`` (one encoder input per text) the misses skip
+        tokenization; the texts still key the cache.
+        """
+        first_index: dict[str, int] = {}
+        inverse = [first_index.setdefault(t, len(first_index)) for t in texts]
+        self._dedup.texts += len(texts)
+        if len(first_index) < len(texts):
+            self._dedup.duplicates += len(texts) - len(first_index)
+            unique = list(first_index)
+            unique_ids = None
+            if token_ids is not None:
+                unique_ids = [None] * len(unique)
+                for ids, u in zip(token_ids, inverse):
+                    if unique_ids[u] is None:
+                        unique_ids[u] = ids
+            return self._embed_unique(unique, batch_size, unique_ids)[inverse]
+        return self._embed_unique(texts, batch_size, token_ids)
+
+    def _embed_unique(
+        self,
+        texts: list[str],
+        batch_size: int | None = None,
+        token_ids: list[list[int]] | None = None,
+    ) -> np.ndarray:
+        """``embed_array`` for texts already known to be distinct."""
+        if self.cache is None:
+            if token_ids is not None:
+                return self.encode_ids(token_ids, batch_size)
+            return self.encode(texts, batch_size)
+
+        cached = self.cache.get_many(self.cache_namespace, texts)
+        misses = [i for i, vec in enumerate(cached) if vec is None]
+        if misses:
+            miss_texts = [texts[i] for i in misses]
+            if token_ids is not None:
+                fresh = self.encode_ids([token_ids[i] for i in misses], batch_size)
+            else:
+                fresh = self.encode(miss_texts, batch_size)
+            self.cache.put_many(self.cache_namespace, miss_texts, fresh)
+            for i, vec in zip(misses, fresh):
+                cached[i] = vec
+        if not cached:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        return np.stack(cached)  # type: ignore[arg-type]
+
+    def encode(self, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+        """Run the model on ``texts``. Every call here is a real forward pass.
+
+        With a token budget configured, ``batch_size`` caps the rows per batch
+        and the budget decides how many of them share one padded batch.  In
+        pool mode the texts are sharded across the workers instead, each of
+        which applies the same batching to its shard.
+        """
+        if self.pool is not None:
+            return self.pool.encode(texts)
         bs = batch_size or self.batch_size
+        if self.max_tokens_per_batch is None or len(texts) <= 1:
+            return self._encode_batch(texts, bs)
+
+        lengths = self.token_lengths(texts)
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for batch in plan_token_batches(lengths, self.max_tokens_per_batch, bs):
+            out[batch] = self._encode_batch([texts[i] for i in batch], len(batch))
+        return out
+
+    def warm_up(self) -> None:
+        """Encode one short text, paging the weights in before the first request.
+
+        Pool workers hold their own models, so with a pool this does nothing.
+        """
+        if self.pool is None:
+            self._encode_batch(["warm-up"], 1)
+
+    def _encode_batch(self, texts: list[str], batch_size: int) -> np.ndarray:
         embeddings = self._model.encode(  # type: ignore[union-attr]
             texts,
-            batch_size=bs,
+            batch_size=batch_size,
             show_progress_bar=False,
         )
-        return embeddings.tolist()
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+    def encode_ids(
+        self, token_ids: list[list[int]], batch_size: int | None = None,
+    ) -> np.ndarray:
+        """Forward pre-tokenized inputs through the model, skipping the tokenizer.
+
+        Each entry must already include special tokens and fit the window.
+        Batches are planned by length exactly like ``encode``.
+        """
+        if self.pool is not None:
+            return self.pool.encode_ids(token_ids)
+        out = np.empty((len(token_ids), self.dimensions), dtype=np.float32)
+        for batch, features in self._forward_ids(token_ids, batch_size):
+            out[batch] = features["sentence_embedding"].float().cpu().numpy()
+        return out
+
+    def _forward_ids(
+        self, token_ids: list[list[int]], batch_size: int | None = None,
+    ) -> Iterator[tuple[list[int], dict]]:
+        """Run padded, length-planned batches of ``token_ids`` through the model.
+
+        Yields each batch's row indices with the model's output features.
+        """
+        import torch
+
+        bs = batch_size or self.batch_size
+        lengths = [len(ids) for ids in token_ids]
+        if self.max_tokens_per_batch is None:
+            batches = fixed_batches(len(token_ids), bs)
+        else:
+            batches = plan_token_batches(lengths, self.max_tokens_per_batch, bs)
+        model = self._model
+        pad_id = model.tokenizer.pad_token_id or 0  # type: ignore[attr-defined]
+        device = model.device  # type: ignore[attr-defined]
+
+        for batch in batches:
+            width = max(lengths[i] for i in batch)
+            input_ids = torch.full((len(batch), width), pad_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+            for row, i in enumerate(batch):
+                input_ids[row, :lengths[i]] = torch.tensor(token_ids[i], dtype=torch.long)
+                attention_mask[row, :lengths[i]] = 1
+            features = {
+                "input_ids": input_ids.to(device),
+                "attention_mask": attention_mask.to(device),
+                "token_type_ids": torch.zeros_like(input_ids).to(device),
+            }
+            with torch.inference_mode():
+                output = model(features)  # type: ignore[operator]
+            yield batch, output
+
+    def token_lengths(self, texts: list[str]) -> list[int]:
+        """WordPiece length of each text as the encoder will see it.
+
+        Includes special tokens and is capped at the model's max sequence
+        length, matching the padded width of the encoder input.  Texts longer
+        than the window are counted in ``truncation_stats``.
+        """
+        encoded = self.tokenizer(  # type: ignore[operator]
+            texts,
+            add_special_tokens=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        raw = [len(ids) for ids in encoded["input_ids"]]
+        self._record_truncation(raw)
+        return [min(n, self.max_seq_length) for n in raw]
+
+    def _record_truncation(self, lengths: list[int]) -> None:
+        window = self.max_seq_length
+        over = [n - window for n in lengths if n > window]
+        self._truncation.texts += len(lengths)
+        self._truncation.truncated += len(over)
+        self._truncation.tokens_dropped += sum(over)
+
+    def truncation_stats(self) -> TruncationStats:
+        """Inputs measured so far and how many were cut at the model window.
+
+        Only inputs tokenized in this process are counted; in pool mode the
+        workers tokenize plain texts and only pre-tokenized chunks are seen.
+        """
+        t = self._truncation
+        return TruncationStats(
+            texts=t.texts, truncated=t.truncated, tokens_dropped=t.tokens_dropped
+        )
+
+    def count_truncated(self, chunks: list[DocumentChunk]) -> int:
+        """Number of ``chunks`` longer than the model window.
+
+        Uses the ``token_count`` a token-aware chunker recorded and never
+        tokenizes; chunks without one are not counted (their truncation shows
+        in ``truncation_stats`` when the service tokenizes them to encode).
+        """
+        window = self.max_seq_length
+        counted = [c.metadata.get("token_count") for c in chunks]
+        return sum(1 for n in counted if n is not None and n > window)
+
+    # ─── Clause library ────────────────────────────────────────────
+
+    @property
+    def clause_library(self) -> ClauseLibrary | None:
+        """Precomputed FAR/DFARS clause vectors, opened lazily.
+
+        Falls back to the library written by ``clause_library build`` for
+        this model; ``None`` if none has been built.
+        """
+        lib = self._clause_library
+        if lib is None:
+            path = default_library_path(self.cache_namespace)
+            lib = path if path.exists() else None
+        if isinstance(lib, (str, Path)):
+            lib = ClauseLibrary(lib)
+        if lib is not None and lib.dimensions != self.dimensions:
+            raise ValueError(
+                f"Clause library at {lib.path} holds {lib.dimensions}-dim vectors, "
+                f"{self.model_name} produces {self.dimensions}"
+            )
+        self._clause_library = lib
+        return lib
+
+    def library_vectors(self, chunks: list[DocumentChunk]) -> tuple[np.ndarray, list[int]]:
+        """Full-size vectors for ``chunks`` filled in from the clause library.
+
+        Returns the ``(len(chunks), dimensions)`` matrix and the indices of
+        the rows the library did not cover; those rows are uninitialized and
+        still need embedding.
+        """
+        full = np.empty((len(chunks), self.dimensions), dtype=np.float32)
+        library = self.clause_library
+        if library is None:
+            return full, list(range(len(chunks)))
+        found = library.lookup(chunks)
+        pending = []
+        for i, vec in enumerate(found):
+            if vec is None:
+                pending.append(i)
+            else:
+                full[i] = vec
+        return full, pending
+
+    # ─── Query encoder ─────────────────────────────────────────────
+
+    @property
+    def query_encoder(self) -> Path | None:
+        """Directory of the distilled query encoder, resolved lazily.
+
+        Falls back to the encoder written by ``query_encoder distill`` for
+        this model; ``None`` if none has been built.
+
+        Raises:
+            ValueError: The encoder was distilled from another model.
+        """
+        if self._query_manifest is not None:
+            return self._query_encoder  # type: ignore[return-value]
+        path = self._query_encoder
+        if path is None:
+            default = default_query_encoder_dir(self.model_name)
+            path = default if is_query_encoder(default) else None
+        if path is None:
+            return None
+        path = Path(path)
+        if not is_query_encoder(path):
+            raise FileNotFoundError(
+                f"No query encoder at {path}. Run "
+                f"`python -m forge_nlp.embeddings.query_encoder distill --model {self.model_name}`."
+            )
+        manifest = read_query_encoder_manifest(path)
+        if (manifest["teacher"], manifest["dimensions"]) != (self.model_name, self.dimensions):
+            raise ValueError(
+                f"Query encoder at {path} was distilled from {manifest['teacher']} "
+                f"({manifest['dimensions']} dims), "
+                f"service runs {self.model_name} ({self.dimensions})"
+            )
+        self._query_encoder, self._query_manifest = path, manifest
+        return path
+
+    @property
+    def query_cache_namespace(self) -> str:
+        """Cache namespace of query vectors: the student's are not the model's."""
+        if self.query_encoder is None:
+            return self.cache_namespace
+        digest = self._query_manifest["weights_sha256"]  # type: ignore[index]
+        return f"{self.cache_namespace}#query@{digest[:12]}"
+
+    def embed_queries(
+        self, texts: list[str], dimensions: int | None = None,
+    ) -> list[list[float]]:
+        """Embed search queries, comparable with the vectors of ``embed_chunks``.
+
+        Uses the query encoder if one is built, else the full model.
+        """
+        return self.project(self.embed_query_array(texts), dimensions).tolist()
+
+    def embed_query_array(self, texts: list[str]) -> np.ndarray:
+        """``embed_queries`` as a float32 array, unprojected.
+
+        Cached under ``query_cache_namespace``.
+        """
+        if self.query_encoder is None:
+            return self.embed_array(texts)
+        if self.cache is None:
+            return self._encode_queries(texts)
+        namespace = self.query_cache_namespace
+        cached = self.cache.get_many(namespace, texts)
+        misses = [i for i, vec in enumerate(cached) if vec is None]
+        if misses:
+            miss_texts = [texts[i] for i in misses]
+            fresh = self._encode_queries(miss_texts)
+            self.cache.put_many(namespace, miss_texts, fresh)
+            for i, vec in zip(misses, fresh):
+                cached[i] = vec
+        return np.stack(cached)  # type: ignore[arg-type]
+
+    def _encode_queries(self, texts: list[str]) -> np.ndarray:
+        """Run the query encoder on ``texts``, always in this process."""
+        model = self.registry.get(str(self.query_encoder), Backend.TORCH, None, None)
+        embeddings = model.encode(  # type: ignore[attr-defined]
+            texts, batch_size=self.batch_size, show_progress_bar=False,
+        )
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+    # ─── Reduced dimensionality ────────────────────────────────────
 
-    def embed_chunks(self, chunks: list[DocumentChunk]) -> list[EmbeddedChunk]:
-        """Embed all DocumentChunks and return EmbeddedChunks with vectors attached.
+    @property
+    def projection(self) -> PcaProjection | None:
+        """PCA projection for reduced output sizes, loaded lazily.
+
+        Falls back to the file written by ``projection fit`` for this model;
+        ``None`` if no projection has been fitted.
+        """
+        proj = self._projection
+        if proj is None:
+            path = default_projection_path(self.model_name)
+            proj = path if path.exists() else None
+        if isinstance(proj, (str, Path)):
+            proj = PcaProjection.load(proj)
+        self._projection = proj
+        return proj
+
+    def _require_projection(self, dimensions: int) -> PcaProjection:
+        projection = self.projection
+        if projection is None:
+            raise ValueError(
+                f"No projection fitted for {self.model_name}; only {self.dimensions} dimensions "
+                "available. Run "
+                f"`python -m forge_nlp.embeddings.projection fit --model {self.model_name}`."
+            )
+        if projection.input_dimensions != self.dimensions:
+            raise ValueError(
+                f"Projection expects {projection.input_dimensions}-dim input, "
+                f"{self.model_name} produces {self.dimensions}"
+            )
+        if not 0 < dimensions <= projection.max_dimensions:
+            raise ValueError(
+                f"dimensions must be between 1 and {projection.max_dimensions} "
+                f"(or {self.dimensions} for full vectors), got {dimensions}"
+            )
+        return projection
+
+    def project(self, vectors: np.ndarray, dimensions: int | None = None) -> np.ndarray:
+        """Reduce full model vectors to ``dimensions`` (default ``output_dimensions``).
+
+        Raises:
+            ValueError: A reduced size was requested but no suitable projection exists.
+        """
+        dims = dimensions or self.output_dimensions
+        if dims == self.dimensions:
+            return vectors
+        return self._require_projection(dims).transform(vectors, dims)
+
+    # ─── Reduced precision ─────────────────────────────────────────
+
+    @property
+    def int8_quantizer(self) -> ScalarQuantizer | None:
+        """Calibration for int8 output, loaded lazily.
+
+        Falls back to the stats written by ``quantization calibrate`` for
+        this model; ``None`` if the model has never been calibrated.
+        """
+        cal = self._int8_calibration
+        if cal is None:
+            path = default_calibration_path(self.model_name)
+            cal = path if path.exists() else None
+        if isinstance(cal, (str, Path)):
+            cal = ScalarQuantizer.load(cal)
+        self._int8_calibration = cal
+        return cal
+
+    def quantize(self, vectors: np.ndarray, precision: Precision | str) -> np.ndarray:
+        """Convert float32 vectors from this model to ``precision``.
+
+        Raises:
+            ValueError: int8 was requested but the model has no calibration,
+                or the calibration was fitted on vectors of another size.
+        """
+        precision = Precision(precision)
+        quantizer = None
+        if precision is Precision.INT8:
+            quantizer = self.int8_quantizer
+            if quantizer is None:
+                raise ValueError(
+                    f"No int8 calibration for {self.model_name}. Run "
+                    "`python -m forge_nlp.embeddings.quantization calibrate "
+                    f"--model {self.model_name}`."
+                )
+            if quantizer.minimums.shape[-1] != vectors.shape[-1]:
+                raise ValueError(
+                    f"int8 calibration is for {quantizer.minimums.shape[-1]}-dim vectors, "
+                    f"got {vectors.shape[-1]}"
+                )
+        return quantize(vectors, precision, quantizer)
+
+    def embed_batch_quantized(
+        self,
+        texts: list[str],
+        precision: Precision | str,
+        dimensions: int | None = None,
+    ) -> np.ndarray:
+        """Embed ``texts`` and return them at ``precision`` as a NumPy array.
+
+        float32/float16 give ``(n, dim)``; int8 gives ``(n, dim)`` int8 codes;
+        binary gives ``(n, dim / 8)`` packed sign bits.  Projection to
+        ``dimensions`` happens before quantization.
+        """
+        return self.quantize(self.project(self.embed_array(texts), dimensions), precision)
+
+    def cache_stats(self) -> CacheStats | None:
+        """Hit/miss counters of the attached cache, or ``None`` if uncached."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def dedup_stats(self) -> DedupStats:
+        """Texts embedded so far and how many in-call duplicates skipped encoding."""
+        return DedupStats(texts=self._dedup.texts, duplicates=self._dedup.duplicates)
+
+    def embed_chunks(
+        self,
+        chunks: list[DocumentChunk],
+        dimensions: int | None = None,
+        late_chunking: bool = False,
+    ) -> EmbeddedChunkBatch:
+        """Embed all DocumentChunks and return them with their vectors attached.
+
+        Chunks whose clause number, variant and text match an entry of the
+        clause library take the precomputed vector.  The rest are encoded
+        from their ``token_ids`` if a token-aware chunker produced them all,
+        and tokenized here otherwise.
 
         Args:
             chunks: Output from DocumentProcessor / ClauseChunker.
+            dimensions: Output size; defaults to ``output_dimensions``.
+            late_chunking: Encode each run of chunks from one section or
+                clause of a document once and pool every chunk's token span
+                (see ``late_chunking.py``); chunks without a ``document_id``
+                are encoded alone.  Vectors differ from per-chunk ones and
+                bypass the cache.
 
         Returns:
-            List of EmbeddedChunk, each carrying its embedding vector.
+            An EmbeddedChunkBatch: the chunks and one float32 matrix of their
+            vectors, iterable as per-chunk rows.
         """
+        version = self.embedding_version(dimensions)
         if not chunks:
-            return []
+            return EmbeddedChunkBatch.empty(dimensions or self.output_dimensions, version)
+
+        full, pending = self.library_vectors(chunks)
+        todo = [chunks[i] for i in pending]
+        if todo:
+            full[pending] = (
+                self._late_chunk_array(todo) if late_chunking else self._chunk_array(todo)
+            )
+        return EmbeddedChunkBatch(chunks, self.project(full, dimensions), version)
 
+    def _chunk_array(self, chunks: list[DocumentChunk]) -> np.ndarray:
+        """Full-size vectors of ``chunks``, each encoded on its own."""
         texts = [c.chunk_text for c in chunks]
-        vectors = self.embed_batch(texts)
+        if all(c.token_ids is not None for c in chunks):
+            token_ids: list[list[int]] = [c.token_ids for c in chunks]  # type: ignore[misc]
+            self._record_truncation([
+                c.metadata.get("token_count", len(ids)) for c, ids in zip(chunks, token_ids)
+            ])
+            return self.embed_array(texts, token_ids=token_ids)
+        return self.embed_array(texts)
 
-        return [
-            EmbeddedChunk.from_chunk(chunk, vector)
-            for chunk, vector in zip(chunks, vectors)
-        ]
+    # ─── Late chunking ─────────────────────────────────────────────
+
+    def _late_chunk_array(self, chunks: list[DocumentChunk]) -> np.ndarray:
+        """Full-size vectors of ``chunks`` pooled from shared section windows.
+
+        The windows always run in this process, pool or not.
+        """
+        normalize = self._check_mean_pooling()
+        plan = plan_late_chunks(chunks, self.tokenizer, self.max_seq_length)
+        out = np.empty((len(chunks), self.dimensions), dtype=np.float32)
+        if plan.singles:
+            out[plan.singles] = self._chunk_array([chunks[i] for i in plan.singles])
+        if not plan.windows:
+            return out
+
+        token_embeddings: list[np.ndarray] = [np.empty(0)] * len(plan.windows)
+        for batch, features in self._forward_ids(plan.windows):
+            hidden = features["token_embeddings"].float().cpu().numpy()
+            for row, i in enumerate(batch):
+                token_embeddings[i] = hidden[row, :len(plan.windows[i])]
+        pooled = [t.chunk for t in plan.targets]
+        for target in plan.targets:
+            window = token_embeddings[target.window]
+            out[target.chunk] = window[target.start:target.end].mean(axis=0)
+        if normalize:
+            out[pooled] /= np.maximum(np.linalg.norm(out[pooled], axis=1, keepdims=True), 1e-12)
+
+        self._late.chunks += len(pooled)
+        self._late.windows += len(plan.windows)
+        self._late.chunk_tokens += plan.chunk_tokens
+        self._late.window_tokens += plan.window_tokens
+        return out
+
+    def _check_mean_pooling(self) -> bool:
+        """Make sure span pooling matches the model's own pooling.
+
+        Returns whether the model L2-normalizes its output.
+
+        Raises:
+            ValueError: The model does not mean-pool token embeddings.
+        """
+        modules = list(self._model)  # type: ignore[call-overload]
+        pooling = next((m for m in modules if type(m).__name__ == "Pooling"), None)
+        mode = getattr(pooling, "pooling_mode", None)
+        if mode is None and pooling is not None:  # sentence-transformers < 5
+            mode = pooling.get_pooling_mode_str()
+        if mode != "mean":
+            raise ValueError(
+                f"Late chunking needs a mean-pooling model; {self.model_name} is not one"
+            )
+        return any(type(m).__name__ == "Normalize" for m in modules)
+
+    def late_chunking_stats(self) -> LateChunkingStats:
+        """Chunks pooled from shared windows and the encoder tokens that took."""
+        return LateChunkingStats(
+            chunks=self._late.chunks,
+            windows=self._late.windows,
+            chunk_tokens=self._late.chunk_tokens,
+            window_tokens=self._late.window_tokens,
+        )
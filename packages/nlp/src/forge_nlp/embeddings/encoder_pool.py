@@ -0,0 +1,428 @@
+"""
+Multi-process encoder pool for many-core CPUs.
+
+One ``SentenceTransformer`` in one Python process stops scaling well before
+a 32-core ingestion node is busy: torch intra-op parallelism flattens out on
+BERT-base sized matrices and everything around the forward pass holds the
+GIL.  ``EncoderPool`` instead runs N spawned worker processes, each pinned
+to its own subset of cores with torch thread counts sized to that subset.
+Large calls are split into contiguous shards encoded in parallel and merged
+back in input order; small calls take a single idle worker, so concurrent
+callers (``/embed`` and ``IngestionPipeline``) can share one pool.
+
+Every worker loads its own copy of the model (~440 MB for LegalBERT).
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+from dataclasses import dataclass, field, replace
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+
+from .backends import Backend
+
+if TYPE_CHECKING:
+    from .autotune import TuningResult
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MODEL = "nlpaueb/legal-bert-base-uncased"
+_START_TIMEOUT_S = 600.0
+_SHUTDOWN_TIMEOUT_S = 10.0
+# Below this many texts per worker, splitting costs more than it saves.
+_DEFAULT_MIN_SHARD_SIZE = 32
+
+
+class EncoderPoolError(RuntimeError):
+    """Raised when a worker fails to start, dies, or the pool is not running."""
+
+
+@dataclass
+class WorkerStatus:
+    """Health and counters of one pool worker."""
+
+    index: int
+    pid: int | None
+    alive: bool
+    cpus: list[int] = field(default_factory=list)
+    threads: int = 0
+    texts: int = 0
+    calls: int = 0
+
+
+def available_cpus() -> list[int]:
+    """CPUs this process may run on (honours cgroup/taskset restrictions)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(cpus: list[int], workers: int) -> list[list[int]]:
+    """Split ``cpus`` into ``workers`` contiguous, near-equal subsets.
+
+    Contiguous ids usually share a physical core or socket, which keeps a
+    worker's threads on neighbouring caches.  With more workers than CPUs,
+    subsets wrap around and some CPUs are shared.
+    """
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    if workers >= len(cpus):
+        return [[cpus[i % len(cpus)]] for i in range(workers)]
+    base, extra = divmod(len(cpus), workers)
+    subsets, start = [], 0
+    for i in range(workers):
+        size = base + (1 if i < extra else 0)
+        subsets.append(cpus[start:start + size])
+        start += size
+    return subsets
+
+
+def shard_bounds(n: int, shards: int) -> list[tuple[int, int]]:
+    """``[start, end)`` bounds splitting ``n`` items into ``shards`` contiguous parts."""
+    shards = max(1, min(shards, n))
+    base, extra = divmod(n, shards)
+    bounds, start = [], 0
+    for i in range(shards):
+        end = start + base + (1 if i < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+# ─── Worker process ───────────────────────────────────────────────────
+
+def _worker_main(
+    conn: Connection,
+    model_name: str,
+    backend: str,
+    onnx_dir: str | None,
+    snapshot: str | None,
+    cpus: list[int],
+    threads: int,
+    batch_size: int,
+    max_tokens_per_batch: int | None,
+    tuning: TuningResult | None,
+) -> None:
+    """Entry point of a spawned worker: pin, load the model, serve encode calls.
+
+    Protocol over ``conn``: the worker first sends ``("ready", dimensions)``
+    or ``("error", message)``; then each ``("encode", texts)`` or
+    ``("encode_ids", token_ids)`` is answered with ``("ok", array)`` or
+    ``("error", message)`` and ``("ping", None)`` with ``("pong", pid)``.
+    ``None`` shuts the worker down.
+    """
+    try:
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(tuning.inter_op_threads if tuning is not None else 1)
+
+        from .embedding_service import EmbeddingService
+
+        svc = EmbeddingService(
+            model_name=model_name,
+            batch_size=batch_size,
+            max_tokens_per_batch=max_tokens_per_batch,
+            backend=backend,
+            onnx_dir=onnx_dir,
+            snapshot=snapshot,
+            autotune=tuning if tuning is not None else False,
+        )
+    except Exception as exc:  # noqa: BLE001 — reported to the parent
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+        conn.close()
+        return
+    conn.send(("ready", svc.dimensions))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        command, payload = message
+        if command == "ping":
+            conn.send(("pong", os.getpid()))
+            continue
+        encode = svc.encode_ids if command == "encode_ids" else svc.encode
+        try:
+            conn.send(("ok", encode(payload)))
+        except Exception as exc:  # noqa: BLE001 — reported to the caller
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    conn.close()
+
+
+# ─── Pool ─────────────────────────────────────────────────────────────
+
+@dataclass
+class _Worker:
+    index: int
+    process: mp.process.BaseProcess
+    conn: Connection
+    cpus: list[int]
+    threads: int
+    texts: int = 0
+    calls: int = 0
+
+
+class EncoderPool:
+    """A fixed set of pinned encoder processes sharing one model configuration.
+
+    Args:
+        workers: Number of worker processes.
+        model_name: Model every worker loads.
+        threads_per_worker: torch intra-op threads per worker; defaults to
+            the size of the worker's CPU subset (capped at the tuned count).
+        cpus: CPUs to spread the workers over; defaults to every CPU this
+            process may use.
+        backend, onnx_dir, snapshot, batch_size, max_tokens_per_batch: Passed
+            to each worker's ``EmbeddingService``.  Workers loading one
+            snapshot share its weight pages.
+        tuning: This host's ``autotune`` result, applied in every worker: its
+            batch size, token budget and inter-op threads.  Also read from
+            the ``tuning`` attribute if set before ``start()``.
+        min_shard_size: Smallest shard worth sending to its own worker.
+
+    Use as a context manager, or call ``start()`` and ``shutdown()``.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        model_name: str = _DEFAULT_MODEL,
+        threads_per_worker: int | None = None,
+        cpus: list[int] | None = None,
+        backend: Backend | str = Backend.TORCH,
+        onnx_dir: str | Path | None = None,
+        snapshot: str | Path | None = None,
+        batch_size: int = 32,
+        max_tokens_per_batch: int | None = 16_384,
+        min_shard_size: int = _DEFAULT_MIN_SHARD_SIZE,
+        tuning: TuningResult | None = None,
+    ) -> None:
+        self.model_name = model_name
+        self.backend = Backend(backend)
+        self.tuning = tuning
+        self.onnx_dir = str(onnx_dir) if onnx_dir is not None else None
+        self.snapshot = str(snapshot) if snapshot is not None else None
+        self.batch_size = batch_size
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.min_shard_size = min_shard_size
+        self.cpu_sets = partition_cpus(cpus or available_cpus(), workers)
+        self.threads_per_worker = threads_per_worker
+        self.dimensions: int | None = None
+        self._workers: list[_Worker] = []
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self.cpu_sets)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    # ─── Lifecycle ───────────────────────────────────────────────────
+
+    def start(self, timeout: float = _START_TIMEOUT_S) -> EncoderPool:
+        """Spawn the workers and wait until every one has loaded the model.
+
+        Raises:
+            EncoderPoolError: A worker failed to load; the pool is shut down.
+        """
+        with self._lock:
+            if self._workers:
+                return self
+            tuning = self.tuning
+            if tuning is not None and (tuning.model_name, tuning.backend) != (
+                self.model_name, self.backend.value,
+            ):
+                raise ValueError(
+                    f"Tuning is for {tuning.model_name} ({tuning.backend}), "
+                    f"pool runs {self.model_name} ({self.backend.value})"
+                )
+            ctx = mp.get_context("spawn")
+            for index, cpus in enumerate(self.cpu_sets):
+                threads = self.threads_per_worker or len(cpus)
+                # The tuned intra-op count was measured on the whole host; a
+                # worker never runs more threads than its CPU subset has.
+                if tuning is not None and self.threads_per_worker is None:
+                    threads = min(threads, tuning.intra_op_threads)
+                worker_tuning = replace(tuning, intra_op_threads=threads) if tuning else None
+                parent_conn, child_conn = ctx.Pipe()
+                process = ctx.Process(
+                    target=_worker_main,
+                    args=(child_conn, self.model_name, self.backend.value, self.onnx_dir,
+                          self.snapshot, cpus, threads, self.batch_size,
+                          self.max_tokens_per_batch, worker_tuning),
+                    name=f"forge-encoder-{index}",
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                self._workers.append(_Worker(index, process, parent_conn, cpus, threads))
+
+        logger.info("Starting %d encoder workers for %s …", self.size, self.model_name)
+        try:
+            for worker in self._workers:
+                if not worker.conn.poll(timeout):
+                    raise EncoderPoolError(
+                        f"Encoder worker {worker.index} did not start in {timeout}s"
+                    )
+                status, payload = self._recv(worker)
+                if status != "ready":
+                    raise EncoderPoolError(
+                        f"Encoder worker {worker.index} failed to start: {payload}"
+                    )
+                self.dimensions = payload
+                self._idle.put(worker)
+        except BaseException:
+            self.shutdown()
+            raise
+        logger.info("Encoder pool ready — %d workers, cpu sets %s", self.size, self.cpu_sets)
+        return self
+
+    def shutdown(self, timeout: float = _SHUTDOWN_TIMEOUT_S) -> None:
+        """Stop every worker, terminating any that do not exit in time."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._idle = queue.Queue()
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                logger.warning("Encoder worker %d did not exit; terminating", worker.index)
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+
+    def health(self) -> list[WorkerStatus]:
+        """Liveness and counters of every worker."""
+        return [
+            WorkerStatus(
+                index=w.index,
+                pid=w.process.pid,
+                alive=w.process.is_alive(),
+                cpus=list(w.cpus),
+                threads=w.threads,
+                texts=w.texts,
+                calls=w.calls,
+            )
+            for w in list(self._workers)
+        ]
+
+    @property
+    def healthy(self) -> bool:
+        workers = list(self._workers)
+        return bool(workers) and all(w.process.is_alive() for w in workers)
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    # ─── Encoding ────────────────────────────────────────────────────
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Encode ``texts`` across idle workers; rows come back in input order.
+
+        Blocks until at least one worker is free, then also claims any other
+        idle workers the input is large enough to keep busy.
+        """
+        return self._dispatch("encode", texts)
+
+    def encode_ids(self, token_ids: list[list[int]]) -> np.ndarray:
+        """Like ``encode`` for pre-tokenized encoder inputs."""
+        return self._dispatch("encode_ids", token_ids)
+
+    def _dispatch(self, command: str, texts: list) -> np.ndarray:
+        if not self._workers:
+            raise EncoderPoolError("Encoder pool is not running; call start() first")
+        if not texts:
+            return np.empty((0, self.dimensions or 0), dtype=np.float32)
+
+        wanted = max(1, len(texts) // self.min_shard_size)
+        claimed = [self._claim_one()]
+        while len(claimed) < wanted:
+            try:
+                claimed.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        bounds = shard_bounds(len(texts), len(claimed))
+        claimed = claimed[:len(bounds)]
+        failures: list[str] = []
+        out: np.ndarray | None = None
+        # Workers sent a request whose reply was not read: one left in the
+        # pipe would answer the worker's next request.
+        unsettled: set[int] = set()
+        try:
+            sent = []
+            for worker, (start, end) in zip(claimed, bounds):
+                unsettled.add(worker.index)
+                try:
+                    worker.conn.send((command, texts[start:end]))
+                except (OSError, ValueError) as exc:
+                    failures.append(f"worker {worker.index}: {exc}")
+                    continue
+                sent.append((worker, start, end))
+            for worker, start, end in sent:
+                status, payload = self._recv(worker)
+                if status != "lost":
+                    unsettled.discard(worker.index)
+                if status != "ok":
+                    failures.append(f"worker {worker.index}: {payload}")
+                    continue
+                if out is None:
+                    out = np.empty((len(texts), payload.shape[1]), dtype=np.float32)
+                out[start:end] = payload
+                worker.texts += end - start
+                worker.calls += 1
+        finally:
+            for worker in claimed:
+                if worker.index in unsettled:
+                    self._retire(worker)
+                elif worker.process.is_alive():
+                    self._idle.put(worker)
+        if failures or out is None:
+            raise EncoderPoolError("Encode failed on " + "; ".join(failures))
+        return out
+
+    def _claim_one(self) -> _Worker:
+        """Wait for an idle worker, failing if none is left alive."""
+        while True:
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                if not any(w.process.is_alive() for w in self._workers):
+                    raise EncoderPoolError("No live encoder workers left") from None
+
+    def _recv(self, worker: _Worker) -> tuple[str, object]:
+        try:
+            return worker.conn.recv()
+        except (EOFError, OSError):
+            return "lost", f"process {worker.process.pid} exited (code {worker.process.exitcode})"
+
+    def _retire(self, worker: _Worker) -> None:
+        """Stop a worker whose pipe is out of step; it is not replaced."""
+        logger.warning("Retiring encoder worker %d", worker.index)
+        worker.process.terminate()
+        worker.process.join(_SHUTDOWN_TIMEOUT_S)
+        worker.conn.close()
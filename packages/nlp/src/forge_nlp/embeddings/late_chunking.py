@@ -0,0 +1,228 @@
+"""
+Late chunking: encode a section once and pool each chunk's token span.
+
+``ClauseChunker._chunk_paragraphs`` repeats up to ``overlap_tokens`` of text
+at every chunk boundary, so encoding chunks one by one runs that text through
+the encoder twice.  In late-chunking mode consecutive chunks of the same
+section (or the same long clause) are stitched back into one text with each
+overlap kept once.  That text is encoded in windows of at most
+``max_seq_length`` tokens, and each chunk's vector is the mean of the
+contextual token embeddings inside its span.  A chunk's vector therefore
+also reflects the text around it.
+
+This module only plans the work — grouping, span bookkeeping, windows.  The
+forward pass and pooling live in ``EmbeddingService``.  A chunk that is
+alone in its group gains nothing and is embedded the ordinary way.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+
+# Separator ``ClauseChunker`` puts between paragraphs; used to join
+# consecutive chunks that share no text.
+_PARAGRAPH_SEP = "\n\n"
+
+
+@dataclass
+class ChunkGroup:
+    """Consecutive chunks of one section or clause, stitched into one text."""
+
+    indices: list[int]  # positions in the chunk list passed to ``group_chunks``
+    text: str = ""
+    spans: list[tuple[int, int]] = field(default_factory=list)  # [start, end) chars in ``text``
+
+
+@dataclass
+class ChunkTarget:
+    """Where one chunk's tokens sit in the encoded windows."""
+
+    chunk: int   # position in the chunk list
+    window: int  # index into ``LateChunkPlan.windows``
+    start: int   # [start, end) positions in that window's input ids
+    end: int
+
+
+@dataclass
+class LateChunkPlan:
+    """Encoder inputs for the grouped chunks and how to pool them back out."""
+
+    windows: list[list[int]] = field(default_factory=list)  # input ids, special tokens included
+    targets: list[ChunkTarget] = field(default_factory=list)
+    singles: list[int] = field(default_factory=list)  # chunks to embed the ordinary way
+    chunk_tokens: int = 0  # tokens per-chunk encoding of the grouped chunks would run
+
+    @property
+    def window_tokens(self) -> int:
+        return sum(len(w) for w in self.windows)
+
+
+def overlap_length(a: str, b: str) -> int:
+    """Length of the longest suffix of ``a`` that is also a prefix of ``b``.
+
+    Only overlaps starting and ending at whitespace count, so a chunk ending
+    in "the" and the next starting with "then" do not get glued together.
+    """
+    pattern = b[:min(len(a), len(b))]
+    m = len(pattern)
+    if m == 0:
+        return 0
+    fail = [0] * m
+    k = 0
+    for i in range(1, m):
+        while k and pattern[i] != pattern[k]:
+            k = fail[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        fail[i] = k
+
+    k = 0
+    for ch in a[len(a) - m:]:
+        if k == m:
+            k = fail[k - 1]
+        while k and pattern[k] != ch:
+            k = fail[k - 1]
+        if pattern[k] == ch:
+            k += 1
+
+    while k and not (
+        (k == len(a) or a[-k - 1].isspace()) and (k == len(b) or b[k].isspace())
+    ):
+        k = fail[k - 1]
+    return k
+
+
+def _group_key(chunk: DocumentChunk) -> tuple | None:
+    """Runs of chunks with one key form a group; ``None`` never groups.
+
+    Without a ``document_id`` nothing says two adjacent chunks come from
+    the same document.
+    """
+    if chunk.metadata.get("document_id") is None:
+        return None
+    return (
+        chunk.metadata["document_id"],
+        chunk.section_type,
+        chunk.clause_number,
+        chunk.metadata.get("clause_variant"),
+    )
+
+
+def group_chunks(chunks: list[DocumentChunk]) -> list[ChunkGroup]:
+    """Stitch runs of consecutive chunks from the same section/clause together.
+
+    The text of each group is the first chunk followed by whatever each later
+    chunk adds beyond its overlap with the one before it.
+    """
+    groups: list[ChunkGroup] = []
+    previous_key: tuple | None = None
+    for i, chunk in enumerate(chunks):
+        key = _group_key(chunk)
+        text = chunk.chunk_text
+        if not groups or key is None or key != previous_key:
+            groups.append(ChunkGroup(indices=[i], text=text, spans=[(0, len(text))]))
+        else:
+            group = groups[-1]
+            prev_start, prev_end = group.spans[-1]
+            k = overlap_length(group.text[prev_start:prev_end], text)
+            if k:
+                start = prev_end - k
+                group.text = group.text[:prev_end] + text[k:]
+            else:
+                start = prev_end + len(_PARAGRAPH_SEP)
+                group.text = group.text[:prev_end] + _PARAGRAPH_SEP + text
+            group.indices.append(i)
+            group.spans.append((start, start + len(text)))
+        previous_key = key
+    return groups
+
+
+def plan_windows(
+    spans: list[tuple[int, int]], width: int,
+) -> tuple[list[tuple[int, int]], list[int]]:
+    """Cover token ``spans`` (sorted by start) with windows of at most ``width`` tokens.
+
+    Consecutive spans share a window while the window still fits; the next
+    window starts where the first span that does not fit starts, so every
+    chunk sees its whole span in one pass.  A span wider than ``width`` is
+    cut, exactly as per-chunk encoding would truncate it.
+
+    Returns:
+        ``(windows, assignment)`` — ``[start, end)`` token bounds of each
+        window and the window index of each span.
+    """
+    windows: list[tuple[int, int]] = []
+    assignment: list[int] = []
+    for start, end in spans:
+        if windows:
+            w_start, w_end = windows[-1]
+            if start >= w_start and end <= w_start + width:
+                windows[-1] = (w_start, max(w_end, end))
+                assignment.append(len(windows) - 1)
+                continue
+        windows.append((start, min(end, start + width)))
+        assignment.append(len(windows) - 1)
+    return windows, assignment
+
+
+def plan_late_chunks(
+    chunks: list[DocumentChunk],
+    tokenizer: Any,
+    max_length: int,
+) -> LateChunkPlan:
+    """Group ``chunks``, tokenize each group once and lay out encoder windows.
+
+    Args:
+        chunks: Chunks in document order, as ``DocumentProcessor`` emits them.
+        tokenizer: The encoder's fast tokenizer (offset mappings required).
+        max_length: Encoder window in tokens, special tokens included.
+    """
+    plan = LateChunkPlan()
+    groups = group_chunks(chunks)
+    multi = [g for g in groups if len(g.indices) > 1]
+    plan.singles = [g.indices[0] for g in groups if len(g.indices) == 1]
+    if not multi:
+        return plan
+
+    specials = tokenizer.num_special_tokens_to_add(pair=False)
+    # Where the first content token lands once special tokens are added.
+    prefix = tokenizer.build_inputs_with_special_tokens([-1]).index(-1)
+    width = max_length - specials
+
+    encoded = tokenizer(
+        [g.text for g in multi],
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        verbose=False,
+    )
+    for group, ids, offsets in zip(multi, encoded["input_ids"], encoded["offset_mapping"]):
+        offsets = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+        token_spans = [
+            (
+                int(np.searchsorted(offsets[:, 0], start, side="left")),
+                int(np.searchsorted(offsets[:, 1], end, side="right")),
+            )
+            for start, end in group.spans
+        ]
+        bounds, assignment = plan_windows(token_spans, width)
+        first_window = len(plan.windows)
+        for w_start, w_end in bounds:
+            span_ids = list(ids[w_start:w_end])
+            plan.windows.append(tokenizer.build_inputs_with_special_tokens(span_ids))
+        for chunk, (start, end), w in zip(group.indices, token_spans, assignment):
+            w_start, w_end = bounds[w]
+            plan.targets.append(ChunkTarget(
+                chunk=chunk,
+                window=first_window + w,
+                start=prefix + start - w_start,
+                end=prefix + min(end, w_end) - w_start,
+            ))
+            plan.chunk_tokens += min(end - start, width) + specials
+    return plan
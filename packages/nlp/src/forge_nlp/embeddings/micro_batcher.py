@@ -0,0 +1,259 @@
+"""
+Asynchronous micro-batching in front of the encoder.
+
+Search traffic arrives as many concurrent ``/embed`` calls carrying a single
+query each.  Encoding them one by one wastes most of each forward pass, so the
+``MicroBatcher`` holds incoming requests for at most ``max_wait_ms``, packs up
+to ``max_batch_size`` texts into one encode call run off the event loop, and
+hands each caller back its own slice of the result.  Up to ``max_in_flight``
+batches encode at once, so an encoder that serves several calls in parallel
+(an ``EncoderPool``, one batch per worker) stays busy while the next batch
+fills.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_BATCH_SIZE = 64
+_DEFAULT_MAX_WAIT_MS = 5.0
+_DEFAULT_MAX_QUEUE_DEPTH = 1024
+_DEFAULT_MAX_IN_FLIGHT = 1
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request arrives while the batching queue is at capacity."""
+
+
+@dataclass
+class MicroBatcherStats:
+    """Configuration and counters of a ``MicroBatcher``."""
+
+    max_batch_size: int
+    max_wait_ms: float
+    max_queue_depth: int
+    max_in_flight: int = _DEFAULT_MAX_IN_FLIGHT
+    queue_depth: int = 0
+    in_flight: int = 0
+    requests: int = 0
+    texts: int = 0
+    batches: int = 0
+    rejected: int = 0
+    last_batch_size: int = 0
+    encode_seconds: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _Pending:
+    texts: list[str]
+    future: asyncio.Future[np.ndarray]
+
+
+class MicroBatcher:
+    """Coalesce concurrent embedding requests into shared encoder batches.
+
+    Args:
+        encode_fn: Blocking function mapping texts to a ``(n, dim)`` array.
+            It runs in worker threads, up to ``max_in_flight`` batches at a
+            time, and must be safe to call concurrently if that is above 1.
+        max_batch_size: Texts per encode call. A single request larger than
+            this is encoded on its own rather than split.
+        max_wait_ms: How long the first request of a batch waits for company.
+        max_queue_depth: Requests allowed to wait; further ones are rejected
+            with ``QueueFullError``.
+        max_in_flight: Batches encoding concurrently; size it to the number
+            of calls ``encode_fn`` can serve in parallel.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[list[str]], np.ndarray],
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = _DEFAULT_MAX_WAIT_MS,
+        max_queue_depth: int = _DEFAULT_MAX_QUEUE_DEPTH,
+        max_in_flight: int = _DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_depth = max_queue_depth
+        self.max_in_flight = max_in_flight
+        self._queue: asyncio.Queue[_Pending] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._encodes: set[asyncio.Task[None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._carry: _Pending | None = None
+        self._stats = MicroBatcherStats(
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_queue_depth=max_queue_depth,
+            max_in_flight=max_in_flight,
+        )
+
+    # ─── Public API ──────────────────────────────────────────────────
+
+    async def submit(self, texts: list[str]) -> np.ndarray:
+        """Queue ``texts`` for the next batch and wait for their vectors."""
+        queue = self._ensure_started()
+        loop = asyncio.get_running_loop()
+        pending = _Pending(texts=list(texts), future=loop.create_future())
+        try:
+            queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            self._stats.rejected += 1
+            raise QueueFullError(
+                f"Embedding queue full ({self.max_queue_depth} requests waiting)"
+            ) from None
+        self._stats.requests += 1
+        return await pending.future
+
+    def stats(self) -> MicroBatcherStats:
+        """Snapshot of configuration, queue depth and batch counters."""
+        queue_depth = self._queue.qsize() if self._queue is not None else 0
+        if self._carry is not None:
+            queue_depth += 1
+        s = self._stats
+        return MicroBatcherStats(
+            max_batch_size=s.max_batch_size,
+            max_wait_ms=s.max_wait_ms,
+            max_queue_depth=s.max_queue_depth,
+            max_in_flight=s.max_in_flight,
+            queue_depth=queue_depth,
+            in_flight=len(self._encodes),
+            requests=s.requests,
+            texts=s.texts,
+            batches=s.batches,
+            rejected=s.rejected,
+            last_batch_size=s.last_batch_size,
+            encode_seconds=s.encode_seconds,
+        )
+
+    async def close(self) -> None:
+        """Stop the worker. Requests queued or encoding fail with ``CancelledError``."""
+        tasks = [*self._encodes, *([self._worker] if self._worker is not None else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._fail_pending()
+        self._worker = None
+        self._queue = None
+        self._slots = None
+        self._loop = None
+
+    # ─── Worker ──────────────────────────────────────────────────────
+
+    def _ensure_started(self) -> asyncio.Queue[_Pending]:
+        """Start the worker on the running loop (restarting if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._fail_pending()
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._carry = None
+            self._loop = loop
+            self._worker = loop.create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    def _fail_pending(self) -> None:
+        leftovers = [self._carry] if self._carry is not None else []
+        self._carry = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                leftovers.append(self._queue.get_nowait())
+        for pending in leftovers:
+            if not pending.future.done():
+                pending.future.cancel()
+
+    async def _collect(self, queue: asyncio.Queue[_Pending]) -> list[_Pending]:
+        """Gather requests until the batch is full or the wait budget is spent."""
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = await queue.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+        while size < self.max_batch_size:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except TimeoutError:
+                    break
+            if size + len(item.texts) > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item.texts)
+        return batch
+
+    async def _run(self) -> None:
+        queue, slots = self._queue, self._slots
+        assert queue is not None and slots is not None
+        while True:
+            # Take a slot before collecting, so requests keep joining the next
+            # batch while every slot is busy.
+            await slots.acquire()
+            try:
+                batch = await self._collect(queue)
+            except BaseException:
+                slots.release()
+                raise
+            live = [p for p in batch if not p.future.done()]
+            if not live:
+                slots.release()
+                continue
+            task = asyncio.get_running_loop().create_task(self._encode(live, slots))
+            self._encodes.add(task)
+            task.add_done_callback(self._encodes.discard)
+
+    async def _encode(self, live: list[_Pending], slots: asyncio.Semaphore) -> None:
+        texts = [t for p in live for t in p.texts]
+        start = time.perf_counter()
+        try:
+            vectors = await asyncio.to_thread(self._encode_fn, texts)
+        except asyncio.CancelledError:
+            for p in live:
+                p.future.cancel()
+            raise
+        except Exception as exc:  # surfaced to every caller
+            logger.exception("Micro-batch encode of %d texts failed", len(texts))
+            for p in live:
+                if not p.future.done():
+                    p.future.set_exception(exc)
+            return
+        finally:
+            self._stats.encode_seconds += time.perf_counter() - start
+            slots.release()
+
+        self._stats.batches += 1
+        self._stats.texts += len(texts)
+        self._stats.last_batch_size = len(texts)
+
+        offset = 0
+        for p in live:
+            n = len(p.texts)
+            if not p.future.done():
+                p.future.set_result(vectors[offset:offset + n])
+            offset += n
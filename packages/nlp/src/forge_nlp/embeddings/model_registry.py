@@ -0,0 +1,236 @@
+"""
+Process-wide registry of loaded embedding models under a memory budget.
+
+Models are loaded on first use and kept in least-recently-used order.  Each
+model's resident size is measured when it loads.  If the loaded models
+exceed ``budget_bytes``, the least recently used ones are dropped until the
+rest fit.  A model that was evicted once is remembered, so room is made for
+it *before* it is reloaded.
+
+``EmbeddingService`` fetches its model from a registry on every use instead
+of holding it, so an evicted model is freed as soon as any in-flight call
+finishes, and it is reloaded transparently the next time it is needed.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .backends import Backend, load_sentence_transformer
+
+logger = logging.getLogger(__name__)
+
+# (model_name, backend, onnx_dir, snapshot), directories resolved: the same
+# model loaded from another export or snapshot is another entry.
+ModelKey = tuple[str, Backend, "str | None", "str | None"]
+# (model_name, backend, onnx_dir, snapshot) -> model
+Loader = Callable[[str, Backend, "str | Path | None", "str | Path | None"], object]
+
+
+def model_key(
+    model_name: str,
+    backend: Backend | str = Backend.TORCH,
+    onnx_dir: str | Path | None = None,
+    snapshot: str | Path | None = None,
+) -> ModelKey:
+    """Registry key of a model as loaded from ``onnx_dir`` / ``snapshot``."""
+    return (
+        model_name,
+        Backend(backend),
+        str(Path(onnx_dir).resolve()) if onnx_dir is not None else None,
+        str(Path(snapshot).resolve()) if snapshot is not None else None,
+    )
+
+
+@dataclass
+class LoadedModel:
+    """A model resident in the registry."""
+
+    model_name: str
+    backend: Backend
+    size_bytes: int
+    uses: int = 0
+    load_seconds: float = 0.0
+
+
+@dataclass
+class RegistryStats:
+    budget_bytes: int | None
+    used_bytes: int
+    loads: int
+    evictions: int
+
+
+def _resident_bytes() -> int | None:
+    """Resident set size of this process (Linux), or ``None`` where unavailable."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def model_size_bytes(model: object) -> int:
+    """Bytes held by a torch model's parameters and buffers (0 if not a torch module)."""
+    parameters = getattr(model, "parameters", None)
+    buffers = getattr(model, "buffers", None)
+    if parameters is None or buffers is None:
+        return 0
+    tensors = {id(t): t for t in (*parameters(), *buffers())}
+    return sum(t.numel() * t.element_size() for t in tensors.values())
+
+
+class ModelRegistry:
+    """Load models on demand and evict least-recently-used ones over budget.
+
+    Args:
+        budget_bytes: Total resident size allowed for loaded models; ``None``
+            never evicts.  The most recently used model is always kept, even
+            if it alone exceeds the budget.
+        loader: ``(model_name, backend, onnx_dir, snapshot) -> model``;
+            defaults to ``load_sentence_transformer``.
+    """
+
+    def __init__(self, budget_bytes: int | None = None, loader: Loader | None = None) -> None:
+        self.budget_bytes = budget_bytes
+        self._loader = loader or load_sentence_transformer
+        self._models: OrderedDict[ModelKey, object] = OrderedDict()
+        self._info: dict[ModelKey, LoadedModel] = {}
+        self._known_sizes: dict[ModelKey, int] = {}
+        self._lock = threading.RLock()
+        self._loads = 0
+        self._evictions = 0
+
+    def get(
+        self,
+        model_name: str,
+        backend: Backend | str = Backend.TORCH,
+        onnx_dir: str | Path | None = None,
+        snapshot: str | Path | None = None,
+    ) -> object:
+        """Return the model, loading it (and evicting others) if needed."""
+        key = model_key(model_name, backend, onnx_dir, snapshot)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key)
+            else:
+                self._models.move_to_end(key)
+            self._info[key].uses += 1
+            return model
+
+    def _load(self, key: ModelKey) -> object:
+        model_name, backend, onnx_dir, snapshot = key
+        known = self._known_sizes.get(key)
+        if known is not None:
+            self._evict_to_fit(known)
+
+        logger.info("Loading model %s (backend=%s) …", model_name, backend.value)
+        before = _resident_bytes()
+        started = time.perf_counter()
+        model = self._loader(model_name, backend, onnx_dir, snapshot)
+        seconds = time.perf_counter() - started
+        size = model_size_bytes(model)
+        if size == 0 and before is not None:
+            # Not a torch module (e.g. ONNX Runtime): fall back to RSS growth.
+            size = max((_resident_bytes() or before) - before, 0)
+
+        self._models[key] = model
+        self._info[key] = LoadedModel(
+            model_name=model_name, backend=backend, size_bytes=size, load_seconds=seconds,
+        )
+        self._known_sizes[key] = size
+        self._loads += 1
+        logger.info("Model %s loaded in %.2fs — %.1f MB", model_name, seconds, size / 2**20)
+        self._evict_to_fit(0)
+        if self.budget_bytes is not None and self.used_bytes > self.budget_bytes:
+            logger.warning(
+                "Model %s (%.1f MB) alone exceeds the %.1f MB model budget",
+                model_name, size / 2**20, self.budget_bytes / 2**20,
+            )
+        return model
+
+    def _evict_to_fit(self, incoming: int) -> None:
+        """Drop least-recently-used models until ``incoming`` more bytes fit.
+
+        The most recently used model is never dropped.
+        """
+        if self.budget_bytes is None:
+            return
+        evicted = False
+        while len(self._models) > (1 if incoming == 0 else 0) and (
+            self.used_bytes + incoming > self.budget_bytes
+        ):
+            key, _ = self._models.popitem(last=False)
+            info = self._info.pop(key)
+            self._evictions += 1
+            evicted = True
+            logger.info(
+                "Evicted model %s (%s, %.1f MB) to stay under the model budget",
+                info.model_name, info.backend.value, info.size_bytes / 2**20,
+            )
+        if evicted:
+            gc.collect()
+
+    def evict(
+        self,
+        model_name: str,
+        backend: Backend | str = Backend.TORCH,
+        onnx_dir: str | Path | None = None,
+        snapshot: str | Path | None = None,
+    ) -> bool:
+        """Unload a model now. Returns whether it was loaded."""
+        key = model_key(model_name, backend, onnx_dir, snapshot)
+        with self._lock:
+            if self._models.pop(key, None) is None:
+                return False
+            self._info.pop(key)
+            self._evictions += 1
+        gc.collect()
+        return True
+
+    def __contains__(self, key: tuple) -> bool:
+        """Whether ``(model_name, backend[, onnx_dir[, snapshot]])`` is loaded."""
+        return model_key(*key) in self._models
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(info.size_bytes for info in self._info.values())
+
+    def loaded(self) -> list[LoadedModel]:
+        """Resident models, least recently used first."""
+        with self._lock:
+            return [
+                LoadedModel(
+                    model_name=info.model_name,
+                    backend=info.backend,
+                    size_bytes=info.size_bytes,
+                    uses=info.uses,
+                    load_seconds=info.load_seconds,
+                )
+                for info in (self._info[key] for key in self._models)
+            ]
+
+    def stats(self) -> RegistryStats:
+        return RegistryStats(
+            budget_bytes=self.budget_bytes,
+            used_bytes=self.used_bytes,
+            loads=self._loads,
+            evictions=self._evictions,
+        )
+
+
+_default_registry = ModelRegistry()
+
+
+def default_registry() -> ModelRegistry:
+    """The process-wide registry services use unless given their own (no budget)."""
+    return _default_registry
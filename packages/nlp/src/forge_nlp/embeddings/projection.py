@@ -0,0 +1,208 @@
+"""
+Learned linear dimensionality reduction for LegalBERT embeddings.
+
+768 dimensions per chunk is more than our similarity workloads need.  A PCA
+projection fitted offline on a corpus of embedded chunks maps vectors to
+their top principal components; keeping the first 128/256/384 components
+cuts storage and search cost roughly in proportion.  One fit stores the
+components up to the largest size, and any prefix of them is a valid
+projection, so a single file serves every output size.
+
+Usage:
+    python -m forge_nlp.embeddings.projection fit [--chunks embedded_chunks.jsonl]
+        [--model nlpaueb/legal-bert-base-uncased] [--dimensions 128 256 384]
+        [--holdout 0.2] [--k 10] [--output models/projections/...]
+
+``--chunks`` is a JSONL export of ``EmbeddedChunk`` records; without it the
+bundled sample contract is embedded (enough for a smoke test, far too few
+vectors for a production fit).  The fit reports, for each size, the retained
+variance and top-k recall of projected vs full vectors on a held-out split.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_PROJECTION_ROOT = _PKG_ROOT / "models" / "projections"
+_DEFAULT_MAX_DIMENSIONS = 384
+SUPPORTED_DIMENSIONS = (128, 256, 384)
+
+
+def default_projection_path(model_name: str) -> Path:
+    """Where ``fit`` writes (and the service looks for) a model's projection."""
+    return _DEFAULT_PROJECTION_ROOT / (re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name) + ".pca.npz")
+
+
+@dataclass
+class PcaProjection:
+    """Centered linear projection onto the leading principal components."""
+
+    mean: np.ndarray
+    components: np.ndarray  # (max_dimensions, input_dimensions), rows sorted by variance
+    explained_variance_ratio: np.ndarray  # (max_dimensions,)
+
+    @classmethod
+    def fit(
+        cls, vectors: np.ndarray, max_dimensions: int = _DEFAULT_MAX_DIMENSIONS,
+    ) -> PcaProjection:
+        """Fit on a ``(n, dim)`` sample of full-precision embeddings."""
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if vectors.ndim != 2 or len(vectors) < 2:
+            raise ValueError("PCA needs at least two vectors")
+        mean = vectors.mean(axis=0)
+        _, singular, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        variance = singular ** 2
+        k = min(max_dimensions, vt.shape[0])
+        return cls(
+            mean=mean.astype(np.float32),
+            components=vt[:k].astype(np.float32),
+            explained_variance_ratio=(variance[:k] / variance.sum()).astype(np.float32),
+        )
+
+    @property
+    def input_dimensions(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def max_dimensions(self) -> int:
+        return self.components.shape[0]
+
+    @cached_property
+    def digest(self) -> str:
+        """SHA-256 hex digest of the fitted parameters: two fits project differently."""
+        h = hashlib.sha256(self.mean.tobytes())
+        h.update(self.components.tobytes())
+        return h.hexdigest()
+
+    def retained_variance(self, dimensions: int) -> float:
+        """Fraction of the fitting corpus' variance kept by the first ``dimensions`` components."""
+        return float(self.explained_variance_ratio[:dimensions].sum())
+
+    def transform(self, vectors: np.ndarray, dimensions: int) -> np.ndarray:
+        """Project ``(n, input_dimensions)`` vectors to ``(n, dimensions)``."""
+        if not 0 < dimensions <= self.max_dimensions:
+            raise ValueError(
+                f"Projection supports 1..{self.max_dimensions} dimensions, got {dimensions}"
+            )
+        centered = np.asarray(vectors, dtype=np.float32) - self.mean
+        return centered @ self.components[:dimensions].T
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            mean=self.mean,
+            components=self.components,
+            explained_variance_ratio=self.explained_variance_ratio,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> PcaProjection:
+        with np.load(path) as data:
+            return cls(
+                mean=data["mean"],
+                components=data["components"],
+                explained_variance_ratio=data["explained_variance_ratio"],
+            )
+
+
+# ─── Evaluation ───────────────────────────────────────────────────────
+
+def _top_k(vectors: np.ndarray, k: int) -> np.ndarray:
+    """Indices of each row's k most cosine-similar other rows."""
+    norm = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    sims = norm @ norm.T
+    np.fill_diagonal(sims, -np.inf)
+    k = min(k, len(vectors) - 1)
+    return np.argpartition(-sims, k - 1, axis=1)[:, :k]
+
+
+def recall_at_k(full: np.ndarray, projected: np.ndarray, k: int) -> float:
+    """Mean overlap between each vector's top-k neighbours in full vs projected space."""
+    if len(full) < 2:
+        return 1.0
+    truth = _top_k(full, k)
+    approx = _top_k(projected, k)
+    overlaps = [len(set(t) & set(a)) / len(t) for t, a in zip(truth.tolist(), approx.tolist())]
+    return float(np.mean(overlaps))
+
+
+@dataclass
+class ProjectionReport:
+    dimensions: int
+    retained_variance: float
+    recall_at_k: float
+    k: int
+
+
+def evaluate(
+    projection: PcaProjection,
+    heldout: np.ndarray,
+    dimensions: list[int],
+    k: int = 10,
+) -> list[ProjectionReport]:
+    """Retained variance and held-out top-k recall for each output size."""
+    reports: list[ProjectionReport] = []
+    for dims in dimensions:
+        dims = min(dims, projection.max_dimensions)
+        reports.append(ProjectionReport(
+            dimensions=dims,
+            retained_variance=projection.retained_variance(dims),
+            recall_at_k=recall_at_k(heldout, projection.transform(heldout, dims), k),
+            k=k,
+        ))
+    return reports
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .corpus import load_embedded_chunks, sample_chunk_texts
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Fit a PCA projection for embeddings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit_p = sub.add_parser("fit", help="Fit on a corpus of embedded chunks")
+    fit_p.add_argument("--chunks", default=None, help="JSONL of EmbeddedChunk records")
+    fit_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    fit_p.add_argument("--dimensions", type=int, nargs="+", default=list(SUPPORTED_DIMENSIONS))
+    fit_p.add_argument("--holdout", type=float, default=0.2)
+    fit_p.add_argument("--k", type=int, default=10)
+    fit_p.add_argument("--seed", type=int, default=42)
+    fit_p.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    if args.chunks:
+        _, vectors = load_embedded_chunks(args.chunks)
+    else:
+        from .embedding_service import EmbeddingService
+
+        svc = EmbeddingService(model_name=args.model)
+        vectors = np.asarray(svc.embed_batch(sample_chunk_texts()), dtype=np.float32)
+
+    order = np.random.default_rng(args.seed).permutation(len(vectors))
+    n_heldout = max(2, int(len(vectors) * args.holdout))
+    heldout, train = vectors[order[:n_heldout]], vectors[order[n_heldout:]]
+
+    projection = PcaProjection.fit(train, max_dimensions=max(args.dimensions))
+    output = Path(args.output) if args.output else default_projection_path(args.model)
+    projection.save(output)
+
+    print(f"Fitted on {len(train)} vectors, evaluated on {len(heldout)} held out -> {output}")
+    print(f"{'dims':>6} {'variance':>9} {'recall@' + str(args.k):>10}")
+    for report in evaluate(projection, heldout, args.dimensions, args.k):
+        print(
+            f"{report.dimensions:>6} {report.retained_variance:>9.1%} {report.recall_at_k:>10.3f}"
+        )
@@ -0,0 +1,195 @@
+"""
+Reduced-precision representations of embedding vectors.
+
+``vectors.document_chunks`` stores every chunk as a 768-dim float32 vector,
+which makes the chunk table the dominant storage and I/O cost.  Compact
+representations trade accuracy for size:
+
+=========  ==============  ===========================================
+precision  bytes / vector  notes
+=========  ==============  ===========================================
+float32    3072            full precision
+float16    1536            ~3 significant digits, no calibration needed
+int8        768            per-dimension min/max scalar quantization;
+                           needs calibration stats for the model
+binary       96            sign bit per dimension, packed 8 per byte
+=========  ==============  ===========================================
+
+The intended pattern is a cheap first pass over int8 or binary codes followed
+by ``rescore`` of the shortlisted candidates against full-precision vectors.
+
+Usage:
+    # Fit int8 calibration stats for a model (written next to the model files)
+    python -m forge_nlp.embeddings.quantization calibrate
+        [--model nlpaueb/legal-bert-base-uncased] [--texts corpus.txt] [--output ...]
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_CALIBRATION_ROOT = _PKG_ROOT / "models" / "calibration"
+
+# popcount of every byte value, for Hamming distance over packed bits
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+class Precision(str, Enum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+    BINARY = "binary"
+
+
+def default_calibration_path(model_name: str) -> Path:
+    """Where ``calibrate`` writes (and the service looks for) int8 stats."""
+    return _DEFAULT_CALIBRATION_ROOT / (re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name) + ".int8.npz")
+
+
+# ─── int8 scalar quantization ─────────────────────────────────────────
+
+@dataclass
+class ScalarQuantizer:
+    """Per-dimension affine map from a calibrated [min, max] range onto int8."""
+
+    minimums: np.ndarray
+    maximums: np.ndarray
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray) -> ScalarQuantizer:
+        """Calibrate from a representative sample of full-precision vectors."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) == 0:
+            raise ValueError("Calibration needs a non-empty 2-D array of vectors")
+        return cls(minimums=vectors.min(axis=0), maximums=vectors.max(axis=0))
+
+    @property
+    def scales(self) -> np.ndarray:
+        return np.maximum(self.maximums - self.minimums, 1e-12) / 255.0
+
+    def quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Map float vectors to int8 codes, clipping values outside the calibrated range."""
+        scaled = (np.asarray(vectors, dtype=np.float32) - self.minimums) / self.scales
+        return (np.clip(np.rint(scaled), 0, 255) - 128).astype(np.int8)
+
+    def dequantize(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate float32 vectors back from int8 codes."""
+        return (codes.astype(np.float32) + 128.0) * self.scales + self.minimums
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate dot products of a float query with int8-coded vectors.
+
+        Works on the codes directly: ``q · (m + (c + 128) s) = c · (q s) + q · (m + 128 s)``.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        weights = query * self.scales
+        offset = float(query @ (self.minimums + 128.0 * self.scales))
+        return codes.astype(np.float32) @ weights + offset
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, minimums=self.minimums, maximums=self.maximums)
+
+    @classmethod
+    def load(cls, path: str | Path) -> ScalarQuantizer:
+        with np.load(path) as data:
+            return cls(minimums=data["minimums"], maximums=data["maximums"])
+
+
+# ─── Binary (sign) quantization ───────────────────────────────────────
+
+def to_binary(vectors: np.ndarray) -> np.ndarray:
+    """Pack the sign of each dimension into bits: ``(n, dim) -> (n, ceil(dim / 8))`` uint8."""
+    return np.packbits(np.asarray(vectors) > 0, axis=-1)
+
+
+def hamming_distances(query_bits: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Hamming distance from one packed query to every packed code."""
+    return _POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=-1)
+
+
+# ─── Conversion and rescoring ─────────────────────────────────────────
+
+def quantize(
+    vectors: np.ndarray,
+    precision: Precision | str,
+    quantizer: ScalarQuantizer | None = None,
+) -> np.ndarray:
+    """Convert float32 vectors to the requested precision."""
+    precision = Precision(precision)
+    if precision is Precision.FLOAT32:
+        return np.asarray(vectors, dtype=np.float32)
+    if precision is Precision.FLOAT16:
+        return np.asarray(vectors, dtype=np.float16)
+    if precision is Precision.BINARY:
+        return to_binary(vectors)
+    if quantizer is None:
+        raise ValueError("int8 precision needs a calibrated ScalarQuantizer")
+    return quantizer.quantize(vectors)
+
+
+def rescore(
+    query: np.ndarray,
+    candidates: np.ndarray | list[int],
+    full_vectors: np.ndarray,
+    top_k: int,
+) -> list[tuple[int, float]]:
+    """Re-rank first-pass candidates by exact cosine similarity.
+
+    Args:
+        query: Full-precision query vector.
+        candidates: Row ids produced by a compact first pass.
+        full_vectors: Full-precision matrix (or memory map) indexed by row id.
+        top_k: Number of results to return.
+
+    Returns:
+        ``(row_id, cosine)`` pairs, best first.
+    """
+    ids = np.asarray(candidates, dtype=np.int64)
+    if ids.size == 0:
+        return []
+    query = np.asarray(query, dtype=np.float32)
+    rows = np.asarray(full_vectors[ids], dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1) * np.linalg.norm(query)
+    sims = (rows @ query) / np.maximum(norms, 1e-12)
+    order = np.argsort(-sims)[:top_k]
+    return [(int(ids[i]), float(sims[i])) for i in order]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .corpus import read_texts, sample_chunk_texts
+    from .embedding_service import EmbeddingService
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Embedding quantization tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal_p = sub.add_parser("calibrate", help="Fit int8 calibration stats for a model")
+    cal_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    cal_p.add_argument("--texts", default=None, help="File with one calibration text per line")
+    cal_p.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    texts = read_texts(args.texts) if args.texts else sample_chunk_texts()
+    svc = EmbeddingService(model_name=args.model)
+    vectors = np.asarray(svc.embed_batch(texts), dtype=np.float32)
+    quantizer = ScalarQuantizer.fit(vectors)
+    output = Path(args.output) if args.output else default_calibration_path(args.model)
+    quantizer.save(output)
+
+    error = np.abs(quantizer.dequantize(quantizer.quantize(vectors)) - vectors).mean()
+    print(
+        f"Calibrated on {len(texts)} texts -> {output} (mean abs reconstruction error {error:.6f})"
+    )
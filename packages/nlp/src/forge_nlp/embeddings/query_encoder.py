@@ -0,0 +1,359 @@
+"""
+Distilled query encoder in the vector space of the document model.
+
+Search embeds one short query per request, and running the full 12-layer
+LegalBERT for it dominates search latency.  A query encoder is a student
+with a few of the teacher's layers (evenly spaced, copied with their
+weights, plus the teacher's embeddings, tokenizer and pooling), trained to
+reproduce the teacher's output vector for the same text.  Its vectors keep
+the teacher's size and space, so they are compared directly against chunk
+vectors the teacher already stored — nothing is re-embedded.
+
+Training texts are the chunk corpus plus short word windows cut from it,
+which have the length of search queries; the loss is MSE plus cosine
+distance to the teacher's vectors.  ``evaluate`` reports, on held-out
+windows, how many of the teacher's top-k chunks the student's query vector
+also retrieves, the cosine between the two query vectors, and single-query
+latency of both encoders.
+
+The student is saved as a SentenceTransformer directory (safetensors
+weights) with a ``query_encoder.json`` manifest recording its teacher and
+evaluation.  ``EmbeddingService.embed_queries`` uses it when built.
+
+Usage:
+    python -m forge_nlp.embeddings.query_encoder distill [--model nlpaueb/legal-bert-base-uncased]
+        [--chunks embedded_chunks.jsonl | --texts corpus.txt] [--layers 4] [--epochs 3]
+        [--batch-size 32] [--lr 1e-4] [--holdout 0.1] [--k 10] [--output DIR]
+    python -m forge_nlp.embeddings.query_encoder evaluate [--model ...] [--encoder DIR]
+        [--chunks ... | --texts ...] [--k 10]
+
+Without ``--chunks``/``--texts`` the bundled sample contract is used (enough
+for a smoke test, far too little text to distill a useful student).
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import random
+import re
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .snapshot import weights_digest
+
+if TYPE_CHECKING:
+    from .embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_QUERY_ENCODER_ROOT = _PKG_ROOT / "models" / "query_encoders"
+_MANIFEST = "query_encoder.json"
+DEFAULT_LAYERS = 4
+# Word counts of the query-like windows cut from chunks.
+_QUERY_WORDS = (3, 16)
+
+
+def default_query_encoder_dir(model_name: str) -> Path:
+    """Where ``distill`` writes (and the service looks for) a model's query encoder."""
+    return _DEFAULT_QUERY_ENCODER_ROOT / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def is_query_encoder(path: str | Path) -> bool:
+    return (Path(path) / _MANIFEST).exists()
+
+
+def read_manifest(path: str | Path) -> dict:
+    return json.loads((Path(path) / _MANIFEST).read_text())
+
+
+# ─── Student ───────────────────────────────────────────────────────────
+
+def kept_layers(teacher_layers: int, num_layers: int) -> list[int]:
+    """Indices of the teacher layers a ``num_layers`` student starts from.
+
+    Evenly spaced, always including the first and the last layer.
+    """
+    if not 0 < num_layers <= teacher_layers:
+        raise ValueError(f"num_layers must be between 1 and {teacher_layers}, got {num_layers}")
+    if num_layers == 1:
+        return [teacher_layers - 1]
+    return sorted({round(i * (teacher_layers - 1) / (num_layers - 1)) for i in range(num_layers)})
+
+
+def student_from_teacher(teacher: object, num_layers: int = DEFAULT_LAYERS) -> object:
+    """Copy of the teacher ``SentenceTransformer`` keeping ``num_layers`` encoder layers."""
+    import torch
+
+    student = copy.deepcopy(teacher)
+    auto_model = student[0].auto_model  # type: ignore[index]
+    layers = auto_model.encoder.layer
+    keep = kept_layers(len(layers), num_layers)
+    auto_model.encoder.layer = torch.nn.ModuleList([layers[i] for i in keep])
+    auto_model.config.num_hidden_layers = len(keep)
+    return student
+
+
+def query_like_spans(
+    texts: list[str], per_text: int = 4, seed: int = 0,
+) -> list[str]:
+    """Short word windows cut from ``texts``, the length of search queries."""
+    rng = random.Random(seed)
+    lo, hi = _QUERY_WORDS
+    spans: list[str] = []
+    for text in texts:
+        words = text.split()
+        if len(words) < lo:
+            continue
+        for _ in range(per_text):
+            n = rng.randint(lo, min(hi, len(words)))
+            start = rng.randint(0, len(words) - n)
+            spans.append(" ".join(words[start:start + n]))
+    return list(dict.fromkeys(spans))
+
+
+def distill(
+    teacher: EmbeddingService,
+    texts: list[str],
+    output: str | Path | None = None,
+    num_layers: int = DEFAULT_LAYERS,
+    epochs: int = 3,
+    batch_size: int = 32,
+    learning_rate: float = 1e-4,
+    seed: int = 0,
+) -> Path:
+    """Train a query encoder for ``teacher`` on ``texts`` and save it.
+
+    The directory is written next to ``output`` and renamed into place, like
+    a snapshot.
+
+    Returns:
+        The query encoder directory.
+
+    Raises:
+        ValueError: The teacher runs on the ONNX backend.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    from .backends import Backend
+
+    if teacher.backend is Backend.ONNX_INT8:
+        raise ValueError("Distill from a PyTorch backend; the ONNX graph has no trainable layers")
+    output = Path(output) if output is not None else default_query_encoder_dir(teacher.model_name)
+    staging = output.with_name(output.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    train = list(dict.fromkeys(texts)) + query_like_spans(texts, seed=seed)
+    logger.info("Embedding %d training texts with the teacher …", len(train))
+    targets = torch.from_numpy(teacher.embed_array(train))
+
+    torch.manual_seed(seed)
+    student = student_from_teacher(teacher._model, num_layers)
+    student.train()  # type: ignore[attr-defined]
+    optimizer = torch.optim.AdamW(
+        student.parameters(), lr=learning_rate,  # type: ignore[attr-defined]
+    )
+    order = list(range(len(train)))
+    rng = random.Random(seed)
+    loss_value = float("nan")
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        total = 0.0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            features = student.tokenize([train[i] for i in batch])  # type: ignore[attr-defined]
+            predicted = student(features)["sentence_embedding"]  # type: ignore[operator]
+            target = targets[batch]
+            loss = F.mse_loss(predicted, target) + (
+                1 - F.cosine_similarity(predicted, target)
+            ).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(batch)
+        loss_value = total / len(order)
+        logger.info("Epoch %d/%d: loss %.4f", epoch + 1, epochs, loss_value)
+    student.eval()  # type: ignore[attr-defined]
+
+    student.save(  # type: ignore[attr-defined]
+        str(staging), safe_serialization=True, create_model_card=False,
+    )
+    teacher_layers = len(teacher._model[0].auto_model.encoder.layer)  # type: ignore[index]
+    (staging / _MANIFEST).write_text(json.dumps({
+        "teacher": teacher.model_name,
+        "teacher_version": teacher.embedding_version(teacher.dimensions),
+        "dimensions": teacher.dimensions,
+        "layers": kept_layers(teacher_layers, num_layers),
+        "teacher_layers": teacher_layers,
+        "weights_sha256": weights_digest(staging),
+        "training_texts": len(train),
+        "epochs": epochs,
+        "final_loss": loss_value,
+        "created_at": time.time(),
+    }, indent=2))
+
+    if output.exists():
+        shutil.rmtree(output)
+    staging.rename(output)
+    return output
+
+
+# ─── Evaluation ───────────────────────────────────────────────────────
+
+@dataclass
+class QueryEncoderReport:
+    """Student vs teacher on one query set against one chunk corpus."""
+
+    queries: int
+    chunks: int
+    k: int
+    recall_at_k: float   # share of the teacher's top-k chunks the student also returns
+    mean_cosine: float   # between student and teacher vectors of the same query
+    teacher_p50_ms: float
+    teacher_p99_ms: float
+    student_p50_ms: float
+    student_p99_ms: float
+
+    @property
+    def speedup(self) -> float:
+        return self.teacher_p50_ms / self.student_p50_ms
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k_overlap(
+    teacher_queries: np.ndarray,
+    student_queries: np.ndarray,
+    chunk_vectors: np.ndarray,
+    k: int,
+) -> float:
+    """Mean share of each query's teacher top-k chunks that the student retrieves too."""
+    k = min(k, len(chunk_vectors))
+    chunks = _normalize(chunk_vectors)
+    truth = np.argsort(-(_normalize(teacher_queries) @ chunks.T), axis=1)[:, :k]
+    approx = np.argsort(-(_normalize(student_queries) @ chunks.T), axis=1)[:, :k]
+    return float(
+        np.mean([len(set(t) & set(a)) / k for t, a in zip(truth.tolist(), approx.tolist())])
+    )
+
+
+def _latencies_ms(encode, queries: list[str]) -> np.ndarray:
+    encode(queries[:1])  # warm-up
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        encode([query])
+        times.append((time.perf_counter() - start) * 1000)
+    return np.asarray(times)
+
+
+def evaluate(
+    service: EmbeddingService,
+    queries: list[str],
+    chunk_vectors: np.ndarray,
+    k: int = 10,
+) -> QueryEncoderReport:
+    """Compare ``service``'s query encoder with its full model on ``queries``.
+
+    ``chunk_vectors`` are full-size teacher vectors of the searched corpus.
+    Latency is one query per forward pass, as search sends them.
+
+    Raises:
+        ValueError: The service has no query encoder.
+    """
+    if service.query_encoder is None:
+        raise ValueError(f"No query encoder for {service.model_name}")
+    teacher = service.encode(queries)
+    student = service._encode_queries(queries)
+    cosine = np.sum(_normalize(teacher) * _normalize(student), axis=1)
+    teacher_ms = _latencies_ms(lambda q: service._encode_batch(q, 1), queries)
+    student_ms = _latencies_ms(service._encode_queries, queries)
+    return QueryEncoderReport(
+        queries=len(queries),
+        chunks=len(chunk_vectors),
+        k=k,
+        recall_at_k=top_k_overlap(teacher, student, chunk_vectors, k),
+        mean_cosine=float(cosine.mean()),
+        teacher_p50_ms=float(np.percentile(teacher_ms, 50)),
+        teacher_p99_ms=float(np.percentile(teacher_ms, 99)),
+        student_p50_ms=float(np.percentile(student_ms, 50)),
+        student_p99_ms=float(np.percentile(student_ms, 99)),
+    )
+
+
+def _print_report(report: QueryEncoderReport) -> None:
+    print(f"{report.queries} queries against {report.chunks} chunks")
+    print(f"recall@{report.k} vs teacher: {report.recall_at_k:.3f}   "
+          f"mean cosine to teacher: {report.mean_cosine:.3f}")
+    print(f"{'encoder':<8} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'teacher':<8} {report.teacher_p50_ms:>8.2f} {report.teacher_p99_ms:>8.2f}")
+    print(f"{'student':<8} {report.student_p50_ms:>8.2f} {report.student_p99_ms:>8.2f}   "
+          f"({report.speedup:.1f}× faster)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .corpus import load_embedded_chunks, read_texts, sample_chunk_texts
+    from .embedding_service import EmbeddingService
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Distilled query encoder")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("distill", "Train a query encoder from the model"),
+                            ("evaluate", "Compare a built query encoder with the model")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+        p.add_argument("--chunks", default=None, help="JSONL of EmbeddedChunk records")
+        p.add_argument("--texts", default=None, help="one chunk text per line")
+        p.add_argument("--k", type=int, default=10)
+        p.add_argument("--seed", type=int, default=42)
+        if name == "distill":
+            p.add_argument("--layers", type=int, default=DEFAULT_LAYERS)
+            p.add_argument("--epochs", type=int, default=3)
+            p.add_argument("--batch-size", type=int, default=32)
+            p.add_argument("--lr", type=float, default=1e-4)
+            p.add_argument("--holdout", type=float, default=0.1)
+            p.add_argument("--output", default=None)
+        else:
+            p.add_argument("--encoder", default=None)
+    args = parser.parse_args()
+
+    if args.chunks:
+        corpus = [r["chunk_text"] for r in load_embedded_chunks(args.chunks)[0]]
+    elif args.texts:
+        corpus = read_texts(args.texts)
+    else:
+        corpus = sample_chunk_texts()
+
+    if args.command == "distill":
+        order = np.random.default_rng(args.seed).permutation(len(corpus))
+        n_heldout = max(1, int(len(corpus) * args.holdout))
+        heldout = [corpus[i] for i in order[:n_heldout]]
+        train = [corpus[i] for i in order[n_heldout:]]
+        teacher = EmbeddingService(model_name=args.model)
+        out = distill(teacher, train, args.output, num_layers=args.layers, epochs=args.epochs,
+                      batch_size=args.batch_size, learning_rate=args.lr, seed=args.seed)
+        print(f"Distilled {args.layers}-layer query encoder from {len(train)} texts -> {out}")
+        svc = EmbeddingService(model_name=args.model, query_encoder=out)
+        queries = query_like_spans(heldout, seed=args.seed + 1)
+        result = evaluate(svc, queries, svc.embed_array(corpus), args.k)
+        manifest = read_manifest(out)
+        manifest["evaluation"] = asdict(result)
+        (out / _MANIFEST).write_text(json.dumps(manifest, indent=2))
+    else:
+        svc = EmbeddingService(model_name=args.model, query_encoder=args.encoder)
+        queries = query_like_spans(corpus, seed=args.seed + 1)
+        result = evaluate(svc, queries, svc.embed_array(corpus), args.k)
+    _print_report(result)
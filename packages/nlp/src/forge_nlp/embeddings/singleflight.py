@@ -0,0 +1,57 @@
+"""
+Share one in-flight computation between concurrent identical requests.
+
+Search clients often fire the same query from several tabs or retries at
+once.  ``SingleFlight`` keys each computation; a call arriving while an
+identical one is still running awaits that result instead of starting its
+own.  Nothing is remembered once the computation finishes — that is the
+``EmbeddingCache``'s job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Calls seen, calls that joined an existing flight, and flights running now."""
+
+    calls: int = 0
+    shared: int = 0
+    in_flight: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Deduplicate concurrent async calls by key."""
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Task[T]] = {}
+        self._calls = 0
+        self._shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await fn()``, or the result of an identical call already running.
+
+        The computation runs as its own task, so one caller being cancelled
+        does not cancel it for the others.
+        """
+        self._calls += 1
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda _t: self._flights.pop(key, None))
+        else:
+            self._shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._calls, shared=self._shared, in_flight=len(self._flights),
+        )
@@ -0,0 +1,233 @@
+"""
+Prebuilt model snapshots for fast cold starts.
+
+Loading ``SentenceTransformer(model_name)`` resolves the model on the Hub (or
+in the HF cache), unpickles ``pytorch_model.bin`` when the model ships no
+safetensors (LegalBERT does not), and copies every weight into anonymous
+process memory.  Every pod restart, autoscale event and ``EncoderPool``
+worker pays that cost again.
+
+A snapshot is the model saved once, in one local directory, with safetensors
+weights.  ``load_snapshot`` builds the model from local files only, with the
+transformer's parameters left empty on the meta device, and points every
+weight at a read-only memory map of the safetensors file
+(``load_state_dict(assign=True)``) instead of reading it.  Weights are paged
+in on first use, and processes on one host that load the same snapshot share
+those pages through the OS page cache rather than each holding a private
+copy.
+
+Layout of a snapshot directory (one per model)::
+
+    modules.json, config.json, tokenizer*, 1_Pooling/, …   a saved SentenceTransformer
+    model.safetensors                                       transformer weights
+    snapshot.json                                           manifest
+
+Usage:
+    python -m forge_nlp.embeddings.snapshot build [--model nlpaueb/legal-bert-base-uncased]
+        [--output models/snapshots/...]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_SNAPSHOT_ROOT = _PKG_ROOT / "models" / "snapshots"
+_MANIFEST = "snapshot.json"
+
+# Set on the thread running ``load_snapshot`` while its skeleton is built.
+_skeleton = threading.local()
+_skeleton_lock = threading.Lock()
+
+
+def default_snapshot_dir(model_name: str) -> Path:
+    """Where ``build`` writes (and the service looks for) a model's snapshot."""
+    return _DEFAULT_SNAPSHOT_ROOT / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def is_snapshot(path: str | Path) -> bool:
+    return (Path(path) / _MANIFEST).exists()
+
+
+def read_manifest(path: str | Path) -> dict:
+    return json.loads((Path(path) / _MANIFEST).read_text())
+
+
+def build_snapshot(model_name: str, output: str | Path | None = None) -> Path:
+    """Save ``model_name`` as a snapshot directory, replacing any existing one.
+
+    The snapshot is written next to ``output`` and renamed into place, so a
+    reader never sees a half-written snapshot.
+    """
+    import sentence_transformers
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output = Path(output) if output is not None else default_snapshot_dir(model_name)
+    staging = output.with_name(output.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    logger.info("Snapshotting %s to %s …", model_name, output)
+    model = SentenceTransformer(model_name, device="cpu")
+    model.save(str(staging), safe_serialization=True, create_model_card=False)
+    (staging / _MANIFEST).write_text(json.dumps({
+        "model_name": model_name,
+        "weights_sha256": weights_digest(staging),
+        "dimensions": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "sentence_transformers": sentence_transformers.__version__,
+        "torch": torch.__version__,
+        "created_at": time.time(),
+    }, indent=2))
+
+    if output.exists():
+        shutil.rmtree(output)
+    staging.rename(output)
+    return output
+
+
+def _weight_files(path: Path) -> dict[int, list[Path]]:
+    """Safetensors files of each module in a saved SentenceTransformer, by module index."""
+    modules = json.loads((path / "modules.json").read_text())
+    return {
+        int(entry["idx"]): sorted((path / entry["path"]).glob("*.safetensors"))
+        for entry in modules
+    }
+
+
+def weights_digest(path: str | Path) -> str:
+    """SHA-256 over every safetensors file of a saved model: its weights' identity."""
+    digest = hashlib.sha256()
+    for files in _weight_files(Path(path)).values():
+        for file in files:
+            with open(file, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def _map_weights(auto_model: torch.nn.Module, files: list[Path]) -> int:
+    """Point the weights of ``auto_model`` at memory maps of ``files``.
+
+    Returns:
+        Bytes of weights now backed by the files.
+    """
+    from safetensors.torch import load_file
+
+    mapped = 0
+    for file in files:
+        state = load_file(str(file), device="cpu")
+        result = auto_model.load_state_dict(state, strict=False, assign=True)
+        mapped += sum(
+            t.numel() * t.element_size()
+            for name, t in state.items() if name not in result.unexpected_keys
+        )
+    if hasattr(auto_model, "tie_weights"):
+        auto_model.tie_weights()
+    return mapped
+
+
+@contextmanager
+def _empty_transformers() -> Iterator[None]:
+    """Make ``AutoModel.from_pretrained`` on this thread map weights instead of reading them.
+
+    The model is built with its parameters on the meta device (buffers, which
+    are small and mostly not in the checkpoint, on the CPU) and then given
+    the memory-mapped tensors of the directory's safetensors files, so the
+    weights are never copied into process memory.  Bytes mapped add up in
+    ``_skeleton.mapped``.  Other threads loading models meanwhile get the
+    real loader.
+    """
+    from transformers import AutoConfig, AutoModel
+    from transformers.integrations.accelerate import init_empty_weights
+
+    loader = AutoModel.from_pretrained
+
+    def from_pretrained(model_name_or_path, *args, **kwargs):
+        if not getattr(_skeleton, "active", False):
+            return loader(model_name_or_path, *args, **kwargs)
+        config = kwargs.get("config") or AutoConfig.from_pretrained(
+            model_name_or_path, local_files_only=True
+        )
+        with init_empty_weights():
+            model = AutoModel.from_config(config)
+        _skeleton.mapped += _map_weights(
+            model, sorted(Path(model_name_or_path).glob("*.safetensors"))
+        )
+        empty = [name for name, param in model.named_parameters() if param.is_meta]
+        if empty:
+            raise ValueError(f"No weights for {', '.join(empty)} in {model_name_or_path}")
+        return model.eval()
+
+    with _skeleton_lock:
+        own = vars(AutoModel).get("from_pretrained")
+        AutoModel.from_pretrained = from_pretrained
+        _skeleton.active, _skeleton.mapped = True, 0
+        try:
+            yield
+        finally:
+            _skeleton.active = False
+            if own is None:
+                del AutoModel.from_pretrained
+            else:
+                AutoModel.from_pretrained = own
+
+
+def load_snapshot(path: str | Path, model_name: str | None = None) -> object:
+    """Build a ``SentenceTransformer`` from a snapshot with memory-mapped weights.
+
+    Args:
+        path: Snapshot directory.
+        model_name: Model the caller expects; a snapshot of another model is
+            a ``ValueError``.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    path = Path(path)
+    if not is_snapshot(path):
+        raise FileNotFoundError(
+            f"No model snapshot at {path}. Run "
+            "`python -m forge_nlp.embeddings.snapshot build --model <model>` first."
+        )
+    manifest = read_manifest(path)
+    if model_name is not None and manifest["model_name"] != model_name:
+        raise ValueError(
+            f"Snapshot at {path} is of {manifest['model_name']}, expected {model_name}"
+        )
+    with _empty_transformers():
+        model = SentenceTransformer(str(path), device="cpu", local_files_only=True)
+        mapped = _skeleton.mapped
+    logger.info("Loaded snapshot %s — %.1f MB of weights memory-mapped", path, mapped / 2**20)
+    return model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Prebuilt model snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="Save a model as a memory-mappable snapshot")
+    build_p.add_argument("--model", default="nlpaueb/legal-bert-base-uncased")
+    build_p.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    out = build_snapshot(args.model, args.output)
+    size = sum(f.stat().st_size for f in out.rglob("*") if f.is_file())
+    print(f"Wrote {out} ({size / 2**20:.1f} MB)")
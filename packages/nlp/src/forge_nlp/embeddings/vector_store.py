@@ -0,0 +1,148 @@
+"""
+Append-only float32 vector matrix persisted on disk and read through a memory map.
+
+Used as the persistent tier for anything that needs to keep many embedding
+vectors around across restarts (embedding cache, precomputed libraries,
+search indexes) without loading them all into the Python heap.  Rows are
+only ever appended; callers keep their own side tables mapping keys to row
+numbers.  Appends from several processes are serialized with ``flock`` on
+the vectors file and each lands after the rows already on disk, so
+``append``'s return value, not a row count taken earlier, is where a
+caller's rows went.  Side table entries written from ``append``'s
+``on_commit`` hook are made under the same lock, so they land in row order
+too.
+
+Layout of a store directory::
+
+    meta.json     {"dimensions": 768, "dtype": "float32"}
+    vectors.f32   rows × dimensions little-endian float32, no header
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+_META_FILE = "meta.json"
+_VECTORS_FILE = "vectors.f32"
+_DTYPE = np.dtype("<f4")
+
+
+class MmapVectorStore:
+    """Append-only on-disk matrix of float32 vectors.
+
+    Reads go through a read-only ``np.memmap`` that is re-opened lazily when
+    the file has grown, so multiple processes opening the same directory share
+    the OS page cache instead of each holding a private copy.  Writers take an
+    exclusive ``flock`` on the vectors file and re-read its size under it.
+    """
+
+    def __init__(self, path: str | Path, dimensions: int | None = None) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._mmap: np.memmap | None = None
+
+        meta_path = self.path / _META_FILE
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            stored_dim = int(meta["dimensions"])
+            if dimensions is not None and dimensions != stored_dim:
+                raise ValueError(
+                    f"Vector store at {self.path} has dimension {stored_dim}, "
+                    f"requested {dimensions}"
+                )
+            self.dimensions = stored_dim
+        elif dimensions is not None:
+            self.dimensions = dimensions
+            meta_path.write_text(json.dumps({"dimensions": dimensions, "dtype": "float32"}))
+        else:
+            raise ValueError(f"No vector store at {self.path} and no dimensions given")
+
+        self._vectors_path = self.path / _VECTORS_FILE
+        self._vectors_path.touch(exist_ok=True)
+        self._row_bytes = self.dimensions * _DTYPE.itemsize
+        self._rows = self._rows_on_disk()
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / _META_FILE).exists()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._rows = self._rows_on_disk()
+            return self._rows
+
+    def _rows_on_disk(self) -> int:
+        """Complete rows in the file, including those appended by other processes."""
+        return self._vectors_path.stat().st_size // self._row_bytes
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def append(
+        self, vectors: np.ndarray, on_commit: Callable[[int], None] | None = None,
+    ) -> int:
+        """Append rows to the store. Returns the row number of the first new row.
+
+        ``on_commit`` is called with that row number once the rows are written,
+        while the lock is still held.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=_DTYPE)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Expected vectors of dimension {self.dimensions}, got {vectors.shape[1]}"
+            )
+        with self._lock, self._vectors_path.open("ab") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)  # released when the file is closed
+            # Re-stat under the lock: another process may have appended since.
+            start = self._rows_on_disk()
+            # Drop any partially written trailing row from an interrupted append.
+            fh.truncate(start * self._row_bytes)
+            fh.write(vectors.tobytes())
+            fh.flush()
+            self._rows = start + vectors.shape[0]
+            if on_commit is not None:
+                on_commit(start)
+        return start
+
+    def truncate(self, rows: int) -> None:
+        """Drop every row at index ``rows`` and beyond."""
+        with self._lock, self._vectors_path.open("r+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            rows = min(rows, self._rows_on_disk())
+            fh.truncate(rows * self._row_bytes)
+            self._rows = rows
+            self._mmap = None
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only ``(rows, dimensions)`` view of every stored vector."""
+        with self._lock:
+            self._rows = self._rows_on_disk()
+            if self._rows == 0:
+                return np.empty((0, self.dimensions), dtype=_DTYPE)
+            if self._mmap is None or self._mmap.shape[0] != self._rows:
+                self._mmap = np.memmap(
+                    self._vectors_path,
+                    dtype=_DTYPE,
+                    mode="r",
+                    shape=(self._rows, self.dimensions),
+                )
+            return self._mmap
+
+    def get(self, row: int) -> np.ndarray:
+        """Return a copy of a single row."""
+        return np.array(self.matrix[row])
+
+    def take(self, rows: list[int] | np.ndarray) -> np.ndarray:
+        """Return a copy of the given rows, in the given order."""
+        return np.asarray(self.matrix[np.asarray(rows, dtype=np.int64)])
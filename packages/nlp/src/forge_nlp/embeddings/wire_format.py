@@ -0,0 +1,166 @@
+"""
+Binary wire formats for embedding responses.
+
+JSON is the default response format, but a 64-chunk response is ~49k floats
+that Pydantic must validate and print as decimal text.  Clients that send a
+matching ``Accept`` header get the raw matrix instead:
+
+``application/octet-stream`` — a Forge embedding frame::
+
+    offset  size  field
+    0       4     magic  b"FEMB"
+    4       1     version (1)
+    5       1     dtype code (see ``DTYPE_CODES``)
+    6       2     reserved (zero)
+    8       4     rows      (uint32, little-endian)
+    12      4     columns   (uint32, little-endian)
+    16      4     metadata length in bytes (uint32, little-endian)
+    20      …     metadata: UTF-8 JSON object (may be empty: ``{}``)
+    …       …     rows × columns little-endian values, row-major
+
+``application/x-npy`` — a standard NumPy ``.npy`` file (``np.load`` reads it);
+any metadata travels in a response header instead.
+
+``application/x-ndjson`` — one JSON object per line, for streaming chunk sets
+in and out without holding the whole document (see ``ndjson_batches``).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import struct
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+import numpy as np
+
+MEDIA_JSON = "application/json"
+MEDIA_FRAME = "application/octet-stream"
+MEDIA_NPY = "application/x-npy"
+MEDIA_NDJSON = "application/x-ndjson"
+
+_MAGIC = b"FEMB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBB2xIII")
+
+DTYPE_CODES: dict[int, np.dtype] = {
+    1: np.dtype("<f4"),
+    2: np.dtype("<f2"),
+    3: np.dtype("i1"),
+    4: np.dtype("u1"),
+}
+_CODE_FOR_DTYPE = {dt: code for code, dt in DTYPE_CODES.items()}
+
+
+class WireFormatError(ValueError):
+    """Raised when a frame cannot be decoded."""
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick the response media type from an ``Accept`` header.
+
+    Honors the order of the header and falls back to JSON for anything we do
+    not serve (including ``*/*`` and a missing header).
+    """
+    if not accept:
+        return MEDIA_JSON
+    for part in accept.split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in (MEDIA_JSON, MEDIA_FRAME, MEDIA_NPY):
+            return media
+    return MEDIA_JSON
+
+
+def encode_frame(array: np.ndarray, metadata: dict[str, Any] | None = None) -> bytes:
+    """Serialize a 2-D array (and optional JSON metadata) as a Forge frame."""
+    array = np.asarray(array)
+    if array.ndim != 2:
+        raise WireFormatError(f"Expected a 2-D array, got shape {array.shape}")
+    dtype = array.dtype.newbyteorder("<") if array.dtype.itemsize > 1 else array.dtype
+    code = _CODE_FOR_DTYPE.get(dtype)
+    if code is None:
+        raise WireFormatError(f"Unsupported dtype {array.dtype}")
+    meta = json.dumps(metadata or {}, separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(_MAGIC, _VERSION, code, array.shape[0], array.shape[1], len(meta))
+    return header + meta + np.ascontiguousarray(array, dtype=dtype).tobytes()
+
+
+def decode_frame(data: bytes) -> tuple[np.ndarray, dict[str, Any]]:
+    """Parse a Forge frame into ``(array, metadata)``."""
+    if len(data) < _HEADER.size:
+        raise WireFormatError("Frame shorter than header")
+    magic, version, code, rows, cols, meta_len = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise WireFormatError("Not a Forge embedding frame")
+    dtype = DTYPE_CODES.get(code)
+    if dtype is None:
+        raise WireFormatError(f"Unknown dtype code {code}")
+    offset = _HEADER.size + meta_len
+    expected = offset + rows * cols * dtype.itemsize
+    if len(data) != expected:
+        raise WireFormatError(f"Frame length {len(data)} != expected {expected}")
+    metadata = json.loads(data[_HEADER.size:offset]) if meta_len else {}
+    array = np.frombuffer(data, dtype=dtype, count=rows * cols, offset=offset)
+    return array.reshape(rows, cols), metadata
+
+
+def encode_npy(array: np.ndarray) -> bytes:
+    """Serialize an array in NumPy ``.npy`` format."""
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(array), allow_pickle=False)
+    return buf.getvalue()
+
+
+# ─── NDJSON ────────────────────────────────────────────────────────────
+
+def encode_ndjson_line(obj: dict[str, Any]) -> bytes:
+    """One compact JSON object and its newline."""
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def ndjson_batches(
+    stream: AsyncIterable[bytes],
+    batch_size: int,
+    max_line_bytes: int = 1 << 20,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Parse an NDJSON byte stream into lists of up to ``batch_size`` objects.
+
+    Bytes are consumed as they arrive, so memory holds one batch and one
+    partial line whatever the stream's length.  Blank lines are skipped.
+
+    Raises:
+        WireFormatError: A line is not a JSON object or exceeds ``max_line_bytes``.
+    """
+    buffer = b""
+    batch: list[dict[str, Any]] = []
+    line_no = 0
+
+    def parse(line: bytes) -> None:
+        nonlocal line_no
+        line_no += 1
+        if len(line) > max_line_bytes:
+            raise WireFormatError(f"Line {line_no} exceeds {max_line_bytes} bytes")
+        if not line.strip():
+            return
+        try:
+            obj = json.loads(line)
+        except ValueError as exc:
+            raise WireFormatError(f"Line {line_no}: invalid JSON ({exc})") from exc
+        if not isinstance(obj, dict):
+            raise WireFormatError(f"Line {line_no}: expected a JSON object")
+        batch.append(obj)
+
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise WireFormatError(f"Line {line_no + len(lines) + 1} exceeds {max_line_bytes} bytes")
+        for line in lines:
+            parse(line)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    parse(buffer)
+    if batch:
+        yield batch
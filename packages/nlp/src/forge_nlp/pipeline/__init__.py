@@ -4,6 +4,7 @@ from .combined_extractor import CombinedExtractor
 from .contract_metadata_mapper import ContractMetadata, map_entities_to_metadata
 from .ingestion_pipeline import IngestionPipeline, IngestionResult
 from .quality_checker import QualityIssue, QualityReport, check_quality
+from .reembedding import ReembedCheckpoint, ReembedDbClient, ReembeddingJob
 
 __all__ = [
     "CombinedExtractor",
@@ -12,6 +13,9 @@ __all__ = [
     "IngestionResult",
     "QualityIssue",
     "QualityReport",
+    "ReembedCheckpoint",
+    "ReembedDbClient",
+    "ReembeddingJob",
     "check_quality",
     "map_entities_to_metadata",
 ]
@@ -15,8 +15,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Protocol
 
+import numpy as np
+
 from forge_nlp.chunking.clause_chunker import DocumentChunk, DocumentProcessor
-from forge_nlp.embeddings.embedding_service import EmbeddedChunk, EmbeddingService
+from forge_nlp.embeddings.embedding_service import EmbeddedChunkBatch, EmbeddingService
+from forge_nlp.embeddings.encoder_pool import EncoderPool
 from forge_nlp.extractors.rule_based import EntityAnnotation, extract_all_entities
 from forge_nlp.ner.model_service import NERService
 from forge_nlp.pipeline.combined_extractor import CombinedExtractor
@@ -38,22 +41,30 @@ class DbClient(Protocol):
     """Minimal DB client interface for the ingestion pipeline."""
 
     def upsert_contract(self, metadata: ContractMetadata, s3_key: str) -> str:
-        """Create or update a contract record. Returns contract_id (UUID)."""
+        """Create or update a contract record. Returns contract_id (UUID).
+
+        Ingesting the same contract again must return the same id: the
+        search indexes find the chunks to tombstone by it.
+        """
         ...
 
     def store_chunks(
         self,
         contract_id: str,
         s3_key: str,
-        chunks: list[EmbeddedChunk],
+        chunks: EmbeddedChunkBatch,
     ) -> list[str]:
-        """Store document chunks with embeddings. Returns list of chunk_ids."""
+        """Store document chunks with embeddings. Returns list of chunk_ids.
+
+        Vectors come as one float32 matrix (``chunks.embeddings``), stored
+        under ``chunks.embedding_version``.
+        """
         ...
 
     def store_entity_annotations(
         self,
         chunk_ids: list[str],
-        chunks: list[EmbeddedChunk],
+        chunks: EmbeddedChunkBatch,
         entities_per_chunk: list[list[EntityAnnotation]],
         model_version: str,
     ) -> int:
@@ -73,6 +84,38 @@ class DbClient(Protocol):
         ...
 
 
+class ChunkIndex(Protocol):
+    """Search index kept in step with the chunks the pipeline stores (``HnswIndex``)."""
+
+    embedding_version: str
+
+    def replace_contract(
+        self,
+        contract_id: str,
+        chunk_ids: list[str],
+        section_types: list[str],
+        vectors: np.ndarray,
+        clause_numbers: list[str | None] | None = None,
+    ) -> int:
+        """Index a contract's new chunks and tombstone its previous ones."""
+        ...
+
+
+class LexicalIndex(Protocol):
+    """Text index kept in step with the chunks the pipeline stores (``Bm25Index``)."""
+
+    def replace_contract(
+        self,
+        contract_id: str,
+        chunk_ids: list[str],
+        section_types: list[str],
+        texts: list[str],
+        clause_numbers: list[str | None] | None = None,
+    ) -> int:
+        """Index a contract's new chunk texts and tombstone its previous ones."""
+        ...
+
+
 # ─── Data classes ─────────────────────────────────────────────────────
 
 @dataclass
@@ -90,6 +133,7 @@ class IngestionResult:
     metadata: ContractMetadata
     quality: QualityReport
     duration_ms: int = 0
+    truncated_chunks: int = 0
 
 
 # ─── Text extraction ─────────────────────────────────────────────────
@@ -163,29 +207,35 @@ def _assign_entities_to_chunks(
 # ─── Mock DB client for testing / local use ───────────────────────────
 
 class InMemoryDbClient:
-    """In-memory DB client for testing and local development."""
+    """In-memory DB client for testing and local development.
+
+    Also implements ``ReembedDbClient`` (see ``reembedding.py``): vectors are
+    kept per embedding version, and reads go to the active version.
+    """
 
     def __init__(self) -> None:
         self.contracts: dict[str, dict] = {}
         self.chunks: dict[str, dict] = {}
         self.annotations: list[dict] = []
         self.audit_logs: list[dict] = []
+        self.embeddings: dict[str, dict[str, np.ndarray]] = {}  # version -> chunk_id -> vector
+        self.active_embedding_version: str | None = None
 
     def upsert_contract(self, metadata: ContractMetadata, s3_key: str) -> str:
-        contract_number = metadata.contract_number or "UNKNOWN"
-        # Check if contract already exists by contract_number
-        for cid, c in self.contracts.items():
-            if c.get("contract_number") == contract_number:
-                c.update(self._meta_to_dict(metadata, s3_key))
-                return cid
-        cid = str(uuid.uuid4())
-        self.contracts[cid] = self._meta_to_dict(metadata, s3_key)
-        self.contracts[cid]["id"] = cid
+        # Derived from the contract number (the document, without one), so a
+        # fresh client — one per API request — returns the id of earlier ingests.
+        key = metadata.contract_number or f"s3:{s3_key}"
+        cid = str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+        self.contracts.setdefault(cid, {"id": cid}).update(self._meta_to_dict(metadata, s3_key))
         return cid
 
     def store_chunks(
-        self, contract_id: str, s3_key: str, chunks: list[EmbeddedChunk],
+        self, contract_id: str, s3_key: str, chunks: EmbeddedChunkBatch,
     ) -> list[str]:
+        version = chunks.embedding_version
+        vectors = self.embeddings.setdefault(version, {})
+        if self.active_embedding_version is None:
+            self.active_embedding_version = version
         chunk_ids: list[str] = []
         for chunk in chunks:
             cid = str(uuid.uuid4())
@@ -198,15 +248,50 @@ class InMemoryDbClient:
                 "clause_number": chunk.clause_number,
                 "chunk_text": chunk.chunk_text,
                 "embedding": chunk.embedding,
+                "embedding_version": version,
                 "metadata_json": chunk.metadata,
             }
+            vectors[cid] = chunk.embedding
             chunk_ids.append(cid)
         return chunk_ids
 
+    def fetch_chunks(
+        self, after_id: str | None, limit: int, missing_version: str,
+    ) -> list[tuple[str, DocumentChunk]]:
+        ids = sorted(
+            cid for cid in self.chunks
+            if (after_id is None or cid > after_id)
+            and cid not in self.embeddings.get(missing_version, {})
+        )
+        return [(cid, self._row_to_chunk(self.chunks[cid])) for cid in ids[:limit]]
+
+    def store_embeddings(self, version: str, chunk_ids: list[str], vectors: np.ndarray) -> None:
+        self.embeddings.setdefault(version, {}).update(zip(chunk_ids, vectors))
+
+    def get_active_embedding_version(self) -> str | None:
+        return self.active_embedding_version
+
+    def set_active_embedding_version(self, version: str) -> None:
+        self.active_embedding_version = version
+
+    def chunk_embedding(self, chunk_id: str) -> np.ndarray | None:
+        """The chunk's vector under the active embedding version."""
+        return self.embeddings.get(self.active_embedding_version or "", {}).get(chunk_id)
+
+    @staticmethod
+    def _row_to_chunk(row: dict) -> DocumentChunk:
+        return DocumentChunk(
+            chunk_text=row["chunk_text"],
+            section_type=row["section_type"],
+            clause_number=row["clause_number"],
+            chunk_index=row["chunk_index"],
+            metadata=dict(row["metadata_json"] or {}),
+        )
+
     def store_entity_annotations(
         self,
         chunk_ids: list[str],
-        chunks: list[EmbeddedChunk],
+        chunks: EmbeddedChunkBatch,
         entities_per_chunk: list[list[EntityAnnotation]],
         model_version: str,
     ) -> int:
@@ -277,7 +362,18 @@ class LocalFileS3Client:
 # ─── Pipeline ─────────────────────────────────────────────────────────
 
 class IngestionPipeline:
-    """Orchestrates the full document ingestion flow."""
+    """Orchestrates the full document ingestion flow.
+
+    Pass either a ready ``embedding_service`` or a started ``encoder_pool``
+    (shared with other callers) from which a default service is built.
+    With ``token_aware_chunking`` chunks are budgeted with the embedding
+    model's tokenizer and embedded from their token ids.  With
+    ``late_chunking`` overlapping chunks of a section are encoded together
+    and pooled per chunk span.  With a ``search_index`` every stored
+    contract's chunks are inserted into it and the contract's previously
+    indexed chunks tombstoned, so a re-ingested contract is not found twice;
+    a ``lexical_index`` is kept current the same way with the chunk texts.
+    """
 
     def __init__(
         self,
@@ -288,22 +384,51 @@ class IngestionPipeline:
         combined_extractor: CombinedExtractor | None = None,
         use_ner: bool = True,
         model_version: str = "v0.1",
+        encoder_pool: EncoderPool | None = None,
+        token_aware_chunking: bool = False,
+        late_chunking: bool = False,
+        search_index: ChunkIndex | None = None,
+        lexical_index: LexicalIndex | None = None,
     ) -> None:
         self.s3 = s3_client
         self.db = db_client
         self.s3_bucket = s3_bucket
         self._embedding_svc = embedding_service
+        self._encoder_pool = encoder_pool
         self._extractor = combined_extractor
         self._use_ner = use_ner
         self._model_version = model_version
-        self._doc_processor = DocumentProcessor()
+        self._token_aware = token_aware_chunking
+        self._late_chunking = late_chunking
+        self.search_index = search_index
+        self.lexical_index = lexical_index
+        self._doc_processor: DocumentProcessor | None = None
 
     @property
     def embedding_service(self) -> EmbeddingService:
         if self._embedding_svc is None:
-            self._embedding_svc = EmbeddingService()
+            if self._encoder_pool is not None:
+                self._embedding_svc = EmbeddingService(
+                    model_name=self._encoder_pool.model_name,
+                    backend=self._encoder_pool.backend,
+                    pool=self._encoder_pool,
+                )
+            else:
+                self._embedding_svc = EmbeddingService()
         return self._embedding_svc
 
+    @property
+    def doc_processor(self) -> DocumentProcessor:
+        if self._doc_processor is None:
+            if self._token_aware:
+                svc = self.embedding_service
+                self._doc_processor = DocumentProcessor(
+                    tokenizer=svc.tokenizer, max_length=svc.max_seq_length,
+                )
+            else:
+                self._doc_processor = DocumentProcessor()
+        return self._doc_processor
+
     @property
     def extractor(self) -> CombinedExtractor | None:
         if self._use_ner and self._extractor is None:
@@ -364,11 +489,29 @@ class IngestionPipeline:
 
             # ── 4. Document chunking ────────────────────────────────
             logger.info("Chunking document …")
-            chunks = self._doc_processor.process(text, document_id=s3_key)
+            chunks = self.doc_processor.process(text, document_id=s3_key)
 
             # ── 5. Embed chunks ─────────────────────────────────────
             logger.info("Generating embeddings for %d chunks …", len(chunks))
-            embedded_chunks = self.embedding_service.embed_chunks(chunks)
+            embedded_chunks = self.embedding_service.embed_chunks(
+                chunks, late_chunking=self._late_chunking,
+            )
+            # Only token-aware chunks know their length without re-tokenizing.
+            truncated_chunks = (
+                self.embedding_service.count_truncated(chunks) if self._token_aware else 0
+            )
+            if truncated_chunks:
+                logger.warning(
+                    "%d chunks exceed the model window and were truncated", truncated_chunks
+                )
+            if (
+                self.search_index is not None
+                and self.search_index.embedding_version != embedded_chunks.embedding_version
+            ):
+                raise ValueError(
+                    f"Search index holds {self.search_index.embedding_version} vectors, "
+                    f"chunks were embedded as {embedded_chunks.embedding_version}"
+                )
 
             # ── 6. Map metadata ─────────────────────────────────────
             metadata = map_entities_to_metadata(text, entities)
@@ -381,6 +524,7 @@ class IngestionPipeline:
                 entities=entities,
                 chunk_count=len(chunks),
                 chunk_entity_counts=chunk_entity_counts,
+                truncated_chunks=truncated_chunks,
             )
 
             # ── 8. Database population ──────────────────────────────
@@ -392,6 +536,23 @@ class IngestionPipeline:
                 s3_key=s3_key,
                 chunks=embedded_chunks,
             )
+            if self.search_index is not None:
+                replaced = self.search_index.replace_contract(
+                    contract_id,
+                    chunk_ids,
+                    [c.section_type for c in embedded_chunks.chunks],
+                    embedded_chunks.embeddings,
+                    [c.clause_number for c in embedded_chunks.chunks],
+                )
+                logger.info("Indexed %d chunks, tombstoned %d previous", len(chunk_ids), replaced)
+            if self.lexical_index is not None:
+                self.lexical_index.replace_contract(
+                    contract_id,
+                    chunk_ids,
+                    [c.section_type for c in embedded_chunks.chunks],
+                    [c.chunk_text for c in embedded_chunks.chunks],
+                    [c.clause_number for c in embedded_chunks.chunks],
+                )
 
             annotation_count = self.db.store_entity_annotations(
                 chunk_ids=chunk_ids,
@@ -414,6 +575,7 @@ class IngestionPipeline:
                 metadata=metadata,
                 quality=quality,
                 duration_ms=duration_ms,
+                truncated_chunks=truncated_chunks,
             )
 
             # ── 9. Log success ──────────────────────────────────────
@@ -52,6 +52,7 @@ def check_quality(
     entities: list[EntityAnnotation],
     chunk_count: int = 0,
     chunk_entity_counts: list[int] | None = None,
+    truncated_chunks: int = 0,
 ) -> QualityReport:
     """Check extraction quality and flag issues.
 
@@ -60,6 +61,7 @@ def check_quality(
         entities: All extracted entities.
         chunk_count: Number of document chunks.
         chunk_entity_counts: Number of entities per chunk (for empty-chunk detection).
+        truncated_chunks: Chunks longer than the embedding model's window.
 
     Returns:
         A QualityReport with any issues found.
@@ -136,6 +138,18 @@ def check_quality(
                 report.needs_human_review = True
                 report.review_reasons.append("Many chunks without entities — possible extraction issue")
 
+    # ── Chunks cut off by the embedding model ───────────────────────
+    if truncated_chunks > 0:
+        report.issues.append(QualityIssue(
+            severity=IssueSeverity.WARNING,
+            code="TRUNCATED_CHUNKS",
+            message=(
+                f"{truncated_chunks} chunks exceed the embedding model's token window; "
+                "their tails are not represented in the embeddings."
+            ),
+            details={"truncated_chunks": truncated_chunks, "total_chunks": chunk_count},
+        ))
+
     # ── No entities at all ──────────────────────────────────────────
     if len(entities) == 0:
         report.issues.append(QualityIssue(
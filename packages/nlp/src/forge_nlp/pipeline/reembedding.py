@@ -0,0 +1,230 @@
+"""
+Background re-embedding of stored chunks after a model upgrade.
+
+Every stored vector carries the ``embedding_version`` of the service that
+produced it (see ``EmbeddingService.embedding_version``).  Vectors of a new
+model, new weights or a new projection are not comparable with the old ones,
+so an upgrade re-embeds every stored chunk under the new version while reads
+keep using the old one, then switches the active version in one write.
+
+The job walks the chunks in id order in large batches, skipping any that
+already have a vector under the target version, and checkpoints the id of
+the last batch written.  After an interruption it resumes from there.  A
+final pass from the start picks up chunks ingested under the old version
+while the job ran; chunks ingested after that pass need the ingestion
+service itself to run the new model before the switch.
+
+Throughput controls (``batch_size``, ``workers``, ``max_chunks_per_s``) keep
+the job from starving live traffic that shares the model or its host.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class ReembedDbClient(Protocol):
+    """Versioned vector storage the re-embedding job reads and writes."""
+
+    def fetch_chunks(
+        self, after_id: str | None, limit: int, missing_version: str,
+    ) -> list[tuple[str, DocumentChunk]]:
+        """Up to ``limit`` ``(chunk_id, chunk)`` pairs with ids after ``after_id``,
+        in id order, that have no vector under ``missing_version``."""
+        ...
+
+    def store_embeddings(self, version: str, chunk_ids: list[str], vectors: np.ndarray) -> None:
+        """Insert or replace the vectors of ``chunk_ids`` (rows of ``vectors``)
+        under ``version``."""
+        ...
+
+    def get_active_embedding_version(self) -> str | None:
+        """The version reads currently use."""
+        ...
+
+    def set_active_embedding_version(self, version: str) -> None:
+        """Point reads at ``version`` in a single write: readers see either
+        the old version or the new one, never a mix."""
+        ...
+
+
+@dataclass
+class ReembedCheckpoint:
+    """Progress of a re-embedding job towards one target version."""
+
+    version: str
+    last_chunk_id: str | None = None  # last id of the main pass written so far
+    chunks_done: int = 0
+    main_pass_done: bool = False
+    activated: bool = False
+    started_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> ReembedCheckpoint:
+        return cls(**json.loads(Path(path).read_text()))
+
+
+class ReembeddingJob:
+    """Re-embed every stored chunk under ``service``'s embedding version.
+
+    Args:
+        db: Versioned vector storage.
+        service: Embedding service running the new model.
+        checkpoint_path: JSON file recording progress; a checkpoint for
+            another version is discarded.
+        batch_size: Chunks fetched, encoded and written together.
+        workers: Batches encoded concurrently.  Useful with an
+            ``EncoderPool`` behind the service; in-process encoding already
+            uses every torch thread.
+        max_chunks_per_s: Cap on the job's throughput; ``None`` runs flat out.
+        activate: Switch reads to the new version once every chunk has it.
+
+    ``run()`` blocks until the job finishes or ``stop()`` is called from
+    another thread; call it from a background thread beside live traffic.
+    """
+
+    def __init__(
+        self,
+        db: ReembedDbClient,
+        service: EmbeddingService,
+        checkpoint_path: str | Path,
+        batch_size: int = 512,
+        workers: int = 1,
+        max_chunks_per_s: float | None = None,
+        activate: bool = True,
+    ) -> None:
+        if batch_size < 1 or workers < 1:
+            raise ValueError("batch_size and workers must be positive")
+        if max_chunks_per_s is not None and max_chunks_per_s <= 0:
+            raise ValueError("max_chunks_per_s must be positive")
+        self.db = db
+        self.service = service
+        self.checkpoint_path = Path(checkpoint_path)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_chunks_per_s = max_chunks_per_s
+        self.activate = activate
+        self.version = service.embedding_version()
+        self._stop = threading.Event()
+        self._checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> ReembedCheckpoint:
+        if self.checkpoint_path.exists():
+            checkpoint = ReembedCheckpoint.load(self.checkpoint_path)
+            if checkpoint.version == self.version:
+                return checkpoint
+            logger.info(
+                "Discarding re-embedding checkpoint for %s; target is %s",
+                checkpoint.version, self.version,
+            )
+        return ReembedCheckpoint(version=self.version)
+
+    def progress(self) -> ReembedCheckpoint:
+        """A copy of the job's current progress."""
+        return ReembedCheckpoint(**asdict(self._checkpoint))
+
+    def stop(self) -> None:
+        """Ask ``run()`` to return after the batches in flight are written."""
+        self._stop.set()
+
+    def run(self) -> ReembedCheckpoint:
+        """Re-embed until done (or stopped), then switch reads if ``activate``."""
+        checkpoint = self._checkpoint
+        if checkpoint.activated:
+            return self.progress()
+        logger.info(
+            "Re-embedding chunks under %s (resuming after %s)",
+            self.version, checkpoint.last_chunk_id,
+        )
+        started, done_before = time.monotonic(), checkpoint.chunks_done
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="forge-reembed") as pool:
+            if not checkpoint.main_pass_done:
+                self._pass(pool, checkpoint.last_chunk_id, main=True)
+                if self._stop.is_set():
+                    return self.progress()
+                checkpoint.main_pass_done = True
+                self._save()
+            # Catch chunks ingested under the old version while the main pass ran.
+            self._pass(pool, None, main=False)
+        if self._stop.is_set():
+            return self.progress()
+
+        if self.activate:
+            previous = self.db.get_active_embedding_version()
+            self.db.set_active_embedding_version(self.version)
+            checkpoint.activated = True
+            self._save()
+            logger.info("Reads switched from embedding version %s to %s", previous, self.version)
+        logger.info(
+            "Re-embedded %d chunks in %.1fs",
+            checkpoint.chunks_done - done_before, time.monotonic() - started,
+        )
+        return self.progress()
+
+    def _pass(self, pool: ThreadPoolExecutor, after_id: str | None, main: bool) -> None:
+        """Walk the chunks after ``after_id``; batches are written (and
+        checkpointed) in id order, at most ``workers`` in flight."""
+        in_flight: deque[tuple[str, Future[int]]] = deque()
+        started, submitted = time.monotonic(), 0
+        while True:
+            self._throttle(started, submitted)
+            if self._stop.is_set():
+                break
+            batch = self.db.fetch_chunks(after_id, self.batch_size, self.version)
+            if not batch:
+                break
+            after_id = batch[-1][0]
+            in_flight.append((after_id, pool.submit(self._embed_and_store, batch)))
+            submitted += len(batch)
+            if len(in_flight) >= self.workers:
+                self._commit(*in_flight.popleft(), main)
+        while in_flight:
+            self._commit(*in_flight.popleft(), main)
+
+    def _embed_and_store(self, batch: list[tuple[str, DocumentChunk]]) -> int:
+        chunk_ids = [cid for cid, _ in batch]
+        embedded = self.service.embed_chunks([chunk for _, chunk in batch])
+        self.db.store_embeddings(self.version, chunk_ids, embedded.embeddings)
+        return len(batch)
+
+    def _commit(self, last_id: str, future: Future[int], main: bool) -> None:
+        checkpoint = self._checkpoint
+        checkpoint.chunks_done += future.result()
+        if main:
+            checkpoint.last_chunk_id = last_id
+        self._save()
+
+    def _throttle(self, started: float, submitted: int) -> None:
+        """Sleep until submitting more keeps the pass under ``max_chunks_per_s``."""
+        if self.max_chunks_per_s is None:
+            return
+        wait = started + submitted / self.max_chunks_per_s - time.monotonic()
+        if wait > 0:
+            self._stop.wait(wait)
+
+    def _save(self) -> None:
+        self._checkpoint.updated_at = time.time()
+        self._checkpoint.save(self.checkpoint_path)
@@ -0,0 +1,33 @@
+"""In-process vector and lexical search over document chunks."""
+
+from .bitmaps import Bitmap
+from .bm25_index import Bm25Index, Bm25Stats
+from .exact_index import ExactIndex, SearchHit
+from .hnsw_index import HnswIndex, HnswStats
+from .hybrid import HybridHit, HybridResult, hybrid_search
+from .index import SearchIndex, index_kind, open_index
+from .ivfpq_index import IvfPqIndex, IvfPqQuantizer, IvfPqStats
+from .latency import LatencyStats, LatencyWindow
+from .rows import RowTable
+
+__all__ = [
+    "Bitmap",
+    "Bm25Index",
+    "Bm25Stats",
+    "ExactIndex",
+    "HnswIndex",
+    "HnswStats",
+    "HybridHit",
+    "HybridResult",
+    "IvfPqIndex",
+    "IvfPqQuantizer",
+    "IvfPqStats",
+    "LatencyStats",
+    "LatencyWindow",
+    "RowTable",
+    "SearchHit",
+    "SearchIndex",
+    "hybrid_search",
+    "index_kind",
+    "open_index",
+]
@@ -0,0 +1,178 @@
+"""
+Compressed bitmaps of row numbers for metadata filters.
+
+A ``Bitmap`` follows the Roaring layout (Chambi, Lemire et al., 2016): row
+numbers are split by their high 16 bits into chunks of 65,536 rows, and
+each chunk is stored as whichever is smaller —
+
+* a sorted ``uint16`` array of the rows it holds, while there are at most
+  4,096 of them (≤ 8 KB), or
+* a 65,536-bit bitset (8 KB) beyond that.
+
+A contract's few hundred chunks cost a few hundred bytes, a section type
+covering half the corpus costs 1 bit per row, and unions, intersections
+and cardinalities run chunk by chunk without materializing a corpus-sized
+mask.  ``to_mask`` and ``rows`` convert to the forms the indexes consume.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_CHUNK = 1 << 16
+_ARRAY_MAX = 4096  # above this a sorted uint16 array outgrows the 8 KB bitset
+_POPCOUNT = np.array([i.bit_count() for i in range(256)], dtype=np.int64)
+
+
+def _is_array(container: np.ndarray) -> bool:
+    return container.dtype == np.uint16
+
+
+def _to_bitset(lows: np.ndarray) -> np.ndarray:
+    bits = np.zeros(_CHUNK, dtype=bool)
+    bits[lows] = True
+    return np.packbits(bits, bitorder="little")
+
+
+def _to_lows(container: np.ndarray) -> np.ndarray:
+    if _is_array(container):
+        return container
+    return np.flatnonzero(np.unpackbits(container, bitorder="little")).astype(np.uint16)
+
+
+def _compact(container: np.ndarray) -> np.ndarray | None:
+    """The smaller representation of a container, or ``None`` if it is empty."""
+    if _is_array(container):
+        if not len(container):
+            return None
+        return _to_bitset(container) if len(container) > _ARRAY_MAX else container
+    count = int(_POPCOUNT[container].sum())
+    if not count:
+        return None
+    return _to_lows(container) if count <= _ARRAY_MAX else container
+
+
+class Bitmap:
+    """Roaring-style compressed set of non-negative row numbers."""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self, rows: np.ndarray | list[int] = ()) -> None:
+        self._containers: dict[int, np.ndarray] = {}
+        if len(rows):
+            self.add(rows)
+
+    def add(self, rows: np.ndarray | list[int]) -> None:
+        """Add row numbers (any order, duplicates allowed)."""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if len(rows) and rows[0] < 0:
+            raise ValueError("Row numbers must be non-negative")
+        highs = rows >> 16
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        for chunk in np.split(rows, bounds):
+            if not len(chunk):
+                continue
+            high = int(chunk[0] >> 16)
+            lows = (chunk & 0xFFFF).astype(np.uint16)
+            existing = self._containers.get(high)
+            if existing is None:
+                merged = lows
+            elif _is_array(existing):
+                merged = np.union1d(existing, lows).astype(np.uint16)
+            else:
+                merged = existing | _to_bitset(lows)
+            self._containers[high] = _compact(merged)  # type: ignore[assignment]
+
+    def __len__(self) -> int:
+        return sum(
+            len(c) if _is_array(c) else int(_POPCOUNT[c].sum()) for c in self._containers.values()
+        )
+
+    def __contains__(self, row: int) -> bool:
+        container = self._containers.get(row >> 16)
+        if container is None:
+            return False
+        low = row & 0xFFFF
+        if _is_array(container):
+            i = np.searchsorted(container, low)
+            return bool(i < len(container) and container[i] == low)
+        return bool(container[low >> 3] >> (low & 7) & 1)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._containers.values())
+
+    def __or__(self, other: Bitmap) -> Bitmap:
+        result = Bitmap()
+        for high in self._containers.keys() | other._containers.keys():
+            a, b = self._containers.get(high), other._containers.get(high)
+            if a is None or b is None:
+                result._containers[high] = a if b is None else b  # type: ignore[assignment]
+            elif _is_array(a) and _is_array(b):
+                merged = np.union1d(a, b).astype(np.uint16)
+                result._containers[high] = _compact(merged)  # type: ignore[assignment]
+            else:
+                bits_a = a if not _is_array(a) else _to_bitset(a)
+                bits_b = b if not _is_array(b) else _to_bitset(b)
+                result._containers[high] = bits_a | bits_b
+        return result
+
+    def __and__(self, other: Bitmap) -> Bitmap:
+        result = Bitmap()
+        for high in self._containers.keys() & other._containers.keys():
+            a, b = self._containers[high], other._containers[high]
+            if _is_array(a) and _is_array(b):
+                both = np.intersect1d(a, b, assume_unique=True).astype(np.uint16)
+            elif _is_array(a) or _is_array(b):
+                lows, bits = (a, b) if _is_array(a) else (b, a)
+                both = lows[(bits[lows >> 3] >> (lows & 7).astype(np.uint8)) & 1 == 1]
+            else:
+                both = a & b
+            compact = _compact(both)
+            if compact is not None:
+                result._containers[high] = compact
+        return result
+
+    @classmethod
+    def union(cls, bitmaps: list[Bitmap]) -> Bitmap:
+        """Union of many bitmaps, merging each chunk once rather than pairwise."""
+        grouped: dict[int, list[np.ndarray]] = {}
+        for bitmap in bitmaps:
+            for high, container in bitmap._containers.items():
+                grouped.setdefault(high, []).append(container)
+        result = cls()
+        for high, containers in grouped.items():
+            if len(containers) == 1:
+                result._containers[high] = containers[0]
+            elif sum(len(c) if _is_array(c) else _ARRAY_MAX + 1 for c in containers) <= _ARRAY_MAX:
+                result._containers[high] = np.unique(np.concatenate(containers))
+            else:
+                bits = np.zeros(_CHUNK // 8, dtype=np.uint8)
+                for container in containers:
+                    bits |= _to_bitset(container) if _is_array(container) else container
+                result._containers[high] = _compact(bits)  # type: ignore[assignment]
+        return result
+
+    def rows(self, limit: int | None = None) -> np.ndarray:
+        """Sorted int64 row numbers, those below ``limit`` only if given."""
+        parts = [
+            (high << 16) + _to_lows(self._containers[high]).astype(np.int64)
+            for high in sorted(self._containers)
+        ]
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        return rows if limit is None else rows[:np.searchsorted(rows, limit)]
+
+    def to_mask(self, size: int) -> np.ndarray:
+        """Boolean mask of rows ``0 .. size - 1``."""
+        mask = np.zeros(size, dtype=bool)
+        for high, container in self._containers.items():
+            base = high << 16
+            if base >= size:
+                continue
+            if _is_array(container):
+                rows = base + container.astype(np.int64)
+                mask[rows[rows < size]] = True
+            else:
+                bits = np.unpackbits(container, bitorder="little").view(bool)
+                mask[base:base + _CHUNK] = bits[:size - base]
+        return mask
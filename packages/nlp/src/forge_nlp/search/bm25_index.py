@@ -0,0 +1,424 @@
+"""
+BM25 inverted index over chunk text for exact-term retrieval.
+
+Dense LegalBERT vectors blur what contract users often type verbatim:
+clause numbers (52.204-21), CLINs (0001AA) and defined terms.  A
+``Bm25Index`` ranks chunks by Okapi BM25 (Robertson & Zaragoza, "The
+Probabilistic Relevance Framework: BM25 and Beyond", 2009) over the words
+the chunker counts — whitespace-separated, lowercased, edge punctuation
+stripped (``word_tokens``) — so a clause number stays one term.
+
+Postings are compact: per term, an ``array`` of row numbers (int32) and
+one of term frequencies (uint16), 6 bytes per (term, chunk) pair.  Chunk
+metadata lives in a ``RowTable``, so the section, contract and clause
+number filters of the vector indexes apply here too.  ``hybrid.py`` uses
+the lexical candidates to restrict and rerank dense search.
+
+The index grows with ingestion: ``IngestionPipeline`` calls
+``replace_contract`` for every contract it stores, which adds the new
+chunks and tombstones the contract's previous ones.  Like the HNSW graph,
+it is persisted as a checkpoint plus an append log: each added chunk's
+term counts are logged as one JSON line *before* its ``rows.jsonl`` line,
+each tombstoning as one ``{"delete": [...]}`` line.  Opening loads the
+checkpoint and replays the log, dropping lines of rows that were never
+committed and a torn final line.  ``save()`` writes a new checkpoint and
+starts a new log.
+
+Tombstoned chunks are never returned and leave the collection size and
+average length, but — as in Lucene before a merge — still count in the
+document frequency of their terms until they age out of the index.
+
+Layout of an index directory::
+
+    rows.jsonl               a ``RowTable``: one {"chunk_id", "section_type", …} line per row
+    postings.npz             checkpoint: terms, CSR postings, lengths, tombstones, generation g
+    postings.<g>.jsonl       {"row", "terms"} and {"delete"} lines since checkpoint g
+
+Usage:
+    # Index a JSONL export of chunks ({"chunk_id", "chunk_text", "section_type",
+    # "contract_id", "clause_number"}; chunk_id falls back to file:line)
+    python -m forge_nlp.search.bm25_index build --chunks chunks.jsonl [--output DIR]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from forge_nlp.chunking.clause_chunker import word_tokens
+from forge_nlp.search.exact_index import SearchHit
+from forge_nlp.search.rows import RowTable
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+DEFAULT_LEXICAL_INDEX_PATH = _PKG_ROOT / "models" / "search" / "bm25"
+_ROWS_FILE = "rows.jsonl"
+_CHECKPOINT_FILE = "postings.npz"
+_MAX_TF = 65535  # uint16 term frequencies
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+
+@dataclass
+class Bm25Stats:
+    """Size of a BM25 index."""
+
+    chunks: int          # live chunks
+    deleted: int
+    terms: int
+    postings: int        # (term, chunk) pairs, tombstoned chunks included
+    postings_bytes: int  # row numbers and term frequencies in RAM
+    log_bytes: int       # lines not yet folded into the checkpoint
+
+
+class Bm25Index:
+    """Incrementally built BM25 index over chunk text.
+
+    Args:
+        path: Index directory, created if missing.
+        k1: Term-frequency saturation.
+        b: Length normalization, 0 (none) to 1 (full).
+    """
+
+    def __init__(self, path: str | Path, k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+        self.rows = RowTable(self.path / _ROWS_FILE)
+        self._lock = threading.RLock()
+        self._term_id: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._docs: list[array] = []  # per term: rows, int32
+        self._tfs: list[array] = []   # per term: frequencies, uint16
+        self._lengths = array("i")    # per row: words
+        self._deleted = bytearray()   # per row: tombstone flag
+        self._live = 0
+        self._live_words = 0
+        self._generation = 0
+        self._load()
+        self._log_path = self.path / f"postings.{self._generation}.jsonl"
+        self._log = self._log_path.open("a")
+        logger.info("BM25 index %s: %d chunks, %d terms", self.path, self._live, len(self._terms))
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / _ROWS_FILE).exists()
+
+    def __len__(self) -> int:
+        return self.rows.live
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.rows
+
+    def stats(self) -> Bm25Stats:
+        with self._lock:
+            postings = sum(len(d) for d in self._docs)
+            return Bm25Stats(
+                chunks=self._live,
+                deleted=len(self._lengths) - self._live,
+                terms=len(self._terms),
+                postings=postings,
+                postings_bytes=postings * 6,
+                log_bytes=self._log.tell(),
+            )
+
+    # ─── Persistence ──────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        checkpoint = self.path / _CHECKPOINT_FILE
+        if checkpoint.exists():
+            with np.load(checkpoint) as data:
+                self._generation = int(data["generation"])
+                offsets = data["offsets"]
+                docs = data["docs"].astype(np.int32)
+                tfs = data["tfs"].astype(np.uint16)
+                for term, start, end in zip(data["terms"].tolist(), offsets[:-1], offsets[1:]):
+                    self._new_term(term)
+                    self._docs[-1].frombytes(docs[start:end].tobytes())
+                    self._tfs[-1].frombytes(tfs[start:end].tobytes())
+                self._lengths.frombytes(data["lengths"].astype(np.int32).tobytes())
+                self._deleted = bytearray(data["deleted"].astype(np.uint8).tobytes())
+            lengths = np.frombuffer(self._lengths, dtype=np.int32)
+            live = np.frombuffer(self._deleted, dtype=np.uint8) == 0
+            self._live = int(live.sum())
+            self._live_words = int(lengths[live].sum())
+            del lengths, live  # release the buffers before they grow
+            for row in np.flatnonzero(np.frombuffer(self._deleted, dtype=np.uint8)).tolist():
+                self.rows.forget(row)
+
+        log_path = self.path / f"postings.{self._generation}.jsonl"
+        if not log_path.exists():
+            return
+        committed = len(self.rows)
+        kept: list[str] = []
+        dropped = 0
+        with log_path.open() as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:  # torn final line
+                    dropped += 1
+                    continue
+                if "delete" in record:
+                    self._apply_delete(record["delete"])
+                elif record["row"] == len(self._lengths) < committed:
+                    self._apply_add(record["terms"])
+                else:  # logged, but its row never reached rows.jsonl
+                    dropped += 1
+                    continue
+                kept.append(line if line.endswith("\n") else line + "\n")
+        if dropped:
+            logger.warning("BM25 index %s: dropping %d uncommitted log lines", self.path, dropped)
+            tmp = log_path.with_suffix(".tmp")
+            tmp.write_text("".join(kept))
+            os.replace(tmp, log_path)
+        if len(self._lengths) < committed:
+            raise ValueError(
+                f"BM25 index at {self.path} has {committed} rows but postings for "
+                f"{len(self._lengths)}; rebuild it"
+            )
+
+    def save(self) -> None:
+        """Write a checkpoint of the whole index and start an empty log."""
+        with self._lock:
+            lengths = np.array(self._lengths, dtype=np.int32)
+            counts = np.array([len(d) for d in self._docs], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            generation = self._generation + 1
+            tmp = self.path / (_CHECKPOINT_FILE + ".tmp")
+            with tmp.open("wb") as fh:
+                np.savez(
+                    fh,
+                    generation=generation,
+                    terms=np.array(self._terms, dtype=str),
+                    offsets=offsets,
+                    docs=np.concatenate([np.array(d, dtype=np.int32) for d in self._docs])
+                    if self._docs else np.empty(0, dtype=np.int32),
+                    tfs=np.concatenate([np.array(t, dtype=np.uint16) for t in self._tfs])
+                    if self._tfs else np.empty(0, dtype=np.uint16),
+                    lengths=lengths,
+                    deleted=np.array(self._deleted, dtype=np.uint8).astype(bool),
+                )
+            os.replace(tmp, self.path / _CHECKPOINT_FILE)
+            self._log.close()
+            old_log = self._log_path
+            self._generation = generation
+            self._log_path = self.path / f"postings.{generation}.jsonl"
+            self._log = self._log_path.open("a")
+            old_log.unlink(missing_ok=True)
+            logger.info(
+                "BM25 checkpoint %d: %d rows, %d terms", generation, len(lengths), len(self._terms)
+            )
+
+    # ─── In-memory postings ───────────────────────────────────────────
+
+    def _new_term(self, term: str) -> int:
+        self._term_id[term] = len(self._terms)
+        self._terms.append(term)
+        self._docs.append(array("i"))
+        self._tfs.append(array("H"))
+        return len(self._terms) - 1
+
+    def _apply_add(self, terms: dict[str, int]) -> None:
+        row = len(self._lengths)
+        for term, tf in terms.items():
+            tid = self._term_id.get(term)
+            if tid is None:
+                tid = self._new_term(term)
+            self._docs[tid].append(row)
+            self._tfs[tid].append(min(tf, _MAX_TF))
+        words = sum(terms.values())
+        self._lengths.append(words)
+        self._deleted.append(0)
+        self._live += 1
+        self._live_words += words
+
+    def _apply_delete(self, rows: list[int]) -> None:
+        for row in rows:
+            if not self._deleted[row]:
+                self._deleted[row] = 1
+                self._live -= 1
+                self._live_words -= self._lengths[row]
+            self.rows.forget(row)
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def add(
+        self,
+        chunk_ids: list[str],
+        section_types: list[str],
+        texts: list[str],
+        contract_ids: list[str | None] | None = None,
+        clause_numbers: list[str | None] | None = None,
+    ) -> None:
+        """Index chunks by the words of their text.
+
+        Raises:
+            ValueError: Lengths disagree, or a chunk id is already indexed.
+        """
+        if not len(chunk_ids) == len(section_types) == len(texts):
+            raise ValueError(
+                f"Got {len(chunk_ids)} ids, {len(section_types)} section types "
+                f"and {len(texts)} texts"
+            )
+        if not chunk_ids:
+            return
+        counts = [Counter(word_tokens(text)) for text in texts]
+        with self._lock:
+            self.rows.check_new(chunk_ids)
+            first = len(self._lengths)
+            # Postings first: rows.jsonl is the record of which rows are committed.
+            for offset, terms in enumerate(counts):
+                self._log.write(json.dumps({"row": first + offset, "terms": terms}) + "\n")
+            self._log.flush()
+            self.rows.append(chunk_ids, section_types, contract_ids, clause_numbers)
+            for terms in counts:
+                self._apply_add(terms)
+
+    def delete(self, chunk_ids: list[str]) -> int:
+        """Tombstone chunks; returns how many were live."""
+        with self._lock:
+            rows = [r for r in (self.rows.row(cid) for cid in chunk_ids) if r is not None]
+            self._delete_rows(rows)
+        return len(rows)
+
+    def replace_contract(
+        self,
+        contract_id: str,
+        chunk_ids: list[str],
+        section_types: list[str],
+        texts: list[str],
+        clause_numbers: list[str | None] | None = None,
+    ) -> int:
+        """Index a contract's new chunks, then tombstone its previous ones.
+
+        Returns the number of chunks tombstoned.
+        """
+        with self._lock:
+            previous = self.rows.contract_rows(contract_id)
+            self.add(
+                chunk_ids, section_types, texts, [contract_id] * len(chunk_ids), clause_numbers
+            )
+            self._delete_rows(previous)
+        return len(previous)
+
+    def _delete_rows(self, rows: list[int]) -> None:
+        if rows:
+            self._log.write(json.dumps({"delete": rows}) + "\n")
+            self._log.flush()
+            self._apply_delete(rows)
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        section_types: list[str] | None = None,
+        contract_ids: list[str] | None = None,
+        clause_numbers: list[str] | None = None,
+    ) -> list[SearchHit]:
+        """Top-``k`` chunks by BM25 score for ``query``, best first.
+
+        Filters are those of ``ExactIndex.search``.  Only chunks sharing at
+        least one term with the query are returned.
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        terms = list(dict.fromkeys(word_tokens(query)))
+        with self._lock:
+            rows, scores = self._score(terms)
+            if not len(rows):
+                return []
+            allowed = self.rows.filter(section_types, contract_ids, clause_numbers)
+            if allowed is not None:
+                keep = allowed.to_mask(len(self._lengths))[rows]
+                rows, scores = rows[keep], scores[keep]
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return [
+            SearchHit(
+                chunk_id=self.rows.chunk_id(row),
+                score=float(scores[i]),
+                section_type=self.rows.section_type(row),
+                contract_id=self.rows.contract_id(row),
+                clause_number=self.rows.clause_number(row),
+            )
+            for i, row in zip(order, rows[order].tolist())
+        ]
+
+    def _score(self, terms: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Live rows matching any of ``terms`` and their BM25 scores.  Call with the lock held.
+
+        Views of the growable buffers stay local to this call: an ``array``
+        cannot grow while a numpy view of it is alive.
+        """
+        live = max(self._live, 1)
+        avg_words = max(self._live_words / live, 1e-9)
+        lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        matched_rows, matched_scores = [], []
+        for term in terms:
+            tid = self._term_id.get(term)
+            if tid is None:
+                continue
+            docs = np.frombuffer(self._docs[tid], dtype=np.int32)
+            tf = np.frombuffer(self._tfs[tid], dtype=np.uint16).astype(np.float32)
+            df = len(docs)
+            idf = math.log(1.0 + (live - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_words)
+            matched_rows.append(docs.astype(np.int64))
+            matched_scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+        if not matched_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores))
+        keep = np.frombuffer(self._deleted, dtype=np.uint8)[rows] == 0
+        return rows[keep], scores[keep]
+
+    def close(self) -> None:
+        with self._lock:
+            self._log.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="BM25 lexical search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="Index (or add to an index) a JSONL export of chunks")
+    build_p.add_argument("--chunks", required=True)
+    build_p.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    with open(args.chunks) as fh:
+        records = [json.loads(line) for line in fh if line.strip()]
+    output = Path(args.output) if args.output else DEFAULT_LEXICAL_INDEX_PATH
+    index = Bm25Index(output)
+    stem = Path(args.chunks).stem
+    index.add(
+        [r.get("chunk_id") or f"{stem}:{i}" for i, r in enumerate(records)],
+        [r.get("section_type", "OTHER") for r in records],
+        [r["chunk_text"] for r in records],
+        [r.get("contract_id") for r in records],
+        [r.get("clause_number") for r in records],
+    )
+    index.save()
+    stats = index.stats()
+    print(f"{stats.chunks} chunks, {stats.terms} terms, "
+          f"{stats.postings_bytes} postings bytes in {output}")
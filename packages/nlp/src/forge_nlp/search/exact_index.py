@@ -0,0 +1,322 @@
+"""
+Exact top-k cosine search over a memory-mapped matrix of chunk vectors.
+
+Every similarity query used to go through pgvector.  An ``ExactIndex`` keeps
+a corpus' chunk vectors in the service itself: one ``MmapVectorStore`` of
+unit-length float32 rows, so cosine similarity is a dot product, and a side
+table with each row's chunk id and section type.  A query scans the matrix
+in blocks of ``block_rows`` rows — one BLAS matrix product per block for all
+queries at once — and keeps a running top-k per query with
+``argpartition``, so memory stays bounded by the block size however large
+the corpus grows.  The answer is exact: the baseline approximate indexes
+are measured against, and a fallback when the database is the bottleneck.
+
+Filters on section, contract or clause number resolve to a row bitmap
+(see ``rows.py``).  A filter matching under ``SUBSET_FRACTION`` of the rows
+is answered by scoring just those rows, gathered from the matrix; a broader
+one is cheaper as the full scan with non-matching scores masked out.
+
+Vectors of different embedding versions are not comparable (see
+``reembedding.py``), so an index records the version it holds and refuses
+vectors of any other.
+
+Layout of an index directory::
+
+    meta.json, vectors.f32   an ``MmapVectorStore`` of normalized vectors
+    rows.jsonl               a ``RowTable``: one {"chunk_id", "section_type", …} line per row
+    index.json               {"embedding_version": …}
+
+Usage:
+    # Index a JSONL export of embedded chunks (``/embed-chunks`` records
+    # plus a "chunk_id"; falls back to file:line)
+    python -m forge_nlp.search.exact_index build --chunks embedded_chunks.jsonl
+        --embedding-version nlpaueb/legal-bert-base-uncased [--output DIR]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from forge_nlp.embeddings.vector_store import MmapVectorStore
+from forge_nlp.search.rows import RowTable
+
+logger = logging.getLogger(__name__)
+
+_PKG_ROOT = Path(__file__).resolve().parent.parent.parent.parent  # packages/nlp
+_DEFAULT_INDEX_ROOT = _PKG_ROOT / "models" / "search"
+_ROWS_FILE = "rows.jsonl"
+_INDEX_FILE = "index.json"
+# Rows scored per matrix product: 8192 × 768 float32 is 24 MB of scores input.
+DEFAULT_BLOCK_ROWS = 8192
+# Gathering scattered rows costs up to twice as much per row as streaming
+# them in order, so a subset pays off below about half the matrix.
+SUBSET_FRACTION = 0.5
+
+
+def default_index_path(embedding_version: str) -> Path:
+    """Where ``build`` writes (and the API looks for) the index of an embedding version."""
+    return _DEFAULT_INDEX_ROOT / re.sub(r"[^A-Za-z0-9_.-]+", "__", embedding_version)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length float32 copies of the rows of ``vectors`` (zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+@dataclass
+class SearchHit:
+    """One search result."""
+
+    chunk_id: str
+    score: float  # cosine similarity (BM25 score from a ``Bm25Index``)
+    section_type: str
+    contract_id: str | None = None
+    clause_number: str | None = None
+
+
+def merge_top_k(
+    best_scores: np.ndarray,
+    best_rows: np.ndarray,
+    scores: np.ndarray,
+    first_row: int,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fold a ``(queries, block)`` score block into running ``(queries, ≤k)`` bests.
+
+    Rows are numbered from ``first_row`` within the block.  The result is
+    unordered; sort it once at the end.
+    """
+    if scores.shape[1] > k:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, top, axis=1)
+        rows = top + first_row
+    else:
+        rows = np.broadcast_to(np.arange(first_row, first_row + scores.shape[1]), scores.shape)
+    scores = np.concatenate([best_scores, scores], axis=1)
+    rows = np.concatenate([best_rows, rows], axis=1)
+    if scores.shape[1] > k:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, top, axis=1)
+        rows = np.take_along_axis(rows, top, axis=1)
+    return scores, rows
+
+
+def subset_top_k(
+    matrix: np.ndarray,
+    rows: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Exact ``(queries, ≤k)`` best scores and rows among ``rows`` of ``matrix`` only.
+
+    Unordered, like ``merge_top_k``.
+    """
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_at = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(rows), block_rows):
+        scores = queries @ matrix[rows[start:start + block_rows]].T
+        best_scores, best_at = merge_top_k(best_scores, best_at, scores, start, k)
+    return best_scores, rows[best_at]
+
+
+class ExactIndex:
+    """Brute-force cosine index over a memory-mapped vector matrix.
+
+    Args:
+        path: Index directory.
+        dimensions: Vector size, required to create a new index.
+        embedding_version: Version of the vectors, required to create a new
+            index; an existing index of another version is a ``ValueError``.
+        block_rows: Rows per matrix product during search.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        dimensions: int | None = None,
+        embedding_version: str | None = None,
+        block_rows: int = DEFAULT_BLOCK_ROWS,
+    ) -> None:
+        self.path = Path(path)
+        index_file = self.path / _INDEX_FILE
+        if not index_file.exists() and (dimensions is None or embedding_version is None):
+            raise FileNotFoundError(
+                f"No search index at {self.path}. Run "
+                "`python -m forge_nlp.search.exact_index build --chunks <embedded.jsonl>` first."
+            )
+        self.store = MmapVectorStore(self.path, dimensions=dimensions)
+        if index_file.exists():
+            stored = json.loads(index_file.read_text())["embedding_version"]
+            if embedding_version is not None and embedding_version != stored:
+                raise ValueError(
+                    f"Search index at {self.path} holds {stored} vectors, not {embedding_version}"
+                )
+            embedding_version = stored
+        else:
+            index_file.write_text(json.dumps({"embedding_version": embedding_version}))
+        self.embedding_version: str = embedding_version  # type: ignore[assignment]
+        self.block_rows = block_rows
+        self.rows = RowTable(self.path / _ROWS_FILE)
+        self._lock = threading.Lock()
+        # Searches per strategy: "unfiltered", "subset" or "scan" (masked).
+        self.filter_strategies: Counter[str] = Counter()
+        if len(self.rows) < len(self.store):
+            # Vectors of an interrupted ``add`` whose rows were never written.
+            self.store.truncate(len(self.rows))
+        logger.info("Search index %s: %d chunks", self.path, len(self.rows))
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / _INDEX_FILE).exists()
+
+    @property
+    def dimensions(self) -> int:
+        return self.store.dimensions
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.rows
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def add(
+        self,
+        chunk_ids: list[str],
+        section_types: list[str],
+        vectors: np.ndarray,
+        contract_ids: list[str | None] | None = None,
+        clause_numbers: list[str | None] | None = None,
+    ) -> None:
+        """Append chunks (rows of ``vectors``, normalized here) to the index.
+
+        Raises:
+            ValueError: Lengths disagree, or a chunk id is already indexed.
+        """
+        if not len(chunk_ids) == len(section_types) == len(vectors):
+            raise ValueError(
+                f"Got {len(chunk_ids)} ids, {len(section_types)} section types "
+                f"and {len(vectors)} vectors"
+            )
+        if not chunk_ids:
+            return
+        with self._lock:
+            self.rows.check_new(chunk_ids)
+            # Vectors first: rows.jsonl is the record of which rows are committed.
+            self.store.append(normalize(vectors))
+            self.rows.append(chunk_ids, section_types, contract_ids, clause_numbers)
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        section_types: list[str] | None = None,
+        contract_ids: list[str] | None = None,
+        clause_numbers: list[str] | None = None,
+    ) -> list[list[SearchHit]]:
+        """Top-``k`` chunks by cosine similarity for each row of ``queries``.
+
+        Args:
+            queries: ``(dimensions,)`` or ``(n, dimensions)`` query vectors.
+            section_types: Only return chunks of these sections.
+            contract_ids: Only return chunks of these contracts.
+            clause_numbers: Only return chunks whose clause number starts
+                with one of these (``"52.204"``, ``"252.225-7048"``).
+
+        Returns:
+            One list of hits per query, best first.
+        """
+        queries = normalize(queries)
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Index holds {self.dimensions}-dim vectors, got {queries.shape[1]}-dim queries"
+            )
+        if k < 1:
+            raise ValueError("k must be positive")
+        with self._lock:
+            rows = len(self.rows)
+            matrix = self.store.matrix[:rows]
+            allowed = self.rows.filter(section_types, contract_ids, clause_numbers)
+            subset = mask = None
+            if allowed is None:
+                strategy = "unfiltered"
+            elif len(allowed) <= rows * SUBSET_FRACTION:
+                strategy, subset = "subset", allowed.rows(limit=rows)
+            else:
+                strategy, mask = "scan", allowed.to_mask(rows)
+            self.filter_strategies[strategy] += 1
+
+        if subset is not None:
+            best_scores, best_rows = subset_top_k(matrix, subset, queries, k, self.block_rows)
+            return [self._hits(s, r) for s, r in zip(best_scores, best_rows)]
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, rows, self.block_rows):
+            block = matrix[start:start + self.block_rows]
+            if mask is not None:
+                block_mask = mask[start:start + len(block)]
+                if not block_mask.any():
+                    continue
+            scores = queries @ block.T
+            if mask is not None:
+                scores[:, ~block_mask] = -np.inf
+            best_scores, best_rows = merge_top_k(best_scores, best_rows, scores, start, k)
+        return [self._hits(s, r) for s, r in zip(best_scores, best_rows)]
+
+    def _hits(self, scores: np.ndarray, rows: np.ndarray) -> list[SearchHit]:
+        order = np.argsort(-scores, kind="stable")
+        return [
+            SearchHit(
+                chunk_id=self.rows.chunk_id(row),
+                score=float(scores[i]),
+                section_type=self.rows.section_type(row),
+                contract_id=self.rows.contract_id(row),
+                clause_number=self.rows.clause_number(row),
+            )
+            for i, row in zip(order, rows[order].tolist())
+            if scores[i] != -np.inf
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from forge_nlp.embeddings.corpus import load_embedded_chunks
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Exact in-process vector search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="Index a JSONL export of embedded chunks")
+    build_p.add_argument("--chunks", required=True)
+    build_p.add_argument("--embedding-version", required=True)
+    build_p.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    records, vectors = load_embedded_chunks(args.chunks)
+    output = Path(args.output) if args.output else default_index_path(args.embedding_version)
+    index = ExactIndex(
+        output, dimensions=vectors.shape[1], embedding_version=args.embedding_version
+    )
+    stem = Path(args.chunks).stem
+    index.add(
+        [r.get("chunk_id") or f"{stem}:{i}" for i, r in enumerate(records)],
+        [r.get("section_type", "OTHER") for r in records],
+        vectors,
+        [r.get("contract_id") for r in records],
+        [r.get("clause_number") for r in records],
+    )
+    print(f"{len(index)} chunks ({index.dimensions} dims) in {output}")
@@ -0,0 +1,715 @@
+"""
+Persistent HNSW graph index for approximate top-k cosine search.
+
+Exact search (``exact_index.py``) reads every vector for every query, which
+stops keeping up at a few million chunks.  An ``HnswIndex`` is a
+hierarchical navigable small-world graph (Malkov & Yashunin, 2016): every
+chunk is a node linked to up to ``m`` near neighbours (``2·m`` on the
+bottom layer), and sparser upper layers hold a random subset of the nodes
+for long hops.  A query descends greedily through the upper layers, then
+runs a beam search of width ``ef_search`` over the bottom layer, touching a
+few thousand vectors instead of all of them.  ``ef_search`` trades recall
+for latency and can be set per query; ``m`` and ``ef_construction`` shape
+the graph itself and are fixed when the index is created.
+
+Vectors live in an ``MmapVectorStore`` and chunk metadata in a
+``RowTable``, like the exact index.  The graph is held in memory and
+persisted as a checkpoint plus an append log: every insert or delete
+appends one CRC-checked frame holding the links it created or changed, and
+opening an index loads the checkpoint and replays the log — no distance is
+recomputed.  A torn final frame (a crash mid-write) is cut off, and rows
+whose vectors were stored but never linked are inserted again.
+``checkpoint()``, run automatically once the log outgrows
+``checkpoint_bytes``, writes a new checkpoint and starts a new log.
+
+Deletes are tombstones: a deleted node keeps routing queries through the
+graph but is never returned.  ``replace_contract`` — what
+``IngestionPipeline`` calls when it stores a contract's chunks — inserts
+the new chunks, then tombstones the contract's previous ones.
+
+Filtered queries (section, contract, clause number) pick a strategy from
+the filter's selectivity ``s``, read off the ``RowTable`` bitmaps.  A beam
+search that may only return a fraction ``s`` of the nodes it meets has to
+expand about ``ef / s`` of them at ``2·m`` distances each, while scoring
+the matching rows directly costs ``s·N`` gathered dot products.  Below the
+break-even — a single contract, a rare clause — the index scores the
+subset exactly; above it, it traverses the graph with the filter as an
+admit mask.  ``filter_strategies`` counts which was used.
+
+Layout of an index directory::
+
+    meta.json, vectors.f32   an ``MmapVectorStore`` of normalized vectors
+    rows.jsonl               a ``RowTable``: one {"chunk_id", "section_type",
+                             "contract_id", "clause_number"} line per node
+    index.json               {"kind": "hnsw", "embedding_version", "m", "ef_construction", "seed"}
+    graph.npz                checkpoint of the graph, with its generation g
+    graph.<g>.log            frames appended since checkpoint g
+
+Usage:
+    # Index a JSONL export of embedded chunks (see exact_index.py)
+    python -m forge_nlp.search.hnsw_index build --chunks embedded_chunks.jsonl
+        --embedding-version nlpaueb/legal-bert-base-uncased [--output DIR]
+        [--m 16] [--ef-construction 200]
+
+    # Fold the log into a new checkpoint
+    python -m forge_nlp.search.hnsw_index checkpoint DIR
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import os
+import struct
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from forge_nlp.embeddings.vector_store import MmapVectorStore
+from forge_nlp.search.exact_index import SearchHit, normalize, subset_top_k
+from forge_nlp.search.rows import RowTable
+
+logger = logging.getLogger(__name__)
+
+_ROWS_FILE = "rows.jsonl"
+_INDEX_FILE = "index.json"
+_CHECKPOINT_FILE = "graph.npz"
+_FRAME_HEADER = struct.Struct("<II")  # payload bytes, crc32 of payload
+_INSERT = 1
+_DELETE = 2
+_APPEND = -1  # link update that appends one id instead of replacing the list
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 200
+DEFAULT_EF_SEARCH = 64
+DEFAULT_CHECKPOINT_BYTES = 256 * 1024 * 1024
+# A distance computed while walking the graph (Python heap and set work per
+# node) costs about this many rows scored in a gathered block product.
+TRAVERSAL_COST = 4
+
+
+@dataclass
+class HnswStats:
+    """Size of an HNSW index and of its pending log."""
+
+    nodes: int       # graph nodes, tombstoned ones included
+    live: int        # nodes that can be returned
+    deleted: int
+    max_level: int
+    log_bytes: int   # frames not yet folded into the checkpoint
+
+
+class HnswIndex:
+    """Approximate cosine index over a persistent HNSW graph.
+
+    Args:
+        path: Index directory.
+        dimensions: Vector size, required to create a new index.
+        embedding_version: Version of the vectors, required to create a new
+            index; an existing index of another version is a ``ValueError``.
+        m: Links per node on the upper layers (``2·m`` on the bottom one).
+            New indexes only.
+        ef_construction: Beam width while inserting.  New indexes only.
+        ef_search: Default beam width of a query.
+        checkpoint_bytes: Log size after which an insert writes a checkpoint.
+        seed: Seed of the node levels.  New indexes only.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        dimensions: int | None = None,
+        embedding_version: str | None = None,
+        m: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES,
+        seed: int = 0,
+    ) -> None:
+        self.path = Path(path)
+        index_file = self.path / _INDEX_FILE
+        if index_file.exists():
+            config = json.loads(index_file.read_text())
+            if config.get("kind") != "hnsw":
+                raise ValueError(
+                    f"{self.path} holds an {config.get('kind', 'exact')} index, not HNSW"
+                )
+            if embedding_version is not None and embedding_version != config["embedding_version"]:
+                raise ValueError(
+                    f"Search index at {self.path} holds {config['embedding_version']} vectors, "
+                    f"not {embedding_version}"
+                )
+            self.store = MmapVectorStore(self.path, dimensions=dimensions)
+        elif dimensions is None or embedding_version is None:
+            raise FileNotFoundError(
+                f"No search index at {self.path}. Run "
+                "`python -m forge_nlp.search.hnsw_index build --chunks <embedded.jsonl>` first."
+            )
+        else:
+            if m < 2:
+                raise ValueError("m must be at least 2")
+            config = {
+                "kind": "hnsw",
+                "embedding_version": embedding_version,
+                "m": m,
+                "ef_construction": ef_construction,
+                "seed": seed,
+            }
+            self.store = MmapVectorStore(self.path, dimensions=dimensions)
+            index_file.write_text(json.dumps(config))
+        self.embedding_version: str = config["embedding_version"]
+        self.m: int = config["m"]
+        self.m0 = 2 * self.m
+        self.ef_construction: int = config["ef_construction"]
+        self.ef_search = ef_search
+        self.checkpoint_bytes = checkpoint_bytes
+        self._seed: int = config["seed"]
+        self._level_mult = 1 / math.log(self.m)
+        self._lock = threading.RLock()
+        # Searches per strategy: "unfiltered", "subset" or "traversal".
+        self.filter_strategies: Counter[str] = Counter()
+
+        self.rows = RowTable(self.path / _ROWS_FILE)
+        if len(self.rows) < len(self.store):
+            # Vectors of an interrupted ``add`` whose rows were never written.
+            self.store.truncate(len(self.rows))
+
+        # Graph: bottom layer as a fixed-width array, upper layers as dicts.
+        self._levels: list[int] = []
+        self._links0 = np.full((0, self.m0), -1, dtype=np.int32)
+        self._counts0 = np.zeros(0, dtype=np.int32)
+        self._upper: list[dict[int, list[int]]] = []  # layer l ≥ 1 at [l - 1]
+        self._deleted = np.zeros(0, dtype=bool)
+        self._deleted_count = 0
+        self._entry = -1
+        self._generation = 0
+        self._load_checkpoint()
+        self._log_path = self.path / f"graph.{self._generation}.log"
+        self._replay_log()
+        self._log = self._log_path.open("ab")
+        if len(self._levels) < len(self.rows):
+            logger.info("Linking %d stored but unlinked chunks", len(self.rows) - len(self._levels))
+            self._link_pending()
+        logger.info(
+            "HNSW index %s: %d chunks (%d deleted)", self.path, self.rows.live, self._deleted_count,
+        )
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / _INDEX_FILE).exists()
+
+    @property
+    def dimensions(self) -> int:
+        return self.store.dimensions
+
+    def __len__(self) -> int:
+        return self.rows.live
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.rows
+
+    def stats(self) -> HnswStats:
+        with self._lock:
+            return HnswStats(
+                nodes=len(self._levels),
+                live=self.rows.live,
+                deleted=self._deleted_count,
+                max_level=self._levels[self._entry] if self._entry >= 0 else -1,
+                log_bytes=self._log.tell(),
+            )
+
+    # ─── Graph storage ────────────────────────────────────────────────
+
+    def _neighbours(self, node: int, layer: int) -> list[int]:
+        if layer == 0:
+            return self._links0[node, :self._counts0[node]].tolist()
+        return self._upper[layer - 1].get(node, [])
+
+    def _set_links(self, node: int, layer: int, links: list[int]) -> None:
+        if layer == 0:
+            self._links0[node, :len(links)] = links
+            self._links0[node, len(links):] = -1
+            self._counts0[node] = len(links)
+        else:
+            self._upper[layer - 1][node] = list(links)
+
+    def _append_link(self, node: int, layer: int, link: int) -> None:
+        if layer == 0:
+            self._links0[node, self._counts0[node]] = link
+            self._counts0[node] += 1
+        else:
+            self._upper[layer - 1][node].append(link)
+
+    def _matrix(self) -> np.ndarray:
+        # A plain ndarray view of the memory map: indexing an ``np.memmap``
+        # costs several times more per call, and the graph walk makes many.
+        return self.store.matrix.view(np.ndarray)
+
+    def _grow(self, nodes: int) -> None:
+        capacity = len(self._counts0)
+        if nodes <= capacity:
+            return
+        capacity = max(nodes, 2 * capacity, 1024)
+        links0 = np.full((capacity, self.m0), -1, dtype=np.int32)
+        links0[:len(self._links0)] = self._links0
+        self._links0 = links0
+        self._counts0 = np.concatenate(
+            [self._counts0, np.zeros(capacity - len(self._counts0), np.int32)]
+        )
+        self._deleted = np.concatenate(
+            [self._deleted, np.zeros(capacity - len(self._deleted), bool)]
+        )
+
+    # ─── Log ──────────────────────────────────────────────────────────
+
+    def _write_frame(self, payload: list[int]) -> None:
+        data = np.asarray(payload, dtype="<i4").tobytes()
+        self._log.write(_FRAME_HEADER.pack(len(data), zlib.crc32(data)) + data)
+        self._log.flush()
+
+    def _apply_frame(self, values: list[int]) -> None:
+        """Apply one log frame to the in-memory graph (inserts and replay alike)."""
+        if values[0] == _DELETE:
+            for node in values[1:]:
+                if not self._deleted[node]:
+                    self._deleted[node] = True
+                    self._deleted_count += 1
+                    self.rows.forget(node)
+            return
+        _, node, level, entry = values[:4]
+        self._grow(node + 1)
+        self._levels.append(level)
+        while len(self._upper) < level:
+            self._upper.append({})
+        pos = 4
+        for layer in range(level + 1):
+            count = values[pos]
+            self._set_links(node, layer, values[pos + 1:pos + 1 + count])
+            pos += 1 + count
+        while pos < len(values):
+            layer, target, count = values[pos:pos + 3]
+            if count == _APPEND:
+                self._append_link(target, layer, values[pos + 3])
+                pos += 4
+            else:
+                self._set_links(target, layer, values[pos + 3:pos + 3 + count])
+                pos += 3 + count
+        self._entry = entry
+
+    def _replay_log(self) -> None:
+        if not self._log_path.exists():
+            return
+        data = self._log_path.read_bytes()
+        pos = 0
+        while pos + _FRAME_HEADER.size <= len(data):
+            size, crc = _FRAME_HEADER.unpack_from(data, pos)
+            body = data[pos + _FRAME_HEADER.size:pos + _FRAME_HEADER.size + size]
+            if len(body) < size or zlib.crc32(body) != crc:
+                break
+            self._apply_frame(np.frombuffer(body, dtype="<i4").tolist())
+            pos += _FRAME_HEADER.size + size
+        if pos < len(data):
+            logger.warning(
+                "Discarding %d bytes of torn log frame in %s", len(data) - pos, self._log_path
+            )
+            with self._log_path.open("r+b") as fh:
+                fh.truncate(pos)
+
+    def _load_checkpoint(self) -> None:
+        path = self.path / _CHECKPOINT_FILE
+        if not path.exists():
+            return
+        with np.load(path) as ckpt:
+            self._generation = int(ckpt["generation"])
+            self._levels = ckpt["levels"].tolist()
+            nodes = len(self._levels)
+            self._grow(nodes)
+            self._links0[:nodes] = ckpt["links0"]
+            self._counts0[:nodes] = ckpt["counts0"]
+            self._deleted[:nodes] = ckpt["deleted"]
+            self._entry = int(ckpt["entry"])
+            offsets = ckpt["upper_offsets"].tolist()
+            ids = ckpt["upper_ids"].tolist()
+            self._upper = [{} for _ in range(max(self._levels, default=0))]
+            for i, (layer, node) in enumerate(zip(ckpt["upper_layers"].tolist(),
+                                                  ckpt["upper_nodes"].tolist())):
+                self._upper[layer - 1][node] = ids[offsets[i]:offsets[i + 1]]
+        for node in np.flatnonzero(self._deleted[:nodes]).tolist():
+            self.rows.forget(node)
+        self._deleted_count = int(self._deleted[:nodes].sum())
+
+    def checkpoint(self) -> None:
+        """Write the whole graph as a new checkpoint and start an empty log."""
+        with self._lock:
+            nodes = len(self._levels)
+            layers, owners, offsets, ids = [], [], [0], []
+            for layer, links in enumerate(self._upper, start=1):
+                for node, neighbours in links.items():
+                    layers.append(layer)
+                    owners.append(node)
+                    ids.extend(neighbours)
+                    offsets.append(len(ids))
+            generation = self._generation + 1
+            tmp = self.path / (_CHECKPOINT_FILE + ".tmp")
+            with tmp.open("wb") as fh:
+                np.savez(
+                    fh,
+                    generation=generation,
+                    levels=np.asarray(self._levels, dtype=np.int8),
+                    links0=self._links0[:nodes],
+                    counts0=self._counts0[:nodes],
+                    deleted=self._deleted[:nodes],
+                    entry=self._entry,
+                    upper_layers=np.asarray(layers, dtype=np.int8),
+                    upper_nodes=np.asarray(owners, dtype=np.int32),
+                    upper_offsets=np.asarray(offsets, dtype=np.int64),
+                    upper_ids=np.asarray(ids, dtype=np.int32),
+                )
+            os.replace(tmp, self.path / _CHECKPOINT_FILE)
+            # The new checkpoint covers the old log; a crash from here on
+            # finds no log of the new generation, which is an empty one.
+            self._log.close()
+            old_log = self._log_path
+            self._generation = generation
+            self._log_path = self.path / f"graph.{generation}.log"
+            self._log = self._log_path.open("ab")
+            old_log.unlink(missing_ok=True)
+            logger.info("HNSW checkpoint %d: %d nodes", generation, nodes)
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def add(
+        self,
+        chunk_ids: list[str],
+        section_types: list[str],
+        vectors: np.ndarray,
+        contract_ids: list[str | None] | None = None,
+        clause_numbers: list[str | None] | None = None,
+    ) -> None:
+        """Insert chunks (rows of ``vectors``, normalized here) into the graph.
+
+        Raises:
+            ValueError: Lengths disagree, or a chunk id is already indexed.
+        """
+        if not len(chunk_ids) == len(section_types) == len(vectors):
+            raise ValueError(
+                f"Got {len(chunk_ids)} ids, {len(section_types)} section types "
+                f"and {len(vectors)} vectors"
+            )
+        if contract_ids is not None and len(contract_ids) != len(chunk_ids):
+            raise ValueError(f"Got {len(chunk_ids)} ids and {len(contract_ids)} contract ids")
+        if clause_numbers is not None and len(clause_numbers) != len(chunk_ids):
+            raise ValueError(f"Got {len(chunk_ids)} ids and {len(clause_numbers)} clause numbers")
+        if not chunk_ids:
+            return
+        with self._lock:
+            self.rows.check_new(chunk_ids)
+            # Vectors, then rows, then one log frame per linked node.
+            self.store.append(normalize(vectors))
+            self.rows.append(chunk_ids, section_types, contract_ids, clause_numbers)
+        self._link_pending()
+
+    def delete(self, chunk_ids: list[str]) -> int:
+        """Tombstone chunks; returns how many were live."""
+        with self._lock:
+            rows = [r for r in (self.rows.row(cid) for cid in chunk_ids) if r is not None]
+            self._delete_rows(rows)
+        return len(rows)
+
+    def delete_contract(self, contract_id: str) -> int:
+        """Tombstone every live chunk of a contract; returns how many."""
+        with self._lock:
+            rows = self.rows.contract_rows(contract_id)
+            self._delete_rows(rows)
+        return len(rows)
+
+    def replace_contract(
+        self,
+        contract_id: str,
+        chunk_ids: list[str],
+        section_types: list[str],
+        vectors: np.ndarray,
+        clause_numbers: list[str | None] | None = None,
+    ) -> int:
+        """Index a contract's new chunks, then tombstone its previous ones.
+
+        Returns the number of chunks tombstoned.  Until the tombstones land,
+        queries may see both versions, never neither.
+        """
+        with self._lock:
+            previous = self.rows.contract_rows(contract_id)
+        self.add(chunk_ids, section_types, vectors, [contract_id] * len(chunk_ids), clause_numbers)
+        with self._lock:
+            self._delete_rows(previous)
+        return len(previous)
+
+    def _delete_rows(self, rows: list[int]) -> None:
+        if rows:
+            payload = [_DELETE, *rows]
+            self._write_frame(payload)
+            self._apply_frame(payload)
+
+    def _link_pending(self) -> None:
+        """Insert stored rows that have no graph node yet, one lock hold each."""
+        while True:
+            with self._lock:
+                node = len(self._levels)
+                if node >= len(self.rows):
+                    break
+                payload = self._insert_frame(node)
+                self._write_frame(payload)
+                self._apply_frame(payload)
+                if self._log.tell() > self.checkpoint_bytes:
+                    self.checkpoint()
+
+    def _random_level(self, node: int) -> int:
+        u = np.random.default_rng([self._seed, node]).random()
+        return int(-math.log(1.0 - u) * self._level_mult)
+
+    def _insert_frame(self, node: int) -> list[int]:
+        """Compute the links of a new node as a log frame, without applying it."""
+        query = np.array(self._matrix()[node])
+        level = self._random_level(node)
+        layers: list[list[int]] = [[] for _ in range(level + 1)]
+        updates: list[int] = []
+        entry = self._entry
+        if entry < 0:
+            entry = node
+        else:
+            top = self._levels[entry]
+            nearest = [entry]
+            for layer in range(top, level, -1):
+                nearest = [self._search_layer(query, nearest, 1, layer)[0][1]]
+            for layer in range(min(level, top), -1, -1):
+                found = self._search_layer(query, nearest, self.ef_construction, layer)
+                layers[layer] = self._select(found, self.m)
+                cap = self.m0 if layer == 0 else self.m
+                for neighbour in layers[layer]:
+                    updates.extend(self._link_back(neighbour, node, layer, cap))
+                nearest = [n for _, n in found]
+            if level > top:
+                entry = node
+        payload = [_INSERT, node, level, entry]
+        for links in layers:
+            payload += [len(links), *links]
+        return payload + updates
+
+    def _link_back(self, node: int, link: int, layer: int, cap: int) -> list[int]:
+        """Log update adding ``link`` to ``node``'s list, pruning it when full."""
+        links = self._neighbours(node, layer)
+        if len(links) < cap:
+            return [layer, node, _APPEND, link]
+        candidates = [*links, link]
+        matrix = self._matrix()
+        dists = 1.0 - matrix[candidates] @ matrix[node]
+        order = np.argsort(dists, kind="stable")
+        kept = self._select([(float(dists[i]), candidates[i]) for i in order], cap)
+        return [layer, node, len(kept), *kept]
+
+    def _select(self, found: list[tuple[float, int]], count: int) -> list[int]:
+        """Neighbour-selection heuristic: keep candidates (nearest first) that
+        are closer to the query than to every neighbour kept so far, which
+        spreads links across directions instead of one dense cluster."""
+        if len(found) <= count:
+            return [n for _, n in found]
+        ids = [n for _, n in found]
+        dists = np.asarray([d for d, _ in found], dtype=np.float32)
+        vectors = self._matrix()[ids]
+        # closer[i, j]: candidate i is nearer to the query than to candidate j.
+        closer = (1.0 - vectors @ vectors.T) > dists[:, None]
+        blocked = np.zeros(len(ids), dtype=bool)
+        kept: list[int] = []
+        start = 0
+        while len(kept) < count:
+            free = np.flatnonzero(~blocked[start:])
+            if not len(free):
+                break
+            i = start + int(free[0])
+            kept.append(ids[i])
+            blocked |= ~closer[:, i]
+            start = i + 1
+        return kept
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: list[int],
+        ef: int,
+        layer: int,
+        admit: np.ndarray | None = None,
+    ) -> list[tuple[float, int]]:
+        """Beam search of one layer: up to ``ef`` ``(distance, node)`` pairs, nearest first.
+
+        Nodes outside ``admit`` still route the search but are not returned.
+        """
+        matrix = self._matrix()
+        dists = (1.0 - matrix[entry_points] @ query).tolist()
+        visited = set(entry_points)
+        candidates = list(zip(dists, entry_points))
+        heapq.heapify(candidates)
+        results: list[tuple[float, int]] = []  # max-heap of (-distance, node)
+        for dist, node in candidates:
+            if admit is None or admit[node]:
+                heapq.heappush(results, (-dist, node))
+                if len(results) > ef:
+                    heapq.heappop(results)
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if len(results) >= ef and dist > -results[0][0]:
+                break
+            fresh = [n for n in self._neighbours(node, layer) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            dists = 1.0 - matrix[fresh] @ query
+            if len(results) >= ef:
+                # Cheap pre-filter against the current bound, which only tightens.
+                close = np.flatnonzero(dists < -results[0][0])
+                if not len(close):
+                    continue
+                fresh = [fresh[i] for i in close.tolist()]
+                dists = dists[close]
+            for d, n in zip(dists.tolist(), fresh):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    if admit is None or admit[n]:
+                        heapq.heappush(results, (-d, n))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+        return sorted((-d, n) for d, n in results)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        section_types: list[str] | None = None,
+        ef_search: int | None = None,
+        contract_ids: list[str] | None = None,
+        clause_numbers: list[str] | None = None,
+    ) -> list[list[SearchHit]]:
+        """Approximate top-``k`` chunks by cosine similarity for each row of ``queries``.
+
+        Selective filters are answered exactly from the matching rows (see
+        the module docstring).
+
+        Args:
+            queries: ``(dimensions,)`` or ``(n, dimensions)`` query vectors.
+            section_types: Only return chunks of these sections.
+            ef_search: Beam width for these queries (default: the index's);
+                at least ``k`` is used.
+            contract_ids: Only return chunks of these contracts.
+            clause_numbers: Only return chunks whose clause number starts
+                with one of these.
+
+        Returns:
+            One list of hits per query, best first.
+        """
+        queries = normalize(queries)
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Index holds {self.dimensions}-dim vectors, got {queries.shape[1]}-dim queries"
+            )
+        if k < 1:
+            raise ValueError("k must be positive")
+        ef = max(ef_search or self.ef_search, k)
+        with self._lock:
+            if self._entry < 0:
+                return [[] for _ in queries]
+            nodes = len(self._levels)
+            admit = ~self._deleted[:nodes] if self._deleted_count else None
+            allowed = self.rows.filter(section_types, contract_ids, clause_numbers)
+            if allowed is None:
+                self.filter_strategies["unfiltered"] += 1
+            elif len(allowed) * len(allowed) / nodes <= TRAVERSAL_COST * ef * self.m0:
+                # s·N rows scored directly vs. (ef / s)·2m distances walked.
+                self.filter_strategies["subset"] += 1
+                rows = allowed.rows(limit=nodes)
+                if admit is not None:
+                    rows = rows[admit[rows]]
+                best_scores, best_rows = subset_top_k(self._matrix(), rows, queries, k)
+                return [self._subset_hits(s, r) for s, r in zip(best_scores, best_rows)]
+            else:
+                self.filter_strategies["traversal"] += 1
+                mask = allowed.to_mask(nodes)
+                admit = mask if admit is None else admit & mask
+            return [self._search_one(q, k, ef, admit) for q in queries]
+
+    def _subset_hits(self, scores: np.ndarray, rows: np.ndarray) -> list[SearchHit]:
+        order = np.argsort(-scores, kind="stable")
+        return [self._hit(row, float(scores[i])) for i, row in zip(order, rows[order].tolist())]
+
+    def _hit(self, node: int, score: float) -> SearchHit:
+        return SearchHit(
+            chunk_id=self.rows.chunk_id(node),
+            score=score,
+            section_type=self.rows.section_type(node),
+            contract_id=self.rows.contract_id(node),
+            clause_number=self.rows.clause_number(node),
+        )
+
+    def _search_one(
+        self, query: np.ndarray, k: int, ef: int, admit: np.ndarray | None,
+    ) -> list[SearchHit]:
+        nearest = [self._entry]
+        for layer in range(self._levels[self._entry], 0, -1):
+            nearest = [self._search_layer(query, nearest, 1, layer)[0][1]]
+        found = self._search_layer(query, nearest, ef, 0, admit)
+        return [self._hit(node, 1.0 - dist) for dist, node in found[:k]]
+
+    def close(self) -> None:
+        with self._lock:
+            self._log.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from forge_nlp.embeddings.corpus import load_embedded_chunks
+    from forge_nlp.search.exact_index import default_index_path
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Persistent HNSW vector search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser(
+        "build", help="Index (or add to an index) a JSONL export of embedded chunks"
+    )
+    build_p.add_argument("--chunks", required=True)
+    build_p.add_argument("--embedding-version", required=True)
+    build_p.add_argument("--output", default=None)
+    build_p.add_argument("--m", type=int, default=DEFAULT_M)
+    build_p.add_argument("--ef-construction", type=int, default=DEFAULT_EF_CONSTRUCTION)
+    ckpt_p = sub.add_parser("checkpoint", help="Fold an index's log into a new checkpoint")
+    ckpt_p.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        records, vectors = load_embedded_chunks(args.chunks)
+        output = Path(args.output) if args.output else default_index_path(args.embedding_version)
+        index = HnswIndex(
+            output, dimensions=vectors.shape[1], embedding_version=args.embedding_version,
+            m=args.m, ef_construction=args.ef_construction,
+        )
+        stem = Path(args.chunks).stem
+        index.add(
+            [r.get("chunk_id") or f"{stem}:{i}" for i, r in enumerate(records)],
+            [r.get("section_type", "OTHER") for r in records],
+            vectors,
+            [r.get("contract_id") for r in records],
+            [r.get("clause_number") for r in records],
+        )
+        index.checkpoint()
+        print(f"{len(index)} chunks ({index.dimensions} dims) in {output}")
+    else:
+        index = HnswIndex(args.path)
+        index.checkpoint()
+        stats = index.stats()
+        print(f"{stats.live} chunks, {stats.deleted} deleted, {stats.nodes} nodes in {args.path}")
@@ -0,0 +1,166 @@
+"""
+Hybrid retrieval: BM25 candidates reranked with dense similarity.
+
+Lexical and dense retrieval fail differently.  BM25 (``bm25_index.py``)
+finds the chunk citing 52.204-21 or CLIN 0001AA and misses paraphrases;
+LegalBERT vectors find paraphrases and blur identifiers.  A hybrid query
+runs in two stages:
+
+1. **lexical** — the top ``candidates`` chunks by BM25 (filters applied);
+2. **dense** — the query vector is scored against exactly those chunks,
+   read by chunk id from the vector index, and the two rankings are fused
+   by reciprocal rank fusion (Cormack et al., 2009): a chunk scores
+   ``1 / (rrf_k + lexical rank) + 1 / (rrf_k + dense rank)``.
+
+Restricting the dense stage to the lexical candidates makes it a few
+hundred dot products instead of an index search.  A query with no lexical
+match at all (every word unknown to the index) falls back to plain dense
+search.  ``HybridResult`` carries the time of each stage.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from forge_nlp.search.bm25_index import Bm25Index
+from forge_nlp.search.exact_index import SearchHit, normalize
+from forge_nlp.search.index import SearchIndex
+
+DEFAULT_CANDIDATES = 200
+DEFAULT_RRF_K = 60
+
+
+@dataclass
+class HybridHit:
+    """One fused result."""
+
+    chunk_id: str
+    score: float                # reciprocal rank fusion score
+    section_type: str
+    contract_id: str | None
+    clause_number: str | None
+    lexical_score: float | None  # BM25; None on the dense fallback
+    dense_score: float | None    # cosine; None if the chunk is not in the vector index
+
+
+@dataclass
+class HybridResult:
+    hits: list[HybridHit]
+    candidates: int     # lexical candidates the dense stage was restricted to
+    fallback: bool      # no lexical match: the hits are a plain dense search
+    lexical_ms: float
+    dense_ms: float
+
+
+def dense_scores(index: SearchIndex, query: np.ndarray, chunk_ids: list[str]) -> np.ndarray:
+    """Cosine similarity of ``query`` to each chunk, NaN for chunks the index lacks."""
+    query = normalize(query)[0]
+    rows = [index.rows.row(cid) for cid in chunk_ids]
+    present = np.array([r is not None for r in rows], dtype=bool)
+    scores = np.full(len(chunk_ids), np.nan, dtype=np.float32)
+    if present.any():
+        found = np.array([r for r in rows if r is not None], dtype=np.int64)
+        order = np.argsort(found)  # sequential reads from the memory map
+        scores[np.flatnonzero(present)[order]] = index.store.matrix[found[order]] @ query
+    return scores
+
+
+def rerank(
+    index: SearchIndex,
+    query: np.ndarray,
+    lexical_hits: list[SearchHit],
+    k: int = 10,
+    rrf_k: int = DEFAULT_RRF_K,
+) -> list[HybridHit]:
+    """Score BM25 candidates (best first) with ``query`` and fuse the two rankings."""
+    dense = dense_scores(index, query, [h.chunk_id for h in lexical_hits])
+    fused = 1.0 / (rrf_k + np.arange(1, len(lexical_hits) + 1))
+    ranked = np.flatnonzero(~np.isnan(dense))
+    ranked = ranked[np.argsort(-dense[ranked], kind="stable")]
+    fused[ranked] += 1.0 / (rrf_k + np.arange(1, len(ranked) + 1))
+    top = np.argsort(-fused, kind="stable")[:k]
+    return [
+        HybridHit(
+            chunk_id=lexical_hits[i].chunk_id,
+            score=float(fused[i]),
+            section_type=lexical_hits[i].section_type,
+            contract_id=lexical_hits[i].contract_id,
+            clause_number=lexical_hits[i].clause_number,
+            lexical_score=lexical_hits[i].score,
+            dense_score=None if np.isnan(dense[i]) else float(dense[i]),
+        )
+        for i in top.tolist()
+    ]
+
+
+def dense_stage(
+    index: SearchIndex,
+    query: np.ndarray,
+    lexical_hits: list[SearchHit],
+    k: int = 10,
+    rrf_k: int = DEFAULT_RRF_K,
+    section_types: list[str] | None = None,
+    contract_ids: list[str] | None = None,
+    clause_numbers: list[str] | None = None,
+) -> list[HybridHit]:
+    """``rerank`` the lexical candidates, or search ``index`` if there are none."""
+    if lexical_hits:
+        return rerank(index, query, lexical_hits, k, rrf_k)
+    [hits] = index.search(
+        query, k, section_types=section_types, contract_ids=contract_ids,
+        clause_numbers=clause_numbers,
+    )
+    return [
+        HybridHit(
+            chunk_id=h.chunk_id,
+            score=1.0 / (rrf_k + rank),
+            section_type=h.section_type,
+            contract_id=h.contract_id,
+            clause_number=h.clause_number,
+            lexical_score=None,
+            dense_score=h.score,
+        )
+        for rank, h in enumerate(hits, start=1)
+    ]
+
+
+def hybrid_search(
+    lexical: Bm25Index,
+    index: SearchIndex,
+    query: str,
+    query_vector: np.ndarray,
+    k: int = 10,
+    candidates: int = DEFAULT_CANDIDATES,
+    rrf_k: int = DEFAULT_RRF_K,
+    section_types: list[str] | None = None,
+    contract_ids: list[str] | None = None,
+    clause_numbers: list[str] | None = None,
+) -> HybridResult:
+    """Both stages for one query whose embedding is ``query_vector``.
+
+    Args:
+        lexical: BM25 index over the chunks' text.
+        index: Vector index over the same chunk ids.
+        candidates: BM25 hits passed to the dense stage (at least ``k``).
+        rrf_k: Rank offset of the fusion; larger flattens the rank weights.
+    """
+    filters = {
+        "section_types": section_types,
+        "contract_ids": contract_ids,
+        "clause_numbers": clause_numbers,
+    }
+    started = time.perf_counter()
+    lexical_hits = lexical.search(query, max(candidates, k), **filters)
+    lexical_done = time.perf_counter()
+    hits = dense_stage(index, query_vector, lexical_hits, k, rrf_k, **filters)
+    finished = time.perf_counter()
+    return HybridResult(
+        hits=hits,
+        candidates=len(lexical_hits),
+        fallback=not lexical_hits,
+        lexical_ms=(lexical_done - started) * 1000,
+        dense_ms=(finished - lexical_done) * 1000,
+    )
@@ -0,0 +1,43 @@
+"""
+Opening whichever kind of search index a directory holds.
+
+Each index writes ``index.json`` with a ``kind`` (exact indexes predate the
+field and omit it), so the API and tools can take a directory without
+being told what is in it.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from forge_nlp.search.exact_index import ExactIndex
+from forge_nlp.search.hnsw_index import HnswIndex
+from forge_nlp.search.ivfpq_index import IvfPqIndex
+
+SearchIndex = ExactIndex | HnswIndex | IvfPqIndex
+
+_INDEX_FILE = "index.json"
+
+
+def index_kind(path: str | Path) -> str | None:
+    """``"exact"``, ``"hnsw"`` or ``"ivfpq"``, or ``None`` if there is no index at ``path``."""
+    index_file = Path(path) / _INDEX_FILE
+    if not index_file.exists():
+        return None
+    return json.loads(index_file.read_text()).get("kind", "exact")
+
+
+def open_index(path: str | Path, embedding_version: str | None = None) -> SearchIndex:
+    """Open the index at ``path``, whatever its kind.
+
+    Raises:
+        FileNotFoundError: No index at ``path``.
+        ValueError: ``embedding_version`` given and the index holds another.
+    """
+    kind = index_kind(path)
+    if kind == "hnsw":
+        return HnswIndex(path, embedding_version=embedding_version)
+    if kind == "ivfpq":
+        return IvfPqIndex(path, embedding_version=embedding_version)
+    return ExactIndex(path, embedding_version=embedding_version)
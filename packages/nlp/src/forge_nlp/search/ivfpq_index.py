@@ -0,0 +1,534 @@
+"""
+Compressed IVF-PQ index: a few dozen bytes of RAM per chunk vector.
+
+Exact and HNSW search read full float32 vectors, 3 KB each at 768
+dimensions, which does not fit in memory across the whole contract archive.
+An ``IvfPqIndex`` keeps only compact codes in RAM (Jégou et al., "Product
+quantization for nearest neighbor search", 2011):
+
+* an **inverted file** — k-means ``centroids`` split the space into
+  ``nlist`` cells, and each chunk is filed under its nearest centroid;
+* **product quantization** of the residual (vector minus its centroid) —
+  the residual is cut into ``subquantizers`` sub-vectors, each replaced by
+  the index of its nearest of 256 codewords, so a vector is stored as
+  ``subquantizers`` bytes (48 for 768 dimensions by default).
+
+A query scores only the ``nprobe`` cells nearest to it.  Since
+``q·x ≈ q·centroid + Σ_j q_j·codeword_j``, one ``(subquantizers, 256)``
+lookup table per query turns scoring a code into ``subquantizers`` table
+reads.  The best ``k · refine_factor`` candidates are then re-scored
+exactly against their full vectors, read from a memory-mapped store that
+lives in the page cache rather than the Python heap, and the top ``k`` of
+those are returned.
+
+A filter (section, contract, clause number) resolves to a ``RowTable``
+bitmap.  When it matches no more rows than the ``nprobe`` cells would hold
+anyway, the query scores the codes of exactly those rows instead of
+probing — no more work, and a narrow filter (one contract) cannot miss its
+rows by their lying outside the probed cells.  Broader filters probe as
+usual and mask out non-matching rows.  ``filter_strategies`` counts which
+was used.
+
+Both quantizers are trained once (``IvfPqIndex.train``) on a sample of
+``EmbeddingService`` output; afterwards ``add`` encodes new chunks and
+``save`` writes the codes.  Codes are derived from the full vectors, so
+rows added after the last ``save`` are simply re-encoded on load.
+
+Layout of an index directory::
+
+    meta.json, vectors.f32   an ``MmapVectorStore`` of normalized vectors (refinement)
+    rows.jsonl               a ``RowTable``: one {"chunk_id", "section_type", …} line per row
+    index.json               {"kind": "ivfpq", "embedding_version", "nlist", "subquantizers"}
+    quantizer.npz            coarse centroids and PQ codebooks
+    codes.npz                codes and cells of the rows at the last ``save``
+
+Usage:
+    # Train on a sample of an embedded-chunks export, then index all of it
+    python -m forge_nlp.search.ivfpq_index build --chunks embedded_chunks.jsonl
+        --embedding-version nlpaueb/legal-bert-base-uncased [--output DIR]
+        [--nlist 1024] [--subquantizers 48] [--train-size 100000]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from forge_nlp.embeddings.vector_store import MmapVectorStore
+from forge_nlp.search.exact_index import SearchHit, normalize
+from forge_nlp.search.rows import RowTable
+
+logger = logging.getLogger(__name__)
+
+_ROWS_FILE = "rows.jsonl"
+_INDEX_FILE = "index.json"
+_QUANTIZER_FILE = "quantizer.npz"
+_CODES_FILE = "codes.npz"
+_CODEWORDS = 256  # one byte per sub-vector
+# Rows per block when assigning vectors to centroids: bounds the distance matrix.
+_ASSIGN_BLOCK = 16384
+
+DEFAULT_SUBQUANTIZERS = 48
+DEFAULT_NPROBE = 16
+DEFAULT_REFINE_FACTOR = 10
+
+
+def nearest_centroid(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest (L2) centroid for each row of ``vectors``."""
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        block = vectors[start:start + _ASSIGN_BLOCK]
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return assign
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means from ``k`` random rows; returns ``(k, dim)`` float32 centroids.
+
+    A cluster that empties out is re-seeded with a random row.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) < k:
+        raise ValueError(
+            f"k-means with {k} clusters needs at least {k} vectors, got {len(vectors)}"
+        )
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = nearest_centroid(vectors, centroids)
+        counts = np.bincount(assign, minlength=k)
+        order = np.argsort(assign, kind="stable")
+        filled = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[filled]
+        centroids[filled] = np.add.reduceat(vectors[order], starts, axis=0) / counts[filled, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+    return centroids
+
+
+@dataclass
+class IvfPqQuantizer:
+    """Coarse centroids plus per-sub-vector codebooks for the residuals."""
+
+    centroids: np.ndarray  # (nlist, dim)
+    codebooks: np.ndarray  # (subquantizers, 256, dim // subquantizers)
+
+    @classmethod
+    def fit(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        subquantizers: int = DEFAULT_SUBQUANTIZERS,
+        iterations: int = 20,
+        seed: int = 0,
+    ) -> IvfPqQuantizer:
+        """Train on a ``(n, dim)`` sample of unit-length vectors (``n`` ≥ 256 and ≥ ``nlist``)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        if dim % subquantizers:
+            raise ValueError(f"{dim} dimensions do not split into {subquantizers} sub-vectors")
+        if len(vectors) < _CODEWORDS:
+            raise ValueError(f"PQ training needs at least {_CODEWORDS} vectors, got {len(vectors)}")
+        centroids = kmeans(vectors, nlist, iterations, seed)
+        residuals = vectors - centroids[nearest_centroid(vectors, centroids)]
+        sub = residuals.reshape(len(vectors), subquantizers, dim // subquantizers)
+        codebooks = np.stack([
+            kmeans(sub[:, j], _CODEWORDS, iterations, seed + 1 + j) for j in range(subquantizers)
+        ])
+        return cls(centroids=centroids, codebooks=codebooks)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def subquantizers(self) -> int:
+        return len(self.codebooks)
+
+    def encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """``(cells, codes)``: each row's centroid and its ``(subquantizers,)`` uint8 code."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        cells = nearest_centroid(vectors, self.centroids)
+        residuals = (vectors - self.centroids[cells]).reshape(len(vectors), self.subquantizers, -1)
+        codes = np.empty((len(vectors), self.subquantizers), dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            codes[:, j] = nearest_centroid(residuals[:, j], codebook)
+        return cells, codes
+
+    def decode(self, cells: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate vectors back from their cells and codes."""
+        parts = self.codebooks[np.arange(self.subquantizers), codes]  # (n, subq, dsub)
+        return self.centroids[cells] + parts.reshape(len(codes), -1)
+
+    def lookup_table(self, query: np.ndarray) -> np.ndarray:
+        """``(subquantizers, 256)`` inner products of the query's sub-vectors with each codeword."""
+        return np.einsum("jcd,jd->jc", self.codebooks, query.reshape(self.subquantizers, -1))
+
+    def save(self, path: str | Path) -> None:
+        np.savez(path, centroids=self.centroids, codebooks=self.codebooks)
+
+    @classmethod
+    def load(cls, path: str | Path) -> IvfPqQuantizer:
+        with np.load(path) as data:
+            return cls(centroids=data["centroids"], codebooks=data["codebooks"])
+
+
+@dataclass
+class IvfPqStats:
+    """Size of an IVF-PQ index and of what it holds in RAM."""
+
+    chunks: int
+    nlist: int
+    subquantizers: int
+    unsaved: int          # rows added since the last ``save``
+    code_bytes: int       # codes plus cell ids, all rows
+    quantizer_bytes: int
+
+    @property
+    def bytes_per_vector(self) -> float:
+        return (self.code_bytes + self.quantizer_bytes) / max(self.chunks, 1)
+
+
+class IvfPqIndex:
+    """Open a trained IVF-PQ index (see ``train`` to create one).
+
+    Args:
+        path: Index directory.
+        embedding_version: If given, the version the index must hold.
+        nprobe: Default cells scanned per query.
+        refine_factor: Default multiple of ``k`` re-scored against full vectors.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        embedding_version: str | None = None,
+        nprobe: int = DEFAULT_NPROBE,
+        refine_factor: int = DEFAULT_REFINE_FACTOR,
+    ) -> None:
+        self.path = Path(path)
+        index_file = self.path / _INDEX_FILE
+        if not index_file.exists():
+            raise FileNotFoundError(
+                f"No search index at {self.path}. Run "
+                "`python -m forge_nlp.search.ivfpq_index build --chunks <embedded.jsonl>` first."
+            )
+        config = json.loads(index_file.read_text())
+        if config.get("kind") != "ivfpq":
+            raise ValueError(
+                f"{self.path} holds an {config.get('kind', 'exact')} index, not IVF-PQ"
+            )
+        if embedding_version is not None and embedding_version != config["embedding_version"]:
+            raise ValueError(
+                f"Search index at {self.path} holds {config['embedding_version']} vectors, "
+                f"not {embedding_version}"
+            )
+        self.embedding_version: str = config["embedding_version"]
+        self.nprobe = nprobe
+        self.refine_factor = refine_factor
+        self.quantizer = IvfPqQuantizer.load(self.path / _QUANTIZER_FILE)
+        self.store = MmapVectorStore(self.path)
+        self.rows = RowTable(self.path / _ROWS_FILE)
+        self._lock = threading.Lock()
+        # Searches per strategy: "unfiltered", "subset" or "probe" (masked).
+        self.filter_strategies: Counter[str] = Counter()
+        if len(self.rows) < len(self.store):
+            # Vectors of an interrupted ``add`` whose rows were never written.
+            self.store.truncate(len(self.rows))
+
+        self._cells = np.empty(0, dtype=np.int32)
+        self._codes = np.empty((0, self.quantizer.subquantizers), dtype=np.uint8)
+        self._size = 0
+        codes_path = self.path / _CODES_FILE
+        if codes_path.exists():
+            with np.load(codes_path) as data:
+                self._append_codes(data["cells"], data["codes"])
+        self._saved = self._size
+        if self._size < len(self.rows):
+            logger.info("Encoding %d rows added after the last save", len(self.rows) - self._size)
+            self._append_codes(*self.quantizer.encode(self.store.matrix[self._size:len(self.rows)]))
+        self._cell_order: np.ndarray | None = None  # rows sorted by cell, rebuilt after adds
+        self._cell_bounds: np.ndarray | None = None
+        logger.info("IVF-PQ index %s: %d chunks", self.path, self._size)
+
+    @classmethod
+    def train(
+        cls,
+        path: str | Path,
+        sample: np.ndarray,
+        embedding_version: str,
+        nlist: int | None = None,
+        subquantizers: int = DEFAULT_SUBQUANTIZERS,
+        iterations: int = 20,
+        seed: int = 0,
+    ) -> IvfPqIndex:
+        """Train the quantizers on ``sample`` and create an empty index at ``path``.
+
+        ``nlist`` defaults to one cell per 39 sample vectors (at most 1024),
+        the fewest points per centroid at which k-means stays stable.
+
+        Raises:
+            FileExistsError: ``path`` already holds an index.
+            ValueError: The sample is too small, or its size does not split
+                into ``subquantizers`` sub-vectors.
+        """
+        path = Path(path)
+        if (path / _INDEX_FILE).exists():
+            raise FileExistsError(f"{path} already holds a search index")
+        sample = normalize(sample)
+        if nlist is None:
+            nlist = min(1024, max(1, len(sample) // 39))
+        quantizer = IvfPqQuantizer.fit(sample, nlist, subquantizers, iterations, seed)
+        MmapVectorStore(path, dimensions=sample.shape[1])
+        quantizer.save(path / _QUANTIZER_FILE)
+        (path / _INDEX_FILE).write_text(json.dumps({
+            "kind": "ivfpq",
+            "embedding_version": embedding_version,
+            "nlist": quantizer.nlist,
+            "subquantizers": quantizer.subquantizers,
+        }))
+        logger.info(
+            "Trained IVF-PQ on %d vectors: %d cells, %d-byte codes",
+            len(sample), nlist, subquantizers,
+        )
+        return cls(path)
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / _INDEX_FILE).exists()
+
+    @property
+    def dimensions(self) -> int:
+        return self.store.dimensions
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.rows
+
+    def stats(self) -> IvfPqStats:
+        with self._lock:
+            return IvfPqStats(
+                chunks=self._size,
+                nlist=self.quantizer.nlist,
+                subquantizers=self.quantizer.subquantizers,
+                unsaved=self._size - self._saved,
+                code_bytes=self._size * (self.quantizer.subquantizers + self._cells.itemsize),
+                quantizer_bytes=self.quantizer.centroids.nbytes + self.quantizer.codebooks.nbytes,
+            )
+
+    def _append_codes(self, cells: np.ndarray, codes: np.ndarray) -> None:
+        needed = self._size + len(cells)
+        if needed > len(self._cells):
+            capacity = max(needed, 2 * len(self._cells), 1024)
+            self._cells = np.resize(self._cells, capacity)
+            self._codes = np.resize(self._codes, (capacity, self.quantizer.subquantizers))
+        self._cells[self._size:needed] = cells
+        self._codes[self._size:needed] = codes
+        self._size = needed
+        self._cell_order = None
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def add(
+        self,
+        chunk_ids: list[str],
+        section_types: list[str],
+        vectors: np.ndarray,
+        contract_ids: list[str | None] | None = None,
+        clause_numbers: list[str | None] | None = None,
+    ) -> None:
+        """Encode chunks (rows of ``vectors``, normalized here) into the index.
+
+        Raises:
+            ValueError: Lengths disagree, or a chunk id is already indexed.
+        """
+        if not len(chunk_ids) == len(section_types) == len(vectors):
+            raise ValueError(
+                f"Got {len(chunk_ids)} ids, {len(section_types)} section types "
+                f"and {len(vectors)} vectors"
+            )
+        if not chunk_ids:
+            return
+        vectors = normalize(vectors)
+        cells, codes = self.quantizer.encode(vectors)
+        with self._lock:
+            self.rows.check_new(chunk_ids)
+            # Vectors first: rows.jsonl is the record of which rows are committed.
+            self.store.append(vectors)
+            self.rows.append(chunk_ids, section_types, contract_ids, clause_numbers)
+            self._append_codes(cells, codes)
+
+    def save(self) -> None:
+        """Write the codes of every row, so loading need not re-encode them."""
+        with self._lock:
+            tmp = self.path / (_CODES_FILE + ".tmp")
+            with tmp.open("wb") as fh:
+                np.savez(fh, cells=self._cells[:self._size], codes=self._codes[:self._size])
+            os.replace(tmp, self.path / _CODES_FILE)
+            self._saved = self._size
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    def _cell_rows(self) -> tuple[np.ndarray, np.ndarray]:
+        """Rows sorted by cell and each cell's ``[start, end)`` bounds in that order."""
+        if self._cell_order is None:
+            cells = self._cells[:self._size]
+            self._cell_order = np.argsort(cells, kind="stable").astype(np.int32)
+            self._cell_bounds = np.searchsorted(
+                cells[self._cell_order], np.arange(self.quantizer.nlist + 1),
+            )
+        return self._cell_order, self._cell_bounds  # type: ignore[return-value]
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        section_types: list[str] | None = None,
+        nprobe: int | None = None,
+        refine_factor: int | None = None,
+        contract_ids: list[str] | None = None,
+        clause_numbers: list[str] | None = None,
+    ) -> list[list[SearchHit]]:
+        """Approximate top-``k`` chunks by cosine similarity for each row of ``queries``.
+
+        Args:
+            queries: ``(dimensions,)`` or ``(n, dimensions)`` query vectors.
+            section_types: Only return chunks of these sections.
+            nprobe: Cells scanned per query (default: the index's).
+            refine_factor: ``k · refine_factor`` candidates are re-scored
+                against full vectors (default: the index's).
+            contract_ids: Only return chunks of these contracts.
+            clause_numbers: Only return chunks whose clause number starts
+                with one of these.
+
+        Returns:
+            One list of hits per query, best first.
+        """
+        queries = normalize(queries)
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Index holds {self.dimensions}-dim vectors, got {queries.shape[1]}-dim queries"
+            )
+        if k < 1:
+            raise ValueError("k must be positive")
+        nprobe = min(nprobe or self.nprobe, self.quantizer.nlist)
+        candidates = k * max(refine_factor or self.refine_factor, 1)
+        with self._lock:
+            order, bounds = self._cell_rows()
+            codes = self._codes
+            cells = self._cells
+            matrix = self.store.matrix
+            allowed = self.rows.filter(section_types, contract_ids, clause_numbers)
+            subset = mask = None
+            if allowed is None:
+                strategy = "unfiltered"
+            elif len(allowed) <= self._size * nprobe / self.quantizer.nlist:
+                strategy, subset = "subset", allowed.rows(limit=self._size)
+            else:
+                strategy, mask = "probe", allowed.to_mask(self._size)
+            self.filter_strategies[strategy] += 1
+        return [
+            self._search_one(
+                q, k, nprobe, candidates, order, bounds, codes, cells, subset, mask, matrix,
+            )
+            for q in queries
+        ]
+
+    def _search_one(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: int,
+        candidates: int,
+        order: np.ndarray,
+        bounds: np.ndarray,
+        codes: np.ndarray,
+        cells: np.ndarray,
+        subset: np.ndarray | None,
+        mask: np.ndarray | None,
+        matrix: np.ndarray,
+    ) -> list[SearchHit]:
+        coarse = self.quantizer.centroids @ query
+        if subset is not None:
+            rows = subset
+        else:
+            probe = (
+                np.argpartition(-coarse, nprobe - 1)[:nprobe]
+                if nprobe < len(coarse)
+                else np.arange(len(coarse))
+            )
+            rows = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in probe])
+            if mask is not None:
+                rows = rows[mask[rows]]
+        if not len(rows):
+            return []
+        table = self.quantizer.lookup_table(query)
+        approx = coarse[cells[rows]] + table[np.arange(len(table)), codes[rows]].sum(axis=1)
+        if len(rows) > candidates:
+            rows = rows[np.argpartition(-approx, candidates - 1)[:candidates]]
+        rows = np.sort(rows)  # sequential reads from the memory map
+        scores = matrix[rows] @ query
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [
+            SearchHit(
+                chunk_id=self.rows.chunk_id(row),
+                score=float(scores[i]),
+                section_type=self.rows.section_type(row),
+                contract_id=self.rows.contract_id(row),
+                clause_number=self.rows.clause_number(row),
+            )
+            for i, row in zip(top, rows[top].tolist())
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from forge_nlp.embeddings.corpus import load_embedded_chunks
+    from forge_nlp.search.exact_index import default_index_path
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Compressed IVF-PQ vector search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="Train on and index a JSONL export of embedded chunks")
+    build_p.add_argument("--chunks", required=True)
+    build_p.add_argument("--embedding-version", required=True)
+    build_p.add_argument("--output", default=None)
+    build_p.add_argument("--nlist", type=int, default=None)
+    build_p.add_argument("--subquantizers", type=int, default=DEFAULT_SUBQUANTIZERS)
+    build_p.add_argument("--train-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records, vectors = load_embedded_chunks(args.chunks)
+    output = Path(args.output) if args.output else default_index_path(args.embedding_version)
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(len(vectors), min(args.train_size, len(vectors)), replace=False)]
+    index = IvfPqIndex.train(
+        output, sample, args.embedding_version, nlist=args.nlist, subquantizers=args.subquantizers,
+    )
+    stem = Path(args.chunks).stem
+    index.add(
+        [r.get("chunk_id") or f"{stem}:{i}" for i, r in enumerate(records)],
+        [r.get("section_type", "OTHER") for r in records],
+        vectors,
+        [r.get("contract_id") for r in records],
+        [r.get("clause_number") for r in records],
+    )
+    index.save()
+    stats = index.stats()
+    print(
+        f"{stats.chunks} chunks in {output}: {stats.nlist} cells, "
+        f"{stats.bytes_per_vector:.1f} bytes/vector in RAM"
+    )
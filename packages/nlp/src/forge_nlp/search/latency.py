@@ -0,0 +1,46 @@
+"""Rolling latency percentiles for the search endpoint."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class LatencyStats:
+    """Percentiles over the most recent ``window`` samples; ``count`` is all-time."""
+
+    count: int
+    window: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class LatencyWindow:
+    """Keeps the last ``size`` durations and reports their percentiles."""
+
+    def __init__(self, size: int = 2048) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            self._samples.append(ms)
+            self._count += 1
+
+    def stats(self) -> LatencyStats:
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples))
+            count = self._count
+        if not len(samples):
+            return LatencyStats(count=count, window=0, p50_ms=0.0, p99_ms=0.0, max_ms=0.0)
+        p50, p99 = np.percentile(samples, [50, 99])
+        return LatencyStats(
+            count=count, window=len(samples), p50_ms=float(p50), p99_ms=float(p99),
+            max_ms=float(samples.max()),
+        )
@@ -0,0 +1,210 @@
+"""
+Per-row chunk metadata shared by the search indexes.
+
+Every index stores vectors by row number; a ``RowTable`` maps rows back to
+chunk ids and holds what queries filter on: section type, contract and
+FAR/DFARS clause number.  It is persisted as ``rows.jsonl``, one line per
+row, written *after* the row's vector, so a vector without its line is the
+trace of an interrupted write and is discarded by the index on open.
+
+Each filterable field keeps a compressed ``Bitmap`` of rows per distinct
+value (see ``bitmaps.py``), folded in lazily on the first filter after an
+append.  A filter ORs the bitmaps of the wanted values within a field and
+ANDs across fields, and the cardinality of the result is the selectivity
+the indexes use to pick a search strategy — all without touching a
+corpus-sized array.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from forge_nlp.search.bitmaps import Bitmap
+
+
+class _Column:
+    """One metadata field: a small integer code per row and a bitmap per value."""
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self._code: dict[str, int] = {}
+        self._codes: list[int] = []  # -1 for no value
+        self._bitmaps: list[Bitmap] = []
+        self._indexed = 0  # rows folded into the bitmaps
+
+    def append(self, value: str | None) -> None:
+        if value is None:
+            self._codes.append(-1)
+            return
+        code = self._code.get(value)
+        if code is None:
+            code = self._code[value] = len(self.names)
+            self.names.append(value)
+            self._bitmaps.append(Bitmap())
+        self._codes.append(code)
+
+    def value(self, row: int) -> str | None:
+        code = self._codes[row]
+        return None if code < 0 else self.names[code]
+
+    def bitmap(self, values: list[str], prefix: bool = False) -> Bitmap:
+        """Rows holding any of ``values`` (or, with ``prefix``, a value starting with one)."""
+        if self._indexed < len(self._codes):
+            codes = np.asarray(self._codes[self._indexed:], dtype=np.int64)
+            order = np.argsort(codes, kind="stable")
+            rows = order + self._indexed
+            bounds = np.flatnonzero(np.diff(codes[order])) + 1
+            for group in np.split(rows, bounds):
+                code = self._codes[group[0]]
+                if code >= 0:
+                    self._bitmaps[code].add(group)
+            self._indexed = len(self._codes)
+        if prefix:
+            wanted = tuple(values)
+            codes = [c for c, name in enumerate(self.names) if name.startswith(wanted)]
+        else:
+            codes = [self._code[v] for v in values if v in self._code]
+        return Bitmap.union([self._bitmaps[c] for c in codes])
+
+
+class RowTable:
+    """Chunk id, section type, contract and clause number of every row of a search index.
+
+    Tombstoned rows keep their line (and their place in the filter bitmaps —
+    the indexes mask them out separately) but leave the id and contract
+    lookups.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}  # live rows only
+        self._sections = _Column()
+        self._contracts = _Column()
+        self._clauses = _Column()
+        self._contract_rows: dict[str, set[int]] = {}
+        if self.path.exists():
+            with self.path.open() as fh:
+                for line in fh:
+                    row = json.loads(line)
+                    self._append(
+                        row["chunk_id"], row["section_type"], row.get("contract_id"),
+                        row.get("clause_number"),
+                    )
+
+    def __len__(self) -> int:
+        """Rows ever appended, tombstoned ones included."""
+        return len(self._ids)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._row_of
+
+    @property
+    def live(self) -> int:
+        return len(self._row_of)
+
+    def _append(
+        self, chunk_id: str, section_type: str, contract_id: str | None, clause_number: str | None
+    ) -> None:
+        row = len(self._ids)
+        self._row_of[chunk_id] = row
+        self._ids.append(chunk_id)
+        self._sections.append(section_type)
+        self._contracts.append(contract_id)
+        self._clauses.append(clause_number)
+        if contract_id is not None:
+            self._contract_rows.setdefault(contract_id, set()).add(row)
+
+    # ─── Writes ───────────────────────────────────────────────────────
+
+    def check_new(self, chunk_ids: list[str]) -> None:
+        """Raise ``ValueError`` if any id is already live or repeated."""
+        duplicates = [cid for cid in chunk_ids if cid in self._row_of]
+        if duplicates or len(set(chunk_ids)) < len(chunk_ids):
+            raise ValueError(f"Chunks already indexed: {duplicates[:5] or 'repeated ids'}")
+
+    def append(
+        self,
+        chunk_ids: list[str],
+        section_types: list[str],
+        contract_ids: list[str | None] | None = None,
+        clause_numbers: list[str | None] | None = None,
+    ) -> None:
+        """Record rows for vectors the caller has already stored."""
+        if contract_ids is None:
+            contract_ids = [None] * len(chunk_ids)
+        if clause_numbers is None:
+            clause_numbers = [None] * len(chunk_ids)
+        with self.path.open("a") as fh:
+            for cid, section, contract, clause in zip(
+                chunk_ids, section_types, contract_ids, clause_numbers
+            ):
+                row = {"chunk_id": cid, "section_type": section}
+                if contract is not None:
+                    row["contract_id"] = contract
+                if clause is not None:
+                    row["clause_number"] = clause
+                fh.write(json.dumps(row) + "\n")
+        for cid, section, contract, clause in zip(
+            chunk_ids, section_types, contract_ids, clause_numbers
+        ):
+            self._append(cid, section, contract, clause)
+
+    def forget(self, row: int) -> None:
+        """Drop a tombstoned row from the id and contract lookups."""
+        if self._row_of.get(self._ids[row]) == row:
+            del self._row_of[self._ids[row]]
+        contract = self._contracts.value(row)
+        if contract is not None:
+            self._contract_rows.get(contract, set()).discard(row)
+
+    # ─── Reads ────────────────────────────────────────────────────────
+
+    def row(self, chunk_id: str) -> int | None:
+        return self._row_of.get(chunk_id)
+
+    def chunk_id(self, row: int) -> str:
+        return self._ids[row]
+
+    def section_type(self, row: int) -> str:
+        return self._sections.value(row)  # type: ignore[return-value]
+
+    def contract_id(self, row: int) -> str | None:
+        return self._contracts.value(row)
+
+    def clause_number(self, row: int) -> str | None:
+        return self._clauses.value(row)
+
+    def contract_rows(self, contract_id: str) -> list[int]:
+        """Live rows of a contract, in insertion order."""
+        return sorted(self._contract_rows.get(contract_id, ()))
+
+    def filter(
+        self,
+        section_types: list[str] | None = None,
+        contract_ids: list[str] | None = None,
+        clause_numbers: list[str] | None = None,
+    ) -> Bitmap | None:
+        """Rows matching every given field, or ``None`` when no filter is given.
+
+        Within a field any listed value matches.  Clause numbers match by
+        prefix, like the API's ``clause_number LIKE '52.204%'``: ``"52.204"``
+        selects 52.204-21 and 52.204-23, ``"252."`` every DFARS clause.
+        Tombstoned rows are included.
+        """
+        bitmaps = []
+        if section_types is not None:
+            bitmaps.append(self._sections.bitmap(section_types))
+        if contract_ids is not None:
+            bitmaps.append(self._contracts.bitmap(contract_ids))
+        if clause_numbers is not None:
+            bitmaps.append(self._clauses.bitmap(clause_numbers, prefix=True))
+        if not bitmaps:
+            return None
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap
+        return result
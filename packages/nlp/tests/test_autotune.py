@@ -0,0 +1,158 @@
+"""
+Tests for startup autotuning: candidates, synthetic inputs, selection and persistence.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+
+import pytest
+
+from forge_nlp.embeddings import autotune as autotune_module
+from forge_nlp.embeddings.autotune import (
+    Measurement,
+    TuningResult,
+    choose_settings,
+    default_tuning_path,
+    host_fingerprint,
+    synthetic_texts,
+    thread_candidates,
+)
+
+
+def _m(threads: tuple[int, int], seq_len: int, batch_size: int, texts_per_s: float, max_ms: float):
+    return Measurement(threads[0], threads[1], seq_len, batch_size, texts_per_s, max_ms / 2, max_ms)
+
+
+def _result(**overrides) -> TuningResult:
+    result = TuningResult(
+        model_name="some/model", backend="torch", fingerprint=host_fingerprint(),
+        batch_size=16, max_tokens_per_batch=4096, intra_op_threads=4, inter_op_threads=1,
+        tokens_per_s=1000.0, max_ms=120.0, max_latency_ms=500.0,
+        measurements=[_m((4, 1), 64, 16, 200.0, 80.0)],
+    )
+    return replace(result, **overrides)
+
+
+class TestThreadCandidates:
+    def test_halvings_and_interop(self):
+        assert thread_candidates(8) == [
+            (8, 1), (8, 2), (4, 1), (4, 2), (2, 1), (2, 2), (1, 1), (1, 2),
+        ]
+
+    def test_many_cores_capped_at_four_intra_values(self):
+        assert sorted({i for i, _ in thread_candidates(64)}) == [8, 16, 32, 64]
+
+    def test_single_cpu(self):
+        assert thread_candidates(1) == [(1, 1)]
+
+
+class TestSyntheticTexts:
+    @pytest.mark.parametrize("seq_len", [16, 64, 200])
+    def test_texts_tokenize_to_bucket_length(self, char_tokenizer, seq_len):
+        texts = synthetic_texts(char_tokenizer, seq_len, 8)
+        assert len(texts) == 8
+        assert len(set(texts)) == 8
+        for text in texts:
+            assert len(char_tokenizer(text)["input_ids"]) == seq_len
+
+    def test_short_source_text_repeated(self, char_tokenizer):
+        texts = synthetic_texts(char_tokenizer, 32, 4, text="The contractor shall deliver.")
+        assert all(len(char_tokenizer(t)["input_ids"]) == 32 for t in texts)
+
+
+class TestChooseSettings:
+    def test_fastest_batch_within_latency_ceiling(self):
+        measurements = [
+            _m((4, 1), 64, 8, 400.0, 50.0),
+            _m((4, 1), 64, 32, 900.0, 90.0),
+            _m((4, 1), 64, 64, 1000.0, 300.0),  # faster but over the ceiling
+            _m((4, 1), 512, 1, 40.0, 30.0),
+            _m((4, 1), 512, 4, 60.0, 95.0),
+        ]
+        threads, chosen = choose_settings(measurements, max_latency_ms=100.0)
+        assert threads == (4, 1)
+        assert chosen[64].batch_size == 32
+        assert chosen[512].batch_size == 4
+
+    def test_best_thread_setting_across_buckets(self):
+        measurements = [
+            # (8, 1) wins short inputs by a little, loses long ones by a lot.
+            _m((8, 1), 64, 32, 1000.0, 50.0), _m((8, 1), 512, 4, 20.0, 50.0),
+            _m((4, 2), 64, 32, 900.0, 50.0), _m((4, 2), 512, 4, 60.0, 50.0),
+        ]
+        threads, _ = choose_settings(measurements, max_latency_ms=100.0)
+        assert threads == (4, 2)
+
+    def test_bucket_over_ceiling_falls_back_to_lowest_latency(self):
+        measurements = [_m((2, 1), 512, 1, 5.0, 400.0), _m((2, 1), 512, 2, 6.0, 700.0)]
+        _, chosen = choose_settings(measurements, max_latency_ms=100.0)
+        assert chosen[512].batch_size == 1
+
+    def test_incomplete_thread_setting_ignored(self):
+        measurements = [
+            _m((8, 1), 64, 32, 5000.0, 50.0),  # never reached the 512 bucket
+            _m((4, 1), 64, 32, 900.0, 50.0), _m((4, 1), 512, 4, 60.0, 50.0),
+        ]
+        threads, _ = choose_settings(measurements, max_latency_ms=100.0)
+        assert threads == (4, 1)
+
+    def test_no_measurements(self):
+        with pytest.raises(ValueError):
+            choose_settings([], max_latency_ms=100.0)
+
+
+class TestPersistence:
+    def test_round_trip(self, tmp_path):
+        result = _result()
+        result.save(tmp_path / "tuning.json")
+        loaded = TuningResult.load(tmp_path / "tuning.json")
+        assert loaded == result
+        assert loaded.measurements[0].tokens_per_s == 200.0 * 64
+
+    def test_default_path_per_model_backend_and_host(self):
+        path = default_tuning_path("nlpaueb/legal-bert-base-uncased", "onnx-int8", "abc123")
+        assert path.name == "abc123.json"
+        assert path.parent.name == "nlpaueb__legal-bert-base-uncased__onnx-int8"
+        assert default_tuning_path("m").stem == host_fingerprint()
+
+    def test_persisted_result_reused_without_sweep(self, tmp_path, monkeypatch):
+        path = tmp_path / "tuning.json"
+        _result().save(path)
+        monkeypatch.setattr(autotune_module, "_run_isolated", pytest.fail)
+        result = autotune_module.autotune("some/model", path=path, max_latency_ms=500.0)
+        assert result.batch_size == 16
+
+    def test_older_format_sweeps_again(self, tmp_path, monkeypatch):
+        path = tmp_path / "tuning.json"
+        _result().save(path)
+        data = json.loads(path.read_text())
+        data["p99_ms"], data["max_p99_ms"] = data.pop("max_ms"), data.pop("max_latency_ms")
+        path.write_text(json.dumps(data))
+
+        def no_sweep(*args):
+            raise RuntimeError("swept")
+
+        monkeypatch.setattr(autotune_module, "_run_isolated", no_sweep)
+        with pytest.raises(RuntimeError, match="swept"):
+            autotune_module.autotune("some/model", path=path, max_latency_ms=500.0)
+
+    def test_other_host_or_ceiling_sweeps_again(self, tmp_path, monkeypatch):
+        path = tmp_path / "tuning.json"
+        _result(fingerprint="another-host").save(path)
+        calls = []
+
+        def fake_sweep(fn, model_name, backend, onnx_dir, intra, inter, *rest):
+            calls.append((intra, inter))
+            return [_m((intra, inter), 64, 8 * intra, 100.0 * intra, 10.0),
+                    _m((intra, inter), 512, intra, 10.0 * intra, 10.0)]
+
+        monkeypatch.setattr(autotune_module, "_run_isolated", fake_sweep)
+        monkeypatch.setattr(autotune_module, "available_cpus", lambda: [0, 1])
+        result = autotune_module.autotune("some/model", path=path, max_latency_ms=500.0)
+        assert calls == [(2, 1), (2, 2), (1, 1), (1, 2)]
+        assert result.fingerprint == host_fingerprint()
+        assert result.intra_op_threads == 2
+        assert (result.batch_size, result.max_tokens_per_batch) == (16, 1024)
+        assert TuningResult.load(path) == result
@@ -0,0 +1,244 @@
+"""
+Tests for lexical search: chunker-compatible tokens, BM25 scoring,
+incremental persistence, ingestion, and hybrid BM25 + dense retrieval.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk, word_tokens
+from forge_nlp.embeddings.embedding_service import EmbeddedChunkBatch
+from forge_nlp.pipeline.ingestion_pipeline import (
+    IngestionPipeline,
+    InMemoryDbClient,
+    LocalFileS3Client,
+)
+from forge_nlp.search import Bm25Index, ExactIndex, HnswIndex, hybrid_search
+
+_VERSION = "test-model"
+_FIXTURES = Path(__file__).parent / "fixtures"
+
+_CHUNKS = {
+    "safeguarding": (
+        "SECTION_I",
+        "52.204-21",
+        "52.204-21 Basic Safeguarding of Covered Contractor Information Systems.",
+    ),
+    "cyber": (
+        "SECTION_I",
+        "252.204-7012",
+        "252.204-7012 Safeguarding Covered Defense Information and Cyber Incident Reporting.",
+    ),
+    "payment": (
+        "SECTION_I",
+        "52.232-33",
+        "52.232-33 Payment by Electronic Funds Transfer, System for Award Management.",
+    ),
+    "clin": ("SECTION_B", None, "CLIN 0001AA Engineering services, firm-fixed-price, 12 months."),
+    "reports": (
+        "SECTION_C",
+        None,
+        "The Contractor shall deliver monthly status reports describing progress and risks.",
+    ),
+    "security": (
+        "SECTION_H",
+        None,
+        (
+            "Contractor information systems shall apply the security requirements of the "
+            "contract, and the Contractor shall report incidents within 72 hours."
+        ),
+    ),
+}
+
+
+def _add(index, contract_id: str = "k1") -> None:
+    ids = list(_CHUNKS)
+    index.add(
+        ids,
+        [_CHUNKS[c][0] for c in ids],
+        [_CHUNKS[c][2] for c in ids],
+        [contract_id] * len(ids),
+        [_CHUNKS[c][1] for c in ids],
+    )
+
+
+@pytest.fixture()
+def index(tmp_path) -> Bm25Index:
+    idx = Bm25Index(tmp_path / "bm25")
+    _add(idx)
+    return idx
+
+
+class TestTokens:
+    def test_words_of_the_chunker(self):
+        text = 'FAR 52.204-21(b)(1), "Basic Safeguarding" of CLIN 0001AA.'
+        assert word_tokens(text) == [
+            "far", "52.204-21(b)(1", "52.204-21", "basic", "safeguarding", "of", "clin", "0001aa",
+        ]
+        assert word_tokens("  -- ") == ["--"]
+        assert word_tokens("(a)") == ["a"]
+
+
+class TestBm25:
+    def test_exact_identifiers_rank_first(self, index):
+        assert index.search("52.204-21")[0].chunk_id == "safeguarding"
+        assert index.search("clin 0001AA")[0].chunk_id == "clin"
+        assert index.search("252.204-7012 incident", k=2)[0].chunk_id == "cyber"
+        assert index.search("unrelated words") == []
+
+    def test_score_matches_formula(self, index):
+        [hit] = index.search("monthly")
+        words = len(word_tokens(_CHUNKS["reports"][2]))
+        avg = sum(len(word_tokens(c[2])) for c in _CHUNKS.values()) / len(_CHUNKS)
+        idf = math.log(1 + (6 - 1 + 0.5) / (1 + 0.5))
+        expected = idf * 1 * 2.2 / (1 + 1.2 * (1 - 0.75 + 0.75 * words / avg))
+        assert hit.score == pytest.approx(expected, rel=1e-5)
+
+    def test_filters(self, index):
+        hits = index.search("safeguarding covered", clause_numbers=["252."])
+        assert [h.chunk_id for h in hits] == ["cyber"]
+        assert index.search("contractor", section_types=["SECTION_C"])[0].chunk_id == "reports"
+        assert index.search("contractor", contract_ids=["other"]) == []
+
+    def test_replace_contract_tombstones(self, index):
+        assert index.replace_contract("k1", ["new"], ["SECTION_C"], ["monthly reports"]) == 6
+        assert [h.chunk_id for h in index.search("monthly reports")] == ["new"]
+        stats = index.stats()
+        assert (stats.chunks, stats.deleted) == (1, 6)
+        with pytest.raises(ValueError, match="already indexed"):
+            index.add(["new"], ["OTHER"], ["x"])
+
+    def test_reopen_replays_log_and_checkpoint(self, index):
+        queries = ["52.204-21", "contractor shall report", "safeguarding"]
+        expected = [index.search(q) for q in queries]
+        index.close()
+        assert [Bm25Index(index.path).search(q) for q in queries] == expected
+
+        reopened = Bm25Index(index.path)
+        reopened.save()
+        assert reopened.stats().log_bytes == 0
+        reopened.delete(["clin"])
+        reopened.close()
+        again = Bm25Index(index.path)
+        assert [[h.chunk_id for h in again.search(q)] for q in queries] == [
+            [h.chunk_id for h in hits] for hits in expected
+        ]
+        assert again.search("0001AA") == [] and len(again) == 5
+
+    def test_uncommitted_and_torn_lines_dropped(self, index):
+        index.close()
+        log = index.path / "postings.0.jsonl"
+        with log.open("a") as fh:
+            fh.write(json.dumps({"row": 6, "terms": {"ghost": 1}}) + "\n")  # no rows.jsonl line
+            fh.write('{"row": 7, "te')
+        reopened = Bm25Index(index.path)
+        assert len(reopened) == 6 and reopened.search("ghost") == []
+        reopened.add(["late"], ["OTHER"], ["ghost story"])
+        reopened.close()
+        assert Bm25Index(index.path).search("ghost")[0].chunk_id == "late"
+
+
+def _vector(text: str) -> np.ndarray:
+    seed = int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).standard_normal(16).astype(np.float32)
+
+
+@pytest.fixture()
+def dense(tmp_path) -> ExactIndex:
+    idx = ExactIndex(tmp_path / "dense", dimensions=16, embedding_version=_VERSION)
+    ids = list(_CHUNKS)
+    idx.add(ids, [_CHUNKS[c][0] for c in ids], np.stack([_vector(c) for c in ids]),
+            ["k1"] * len(ids), [_CHUNKS[c][1] for c in ids])
+    return idx
+
+
+class TestHybrid:
+    def test_dense_reranks_lexical_candidates(self, index, dense):
+        # "contractor" matches three chunks; the query vector is that of "security".
+        result = hybrid_search(index, dense, "contractor", _vector("security"), k=3)
+        assert not result.fallback and result.candidates == 3
+        assert result.hits[0].chunk_id == "security"
+        assert result.hits[0].dense_score == pytest.approx(1.0, abs=1e-5)
+        assert {h.chunk_id for h in result.hits} == {h.chunk_id for h in index.search("contractor")}
+        assert result.lexical_ms >= 0 and result.dense_ms >= 0
+
+    def test_identifier_query_restricted_to_its_chunk(self, index, dense):
+        result = hybrid_search(index, dense, "52.232-33", _vector("reports"), k=5)
+        assert [h.chunk_id for h in result.hits] == ["payment"]
+        assert result.hits[0].lexical_score > 0
+
+    def test_fallback_to_dense_without_lexical_match(self, index, dense):
+        result = hybrid_search(
+            index, dense, "zzz", _vector("clin"), k=2, section_types=["SECTION_B"]
+        )
+        assert result.fallback and [h.chunk_id for h in result.hits] == ["clin"]
+        assert result.hits[0].lexical_score is None
+
+    def test_chunks_missing_from_vector_index(self, index, dense):
+        index.add(["text-only"], ["SECTION_C"], ["monthly status reports, text only"])
+        result = hybrid_search(index, dense, "monthly status reports", _vector("reports"))
+        by_id = {h.chunk_id: h for h in result.hits}
+        assert by_id["text-only"].dense_score is None
+        assert result.hits[0].chunk_id == "reports"
+
+
+class _HashService:
+    """Embeds each chunk as a pseudo-random vector seeded by its text."""
+
+    def embedding_version(self, dimensions: int | None = None) -> str:
+        return _VERSION
+
+    def embed_chunks(
+        self, chunks: list[DocumentChunk], late_chunking: bool = False,
+    ) -> EmbeddedChunkBatch:
+        return EmbeddedChunkBatch(
+            chunks, np.stack([_vector(c.chunk_text) for c in chunks]), _VERSION
+        )
+
+    def count_truncated(self, chunks: list[DocumentChunk]) -> int:
+        return 0
+
+
+class TestIngestion:
+    def test_ingestion_builds_both_indexes(self, tmp_path):
+        lexical = Bm25Index(tmp_path / "bm25")
+        dense = HnswIndex(tmp_path / "hnsw", dimensions=16, embedding_version=_VERSION)
+        pipeline = IngestionPipeline(
+            s3_client=LocalFileS3Client(base_dir=_FIXTURES), db_client=InMemoryDbClient(),
+            s3_bucket="test", embedding_service=_HashService(), use_ner=False,
+            search_index=dense, lexical_index=lexical,
+        )
+        first = pipeline.ingest("sample_contract.docx")
+        assert len(lexical) == len(dense) == first.chunks_stored
+        second = pipeline.ingest("sample_contract.docx")
+        assert len(lexical) == second.chunks_stored
+        assert lexical.stats().deleted == first.chunks_stored
+
+        [top] = lexical.search("252.204-7012", k=1)
+        assert top.clause_number == "252.204-7012"
+        result = hybrid_search(lexical, dense, "252.204-7012", _vector("x"), k=5)
+        assert top.chunk_id in {h.chunk_id for h in result.hits}
+        assert all(h.dense_score is not None for h in result.hits)
+
+    def test_reingest_with_fresh_db_client(self, tmp_path):
+        """Like /pipeline/ingest, which builds a new db client per request."""
+        lexical = Bm25Index(tmp_path / "bm25")
+        results = [
+            IngestionPipeline(
+                s3_client=LocalFileS3Client(base_dir=_FIXTURES), db_client=InMemoryDbClient(),
+                s3_bucket="test", embedding_service=_HashService(), use_ner=False,
+                lexical_index=lexical,
+            ).ingest("sample_contract.docx")
+            for _ in range(2)
+        ]
+        stats = lexical.stats()
+        assert (stats.chunks, stats.deleted) == (results[1].chunks_stored, results[0].chunks_stored)
+        [top] = lexical.search("252.204-7012", k=1)
+        assert lexical.search("252.204-7012", contract_ids=[results[0].contract_id])[0] == top
@@ -16,6 +16,7 @@ from forge_nlp.chunking.clause_chunker import (
     SectionDetector,
     SectionType,
     _word_count,
+    clause_variant,
 )
 from forge_nlp.chunking.test_data import load_sample
 
@@ -165,6 +166,30 @@ class TestClauseChunker:
         assert "52.212-4" in clause_numbers
         assert "252.204-7012" in clause_numbers
 
+    def test_clause_variant_recorded_in_metadata(self):
+        """Alternates and deviations of the same clause number are told apart."""
+        section_text = textwrap.dedent("""\
+            52.219-9 Small Business Subcontracting Plan (SEP 2023)
+            The basic clause text.
+
+            52.219-9 Small Business Subcontracting Plan (SEP 2023) Alternate III (SEP 2023)
+            The alternate text.
+
+            252.225-7001 Buy American and Balance of Payments Program (DEVIATION 2020-O0019)
+            The deviation text.
+        """)
+        section = DetectedSection(SectionType.SECTION_I, 0, len(section_text))
+        chunks = self.chunker.chunk_document(section_text, [section])
+        variants = [
+            (c.clause_number, c.metadata["clause_variant"])
+            for c in chunks if c.clause_number is not None
+        ]
+        assert variants == [
+            ("52.219-9", ""),
+            ("52.219-9", "ALT III"),
+            ("252.225-7001", "DEV 2020-O0019"),
+        ]
+
     def test_clause_number_correctly_extracted(self):
         """Each chunk in Section I should have the right clause_number."""
         section_text = textwrap.dedent("""\
@@ -270,6 +295,20 @@ class TestClauseChunker:
 # ═══════════════════════════════════════════════════════════════════════
 
 
+class TestClauseVariant:
+    @pytest.mark.parametrize(("title", "expected"), [
+        ("Definitions (JUN 2020)", ""),
+        ("Small Business Subcontracting Plan (SEP 2023) Alternate III (SEP 2023)", "ALT III"),
+        ("Pre-Award On-Site Equal Opportunity Compliance Evaluation Alt. I", "ALT I"),
+        ("Buy American (DEVIATION 2020-O0019)", "DEV 2020-O0019"),
+        ("Buy American (DEVIATION 2020-O0019) Alternate I", "DEV 2020-O0019 ALT I"),
+        ("Annual Representations (DEV)", "DEV"),
+        ("Research and Development Contracting", ""),
+    ])
+    def test_parses_alternate_and_deviation(self, title, expected):
+        assert clause_variant(title) == expected
+
+
 class TestDocumentProcessor:
     def setup_method(self):
         self.processor = DocumentProcessor()
@@ -360,3 +399,69 @@ class TestDocumentProcessor:
         assert "52.212-4" in clause_numbers
         assert "252.204-7012" in clause_numbers
         assert "252.227-7014" in clause_numbers
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Token-aware chunking tests
+# ═══════════════════════════════════════════════════════════════════════
+
+
+@pytest.fixture(scope="module")
+def tokenizer(char_tokenizer):
+    return char_tokenizer
+
+
+class TestTokenAwareChunking:
+    def test_chunks_fit_model_window(self, tokenizer):
+        """Every chunk's encoder input fits max_length, unlike word budgeting."""
+        text = load_sample("sample_contract.txt")
+        word_chunks = DocumentProcessor().process(text, "test")
+        word_lengths = [
+            len(tokenizer(c.chunk_text, verbose=False)["input_ids"]) for c in word_chunks
+        ]
+        assert max(word_lengths) > 512  # word counts let over-long chunks through
+
+        chunks = DocumentProcessor(tokenizer=tokenizer, max_length=512).process(text, "test")
+        for chunk in chunks:
+            assert chunk.token_ids is not None
+            assert len(chunk.token_ids) <= 512
+            assert chunk.metadata["token_count"] == len(chunk.token_ids)
+
+    def test_token_ids_match_tokenizer(self, tokenizer):
+        text = "SECTION C — WORK\n\nThe contractor shall deliver 3 reports."
+        chunks = DocumentProcessor(tokenizer=tokenizer).process(text, "test")
+        for chunk in chunks:
+            assert chunk.token_ids == tokenizer(chunk.chunk_text)["input_ids"]
+            assert chunk.token_ids[0] == tokenizer.cls_token_id
+            assert chunk.token_ids[-1] == tokenizer.sep_token_id
+
+    def test_run_on_sentence_split_by_tokens(self, tokenizer):
+        """A single sentence longer than the window is cut at token boundaries."""
+        sentence = " ".join(f"clause{i:03d}" for i in range(200))
+        chunker = ClauseChunker(tokenizer=tokenizer, max_length=128)
+        chunks = chunker.chunk_document(sentence, [])
+        assert len(chunks) > 1
+        assert all(len(c.token_ids) <= 128 for c in chunks)
+        assert all(c.metadata["token_count"] <= 128 for c in chunks)
+
+    def test_overlap_keeps_chunks_within_window(self, tokenizer):
+        """Overlap carried into a chunk that starts with a long paragraph is trimmed."""
+        short = "The contractor shall comply."
+        long = " ".join(["The contractor shall deliver all monthly reports to the officer."] * 2)
+        text = "\n\n".join([short, long] * 6)
+        chunker = ClauseChunker(tokenizer=tokenizer, max_length=128)
+        assert chunker._count(short) + chunker._count(long) > chunker.max_tokens
+        chunks = chunker.chunk_document(text, [])
+        assert len(chunks) > 1
+        assert all(c.metadata["token_count"] <= 128 for c in chunks)
+
+    def test_budgets_capped_to_window(self, tokenizer):
+        chunker = ClauseChunker(
+            target_tokens=500, max_tokens=600, tokenizer=tokenizer, max_length=256
+        )
+        assert chunker.max_tokens == 254  # room for [CLS] and [SEP]
+        assert chunker.target_tokens == 254
+
+    def test_word_mode_leaves_token_ids_unset(self):
+        chunks = DocumentProcessor().process("SECTION A — SHORT DOC\n\nBrief.", "short")
+        assert all(c.token_ids is None for c in chunks)
@@ -0,0 +1,147 @@
+"""
+Tests for the precomputed clause embedding library.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import textwrap
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.clause_library import (
+    ClauseLibrary,
+    chunk_clause_corpus,
+    chunk_key,
+)
+
+CORPUS = textwrap.dedent("""\
+    52.204-21 Basic Safeguarding of Covered Contractor Information Systems (NOV 2021)
+    The Contractor shall apply basic safeguarding requirements and procedures.
+
+    52.219-9 Small Business Subcontracting Plan (SEP 2023)
+    The Offeror shall submit a subcontracting plan.
+
+    52.219-9 Small Business Subcontracting Plan (SEP 2023) Alternate II (NOV 2016)
+    The Offeror shall submit a subcontracting plan with its initial offer.
+
+    252.204-7012 Safeguarding Covered Defense Information (JAN 2023)
+    The Contractor shall implement NIST SP 800-171.
+""")
+
+
+@pytest.fixture()
+def chunks() -> list[DocumentChunk]:
+    return chunk_clause_corpus(CORPUS)
+
+
+def _vectors(n: int, dim: int = 16) -> np.ndarray:
+    return np.random.default_rng(5).standard_normal((n, dim)).astype(np.float32)
+
+
+def _clause(text: str) -> DocumentChunk:
+    return DocumentChunk(text, "SECTION_I", "52.204-21", 0)
+
+
+def _add_one_by_one(path: str, writer: int, count: int) -> None:
+    """Adds single-chunk batches whose vectors encode the writer and the chunk."""
+    lib = ClauseLibrary(path, dimensions=16)
+    for i in range(count):
+        lib.add([_clause(f"{writer}-{i}")], np.full((1, 16), writer * 1000 + i))
+
+
+class TestChunkKey:
+    def test_corpus_chunked_per_clause(self, chunks):
+        assert [c.clause_number for c in chunks] == [
+            "52.204-21", "52.219-9", "52.219-9", "252.204-7012",
+        ]
+
+    def test_alternate_has_its_own_key(self, chunks):
+        basic, alternate = chunks[1], chunks[2]
+        assert chunk_key(basic)[1] == ""
+        assert chunk_key(alternate)[1] == "ALT II"
+        assert chunk_key(basic) != chunk_key(alternate)
+
+    def test_unnumbered_chunk_has_no_key(self):
+        chunk = DocumentChunk("Free text", "SECTION_C", None, 0)
+        assert chunk_key(chunk) is None
+
+
+class TestClauseLibrary:
+    def test_missing_library_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="clause_library build"):
+            ClauseLibrary(tmp_path / "missing")
+
+    def test_lookup_returns_stored_vectors(self, chunks, tmp_path):
+        vectors = _vectors(len(chunks))
+        lib = ClauseLibrary(tmp_path / "lib", dimensions=16)
+        assert lib.add(chunks, vectors) == 4
+
+        found = lib.lookup(chunks)
+        for vec, expected in zip(found, vectors):
+            np.testing.assert_array_equal(vec, expected)
+        assert lib.stats().hits == 4
+
+    def test_changed_text_misses(self, chunks, tmp_path):
+        lib = ClauseLibrary(tmp_path / "lib", dimensions=16)
+        lib.add(chunks, _vectors(len(chunks)))
+        edited = DocumentChunk(
+            chunks[0].chunk_text + " As modified.", "SECTION_I", "52.204-21", 0,
+            metadata={"clause_variant": ""},
+        )
+        assert lib.lookup([edited]) == [None]
+        assert lib.stats().misses == 1
+
+    def test_variant_must_match(self, chunks, tmp_path):
+        lib = ClauseLibrary(tmp_path / "lib", dimensions=16)
+        lib.add(chunks[:1], _vectors(1))
+        relabelled = DocumentChunk(
+            chunks[0].chunk_text, "SECTION_I", "52.204-21", 0,
+            metadata={"clause_variant": "ALT I"},
+        )
+        assert lib.lookup([relabelled]) == [None]
+
+    def test_duplicates_stored_once(self, chunks, tmp_path):
+        lib = ClauseLibrary(tmp_path / "lib", dimensions=16)
+        lib.add(chunks, _vectors(len(chunks)))
+        assert lib.add(chunks + chunks, _vectors(2 * len(chunks))) == 0
+        assert len(lib) == len(lib.store) == 4
+
+    def test_reopen_shares_file(self, chunks, tmp_path):
+        vectors = _vectors(len(chunks))
+        ClauseLibrary(tmp_path / "lib", dimensions=16).add(chunks, vectors)
+
+        reopened = ClauseLibrary(tmp_path / "lib")
+        assert reopened.dimensions == 16
+        assert len(reopened) == 4
+        np.testing.assert_array_equal(np.stack(reopened.lookup(chunks)), vectors)
+
+    def test_orphan_rows_ignored_on_open(self, chunks, tmp_path):
+        vectors = _vectors(len(chunks))
+        lib = ClauseLibrary(tmp_path / "lib", dimensions=16)
+        lib.add(chunks, vectors)
+        lib.store.append(_vectors(1))  # vectors written, entry line never was
+
+        reopened = ClauseLibrary(tmp_path / "lib")
+        assert len(reopened) == 4
+        np.testing.assert_array_equal(np.stack(reopened.lookup(chunks)), vectors)
+
+    def test_writers_in_separate_processes_keep_entries_on_their_rows(self, tmp_path):
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_add_one_by_one, args=(str(tmp_path / "lib"), w, 100))
+            for w in range(3)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        assert all(p.exitcode == 0 for p in procs)
+
+        clauses = [_clause(f"{w}-{i}") for w in range(3) for i in range(100)]
+        hits = ClauseLibrary(tmp_path / "lib").lookup(clauses)
+        for clause, hit in zip(clauses, hits):
+            w, i = map(int, clause.chunk_text.split("-"))
+            np.testing.assert_array_equal(hit, np.full(16, w * 1000 + i, dtype=np.float32))
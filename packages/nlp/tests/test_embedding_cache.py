@@ -0,0 +1,152 @@
+"""
+Tests for the content-addressed embedding cache.
+
+These exercise the cache tiers directly and do not need the LegalBERT model.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.embedding_cache import (
+    EmbeddingCache,
+    cache_key,
+    normalize_text,
+)
+from forge_nlp.embeddings.vector_store import MmapVectorStore
+
+_MODEL = "test-model"
+
+
+def _vectors(n: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _put_batches(disk_dir: str, writer: int, batches: int) -> None:
+    """Writes one-row batches whose vectors encode the writer and the text."""
+    cache = EmbeddingCache(disk_dir=disk_dir)
+    for i in range(batches):
+        cache.put_many(_MODEL, [f"{writer}-{i}"], np.full((1, 8), writer * 1000 + i))
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Keys
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestCacheKey:
+    def test_whitespace_normalized(self):
+        """Formatting-only differences should share a key."""
+        text = "  52.204-21\n\tBasic  Safeguarding "
+        assert normalize_text(text) == "52.204-21 Basic Safeguarding"
+        assert cache_key(_MODEL, "a  b\nc") == cache_key(_MODEL, "a b c")
+
+    def test_model_name_part_of_key(self):
+        """The same text under different models must not collide."""
+        assert cache_key("model-a", "text") != cache_key("model-b", "text")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Memory tier
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestMemoryTier:
+    def test_miss_then_hit(self):
+        cache = EmbeddingCache(max_entries=10)
+        assert cache.get_many(_MODEL, ["clause"]) == [None]
+
+        vecs = _vectors(1)
+        cache.put_many(_MODEL, ["clause"], vecs)
+        [hit] = cache.get_many(_MODEL, ["clause"])
+        assert hit is not None
+        np.testing.assert_array_equal(hit, vecs[0])
+
+        stats = cache.stats()
+        assert stats.hits == 1
+        assert stats.misses == 1
+        assert stats.hit_rate == pytest.approx(0.5)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        cache = EmbeddingCache(max_entries=2)
+        cache.put_many(_MODEL, ["a", "b"], _vectors(2))
+        cache.get_many(_MODEL, ["a"])  # touch "a" so "b" is the LRU entry
+        cache.put_many(_MODEL, ["c"], _vectors(1, seed=1))
+
+        a, b, c = cache.get_many(_MODEL, ["a", "b", "c"])
+        assert a is not None
+        assert b is None
+        assert c is not None
+        assert cache.stats().evictions == 1
+        assert cache.stats().memory_entries == 2
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Disk tier
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestDiskTier:
+    def test_survives_restart(self, tmp_path):
+        """A new cache over the same directory should see earlier vectors."""
+        vecs = _vectors(3)
+        EmbeddingCache(disk_dir=tmp_path).put_many(_MODEL, ["x", "y", "z"], vecs)
+
+        reopened = EmbeddingCache(disk_dir=tmp_path)
+        hits = reopened.get_many(_MODEL, ["z", "x", "missing"])
+        np.testing.assert_array_equal(hits[0], vecs[2])
+        np.testing.assert_array_equal(hits[1], vecs[0])
+        assert hits[2] is None
+
+        stats = reopened.stats()
+        assert stats.disk_hits == 2
+        assert stats.disk_entries == 3
+
+    def test_duplicate_puts_not_appended_twice(self, tmp_path):
+        cache = EmbeddingCache(disk_dir=tmp_path)
+        cache.put_many(_MODEL, ["x"], _vectors(1))
+        cache.put_many(_MODEL, ["x"], _vectors(1))
+        assert cache.stats().disk_entries == 1
+
+    def test_torn_append_is_ignored(self, tmp_path):
+        """Vectors written without a matching key line are never looked up."""
+        EmbeddingCache(disk_dir=tmp_path).put_many(_MODEL, ["x"], _vectors(1))
+        store = MmapVectorStore(tmp_path / _MODEL)
+        store.append(_vectors(1, seed=5))  # simulate a crash before the key log write
+
+        reopened = EmbeddingCache(disk_dir=tmp_path)
+        assert reopened.get_many(_MODEL, ["x"])[0] is not None
+        assert reopened.stats().disk_entries == 1
+
+    def test_writers_in_separate_processes_keep_keys_on_their_rows(self, tmp_path):
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_put_batches, args=(str(tmp_path), w, 200)) for w in range(3)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        assert all(p.exitcode == 0 for p in procs)
+
+        texts = [f"{w}-{i}" for w in range(3) for i in range(200)]
+        hits = EmbeddingCache(disk_dir=tmp_path).get_many(_MODEL, texts)
+        for text, hit in zip(texts, hits):
+            w, i = map(int, text.split("-"))
+            np.testing.assert_array_equal(hit, np.full(8, w * 1000 + i, dtype=np.float32))
+
+
+class TestVectorStore:
+    def test_writers_in_separate_processes_do_not_overwrite(self, tmp_path):
+        """Each store stands in for a process: neither's row count is current."""
+        first, second = MmapVectorStore(tmp_path, dimensions=4), MmapVectorStore(tmp_path)
+        a, b = _vectors(2, dim=4), _vectors(3, dim=4, seed=1)
+        assert first.append(a) == 0
+        assert second.append(b) == 2
+        assert first.append(a[:1]) == 5
+        assert len(first) == len(second) == 6
+        np.testing.assert_array_equal(second.matrix, np.concatenate([a, b, a[:1]]))
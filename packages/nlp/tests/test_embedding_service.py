@@ -7,13 +7,27 @@ Subsequent runs use the cached model.
 
 from __future__ import annotations
 
+import json
 import math
 
 import httpx
+import numpy as np
 import pytest
 
 from forge_nlp.chunking.clause_chunker import DocumentChunk
-from forge_nlp.embeddings.embedding_service import EmbeddedChunk, EmbeddingService
+from forge_nlp.embeddings.backends import Backend, load_sentence_transformer
+from forge_nlp.embeddings.batching import fixed_batches, padding_stats, plan_token_batches
+from forge_nlp.embeddings.embedding_cache import EmbeddingCache
+from forge_nlp.embeddings.embedding_service import (
+    EmbeddedChunk,
+    EmbeddedChunkBatch,
+    EmbeddedChunkRow,
+    EmbeddingService,
+)
+from forge_nlp.embeddings.encoder_pool import EncoderPool
+from forge_nlp.embeddings.projection import PcaProjection
+from forge_nlp.embeddings.quantization import ScalarQuantizer
+from forge_nlp.embeddings.wire_format import decode_frame
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────
@@ -145,6 +159,68 @@ class TestEmbedBatch:
         assert len(results) == 10
         assert all(len(v) == 768 for v in results)
 
+    def test_duplicate_texts_encoded_once(self, service: EmbeddingService, monkeypatch):
+        """Identical inputs share one encode and every position gets the vector."""
+        svc = EmbeddingService(model_name=service.model_name)
+        encoded: list[str] = []
+        original = svc.encode
+
+        def spy(texts, batch_size=None):
+            encoded.extend(texts)
+            return original(texts, batch_size)
+
+        monkeypatch.setattr(svc, "encode", spy)
+        boilerplate = "52.204-21 Basic Safeguarding of Covered Contractor Information Systems"
+        vectors = svc.embed_batch([boilerplate, "Section B", boilerplate, boilerplate])
+
+        assert encoded == [boilerplate, "Section B"]
+        assert vectors[0] == vectors[2] == vectors[3]
+        stats = svc.dedup_stats()
+        assert stats.texts == 4
+        assert stats.duplicates == 2
+
+    def test_bucketed_batches_preserve_input_order(self, service: EmbeddingService):
+        """Length-sorted batching must return vectors in the caller's order."""
+        texts = [
+            "Section A",
+            "52.219-8 Utilization of Small Business Concerns " * 20,
+            "Section B — Supplies or Services and Prices",
+            "The contractor shall deliver all items per the schedule in Section F.",
+        ]
+        bucketed = EmbeddingService(model_name=service.model_name, max_tokens_per_batch=64)
+        unbucketed = EmbeddingService(model_name=service.model_name, max_tokens_per_batch=None)
+        for a, b in zip(bucketed.embed_batch(texts), unbucketed.embed_batch(texts)):
+            assert _cosine_similarity(a, b) > 0.9999
+
+
+class TestBatchPlanning:
+    def test_sorted_longest_first_within_budget(self):
+        """Each batch should respect the padded-token budget."""
+        lengths = [10, 500, 12, 480, 11, 9]
+        batches = plan_token_batches(lengths, max_tokens_per_batch=1024, max_batch_size=32)
+        assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+        assert batches[0] == [1, 3]
+        for batch in batches:
+            assert len(batch) * max(lengths[i] for i in batch) <= 1024
+
+    def test_batch_size_caps_rows(self):
+        batches = plan_token_batches([5] * 10, max_tokens_per_batch=10_000, max_batch_size=3)
+        assert [len(b) for b in batches] == [3, 3, 3, 1]
+
+    def test_oversized_input_gets_own_batch(self):
+        batches = plan_token_batches([600, 10], max_tokens_per_batch=512, max_batch_size=32)
+        assert batches == [[0], [1]]
+
+    def test_bucketing_reduces_padding(self):
+        """Mixed long and short inputs should waste far less on padding."""
+        lengths = [512, 20, 25, 18, 30, 22, 509, 19] * 4
+        fixed = padding_stats(lengths, fixed_batches(len(lengths), 8))
+        bucketed = padding_stats(
+            lengths, plan_token_batches(lengths, max_tokens_per_batch=4096, max_batch_size=8),
+        )
+        assert bucketed.real_tokens == fixed.real_tokens
+        assert bucketed.padding_ratio < 0.1 < fixed.padding_ratio
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # embed_chunks tests
@@ -153,7 +229,7 @@ class TestEmbedBatch:
 
 class TestEmbedChunks:
     def test_attaches_embeddings_to_chunks(self, service: EmbeddingService):
-        """embed_chunks should return EmbeddedChunk objects with vectors."""
+        """embed_chunks should return the chunks with their vectors attached."""
         chunks = [
             DocumentChunk(
                 chunk_text="52.202-1 Definitions (JUN 2020) — establishes definitions.",
@@ -174,10 +250,11 @@ class TestEmbedChunks:
         embedded = service.embed_chunks(chunks)
 
         assert len(embedded) == 2
+        assert isinstance(embedded, EmbeddedChunkBatch)
+        assert embedded.embeddings.shape == (2, 768)
+        assert embedded.embeddings.dtype == np.float32
         for ec in embedded:
-            assert isinstance(ec, EmbeddedChunk)
             assert len(ec.embedding) == 768
-            assert isinstance(ec.embedding[0], float)
 
         # Verify metadata is preserved
         assert embedded[0].clause_number == "52.202-1"
@@ -186,10 +263,378 @@ class TestEmbedChunks:
         assert embedded[1].clause_number is None
         assert embedded[1].section_type == "SECTION_B"
 
+    def test_token_ids_path_matches_text_path(self, service: EmbeddingService):
+        """Chunks from a token-aware chunker embed without re-tokenizing, same vectors."""
+        from forge_nlp.chunking.clause_chunker import DocumentProcessor
+        from forge_nlp.embeddings.corpus import _SAMPLE_CONTRACT
+
+        processor = DocumentProcessor(
+            tokenizer=service.tokenizer, max_length=service.max_seq_length
+        )
+        chunks = processor.process(_SAMPLE_CONTRACT.read_text(), "sample")[:6]
+        assert all(c.token_ids is not None for c in chunks)
+
+        from_ids = service.embed_chunks(chunks)
+        from_text = service.embed_batch([c.chunk_text for c in chunks])
+        for ec, vec in zip(from_ids, from_text):
+            assert _cosine_similarity(ec.embedding, vec) > 0.9999
+        assert service.count_truncated(chunks) == 0
+
+    def test_truncated_chunks_counted(self, service: EmbeddingService):
+        long_text = "The contractor shall comply with FAR 52.204-21. " * 200
+        svc = EmbeddingService(model_name=service.model_name)
+        svc.embed_batch([long_text, "Section B"])
+        stats = svc.truncation_stats()
+        assert stats.texts == 2
+        assert stats.truncated == 1
+        assert stats.tokens_dropped > 0
+        chunk = DocumentChunk(
+            chunk_text=long_text, section_type="OTHER", clause_number=None, chunk_index=0,
+            metadata={"token_count": svc.max_seq_length + 1},
+        )
+        unmeasured = DocumentChunk(
+            chunk_text=long_text, section_type="OTHER", clause_number=None, chunk_index=1,
+        )
+        assert svc.count_truncated([chunk, unmeasured]) == 1
+
+    def test_late_chunking(self, service: EmbeddingService):
+        """Overlapping chunks share windows; lone chunks keep their per-chunk vector."""
+        from forge_nlp.chunking.clause_chunker import DocumentProcessor
+        from forge_nlp.embeddings.corpus import _SAMPLE_CONTRACT
+
+        processor = DocumentProcessor(target_tokens=60, max_tokens=80, overlap_tokens=20)
+        chunks = processor.process(_SAMPLE_CONTRACT.read_text(), "sample")
+        svc = EmbeddingService(model_name=service.model_name)
+
+        per_chunk = svc.embed_chunks(chunks)
+        late = svc.embed_chunks(chunks, late_chunking=True)
+        stats = svc.late_chunking_stats()
+
+        assert 0 < stats.chunks < len(chunks)
+        assert stats.window_tokens < stats.chunk_tokens
+        similarities = [
+            _cosine_similarity(a.embedding, b.embedding) for a, b in zip(per_chunk, late)
+        ]
+        assert min(similarities) > 0.8
+        assert sum(s > 0.9999 for s in similarities) >= len(chunks) - stats.chunks
+
     def test_embed_empty_chunks(self, service: EmbeddingService):
-        """embed_chunks with empty list should return empty list."""
+        """embed_chunks with an empty list should return an empty batch."""
         result = service.embed_chunks([])
-        assert result == []
+        assert len(result) == 0
+        assert result.embeddings.shape == (0, 768)
+
+
+class TestEmbeddedChunkBatch:
+    @staticmethod
+    def _batch(n: int = 3) -> EmbeddedChunkBatch:
+        chunks = [
+            DocumentChunk(chunk_text=f"text {i}", section_type="SECTION_C", clause_number=None,
+                          chunk_index=i, metadata={"i": i})
+            for i in range(n)
+        ]
+        vectors = np.arange(n * 4, dtype=np.float64).reshape(n, 4)
+        return EmbeddedChunkBatch(chunks, vectors, "model-a")
+
+    def test_rows_are_views_of_one_matrix(self):
+        batch = self._batch()
+        assert batch.embeddings.dtype == np.float32
+        assert batch.embeddings.flags.c_contiguous
+        row = batch[1]
+        assert isinstance(row, EmbeddedChunkRow)
+        assert np.shares_memory(row.embedding, batch.embeddings)
+        assert row.embedding.tolist() == [4.0, 5.0, 6.0, 7.0]
+        assert (row.chunk_text, row.chunk_index, row.embedding_version) == ("text 1", 1, "model-a")
+        assert row.metadata is batch.chunks[1].metadata  # shared, not copied
+        with pytest.raises(ValueError):
+            row.embedding[0] = 0.0
+
+    def test_sequence_protocol(self):
+        batch = self._batch()
+        assert [r.chunk_index for r in batch] == [0, 1, 2]
+        assert batch[-1].chunk_index == 2
+        with pytest.raises(IndexError):
+            batch[3]
+        tail = batch[1:]
+        assert isinstance(tail, EmbeddedChunkBatch)
+        assert len(tail) == 2 and tail.embedding_version == "model-a"
+
+    def test_rows_without_slots_dict(self):
+        assert not hasattr(self._batch()[0], "__dict__")
+
+    def test_to_embedded_chunks(self):
+        [first, *_] = self._batch().to_embedded_chunks()
+        assert isinstance(first, EmbeddedChunk)
+        assert first.embedding == [0.0, 1.0, 2.0, 3.0]
+        assert isinstance(first.embedding[0], float)
+        assert first.embedding_version == "model-a"
+
+    def test_shape_mismatch_rejected(self):
+        with pytest.raises(ValueError, match="Expected 2 embedding rows"):
+            EmbeddedChunkBatch(self._batch(2).chunks, np.zeros((3, 4)))
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Inference backend tests
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestBackends:
+    def test_onnx_backend_requires_export(self, tmp_path):
+        """onnx-int8 should point at the export command when no model exists."""
+        with pytest.raises(FileNotFoundError, match="backends export"):
+            load_sentence_transformer("some/model", Backend.ONNX_INT8, onnx_dir=tmp_path)
+
+    def test_torch_compile_matches_eager(self, service: EmbeddingService):
+        """torch.compile must not change the vectors."""
+        compiled = EmbeddingService(model_name=service.model_name, backend="torch-compile")
+        assert compiled.backend is Backend.TORCH_COMPILE
+        texts = ["52.204-21 Basic Safeguarding", "The period of performance is 12 months."]
+        for a, b in zip(compiled.embed_batch(texts), service.embed_batch(texts)):
+            assert _cosine_similarity(a, b) > 0.9999
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Reduced dimensionality tests
+# ═══════════════════════════════════════════════════════════════════════
+
+_PROJECTION_TEXTS = [
+    f"{prefix} clause {n}: the contractor shall {verb} within {n} days."
+    for n, (prefix, verb) in enumerate(
+        [(p, v) for p in ("FAR", "DFARS", "Section C", "Section H")
+         for v in ("deliver reports", "notify the CO", "submit invoices", "safeguard data")]
+    )
+]
+
+
+@pytest.fixture(scope="module")
+def projection(service: EmbeddingService) -> PcaProjection:
+    vectors = np.asarray(service.embed_batch(_PROJECTION_TEXTS), dtype=np.float32)
+    return PcaProjection.fit(vectors, max_dimensions=8)
+
+
+class TestProjection:
+    def test_dimensions_option(self, service: EmbeddingService, projection: PcaProjection):
+        svc = EmbeddingService(model_name=service.model_name, projection=projection)
+        assert len(svc.embed_batch(["Section B"])[0]) == service.dimensions
+        assert len(svc.embed_batch(["Section B"], dimensions=8)[0]) == 8
+        assert len(svc.embed_text("Section B", dimensions=4)) == 4
+
+    def test_output_dimensions_default(self, service: EmbeddingService, projection: PcaProjection):
+        svc = EmbeddingService(
+            model_name=service.model_name, projection=projection, output_dimensions=8,
+        )
+        embedded = svc.embed_chunks([DocumentChunk(
+            chunk_text="Section B", section_type="SECTION_B", clause_number=None, chunk_index=0,
+        )])
+        assert len(embedded[0].embedding) == 8
+
+    def test_cache_stores_full_vectors(self, service: EmbeddingService, projection: PcaProjection):
+        svc = EmbeddingService(
+            model_name=service.model_name, projection=projection, cache=EmbeddingCache(),
+        )
+        svc.embed_batch(["Section B"], dimensions=8)
+        full = svc.embed_batch(["Section B"])
+        assert len(full[0]) == service.dimensions
+        assert svc.cache_stats().hits == 1
+
+    def test_version_names_projection(self, service: EmbeddingService, projection: PcaProjection):
+        svc = EmbeddingService(model_name=service.model_name, projection=projection)
+        assert svc.embedding_version() == svc.cache_namespace
+        assert svc.embedding_version(8) == f"{svc.cache_namespace}/8d@{projection.digest[:12]}"
+
+    def test_reduced_dimensions_need_projection(
+        self, service: EmbeddingService, tmp_path, monkeypatch,
+    ):
+        monkeypatch.setattr(
+            "forge_nlp.embeddings.embedding_service.default_projection_path",
+            lambda model_name: tmp_path / "missing.pca.npz",
+        )
+        svc = EmbeddingService(model_name=service.model_name)
+        assert svc.projection is None
+        with pytest.raises(ValueError, match="projection fit"):
+            svc.embed_batch(["Section B"], dimensions=8)
+
+    def test_int8_calibration_dimension_mismatch(
+        self, service: EmbeddingService, projection: PcaProjection,
+    ):
+        full = np.asarray(service.embed_batch(_PROJECTION_TEXTS), dtype=np.float32)
+        svc = EmbeddingService(
+            model_name=service.model_name,
+            projection=projection,
+            int8_calibration=ScalarQuantizer.fit(full),
+        )
+        with pytest.raises(ValueError, match="int8 calibration"):
+            svc.embed_batch_quantized(["Section B"], "int8", dimensions=8)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Encoder pool tests
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestEncoderPool:
+    @pytest.fixture(scope="class")
+    def pool(self, service: EmbeddingService):
+        with EncoderPool(
+            workers=2, model_name=service.model_name, threads_per_worker=1, min_shard_size=2,
+        ) as pool:
+            yield pool
+
+    def test_sharded_batch_matches_in_process(self, service: EmbeddingService, pool: EncoderPool):
+        """Shards encoded by different workers must merge back in input order."""
+        pooled = EmbeddingService(model_name=service.model_name, pool=pool)
+        texts = _PROJECTION_TEXTS[:9]
+        for a, b in zip(pooled.embed_batch(texts), service.embed_batch(texts)):
+            assert _cosine_similarity(a, b) > 0.9999
+        assert len(pooled.embed_text("Section B")) == service.dimensions
+
+        health = pool.health()
+        assert pool.healthy
+        assert [w.alive for w in health] == [True, True]
+        assert all(w.calls >= 1 for w in health)
+        assert sum(w.texts for w in health) >= 10
+        assert all(w.cpus and w.threads == 1 for w in health)
+
+    def test_pool_model_must_match_service(self, service: EmbeddingService, pool: EncoderPool):
+        with pytest.raises(ValueError, match="Encoder pool runs"):
+            EmbeddingService(model_name=service.model_name, backend="torch-compile", pool=pool)
+
+    def test_shutdown_stops_workers(self, service: EmbeddingService):
+        pool = EncoderPool(workers=1, model_name=service.model_name, threads_per_worker=1).start()
+        pids = [w.pid for w in pool.health()]
+        pool.shutdown()
+        assert pids and not pool.running
+        assert pool.health() == []
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Embedding cache tests
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestEmbeddingCacheIntegration:
+    def test_only_misses_are_encoded(self, service: EmbeddingService, monkeypatch):
+        """Cached texts should never reach the model a second time."""
+        cached_svc = EmbeddingService(model_name=service.model_name, cache=EmbeddingCache())
+        encoded: list[str] = []
+        original = cached_svc.encode
+
+        def spy(texts, batch_size=None):
+            encoded.extend(texts)
+            return original(texts, batch_size)
+
+        monkeypatch.setattr(cached_svc, "encode", spy)
+
+        first = cached_svc.embed_batch(["52.204-21 Basic Safeguarding", "Section B"])
+        second = cached_svc.embed_batch(["Section B", "52.204-21  Basic Safeguarding", "Section C"])
+
+        assert encoded == ["52.204-21 Basic Safeguarding", "Section B", "Section C"]
+        assert second[0] == first[1]
+        assert second[1] == first[0]
+
+        stats = cached_svc.cache_stats()
+        assert stats is not None
+        assert stats.hits == 2
+        assert stats.misses == 3
+
+    def test_cached_vectors_match_uncached(self, service: EmbeddingService):
+        """A cache hit should return the same vector the model produces."""
+        cached_svc = EmbeddingService(model_name=service.model_name, cache=EmbeddingCache())
+        text = "The contractor shall comply with DFARS 252.204-7012."
+        cached_svc.embed_text(text)
+        assert cached_svc.embed_text(text) == service.embed_batch([text])[0]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Clause library tests
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class TestClauseLibrary:
+    def test_library_hits_skip_the_model(self, service: EmbeddingService, tmp_path, monkeypatch):
+        """Standard clause chunks take precomputed vectors; only the rest are encoded."""
+        from forge_nlp.chunking.clause_chunker import DocumentProcessor
+        from forge_nlp.embeddings.clause_library import build_library
+
+        corpus = (
+            "52.204-21 Basic Safeguarding of Covered Contractor Information Systems (NOV 2021)\n"
+            "The Contractor shall apply basic safeguarding requirements.\n\n"
+            "252.204-7012 Safeguarding Covered Defense Information (JAN 2023)\n"
+            "The Contractor shall implement NIST SP 800-171.\n"
+        )
+        library = build_library(service, corpus, tmp_path / "lib")
+        assert len(library) == 2
+
+        svc = EmbeddingService(model_name=service.model_name, clause_library=tmp_path / "lib")
+        document = "SECTION I — CONTRACT CLAUSES\n\n" + corpus
+        chunks = DocumentProcessor().process(document, "award-1")
+        clause_chunks = [c for c in chunks if c.clause_number is not None]
+        assert len(clause_chunks) == 2
+
+        encoded: list[str] = []
+        original = svc.encode
+
+        def spy(texts, batch_size=None):
+            encoded.extend(texts)
+            return original(texts, batch_size)
+
+        monkeypatch.setattr(svc, "encode", spy)
+        embedded = svc.embed_chunks(chunks)
+
+        assert all(t not in encoded for t in (c.chunk_text for c in clause_chunks))
+        assert len(encoded) == len(chunks) - 2
+        expected = service.embed_batch([c.chunk_text for c in chunks])
+        for ec, vec in zip(embedded, expected):
+            assert _cosine_similarity(ec.embedding, vec) > 0.9999
+        assert svc.clause_library.stats().hits == 2
+
+
+class TestAutotune:
+    def test_sweep_persists_and_service_applies(
+        self, service: EmbeddingService, tmp_path, monkeypatch,
+    ):
+        """A real (single thread setting) sweep; the service adopts its settings."""
+        import torch
+
+        from forge_nlp.embeddings import autotune as autotune_module
+
+        monkeypatch.setattr(autotune_module, "available_cpus", lambda: [0])
+        path = tmp_path / "tuning.json"
+        result = autotune_module.autotune(
+            service.model_name, path=path, seq_buckets=(16, 64), batch_sizes=(1, 4), repeats=2,
+        )
+        assert path.exists()
+        assert {(m.seq_len, m.batch_size) for m in result.measurements} == {
+            (16, 1), (16, 4), (64, 1), (64, 4),
+        }
+        assert result.batch_size in (1, 4)
+        assert result.max_tokens_per_batch in (64, 256)
+
+        threads = torch.get_num_threads()
+        try:
+            svc = EmbeddingService(model_name=service.model_name, autotune=result)
+            assert svc.tuning is result
+            assert (svc.batch_size, svc.max_tokens_per_batch) == (
+                result.batch_size, result.max_tokens_per_batch,
+            )
+            assert torch.get_num_threads() == 1
+            texts = ["Section B", "Section C"]
+            for a, b in zip(svc.embed_batch(texts), service.embed_batch(texts)):
+                assert _cosine_similarity(a, b) > 0.9999
+        finally:
+            torch.set_num_threads(threads)
+
+    def test_tuning_for_another_model_rejected(self, service: EmbeddingService):
+        from forge_nlp.embeddings.autotune import TuningResult
+
+        tuning = TuningResult(
+            model_name="other/model", backend="torch", fingerprint="x", batch_size=8,
+            max_tokens_per_batch=2048, intra_op_threads=1, inter_op_threads=1,
+            tokens_per_s=1.0, max_ms=1.0, max_latency_ms=1.0,
+        )
+        with pytest.raises(ValueError, match="other/model"):
+            EmbeddingService(model_name=service.model_name, autotune=tuning)
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -219,6 +664,12 @@ class TestFastAPIEndpoints:
         assert data["model_loaded"] is True
         assert data["model_name"] == "nlpaueb/legal-bert-base-uncased"
         assert data["dimensions"] == 768
+        assert data["model_dimensions"] == 768
+        assert data["backend"] == "torch"
+        assert [m["model_name"] for m in data["models"]] == ["nlpaueb/legal-bert-base-uncased"]
+        assert data["models"][0]["size_bytes"] > 0
+        assert data["model_memory_used_bytes"] == data["models"][0]["size_bytes"]
+        assert data["tuning"] is None  # EMBED_AUTOTUNE unset
 
     @pytest.mark.asyncio
     async def test_embed_endpoint(self, client: httpx.AsyncClient):
@@ -236,6 +687,17 @@ class TestFastAPIEndpoints:
         assert data["model"] == "nlpaueb/legal-bert-base-uncased"
         assert data["dimensions"] == 768
 
+    @pytest.mark.asyncio
+    async def test_embed_query_without_encoder(self, client: httpx.AsyncClient):
+        """query=true falls back to the full model when no query encoder is built."""
+        text = "Which clauses require CMMC certification?"
+        plain = await client.post("/embed", json={"texts": [text]})
+        query = await client.post("/embed", json={"texts": [text], "query": True})
+        assert query.status_code == 200
+        np.testing.assert_allclose(
+            query.json()["embeddings"], plain.json()["embeddings"], atol=1e-5,
+        )
+
     @pytest.mark.asyncio
     async def test_embed_chunks_endpoint(self, client: httpx.AsyncClient):
         """POST /embed-chunks should embed chunk objects."""
@@ -257,6 +719,331 @@ class TestFastAPIEndpoints:
         assert len(ec["embedding"]) == 768
         assert ec["section_type"] == "SECTION_C"
 
+    @pytest.mark.asyncio
+    async def test_embed_endpoint_binary_frame(self, client: httpx.AsyncClient):
+        """Accept: application/octet-stream should return a raw float32 frame."""
+        texts = ["FAR 52.212-4 Contract Terms and Conditions", "Section B"]
+        resp = await client.post(
+            "/embed", json={"texts": texts}, headers={"Accept": "application/octet-stream"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/octet-stream"
+        vectors, meta = decode_frame(resp.content)
+        assert vectors.shape == (2, 768)
+        assert meta["model"] == "nlpaueb/legal-bert-base-uncased"
+
+        json_resp = await client.post("/embed", json={"texts": texts})
+        for a, b in zip(vectors.tolist(), json_resp.json()["embeddings"]):
+            assert _cosine_similarity(a, b) > 0.9999
+
+    @pytest.mark.asyncio
+    async def test_embed_chunks_endpoint_npy(self, client: httpx.AsyncClient):
+        """Accept: application/x-npy should return .npy with metadata in a header."""
+        import io
+        import json
+
+        import numpy as np
+
+        resp = await client.post(
+            "/embed-chunks",
+            json={"chunks": [
+                {"chunk_text": "Monthly status reports.", "section_type": "SECTION_C"},
+                {"chunk_text": "52.204-21 Basic Safeguarding", "clause_number": "52.204-21"},
+            ]},
+            headers={"Accept": "application/x-npy"},
+        )
+        assert resp.status_code == 200
+        vectors = np.load(io.BytesIO(resp.content))
+        assert vectors.shape == (2, 768)
+        meta = json.loads(resp.headers["x-embedding-metadata"])
+        assert meta["chunks"][0]["section_type"] == "SECTION_C"
+        assert meta["chunks"][1]["clause_number"] == "52.204-21"
+
+    @pytest.mark.asyncio
+    async def test_embed_endpoint_binary_precision(self, client: httpx.AsyncClient):
+        """precision=binary should return packed sign bits (96 bytes for 768 dims)."""
+        resp = await client.post("/embed", json={"texts": ["Section B"], "precision": "binary"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["precision"] == "binary"
+        assert len(data["embeddings"][0]) == 96
+        assert all(isinstance(b, int) and 0 <= b <= 255 for b in data["embeddings"][0])
+
+    @pytest.mark.asyncio
+    async def test_embed_chunks_float16_with_full_precision(self, client: httpx.AsyncClient):
+        resp = await client.post("/embed-chunks", json={
+            "chunks": [{"chunk_text": "The contractor shall provide monthly reports."}],
+            "precision": "float16",
+            "include_float32": True,
+        })
+        assert resp.status_code == 200
+        ec = resp.json()["embedded_chunks"][0]
+        assert len(ec["embedding"]) == 768
+        assert len(ec["embedding_float32"]) == 768
+        assert ec["embedding"][0] == pytest.approx(ec["embedding_float32"][0], abs=1e-2)
+
+    @pytest.mark.asyncio
+    async def test_embed_chunks_stream_endpoint(self, client: httpx.AsyncClient, monkeypatch):
+        """POST /embed-chunks/stream answers NDJSON chunks with one line each, then a summary."""
+        monkeypatch.setenv("EMBED_STREAM_BATCH_SIZE", "4")
+        chunks = [
+            {"chunk_text": f"The contractor shall deliver report {i}.", "chunk_index": i}
+            for i in range(10)
+        ]
+        body = "".join(json.dumps(c) + "\n" for c in chunks)
+        resp = await client.post(
+            "/embed-chunks/stream", content=body, headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        *lines, summary = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line["chunk_index"] for line in lines] == list(range(10))
+        assert all(len(line["embedding"]) == 768 for line in lines)
+        assert summary == {
+            "done": True, "chunks": 10,
+            "embedding_version": "nlpaueb/legal-bert-base-uncased",
+        }
+
+        whole = (await client.post("/embed-chunks", json={"chunks": chunks[:1]})).json()
+        np.testing.assert_allclose(
+            lines[0]["embedding"], whole["embedded_chunks"][0]["embedding"], atol=1e-5,
+        )
+
+    @pytest.mark.asyncio
+    async def test_embed_chunks_stream_errors(self, client: httpx.AsyncClient):
+        """Bad settings are a 422; a bad line after streaming began ends it with an error line."""
+        resp = await client.post(
+            "/embed-chunks/stream?dimensions=7", content=b'{"chunk_text": "a"}\n'
+        )
+        assert resp.status_code == 422
+
+        resp = await client.post("/embed-chunks/stream", content=b'{"chunk_text": "a"}\n{"x": 1}\n')
+        assert resp.status_code == 200
+        [last] = [json.loads(line) for line in resp.text.splitlines()]
+        assert "chunk_text" in last["error"]
+        assert last["chunks"] == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_reports_cache(self, client: httpx.AsyncClient):
+        """GET /metrics should expose embedding cache counters."""
+        await client.post("/embed", json={"texts": ["FAR 52.212-4"]})
+        await client.post("/embed", json={"texts": ["FAR 52.212-4"]})
+        resp = await client.get("/metrics")
+        assert resp.status_code == 200
+        cache = resp.json()["cache"]
+        assert cache["hits"] >= 1
+        assert cache["misses"] >= 1
+        assert 0.0 <= cache["hit_rate"] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_embed_endpoint_dimensions(self, client: httpx.AsyncClient, monkeypatch):
+        """dimensions= projects the vectors; sizes the projection lacks are a 422."""
+        import api
+
+        svc = api._get_service()
+        full = np.asarray(svc.embed_batch(_PROJECTION_TEXTS), dtype=np.float32)
+        monkeypatch.setattr(svc, "_projection", PcaProjection.fit(full, max_dimensions=8))
+
+        resp = await client.post("/embed", json={"texts": ["Section B"], "dimensions": 8})
+        assert resp.status_code == 200
+        assert resp.json()["dimensions"] == 8
+        assert len(resp.json()["embeddings"][0]) == 8
+
+        resp = await client.post("/embed", json={"texts": ["Section B"], "dimensions": 128})
+        assert resp.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_search_endpoint(self, client: httpx.AsyncClient, monkeypatch, tmp_path):
+        """/search ranks indexed chunks for a query; an index of another version is a 409."""
+        import api
+        from forge_nlp.search.exact_index import ExactIndex
+
+        svc = api._get_service()
+        texts = [
+            "The Contractor shall deliver monthly status reports.",
+            "All stored data must use AES-256 encryption.",
+            "Invoices are submitted through Wide Area WorkFlow.",
+        ]
+        index = ExactIndex(
+            tmp_path / "idx", dimensions=768, embedding_version=svc.embedding_version()
+        )
+        index.add(["c1", "c2", "c3"], ["SECTION_C", "SECTION_H", "SECTION_G"],
+                  np.asarray(svc.embed_batch(texts)), ["k1", "k1", "k2"],
+                  [None, "52.204-21", "52.232-33"])
+        monkeypatch.setattr(api, "_search_index", index)
+
+        resp = await client.post("/search", json={"query": texts[1], "k": 2})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["hits"][0]["chunk_id"] == "c2"
+        assert len(data["hits"]) == 2
+        assert data["embedding_version"] == svc.embedding_version()
+
+        resp = await client.post(
+            "/search", json={"query": texts[1], "section_types": ["SECTION_G"]}
+        )
+        assert [h["chunk_id"] for h in resp.json()["hits"]] == ["c3"]
+
+        resp = await client.post("/search", json={"query": texts[1], "clause_numbers": ["52.2"],
+                                                  "contract_ids": ["k1"]})
+        [hit] = resp.json()["hits"]
+        assert (hit["chunk_id"], hit["contract_id"]) == ("c2", "k1")
+        assert hit["clause_number"] == "52.204-21"
+
+        other = ExactIndex(tmp_path / "other", dimensions=768, embedding_version="other-model")
+        monkeypatch.setattr(api, "_search_index", other)
+        assert (await client.post("/search", json={"query": "x"})).status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_search_endpoint_hnsw_and_metrics(
+        self, client: httpx.AsyncClient, monkeypatch, tmp_path,
+    ):
+        """An HNSW index takes a per-query ef_search; /metrics reports search latency."""
+        import api
+        from forge_nlp.search.hnsw_index import HnswIndex
+
+        svc = api._get_service()
+        texts = ["Deliver monthly status reports.", "Encrypt stored data with AES-256."]
+        index = HnswIndex(
+            tmp_path / "hnsw", dimensions=768, embedding_version=svc.embedding_version()
+        )
+        index.add(["c1", "c2"], ["SECTION_C", "SECTION_H"], np.asarray(svc.embed_batch(texts)))
+        monkeypatch.setattr(api, "_search_index", index)
+        monkeypatch.setattr(api, "_search_latency", api.LatencyWindow())
+
+        resp = await client.post("/search", json={"query": texts[0], "k": 1, "ef_search": 8})
+        assert resp.status_code == 200
+        assert resp.json()["hits"][0]["chunk_id"] == "c1"
+        search = (await client.get("/metrics")).json()["search"]
+        assert search["index_kind"] == "hnsw" and search["chunks"] == 2
+        assert search["requests"] == 1 and search["p99_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_endpoint(self, client: httpx.AsyncClient, monkeypatch, tmp_path):
+        """/search/hybrid reranks BM25 candidates densely and times each stage."""
+        import api
+        from forge_nlp.search.bm25_index import Bm25Index
+        from forge_nlp.search.exact_index import ExactIndex
+
+        svc = api._get_service()
+        texts = [
+            "52.204-21 Basic Safeguarding of Covered Contractor Information Systems.",
+            "The Contractor shall deliver monthly status reports.",
+            "The Contractor shall encrypt stored data with AES-256.",
+        ]
+        index = ExactIndex(
+            tmp_path / "idx", dimensions=768, embedding_version=svc.embedding_version()
+        )
+        index.add(["c1", "c2", "c3"], ["SECTION_I", "SECTION_C", "SECTION_H"],
+                  np.asarray(svc.embed_batch(texts)))
+        lexical = Bm25Index(tmp_path / "bm25")
+        lexical.add(["c1", "c2", "c3"], ["SECTION_I", "SECTION_C", "SECTION_H"], texts)
+        monkeypatch.setattr(api, "_search_index", index)
+        monkeypatch.setattr(api, "_lexical_index", lexical)
+        monkeypatch.setattr(api, "_lexical_latency", api.LatencyWindow())
+
+        resp = await client.post("/search/hybrid", json={"query": "52.204-21"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [h["chunk_id"] for h in data["hits"]] == ["c1"] and not data["fallback"]
+        assert data["lexical_ms"] > 0 and data["dense_ms"] > 0 and data["embed_ms"] > 0
+
+        resp = await client.post(
+            "/search/hybrid", json={"query": "contractor encryption of data", "k": 2}
+        )
+        assert resp.json()["hits"][0]["chunk_id"] == "c3" and resp.json()["candidates"] == 3
+        lexical_stats = (await client.get("/metrics")).json()["lexical"]
+        assert lexical_stats["chunks"] == 3 and lexical_stats["requests"] == 2
+
+        monkeypatch.setattr(api, "_lexical_index", None)
+        monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "none"))
+        assert (await client.post("/search/hybrid", json={"query": "x"})).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_ivfpq_operations(self, client: httpx.AsyncClient, monkeypatch, tmp_path):
+        """Train, add, save and load an IVF-PQ index over the API, then search it."""
+        import api
+
+        monkeypatch.setenv("SEARCH_INDEX_DIR", str(tmp_path / "ivfpq"))
+        monkeypatch.setattr(api, "_search_index", None)
+        sample = [
+            f"Clause {i}: the Contractor shall provide item {i % 17} by day {i}."
+            for i in range(300)
+        ]
+
+        resp = await client.post("/search/ivfpq/train", json={"texts": sample, "nlist": 4})
+        assert resp.status_code == 200
+        assert resp.json()["chunks"] == 0 and resp.json()["subquantizers"] == 48
+        assert (await client.post("/search/ivfpq/train", json={"texts": sample})).status_code == 409
+
+        chunks = [{"chunk_id": f"c{i}", "chunk_text": t} for i, t in enumerate(sample[:20])]
+        resp = await client.post("/search/ivfpq/add", json={"chunks": chunks})
+        assert resp.json()["chunks"] == 20 and resp.json()["unsaved"] == 20
+        assert (await client.post("/search/ivfpq/save")).json()["unsaved"] == 0
+        resp = await client.post("/search/ivfpq/load")
+        assert resp.json()["chunks"] == 20 and resp.json()["bytes_per_vector"] > 0
+
+        resp = await client.post("/search", json={"query": sample[7], "k": 3, "nprobe": 4})
+        assert resp.json()["hits"][0]["chunk_id"] == "c7"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_encode(self, client: httpx.AsyncClient):
+        """Identical concurrent /embed calls are deduplicated; /metrics counts the savings."""
+        import asyncio
+
+        before = (await client.get("/metrics")).json()["dedup"]
+        text = "The Government may terminate this contract for convenience."
+        responses = await asyncio.gather(*(
+            client.post("/embed", json={"texts": [text]}) for _ in range(6)
+        ))
+        assert all(r.status_code == 200 for r in responses)
+        assert len({tuple(r.json()["embeddings"][0]) for r in responses}) == 1
+
+        after = (await client.get("/metrics")).json()["dedup"]
+        assert after["encodes_avoided"] - before["encodes_avoided"] >= 5
+
+    @pytest.mark.asyncio
+    async def test_embed_endpoint_model_override(self, client: httpx.AsyncClient, monkeypatch):
+        """``model`` routes to that model; models not served are a 404."""
+        resp = await client.post("/embed", json={
+            "texts": ["Section B"], "model": "nlpaueb/legal-bert-base-uncased",
+        })
+        assert resp.status_code == 200
+        assert resp.json()["model"] == "nlpaueb/legal-bert-base-uncased"
+
+        monkeypatch.setenv("EMBED_MODELS", "")
+        resp = await client.post(
+            "/embed", json={"texts": ["Section B"], "model": "bert-base-uncased"}
+        )
+        assert resp.status_code == 404
+        assert "nlpaueb/legal-bert-base-uncased" in resp.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_model_service_loaded_once_off_the_event_loop(
+        self, client: httpx.AsyncClient, monkeypatch,
+    ):
+        import asyncio
+        import threading
+
+        import api
+
+        default = api._get_service()
+        loads: list[int] = []
+
+        def load(**kwargs: object) -> EmbeddingService:
+            loads.append(threading.get_ident())
+            return default
+
+        monkeypatch.setenv("EMBED_MODELS", "bert-base-uncased")
+        monkeypatch.setattr(api, "_model_services", {})
+        monkeypatch.setattr(api, "EmbeddingService", load)
+        responses = await asyncio.gather(*(
+            client.post("/embed", json={"texts": ["Section B"], "model": "bert-base-uncased"})
+            for _ in range(3)
+        ))
+        assert all(r.status_code == 200 for r in responses)
+        assert len(loads) == 1 and loads[0] != threading.get_ident()
+
     @pytest.mark.asyncio
     async def test_embed_endpoint_empty_texts_rejected(self, client: httpx.AsyncClient):
         """POST /embed with empty texts list should return 422."""
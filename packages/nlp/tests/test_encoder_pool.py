@@ -0,0 +1,206 @@
+"""
+Tests for the multi-process encoder pool (model-free parts).
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.autotune import TuningResult
+from forge_nlp.embeddings.encoder_pool import (
+    EncoderPool,
+    EncoderPoolError,
+    _Worker,
+    partition_cpus,
+    shard_bounds,
+)
+
+
+class TestPartitionCpus:
+    def test_contiguous_near_equal_subsets(self):
+        assert partition_cpus(list(range(10)), 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+    def test_every_cpu_used_once(self):
+        cpus = list(range(32))
+        subsets = partition_cpus(cpus, 4)
+        assert sorted(c for s in subsets for c in s) == cpus
+        assert all(len(s) == 8 for s in subsets)
+
+    def test_more_workers_than_cpus_wraps(self):
+        assert partition_cpus([0, 1], 3) == [[0], [1], [0]]
+
+    def test_rejects_zero_workers(self):
+        with pytest.raises(ValueError):
+            partition_cpus([0, 1], 0)
+
+
+class TestShardBounds:
+    def test_covers_input_in_order(self):
+        bounds = shard_bounds(10, 3)
+        assert bounds == [(0, 4), (4, 7), (7, 10)]
+
+    def test_never_more_shards_than_items(self):
+        assert shard_bounds(2, 8) == [(0, 1), (1, 2)]
+
+
+class TestLifecycle:
+    def test_encode_requires_start(self):
+        pool = EncoderPool(workers=1, model_name="unused")
+        with pytest.raises(EncoderPoolError, match="not running"):
+            pool.encode(["text"])
+
+    def test_worker_start_failure_is_reported(self, tmp_path):
+        """A worker that cannot load its model fails start() and leaves no processes."""
+        pool = EncoderPool(
+            workers=1, model_name="some/model", backend="onnx-int8", onnx_dir=tmp_path
+        )
+        with pytest.raises(EncoderPoolError, match="backends export"):
+            pool.start(timeout=120)
+        assert not pool.running
+        assert pool.health() == []
+
+
+class _FakeConn:
+    def poll(self, timeout: float) -> bool:
+        return True
+
+    def recv(self) -> tuple[str, int]:
+        return "ready", 16
+
+    def send(self, message: object) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeProcess:
+    def __init__(self, args: tuple, spawned: list[tuple], **kwargs: object) -> None:
+        spawned.append(args)
+
+    def start(self) -> None:
+        pass
+
+    def join(self, timeout: float | None = None) -> None:
+        pass
+
+    def is_alive(self) -> bool:
+        return False
+
+
+class _FakeContext:
+    """Records the arguments each worker would be spawned with."""
+
+    def __init__(self) -> None:
+        self.spawned: list[tuple] = []
+
+    def Pipe(self) -> tuple[_FakeConn, _FakeConn]:
+        return _FakeConn(), _FakeConn()
+
+    def Process(self, target: object, args: tuple, **kwargs: object) -> _FakeProcess:
+        return _FakeProcess(args, self.spawned)
+
+
+class _ReplyConn(_FakeConn):
+    """Answers each request with a row of ones per text, or fails the read."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.texts: list[str] = []
+
+    def send(self, message: object) -> None:
+        self.texts = message[1]  # type: ignore[index]
+
+    def recv(self) -> tuple[str, np.ndarray]:
+        if self.fail:
+            raise KeyboardInterrupt
+        return "ok", np.ones((len(self.texts), 4), dtype=np.float32)
+
+
+class _LiveProcess:
+    pid = 1
+    exitcode = None
+
+    def __init__(self) -> None:
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def terminate(self) -> None:
+        self.alive = False
+
+    def join(self, timeout: float | None = None) -> None:
+        pass
+
+
+class TestDispatch:
+    def _pool(self, *conns: _FakeConn) -> EncoderPool:
+        pool = EncoderPool(workers=len(conns), model_name="some/model", min_shard_size=1)
+        for index, conn in enumerate(conns):
+            worker = _Worker(index, _LiveProcess(), conn, [index], 1)  # type: ignore[arg-type]
+            pool._workers.append(worker)
+            pool._idle.put(worker)
+        return pool
+
+    def test_worker_with_unread_reply_is_retired(self):
+        pool = self._pool(_ReplyConn(), _ReplyConn(fail=True))
+        with pytest.raises(KeyboardInterrupt):
+            pool.encode(["a", "b"])
+        assert [w.alive for w in pool.health()] == [True, False]
+        assert pool._idle.qsize() == 1
+        assert pool.encode(["a", "b"]).shape == (2, 4)
+
+
+class TestTuning:
+    def _tuning(self, model_name: str = "some/model") -> TuningResult:
+        return TuningResult(
+            model_name=model_name, backend="torch", fingerprint="host", batch_size=8,
+            max_tokens_per_batch=2048, intra_op_threads=3, inter_op_threads=2,
+            tokens_per_s=1.0, max_ms=1.0, max_latency_ms=1.0,
+        )
+
+    def test_workers_receive_tuning_capped_to_their_cpus(self, monkeypatch):
+        ctx = _FakeContext()
+        monkeypatch.setattr(mp, "get_context", lambda method: ctx)
+        pool = EncoderPool(
+            workers=2, model_name="some/model", cpus=[0, 1, 2, 3, 4, 5, 6, 7],
+            tuning=self._tuning(),
+        ).start()
+        pool.shutdown()
+        # (conn, model, backend, onnx_dir, snapshot, cpus, threads, batch, tokens, tuning)
+        assert [args[6] for args in ctx.spawned] == [3, 3]
+        worker_tuning = ctx.spawned[0][9]
+        assert (worker_tuning.intra_op_threads, worker_tuning.inter_op_threads) == (3, 2)
+        assert (worker_tuning.batch_size, worker_tuning.max_tokens_per_batch) == (8, 2048)
+
+        small = EncoderPool(workers=4, model_name="some/model", cpus=[0, 1, 2, 3, 4, 5, 6, 7])
+        small.tuning = self._tuning()
+        small.start().shutdown()
+        assert [args[6] for args in ctx.spawned[2:]] == [2, 2, 2, 2]
+
+    def test_tuning_for_another_model_rejected(self):
+        pool = EncoderPool(workers=1, model_name="some/model", tuning=self._tuning("other/model"))
+        with pytest.raises(ValueError, match="Tuning is for other/model"):
+            pool.start()
+        assert not pool.running
+
+
+class TestServiceWithPool:
+    def test_service_takes_dimensions_from_pool_without_loading_model(self):
+        from forge_nlp.embeddings.embedding_service import EmbeddingService
+        from forge_nlp.embeddings.model_registry import ModelRegistry
+
+        def loader(*args: object) -> object:
+            raise AssertionError("the parent process loaded the model")
+
+        pool = EncoderPool(workers=2, model_name="some/model")
+        pool.dimensions = 16  # as reported by the workers' ready handshake
+        svc = EmbeddingService(
+            model_name="some/model", pool=pool, registry=ModelRegistry(loader=loader),
+        )
+        assert svc.dimensions == svc.output_dimensions == 16
+        assert svc.registry.stats().loads == 0
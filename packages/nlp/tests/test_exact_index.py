@@ -0,0 +1,127 @@
+"""
+Tests for exact in-process vector search: blocked top-k, section filters and
+persistence of the memory-mapped index.
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from forge_nlp.search.exact_index import ExactIndex, merge_top_k, normalize
+
+_VERSION = "test-model"
+_SECTIONS = ["SECTION_C", "SECTION_H", "SECTION_I"]
+
+
+def _corpus(n: int = 500, dims: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dims)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(n)]
+    sections = [_SECTIONS[i % len(_SECTIONS)] for i in range(n)]
+    return ids, sections, vectors
+
+
+def _brute_force(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    scores = normalize(vectors) @ normalize(query)[0]
+    return np.argsort(-scores, kind="stable")[:k].tolist()
+
+
+@pytest.fixture()
+def index(tmp_path) -> ExactIndex:
+    ids, sections, vectors = _corpus()
+    idx = ExactIndex(tmp_path / "idx", dimensions=16, embedding_version=_VERSION, block_rows=64)
+    idx.add(ids, sections, vectors)
+    return idx
+
+
+class TestMergeTopK:
+    def test_keeps_best_across_blocks(self):
+        scores = np.array([[0.1, 0.9, 0.5, 0.7, 0.3, 0.8]], dtype=np.float32)
+        best_s = np.empty((1, 0), dtype=np.float32)
+        best_r = np.empty((1, 0), dtype=np.int64)
+        for start in range(0, 6, 2):
+            best_s, best_r = merge_top_k(best_s, best_r, scores[:, start:start + 2], start, 3)
+        assert sorted(best_r[0].tolist()) == [1, 3, 5]
+
+
+class TestSearch:
+    def test_matches_brute_force(self, index):
+        _, _, vectors = _corpus()
+        queries = np.random.default_rng(1).standard_normal((5, 16)).astype(np.float32)
+        results = index.search(queries, k=10)
+        for query, hits in zip(queries, results):
+            expected = _brute_force(vectors, query[None], 10)
+            assert [h.chunk_id for h in hits] == [f"chunk-{i}" for i in expected]
+            assert all(a.score >= b.score for a, b in pairwise(hits))
+
+    def test_single_query_vector_and_exact_match(self, index):
+        _, _, vectors = _corpus()
+        [hits] = index.search(vectors[42] * 3.0, k=1)
+        assert hits[0].chunk_id == "chunk-42"
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+        assert hits[0].section_type == _SECTIONS[42 % 3]
+
+    def test_section_filter(self, index):
+        _, _, vectors = _corpus()
+        [hits] = index.search(vectors[0], k=20, section_types=["SECTION_H"])
+        assert len(hits) == 20
+        assert {h.section_type for h in hits} == {"SECTION_H"}
+        allowed = [i for i in range(500) if i % 3 == 1]
+        expected = _brute_force(vectors[allowed], vectors[0][None], 20)
+        assert [h.chunk_id for h in hits] == [f"chunk-{allowed[i]}" for i in expected]
+
+    def test_unknown_section_and_small_corpus(self, index, tmp_path):
+        _, _, vectors = _corpus()
+        assert index.search(vectors[0], section_types=["SECTION_Z"]) == [[]]
+        small = ExactIndex(tmp_path / "small", dimensions=16, embedding_version=_VERSION)
+        assert small.search(vectors[0], k=5) == [[]]
+        small.add(["a", "b"], ["OTHER", "OTHER"], vectors[:2])
+        [hits] = small.search(vectors[0], k=5)
+        assert [h.chunk_id for h in hits] == ["a", "b"]
+
+    def test_invalid_queries(self, index):
+        with pytest.raises(ValueError, match="16-dim"):
+            index.search(np.ones(8, dtype=np.float32))
+        with pytest.raises(ValueError):
+            index.search(np.ones(16, dtype=np.float32), k=0)
+
+
+class TestPersistence:
+    def test_reopen(self, index):
+        _, _, vectors = _corpus()
+        reopened = ExactIndex(index.path)
+        assert len(reopened) == 500
+        assert reopened.embedding_version == _VERSION
+        assert reopened.search(vectors[7], k=3) == index.search(vectors[7], k=3)
+
+    def test_interrupted_add_discarded(self, index):
+        index.store.append(np.ones((3, 16), dtype=np.float32))  # rows never recorded
+        reopened = ExactIndex(index.path)
+        assert len(reopened) == len(reopened.store) == 500
+
+    def test_rows_are_normalized_on_disk(self, index):
+        norms = np.linalg.norm(index.store.matrix, axis=1)
+        np.testing.assert_allclose(norms, 1.0, atol=1e-5)
+
+    def test_version_and_missing_checks(self, index, tmp_path):
+        with pytest.raises(ValueError, match="holds test-model"):
+            ExactIndex(index.path, embedding_version="other-model")
+        with pytest.raises(FileNotFoundError, match="exact_index build"):
+            ExactIndex(tmp_path / "none")
+        assert json.loads((index.path / "index.json").read_text()) == {
+            "embedding_version": _VERSION
+        }
+
+    def test_duplicate_ids_rejected(self, index):
+        vector = np.ones((1, 16), dtype=np.float32)
+        with pytest.raises(ValueError, match="already indexed"):
+            index.add(["chunk-3"], ["OTHER"], vector)
+        with pytest.raises(ValueError):
+            index.add(["x", "x"], ["OTHER", "OTHER"], np.ones((2, 16), dtype=np.float32))
+        with pytest.raises(ValueError):
+            index.add(["y"], [], vector)
+        assert len(index) == 500
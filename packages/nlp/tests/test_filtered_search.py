@@ -0,0 +1,184 @@
+"""
+Tests for metadata-filtered search: compressed row bitmaps, filters on
+section, contract and clause number, and the selectivity-based choice
+between scoring the matching subset and filtering the full search.
+"""
+
+from __future__ import annotations
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from forge_nlp.search import Bitmap, ExactIndex, HnswIndex, IvfPqIndex, RowTable
+
+_VERSION = "test-model"
+_SECTIONS = ["SECTION_C", "SECTION_H", "SECTION_I"]
+_CLAUSES = ["52.204-21", "52.204-23", "52.232-33", "252.204-7012", "252.225-7048", None]
+
+
+def _corpus(n: int = 2000, dims: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((24, dims))
+    vectors = centres[rng.integers(0, 24, n)] + 0.4 * rng.standard_normal((n, dims))
+    return {
+        "chunk_ids": [f"chunk-{i}" for i in range(n)],
+        "section_types": [_SECTIONS[i % 3] for i in range(n)],
+        "vectors": vectors.astype(np.float32),
+        "contract_ids": [f"contract-{i // 100}" for i in range(n)],
+        "clause_numbers": [_CLAUSES[i % len(_CLAUSES)] for i in range(n)],
+    }
+
+
+def _expected(corpus, section_types=None, contract_ids=None, clause_numbers=None) -> set[str]:
+    return {
+        cid for cid, section, contract, clause in zip(
+            corpus["chunk_ids"], corpus["section_types"], corpus["contract_ids"],
+            corpus["clause_numbers"],
+        )
+        if (section_types is None or section in section_types)
+        and (contract_ids is None or contract in contract_ids)
+        and (clause_numbers is None or (clause or "").startswith(tuple(clause_numbers)))
+    }
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return _corpus()
+
+
+@pytest.fixture(scope="module")
+def exact(tmp_path_factory, corpus) -> ExactIndex:
+    idx = ExactIndex(
+        tmp_path_factory.mktemp("exact") / "idx", dimensions=16, embedding_version=_VERSION
+    )
+    idx.add(**corpus)
+    return idx
+
+
+@pytest.fixture(scope="module")
+def hnsw(tmp_path_factory, corpus) -> HnswIndex:
+    idx = HnswIndex(
+        tmp_path_factory.mktemp("hnsw") / "idx",
+        dimensions=16,
+        embedding_version=_VERSION,
+        m=8,
+        ef_construction=64,
+    )
+    idx.add(**corpus)
+    return idx
+
+
+class TestBitmap:
+    @pytest.mark.parametrize("n", [0, 1, 4096, 4097, 70_000])
+    def test_set_operations(self, n):
+        rng = np.random.default_rng(n)
+        a = rng.choice(200_000, n, replace=False) if n else np.empty(0, dtype=np.int64)
+        b = rng.choice(200_000, 3000, replace=False)
+        left, right = Bitmap(a), Bitmap(b)
+        assert len(left) == n
+        assert set((left | right).rows().tolist()) == set(a.tolist()) | set(b.tolist())
+        assert set((left & right).rows().tolist()) == set(a.tolist()) & set(b.tolist())
+        np.testing.assert_array_equal(np.flatnonzero(left.to_mask(200_000)), np.sort(a))
+
+    def test_incremental_adds_and_membership(self):
+        bitmap = Bitmap([5, 70_000])
+        bitmap.add(np.arange(10, 5000))
+        assert len(bitmap) == 4992 and 5 in bitmap and 70_000 in bitmap and 6 not in bitmap
+        np.testing.assert_array_equal(bitmap.rows(limit=12), [5, 10, 11])
+        with pytest.raises(ValueError, match="non-negative"):
+            bitmap.add([-1])
+
+    def test_compressed(self):
+        dense, sparse = Bitmap(np.arange(65_536)), Bitmap(np.arange(0, 65_536, 100))
+        assert dense.nbytes == 8192
+        assert sparse.nbytes == 2 * len(sparse)
+
+
+class TestRowTable:
+    def test_filters_combine(self, tmp_path, corpus):
+        table = RowTable(tmp_path / "rows.jsonl")
+        table.append(corpus["chunk_ids"], corpus["section_types"], corpus["contract_ids"],
+                     corpus["clause_numbers"])
+        assert table.filter() is None
+        for filters in [
+            {"section_types": ["SECTION_H"]},
+            {"contract_ids": ["contract-3", "contract-7"]},
+            {"clause_numbers": ["52.204"]},
+            {"clause_numbers": ["252."], "section_types": ["SECTION_C", "SECTION_I"]},
+            {"contract_ids": ["contract-1"], "clause_numbers": ["52.232-33"]},
+            {"contract_ids": ["unknown"]},
+        ]:
+            found = {table.chunk_id(r) for r in table.filter(**filters).rows()}
+            assert found == _expected(corpus, **filters), filters
+
+    def test_reload_and_later_appends(self, tmp_path):
+        table = RowTable(tmp_path / "rows.jsonl")
+        table.append(["a", "b"], ["SECTION_I", "SECTION_I"], ["k1", "k1"], ["52.204-21", None])
+        assert table.filter(clause_numbers=["52.204"]).rows().tolist() == [0]
+        table.append(["c"], ["SECTION_I"], ["k2"], ["52.204-23"])
+        reopened = RowTable(tmp_path / "rows.jsonl")
+        for t in (table, reopened):
+            assert t.filter(clause_numbers=["52.204"]).rows().tolist() == [0, 2]
+            assert t.clause_number(1) is None and t.clause_number(2) == "52.204-23"
+
+
+class TestStrategies:
+    def test_exact_subset_and_scan_agree_with_expected(self, exact, corpus):
+        query = corpus["vectors"][:1]
+        [narrow] = exact.search(query, k=100, contract_ids=["contract-4"])
+        [broad] = exact.search(query, k=2000, section_types=["SECTION_C", "SECTION_H"])
+        assert {h.chunk_id for h in narrow} == _expected(corpus, contract_ids=["contract-4"])
+        assert {h.chunk_id for h in broad} == _expected(
+            corpus, section_types=["SECTION_C", "SECTION_H"]
+        )
+        assert exact.filter_strategies["subset"] >= 1 and exact.filter_strategies["scan"] >= 1
+        assert all(a.score >= b.score for a, b in pairwise(narrow))
+        assert narrow[0].contract_id == "contract-4"
+
+    def test_hnsw_selective_filter_scores_subset_exactly(self, hnsw, exact, corpus):
+        queries = corpus["vectors"][:5] + 0.1
+        filters = {"contract_ids": ["contract-2"], "clause_numbers": ["52.204"]}
+        before = hnsw.filter_strategies["subset"]
+        found = hnsw.search(queries, k=10, **filters)
+        assert hnsw.filter_strategies["subset"] == before + 1
+        truth = exact.search(queries, k=10, **filters)
+        assert [[h.chunk_id for h in hits] for hits in found] == [
+            [h.chunk_id for h in hits] for hits in truth
+        ]
+
+    def test_hnsw_broad_filter_traverses_graph(self, hnsw, exact, corpus):
+        queries = corpus["vectors"][10:30] + 0.1
+        before = hnsw.filter_strategies["traversal"]
+        found = hnsw.search(queries, k=10, section_types=["SECTION_C", "SECTION_I"], ef_search=8)
+        assert hnsw.filter_strategies["traversal"] == before + 1
+        truth = exact.search(queries, k=10, section_types=["SECTION_C", "SECTION_I"])
+        recall = np.mean([
+            len({h.chunk_id for h in a} & {h.chunk_id for h in b}) / 10
+            for a, b in zip(found, truth)
+        ])
+        assert recall >= 0.9
+        assert all(h.section_type != "SECTION_H" for hits in found for h in hits)
+
+    def test_hnsw_subset_skips_tombstones(self, tmp_path, corpus):
+        idx = HnswIndex(tmp_path / "idx", dimensions=16, embedding_version=_VERSION, m=8,
+                        ef_construction=32)
+        idx.add(**{key: value[:300] for key, value in corpus.items()})
+        idx.replace_contract(
+            "contract-1", ["new"], ["SECTION_I"], corpus["vectors"][:1], ["52.204-21"]
+        )
+        [hits] = idx.search(corpus["vectors"][0], k=10, contract_ids=["contract-1"])
+        assert [(h.chunk_id, h.clause_number) for h in hits] == [("new", "52.204-21")]
+        assert HnswIndex(idx.path).rows.clause_number(300) == "52.204-21"
+
+    def test_ivfpq_selective_filter_ignores_probe_limit(self, tmp_path, corpus):
+        idx = IvfPqIndex.train(
+            tmp_path / "idx", corpus["vectors"], _VERSION, nlist=16, subquantizers=4, iterations=5
+        )
+        idx.add(**corpus)
+        [hits] = idx.search(-corpus["vectors"][0], k=100, nprobe=1, contract_ids=["contract-5"])
+        assert {h.chunk_id for h in hits} == _expected(corpus, contract_ids=["contract-5"])
+        [hits] = idx.search(corpus["vectors"][0], k=5, nprobe=4, section_types=["SECTION_H"])
+        assert {h.section_type for h in hits} == {"SECTION_H"}
+        assert idx.filter_strategies == {"subset": 1, "probe": 1}
@@ -0,0 +1,282 @@
+"""
+Tests for the persistent HNSW index: recall against exact search, per-query
+beam width, log replay and checkpoints, tombstones and the ingestion hook.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.embedding_service import EmbeddedChunkBatch
+from forge_nlp.pipeline.ingestion_pipeline import (
+    IngestionPipeline,
+    InMemoryDbClient,
+    LocalFileS3Client,
+)
+from forge_nlp.search import ExactIndex, HnswIndex, LatencyWindow, index_kind, open_index
+
+_VERSION = "test-model"
+_SECTIONS = ["SECTION_C", "SECTION_H", "SECTION_I"]
+_FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _corpus(n: int = 1200, dims: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((24, dims))
+    vectors = (centres[rng.integers(0, 24, n)] + 0.4 * rng.standard_normal((n, dims)))
+    ids = [f"chunk-{i}" for i in range(n)]
+    sections = [_SECTIONS[i % len(_SECTIONS)] for i in range(n)]
+    return ids, sections, vectors.astype(np.float32)
+
+
+def _queries(n: int = 40, dims: int = 16) -> np.ndarray:
+    _, _, vectors = _corpus()
+    rng = np.random.default_rng(7)
+    noise = rng.standard_normal((n, dims)).astype(np.float32)
+    return vectors[rng.choice(len(vectors), n)] + 0.2 * noise
+
+
+def _recall(found, truth) -> float:
+    return float(np.mean([
+        len({h.chunk_id for h in a} & {h.chunk_id for h in b}) / len(b)
+        for a, b in zip(found, truth)
+    ]))
+
+
+@pytest.fixture(scope="module")
+def exact(tmp_path_factory) -> ExactIndex:
+    ids, sections, vectors = _corpus()
+    idx = ExactIndex(
+        tmp_path_factory.mktemp("exact") / "idx", dimensions=16, embedding_version=_VERSION
+    )
+    idx.add(ids, sections, vectors)
+    return idx
+
+
+def _build(path, **kwargs) -> HnswIndex:
+    ids, sections, vectors = _corpus()
+    idx = HnswIndex(
+        path, dimensions=16, embedding_version=_VERSION, m=8, ef_construction=64, **kwargs
+    )
+    idx.add(ids, sections, vectors, [f"contract-{i // 100}" for i in range(len(ids))])
+    return idx
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory) -> HnswIndex:
+    return _build(tmp_path_factory.mktemp("hnsw") / "idx")
+
+
+@pytest.fixture()
+def index(built, tmp_path) -> HnswIndex:
+    """A private copy of the module's index, safe to modify."""
+    import shutil
+
+    built.checkpoint()
+    shutil.copytree(built.path, tmp_path / "idx")
+    return HnswIndex(tmp_path / "idx")
+
+
+class TestSearch:
+    def test_recall_against_exact(self, built, exact):
+        queries = _queries()
+        assert _recall(built.search(queries, k=10), exact.search(queries, k=10)) >= 0.95
+
+    def test_ef_search_per_query(self, built, exact):
+        queries = _queries()
+        truth = exact.search(queries, k=10)
+        narrow = _recall(built.search(queries, k=10, ef_search=10), truth)
+        wide = _recall(built.search(queries, k=10, ef_search=200), truth)
+        assert wide >= narrow and wide >= 0.99
+
+    def test_hits_sorted_and_exact_match(self, built):
+        _, _, vectors = _corpus()
+        [hits] = built.search(vectors[42], k=5)
+        assert hits[0].chunk_id == "chunk-42"
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+        assert all(a.score >= b.score for a, b in pairwise(hits))
+
+    def test_section_filter(self, built):
+        [hits] = built.search(_queries(1), k=15, section_types=["SECTION_I"])
+        assert len(hits) == 15
+        assert {h.section_type for h in hits} == {"SECTION_I"}
+
+    def test_empty_and_invalid(self, built, tmp_path):
+        empty = HnswIndex(tmp_path / "empty", dimensions=16, embedding_version=_VERSION)
+        assert empty.search(np.ones(16), k=3) == [[]]
+        with pytest.raises(ValueError, match="16-dim"):
+            built.search(np.ones(8, dtype=np.float32))
+        with pytest.raises(ValueError):
+            built.search(np.ones(16, dtype=np.float32), k=0)
+
+
+class TestDeletes:
+    def test_tombstones_hidden_and_persisted(self, index):
+        _, _, vectors = _corpus()
+        assert index.delete(["chunk-42", "missing"]) == 1
+        [hits] = index.search(vectors[42], k=5)
+        assert "chunk-42" not in {h.chunk_id for h in hits}
+        assert len(index) == 1199 and "chunk-42" not in index
+        reopened = HnswIndex(index.path)
+        assert reopened.stats().deleted == 1
+        assert reopened.search(vectors[42], k=5) == index.search(vectors[42], k=5)
+
+    def test_replace_contract(self, index):
+        _, _, vectors = _corpus()
+        new_ids = [f"v2-{i}" for i in range(100)]
+        replaced = index.replace_contract(
+            "contract-3", new_ids, ["SECTION_C"] * 100, vectors[300:400]
+        )
+        assert replaced == 100
+        [hits] = index.search(vectors[350], k=1)
+        assert hits[0].chunk_id == "v2-50"
+        assert len(index) == 1200
+        assert index.delete_contract("contract-3") == 100
+        assert len(HnswIndex(index.path)) == 1100
+
+    def test_deleted_id_can_be_added_again(self, index):
+        _, _, vectors = _corpus()
+        index.delete(["chunk-7"])
+        index.add(["chunk-7"], ["OTHER"], vectors[7:8])
+        [hits] = HnswIndex(index.path).search(vectors[7], k=1)
+        assert (hits[0].chunk_id, hits[0].section_type) == ("chunk-7", "OTHER")
+
+
+class TestPersistence:
+    def test_reopen_replays_log_without_relinking(self, tmp_path, monkeypatch):
+        idx = _build(tmp_path / "idx")
+        assert idx.stats().log_bytes > 0 and not (idx.path / "graph.npz").exists()
+        queries = _queries(5)
+
+        def fail(*args):
+            raise AssertionError("graph rebuilt on open")
+
+        monkeypatch.setattr(HnswIndex, "_insert_frame", fail)
+        reopened = HnswIndex(idx.path)
+        assert reopened.stats().nodes == 1200
+        assert reopened.search(queries, k=10) == idx.search(queries, k=10)
+
+    def test_checkpoint_then_more_inserts(self, index):
+        _, _, vectors = _corpus()
+        assert (index.path / "graph.npz").exists()
+        assert sorted(p.name for p in index.path.glob("graph.*.log")) == [
+            f"graph.{index._generation}.log"
+        ]
+        index.add(["extra"], ["OTHER"], vectors[:1] * -1)
+        reopened = HnswIndex(index.path)
+        assert len(reopened) == 1201
+        assert reopened.search(vectors[0] * -1, k=1)[0][0].chunk_id == "extra"
+
+    def test_torn_frame_relinked_from_rows(self, index):
+        _, _, vectors = _corpus()
+        index.add(["a", "b"], ["OTHER", "OTHER"], vectors[:2] * -1)
+        log = index._log_path
+        index.close()
+        log.write_bytes(log.read_bytes()[:-7])  # crash in the middle of b's frame
+        reopened = HnswIndex(index.path)
+        assert reopened.stats().nodes == 1202
+        assert reopened.search(vectors[1] * -1, k=1)[0][0].chunk_id == "b"
+
+    def test_automatic_checkpoint(self, tmp_path):
+        idx = _build(tmp_path / "idx", checkpoint_bytes=50_000)
+        assert idx._generation > 0
+        assert idx.stats().log_bytes <= 50_000 + 10_000
+        assert len(HnswIndex(idx.path)) == 1200
+
+    def test_kinds_and_versions(self, index, exact):
+        assert index_kind(index.path) == "hnsw" and index_kind(exact.path) == "exact"
+        assert isinstance(open_index(index.path), HnswIndex)
+        assert isinstance(open_index(exact.path), ExactIndex)
+        with pytest.raises(ValueError, match="not HNSW"):
+            HnswIndex(exact.path)
+        with pytest.raises(ValueError, match="holds test-model"):
+            HnswIndex(index.path, embedding_version="other-model")
+        with pytest.raises(FileNotFoundError, match="hnsw_index build"):
+            HnswIndex(index.path.parent / "none")
+        assert index_kind(index.path.parent / "none") is None
+
+
+class _HashService:
+    """Embeds each chunk as a pseudo-random vector seeded by its text."""
+
+    def embedding_version(self, dimensions: int | None = None) -> str:
+        return _VERSION
+
+    def embed_chunks(
+        self, chunks: list[DocumentChunk], late_chunking: bool = False,
+    ) -> EmbeddedChunkBatch:
+        vectors = [
+            np.random.default_rng(int(hashlib.sha256(c.chunk_text.encode()).hexdigest()[:8], 16))
+            .standard_normal(16)
+            for c in chunks
+        ]
+        return EmbeddedChunkBatch(chunks, np.array(vectors), _VERSION)
+
+    def count_truncated(self, chunks: list[DocumentChunk]) -> int:
+        return 0
+
+
+class TestIngestion:
+    def test_reingest_tombstones_previous_chunks(self, tmp_path):
+        idx = HnswIndex(tmp_path / "idx", dimensions=16, embedding_version=_VERSION)
+        pipeline = IngestionPipeline(
+            s3_client=LocalFileS3Client(base_dir=_FIXTURES),
+            db_client=InMemoryDbClient(),
+            s3_bucket="test",
+            embedding_service=_HashService(),
+            use_ner=False,
+            search_index=idx,
+        )
+        first = pipeline.ingest("sample_contract.docx")
+        assert len(idx) == first.chunks_stored > 0
+        second = pipeline.ingest("sample_contract.docx")
+        assert second.contract_id == first.contract_id
+        assert len(idx) == second.chunks_stored
+        assert idx.stats().deleted == first.chunks_stored
+        assert set(idx.rows.contract_rows(first.contract_id)) == set(
+            range(first.chunks_stored, first.chunks_stored + second.chunks_stored)
+        )
+
+    def test_reingest_with_fresh_db_client(self, tmp_path):
+        """Like /pipeline/ingest, which builds a new db client per request."""
+        idx = HnswIndex(tmp_path / "idx", dimensions=16, embedding_version=_VERSION)
+        results = [
+            IngestionPipeline(
+                s3_client=LocalFileS3Client(base_dir=_FIXTURES), db_client=InMemoryDbClient(),
+                s3_bucket="test", embedding_service=_HashService(), use_ner=False,
+                search_index=idx,
+            ).ingest("sample_contract.docx")
+            for _ in range(2)
+        ]
+        assert results[0].contract_id == results[1].contract_id
+        assert len(idx) == results[1].chunks_stored
+        assert idx.stats().deleted == results[0].chunks_stored
+
+    def test_version_mismatch_fails_before_storing(self, tmp_path):
+        idx = HnswIndex(tmp_path / "idx", dimensions=16, embedding_version="other-model")
+        db = InMemoryDbClient()
+        pipeline = IngestionPipeline(
+            s3_client=LocalFileS3Client(base_dir=_FIXTURES), db_client=db, s3_bucket="test",
+            embedding_service=_HashService(), use_ner=False, search_index=idx,
+        )
+        with pytest.raises(ValueError, match="other-model"):
+            pipeline.ingest("sample_contract.docx")
+        assert not db.chunks
+
+
+class TestLatencyWindow:
+    def test_percentiles_over_window(self):
+        window = LatencyWindow(size=100)
+        assert window.stats().p99_ms == 0.0
+        for ms in range(1, 201):
+            window.record(float(ms))
+        stats = window.stats()
+        assert (stats.count, stats.window, stats.max_ms) == (200, 100, 200.0)
+        assert stats.p50_ms == pytest.approx(150.5)
+        assert 198 <= stats.p99_ms <= 200
@@ -118,6 +118,42 @@ class TestFullPipeline:
             assert len(chunk_data["embedding"]) == 768
             assert chunk_data["chunk_text"] != ""
 
+    def test_token_aware_chunking(self, s3_client, db_client: InMemoryDbClient):
+        """Token-aware mode budgets chunks to the model window: nothing truncated."""
+        pipeline = IngestionPipeline(
+            s3_client=s3_client,
+            db_client=db_client,
+            s3_bucket="test",
+            use_ner=False,
+            token_aware_chunking=True,
+        )
+        result = pipeline.ingest(s3_key="sample_contract.docx", document_type="docx")
+
+        assert result.chunks_stored > 0
+        assert result.truncated_chunks == 0
+        assert "TRUNCATED_CHUNKS" not in [i.code for i in result.quality.issues]
+        assert all(
+            len(chunk_data["embedding"]) == pipeline.embedding_service.dimensions
+            for chunk_data in db_client.chunks.values()
+        )
+
+    def test_late_chunking(self, s3_client, db_client: InMemoryDbClient):
+        """Late-chunking mode stores one vector per chunk like the default mode."""
+        pipeline = IngestionPipeline(
+            s3_client=s3_client,
+            db_client=db_client,
+            s3_bucket="test",
+            use_ner=False,
+            late_chunking=True,
+        )
+        result = pipeline.ingest(s3_key="sample_contract.docx", document_type="docx")
+
+        assert result.chunks_stored == result.chunk_count > 0
+        assert all(
+            len(chunk_data["embedding"]) == pipeline.embedding_service.dimensions
+            for chunk_data in db_client.chunks.values()
+        )
+
     def test_entity_annotations_linked_to_chunks(
         self, pipeline: IngestionPipeline, db_client: InMemoryDbClient,
     ):
@@ -335,6 +371,16 @@ class TestQualityChecker:
         assert "MANY_EMPTY_CHUNKS" in codes
         assert report.needs_human_review is True
 
+    def test_flags_truncated_chunks(self):
+        """Chunks longer than the model window should produce a WARNING."""
+        meta = ContractMetadata(contract_number="X")
+        entities = [EntityAnnotation("CONTRACT_NUMBER", "X", 0, 1, 1.0)]
+        report = check_quality(meta, entities, chunk_count=10, truncated_chunks=2)
+
+        issue = next(i for i in report.issues if i.code == "TRUNCATED_CHUNKS")
+        assert issue.severity == IssueSeverity.WARNING
+        assert issue.details["truncated_chunks"] == 2
+
     def test_no_issues_for_complete_metadata(self):
         """Complete metadata should produce no ERROR issues."""
         meta = ContractMetadata(
@@ -394,3 +440,28 @@ class TestAPIEndpoint:
         assert data["result"]["chunk_count"] > 0
         assert data["result"]["entity_count"] > 0
         assert data["result"]["metadata"]["contract_number"] == "FA8726-24-C-0042"
+
+    @pytest.mark.asyncio
+    async def test_reingest_replaces_indexed_chunks(
+        self, client: httpx.AsyncClient, monkeypatch, tmp_path,
+    ):
+        """Ingesting a document again tombstones the chunks of the first ingest."""
+        import api as api_module
+        from forge_nlp.search import Bm25Index, HnswIndex
+
+        svc = api_module._get_service()
+        index = HnswIndex(
+            tmp_path / "hnsw", dimensions=svc.dimensions, embedding_version=svc.embedding_version(),
+        )
+        monkeypatch.setattr(api_module, "_search_index", index)
+        lexical = Bm25Index(tmp_path / "bm25")
+        monkeypatch.setattr(api_module, "_lexical_index", lexical)
+        body = {"s3_key": "sample_contract.docx", "document_type": "docx"}
+
+        first = (await client.post("/pipeline/ingest", json=body)).json()["result"]
+        second = (await client.post("/pipeline/ingest", json=body)).json()["result"]
+        assert second["contract_id"] == first["contract_id"]
+        assert index.stats().deleted == first["chunk_count"]
+        assert len(index) == second["chunk_count"]
+        assert lexical.stats().deleted == first["chunk_count"]
+        assert len(lexical) == second["chunk_count"]
@@ -0,0 +1,163 @@
+"""
+Tests for the IVF-PQ index: k-means and product quantization, refined
+search against exact results, and save/load of the codes.
+"""
+
+from __future__ import annotations
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from forge_nlp.search import ExactIndex, IvfPqIndex, IvfPqQuantizer, open_index
+from forge_nlp.search.exact_index import normalize
+from forge_nlp.search.ivfpq_index import kmeans, nearest_centroid
+
+_VERSION = "test-model"
+_SECTIONS = ["SECTION_C", "SECTION_H", "SECTION_I"]
+
+
+def _corpus(n: int = 3000, dims: int = 32, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((40, dims))
+    vectors = centres[rng.integers(0, 40, n)] + 0.5 * rng.standard_normal((n, dims))
+    ids = [f"chunk-{i}" for i in range(n)]
+    sections = [_SECTIONS[i % len(_SECTIONS)] for i in range(n)]
+    return ids, sections, vectors.astype(np.float32)
+
+
+def _queries(n: int = 30) -> np.ndarray:
+    _, _, vectors = _corpus()
+    rng = np.random.default_rng(5)
+    noise = rng.standard_normal((n, 32)).astype(np.float32)
+    return vectors[rng.choice(len(vectors), n)] + 0.2 * noise
+
+
+@pytest.fixture(scope="module")
+def quantizer() -> IvfPqQuantizer:
+    _, _, vectors = _corpus()
+    return IvfPqQuantizer.fit(normalize(vectors), nlist=16, subquantizers=8, iterations=10)
+
+
+@pytest.fixture()
+def index(tmp_path) -> IvfPqIndex:
+    ids, sections, vectors = _corpus()
+    idx = IvfPqIndex.train(tmp_path / "idx", vectors[:1500], _VERSION, nlist=16, subquantizers=8,
+                           iterations=10)
+    idx.add(ids, sections, vectors)
+    return idx
+
+
+@pytest.fixture(scope="module")
+def exact(tmp_path_factory) -> ExactIndex:
+    ids, sections, vectors = _corpus()
+    idx = ExactIndex(
+        tmp_path_factory.mktemp("exact") / "idx", dimensions=32, embedding_version=_VERSION
+    )
+    idx.add(ids, sections, vectors)
+    return idx
+
+
+class TestQuantizer:
+    def test_kmeans_finds_separated_clusters(self):
+        rng = np.random.default_rng(0)
+        centres = np.array([[10.0, 0], [0, 10], [-10, 0]], dtype=np.float32)
+        points = np.repeat(centres, 50, axis=0) + rng.standard_normal((150, 2)).astype(np.float32)
+        found = kmeans(points, 3, seed=1)
+        assert sorted(nearest_centroid(centres, found).tolist()) == [0, 1, 2]
+
+    def test_codes_reconstruct_vectors(self, quantizer):
+        _, _, vectors = _corpus()
+        vectors = normalize(vectors)
+        cells, codes = quantizer.encode(vectors)
+        assert codes.shape == (3000, 8) and codes.dtype == np.uint8
+        error = np.linalg.norm(quantizer.decode(cells, codes) - vectors, axis=1).mean()
+        coarse_only = np.linalg.norm(quantizer.centroids[cells] - vectors, axis=1).mean()
+        assert error < 0.5 * coarse_only
+
+    def test_lookup_table_matches_decoded_dot(self, quantizer):
+        _, _, vectors = _corpus()
+        vectors = normalize(vectors[:100])
+        cells, codes = quantizer.encode(vectors)
+        query = vectors[0]
+        table = quantizer.lookup_table(query)
+        approx = (quantizer.centroids @ query)[cells] + table[np.arange(8), codes].sum(axis=1)
+        np.testing.assert_allclose(approx, quantizer.decode(cells, codes) @ query, atol=1e-5)
+
+    def test_fit_rejects_bad_shapes(self):
+        _, _, vectors = _corpus()
+        with pytest.raises(ValueError, match="do not split"):
+            IvfPqQuantizer.fit(vectors, nlist=4, subquantizers=5)
+        with pytest.raises(ValueError, match="at least 256"):
+            IvfPqQuantizer.fit(vectors[:100], nlist=4, subquantizers=8)
+
+
+class TestSearch:
+    def test_refined_recall_against_exact(self, index, exact):
+        queries = _queries()
+        truth = exact.search(queries, k=10)
+        found = index.search(queries, k=10, nprobe=8, refine_factor=10)
+        recall = np.mean([
+            len({h.chunk_id for h in a} & {h.chunk_id for h in b}) / 10
+            for a, b in zip(found, truth)
+        ])
+        assert recall >= 0.9
+
+    def test_refined_scores_are_exact(self, index):
+        _, _, vectors = _corpus()
+        [hits] = index.search(vectors[42], k=5)
+        assert hits[0].chunk_id == "chunk-42"
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+        assert all(a.score >= b.score for a, b in pairwise(hits))
+
+    def test_section_filter(self, index):
+        [hits] = index.search(_queries(1), k=10, section_types=["SECTION_H"], nprobe=16)
+        assert len(hits) == 10 and {h.section_type for h in hits} == {"SECTION_H"}
+        assert index.search(_queries(1), section_types=["SECTION_Z"]) == [[]]
+
+    def test_compact_in_memory(self, index):
+        stats = index.stats()
+        assert stats.chunks == 3000 and stats.code_bytes == 3000 * (8 + 4)
+        assert stats.bytes_per_vector < 32 * 4
+
+    def test_invalid_queries(self, index):
+        with pytest.raises(ValueError, match="32-dim"):
+            index.search(np.ones(8, dtype=np.float32))
+        with pytest.raises(ValueError, match="already indexed"):
+            index.add(["chunk-1"], ["OTHER"], np.ones((1, 32), dtype=np.float32))
+
+
+class TestPersistence:
+    def test_save_and_load(self, index):
+        queries = _queries(5)
+        index.save()
+        assert index.stats().unsaved == 0
+        reopened = IvfPqIndex(index.path)
+        assert reopened.search(queries, k=10) == index.search(queries, k=10)
+        np.testing.assert_array_equal(reopened._codes[:3000], index._codes[:3000])
+
+    def test_unsaved_rows_reencoded_on_load(self, index):
+        _, _, vectors = _corpus()
+        index.save()
+        index.add(["extra"], ["OTHER"], -vectors[:1])
+        assert index.stats().unsaved == 1
+        reopened = IvfPqIndex(index.path)
+        assert len(reopened) == 3001 and reopened.stats().unsaved == 1
+        assert reopened.search(-vectors[0], k=1)[0][0].chunk_id == "extra"
+
+    def test_interrupted_add_discarded(self, index):
+        index.store.append(np.ones((2, 32), dtype=np.float32))  # rows never recorded
+        assert len(IvfPqIndex(index.path)) == 3000
+
+    def test_kinds_and_errors(self, index, exact, tmp_path):
+        _, _, vectors = _corpus()
+        assert isinstance(open_index(index.path), IvfPqIndex)
+        with pytest.raises(FileExistsError):
+            IvfPqIndex.train(index.path, vectors, _VERSION)
+        with pytest.raises(ValueError, match="not IVF-PQ"):
+            IvfPqIndex(exact.path)
+        with pytest.raises(ValueError, match="holds test-model"):
+            IvfPqIndex(index.path, embedding_version="other-model")
+        with pytest.raises(FileNotFoundError, match="ivfpq_index build"):
+            IvfPqIndex(tmp_path / "none")
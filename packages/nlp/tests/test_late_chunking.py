@@ -0,0 +1,113 @@
+"""
+Tests for late-chunking planning: grouping, overlap stitching and windows.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk, DocumentProcessor
+from forge_nlp.chunking.test_data import load_sample
+from forge_nlp.embeddings.late_chunking import (
+    group_chunks,
+    overlap_length,
+    plan_late_chunks,
+    plan_windows,
+)
+
+
+def _chunk(text: str, section: str = "SECTION_C", clause: str | None = None) -> DocumentChunk:
+    return DocumentChunk(text, section, clause, 0, metadata={"document_id": "doc"})
+
+
+@pytest.fixture(scope="module")
+def chunks() -> list[DocumentChunk]:
+    processor = DocumentProcessor(target_tokens=60, max_tokens=80, overlap_tokens=20)
+    return processor.process(load_sample("sample_contract.txt"), document_id="sample")
+
+
+class TestOverlapLength:
+    def test_paragraph_overlap(self):
+        a = "First paragraph.\n\nShared paragraph."
+        b = "Shared paragraph.\n\nNew paragraph."
+        assert overlap_length(a, b) == len("Shared paragraph.")
+
+    def test_no_overlap(self):
+        assert overlap_length("One two three.", "Four five six.") == 0
+
+    def test_partial_word_is_not_an_overlap(self):
+        assert overlap_length("It is the", "then it ran") == 0
+
+    def test_prefers_longest_overlap(self):
+        assert overlap_length("a b a b", "a b a b c") == len("a b a b")
+
+
+class TestGroupChunks:
+    def test_overlapping_chunks_stitched_once(self):
+        group = group_chunks([
+            _chunk("Alpha beta.\n\nGamma delta."),
+            _chunk("Gamma delta.\n\nEpsilon zeta."),
+        ])[0]
+        assert group.text == "Alpha beta.\n\nGamma delta.\n\nEpsilon zeta."
+        assert [group.text[s:e] for s, e in group.spans] == [
+            "Alpha beta.\n\nGamma delta.", "Gamma delta.\n\nEpsilon zeta.",
+        ]
+
+    def test_disjoint_chunks_joined_as_paragraphs(self):
+        group = group_chunks([_chunk("One."), _chunk("Two.")])[0]
+        assert group.text == "One.\n\nTwo."
+        assert [group.text[s:e] for s, e in group.spans] == ["One.", "Two."]
+
+    def test_groups_split_on_section_and_clause(self):
+        groups = group_chunks([
+            _chunk("C one."), _chunk("C two."),
+            _chunk("I one.", "SECTION_I", "52.204-21"),
+            _chunk("I two.", "SECTION_I", "52.219-8"),
+        ])
+        assert [g.indices for g in groups] == [[0, 1], [2], [3]]
+
+    def test_chunks_without_document_id_not_grouped(self):
+        chunks = [DocumentChunk(text, "SECTION_C", None, 0) for text in ("One.", "Two.")]
+        assert [g.indices for g in group_chunks(chunks)] == [[0], [1]]
+        groups = group_chunks([_chunk("One."), *chunks, _chunk("Two.")])
+        assert [g.indices for g in groups] == [[0], [1], [2], [3]]
+
+    def test_spans_reproduce_every_chunk(self, chunks):
+        for group in group_chunks(chunks):
+            for i, (start, end) in zip(group.indices, group.spans):
+                assert group.text[start:end] == chunks[i].chunk_text
+
+
+class TestPlanWindows:
+    def test_spans_packed_while_they_fit(self):
+        windows, assignment = plan_windows([(0, 40), (30, 70), (60, 100), (90, 130)], width=100)
+        assert windows == [(0, 100), (90, 130)]
+        assert assignment == [0, 0, 0, 1]
+
+    def test_wide_span_cut_to_width(self):
+        windows, assignment = plan_windows([(0, 300), (250, 320)], width=100)
+        assert windows == [(0, 100), (250, 320)]
+        assert assignment == [0, 1]
+
+
+class TestPlanLateChunks:
+    def test_targets_cover_each_chunk_text(self, chunks, char_tokenizer):
+        plan = plan_late_chunks(chunks, char_tokenizer, max_length=512)
+        assert plan.windows
+        assert sorted([t.chunk for t in plan.targets] + plan.singles) == list(range(len(chunks)))
+        for target in plan.targets:
+            window = plan.windows[target.window]
+            assert len(window) <= 512
+            text = chunks[target.chunk].chunk_text
+            ids = char_tokenizer(text, add_special_tokens=False)["input_ids"]
+            # Chunks longer than the window are cut like per-chunk truncation.
+            assert window[target.start:target.end] == ids[:510]
+
+    def test_overlap_encoded_once(self, chunks, char_tokenizer):
+        plan = plan_late_chunks(chunks, char_tokenizer, max_length=512)
+        assert plan.window_tokens < plan.chunk_tokens
+
+    def test_single_chunk_groups_left_alone(self, char_tokenizer):
+        plan = plan_late_chunks([_chunk("Only chunk.")], char_tokenizer, max_length=512)
+        assert plan.singles == [0]
+        assert plan.windows == []
@@ -0,0 +1,127 @@
+"""
+Tests for the asynchronous micro-batching queue.
+
+The batcher is exercised with a plain numpy encode function so the tests
+do not depend on the LegalBERT model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.micro_batcher import MicroBatcher, QueueFullError
+
+
+class _RecordingEncoder:
+    """Encodes each text as [len(text), index-in-batch] and records batch sizes."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.batches: list[list[str]] = []
+        self.delay = delay
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        self.release.wait()
+        self.batches.append(list(texts))
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+class TestMicroBatcher:
+    async def test_concurrent_requests_share_one_encode(self):
+        """Concurrent single-text requests should be coalesced into one batch."""
+        encoder = _RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=16, max_wait_ms=50)
+        texts = [f"query {'x' * i}" for i in range(8)]
+
+        results = await asyncio.gather(*(batcher.submit([t]) for t in texts))
+
+        assert len(encoder.batches) == 1
+        assert sorted(encoder.batches[0]) == sorted(texts)
+        for text, vec in zip(texts, results):
+            assert vec.shape == (1, 2)
+            assert vec[0, 0] == len(text)
+
+        stats = batcher.stats()
+        assert stats.requests == 8
+        assert stats.batches == 1
+        assert stats.mean_batch_size == 8
+        await batcher.close()
+
+    async def test_each_caller_gets_its_own_slice(self):
+        encoder = _RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=16, max_wait_ms=50)
+
+        a, b = await asyncio.gather(batcher.submit(["a", "bb"]), batcher.submit(["ccc"]))
+
+        assert a[:, 0].tolist() == [1, 2]
+        assert b[:, 0].tolist() == [3]
+        await batcher.close()
+
+    async def test_max_batch_size_respected(self):
+        encoder = _RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=3, max_wait_ms=20)
+
+        await asyncio.gather(*(batcher.submit([str(i)]) for i in range(7)))
+
+        assert [len(b) for b in encoder.batches] == [3, 3, 1]
+        await batcher.close()
+
+    async def test_oversized_request_runs_alone(self):
+        encoder = _RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=2, max_wait_ms=1)
+
+        result = await batcher.submit(["a", "b", "c", "d"])
+
+        assert result.shape == (4, 2)
+        assert encoder.batches == [["a", "b", "c", "d"]]
+        await batcher.close()
+
+    async def test_queue_full_rejected(self):
+        encoder = _RecordingEncoder()
+        encoder.release.clear()  # hold the first batch inside encode
+        batcher = MicroBatcher(encoder, max_batch_size=1, max_wait_ms=0, max_queue_depth=1)
+
+        first = asyncio.create_task(batcher.submit(["first"]))
+        while not batcher.stats().requests or batcher.stats().queue_depth:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(batcher.submit(["queued"]))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(QueueFullError):
+            await batcher.submit(["rejected"])
+        assert batcher.stats().rejected == 1
+
+        encoder.release.set()
+        await asyncio.gather(first, queued)
+        await batcher.close()
+
+    async def test_encode_errors_propagate_to_callers(self):
+        def failing(texts: list[str]) -> np.ndarray:
+            raise RuntimeError("model exploded")
+
+        batcher = MicroBatcher(failing, max_wait_ms=1)
+        with pytest.raises(RuntimeError, match="model exploded"):
+            await batcher.submit(["x"])
+        await batcher.close()
+
+    async def test_batches_overlap_up_to_max_in_flight(self):
+        """A second batch should start encoding while the first is still running."""
+        both_running = threading.Barrier(2, timeout=5)
+
+        def encode(texts: list[str]) -> np.ndarray:
+            both_running.wait()  # raises BrokenBarrierError unless two calls overlap
+            return np.zeros((len(texts), 2), dtype=np.float32)
+
+        batcher = MicroBatcher(encode, max_batch_size=1, max_wait_ms=1, max_in_flight=2)
+        a, b = await asyncio.gather(batcher.submit(["a"]), batcher.submit(["b"]))
+
+        assert a.shape == b.shape == (1, 2)
+        stats = batcher.stats()
+        assert stats.batches == 2 and stats.max_in_flight == 2
+        await batcher.close()
@@ -0,0 +1,140 @@
+"""
+Tests for the model registry: on-demand loads, LRU order and the memory budget.
+"""
+
+from __future__ import annotations
+
+import torch
+
+from forge_nlp.embeddings.backends import Backend
+from forge_nlp.embeddings.model_registry import ModelRegistry, model_size_bytes
+
+# A float32 Linear(n, n) without bias holds n * n * 4 bytes.
+_SIZES = {"small": 16, "medium": 32, "large": 64}
+
+
+def _loader(calls: list[str]):
+    def load(model_name: str, backend: Backend, onnx_dir, snapshot) -> torch.nn.Module:
+        calls.append(model_name)
+        n = _SIZES[model_name]
+        return torch.nn.Linear(n, n, bias=False)
+
+    return load
+
+
+def _bytes(name: str) -> int:
+    return _SIZES[name] ** 2 * 4
+
+
+class TestModelSize:
+    def test_counts_parameters_and_buffers(self):
+        model = torch.nn.BatchNorm1d(8)
+        # weight, bias, running_mean, running_var (float32) + num_batches_tracked (int64)
+        assert model_size_bytes(model) == 4 * 8 * 4 + 8
+
+    def test_non_torch_model_is_zero(self):
+        assert model_size_bytes(object()) == 0
+
+
+class TestModelRegistry:
+    def test_loads_once_and_counts_uses(self):
+        calls: list[str] = []
+        registry = ModelRegistry(loader=_loader(calls))
+        first = registry.get("small")
+        assert registry.get("small") is first
+        assert calls == ["small"]
+        [loaded] = registry.loaded()
+        assert loaded.uses == 2
+        assert loaded.size_bytes == _bytes("small")
+        assert ("small", "torch") in registry
+
+    def test_backends_are_separate_models(self):
+        calls: list[str] = []
+        registry = ModelRegistry(loader=_loader(calls))
+        registry.get("small", Backend.TORCH)
+        registry.get("small", Backend.ONNX_INT8)
+        assert calls == ["small", "small"]
+        assert len(registry.loaded()) == 2
+
+    def test_snapshots_and_exports_are_separate_models(self, tmp_path, monkeypatch):
+        calls: list[str] = []
+        registry = ModelRegistry(loader=_loader(calls))
+        registry.get("small")
+        registry.get("small", snapshot=tmp_path / "a")
+        registry.get("small", snapshot=tmp_path / "b")
+        registry.get("small", Backend.ONNX_INT8, onnx_dir=tmp_path / "a")
+        monkeypatch.chdir(tmp_path)
+        registry.get("small", snapshot="a")  # same directory, relative path
+        assert len(calls) == 4
+        assert ("small", "torch", None, tmp_path / "b") in registry
+        assert ("small", "torch", None, tmp_path / "c") not in registry
+
+    def test_no_budget_never_evicts(self):
+        registry = ModelRegistry(loader=_loader([]))
+        for name in _SIZES:
+            registry.get(name)
+        assert [m.model_name for m in registry.loaded()] == ["small", "medium", "large"]
+        assert registry.stats().evictions == 0
+
+    def test_evicts_least_recently_used_over_budget(self):
+        registry = ModelRegistry(
+            budget_bytes=_bytes("small") + _bytes("medium"), loader=_loader([]),
+        )
+        registry.get("small")
+        registry.get("medium")
+        registry.get("small")  # medium is now least recently used
+        registry.get("large")
+        assert [m.model_name for m in registry.loaded()] == ["large"]
+
+        registry = ModelRegistry(
+            budget_bytes=_bytes("medium") + _bytes("large"), loader=_loader([]),
+        )
+        registry.get("small")
+        registry.get("medium")
+        registry.get("small")
+        registry.get("large")
+        assert [m.model_name for m in registry.loaded()] == ["small", "large"]
+        assert registry.used_bytes <= registry.budget_bytes
+        assert registry.stats().evictions == 1
+
+    def test_most_recent_model_kept_even_over_budget(self):
+        registry = ModelRegistry(budget_bytes=_bytes("small"), loader=_loader([]))
+        registry.get("small")
+        registry.get("large")
+        assert [m.model_name for m in registry.loaded()] == ["large"]
+        assert registry.used_bytes > registry.budget_bytes
+
+    def test_evicted_model_reloaded_transparently(self):
+        calls: list[str] = []
+        registry = ModelRegistry(budget_bytes=_bytes("medium"), loader=_loader(calls))
+        registry.get("medium")
+        registry.get("small")
+        assert ("medium", Backend.TORCH) not in registry
+        registry.get("medium")
+        assert calls == ["medium", "small", "medium"]
+        assert registry.stats().loads == 3
+
+    def test_room_made_before_known_model_reloads(self):
+        """A model seen before evicts others *before* loading, not after."""
+        resident: list[list[str]] = []
+        registry: ModelRegistry
+
+        def load(model_name: str, backend: Backend, onnx_dir, snapshot) -> torch.nn.Module:
+            resident.append([m.model_name for m in registry.loaded()])
+            return _loader([])(model_name, backend, onnx_dir, snapshot)
+
+        registry = ModelRegistry(budget_bytes=_bytes("large"), loader=load)
+        registry.get("large")
+        registry.get("medium")
+        registry.get("large")
+        # First load of large saw nothing, medium saw large (size unknown
+        # until loaded), the reload of large saw medium already gone.
+        assert resident == [[], ["large"], []]
+
+    def test_explicit_evict(self):
+        registry = ModelRegistry(loader=_loader([]))
+        registry.get("small")
+        assert registry.evict("small") is True
+        assert registry.evict("small") is False
+        assert registry.loaded() == []
+        assert registry.used_bytes == 0
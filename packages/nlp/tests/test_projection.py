@@ -0,0 +1,94 @@
+"""
+Tests for the PCA dimensionality-reduction projection.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.corpus import load_embedded_chunks
+from forge_nlp.embeddings.projection import PcaProjection, evaluate, recall_at_k
+
+
+@pytest.fixture(scope="module")
+def vectors() -> np.ndarray:
+    """Low-rank data plus noise, like real embeddings: most variance in few directions."""
+    rng = np.random.default_rng(11)
+    latent = rng.standard_normal((400, 8)) * np.linspace(10, 3, 8)
+    mixing = rng.standard_normal((8, 64))
+    return (latent @ mixing + 0.1 * rng.standard_normal((400, 64)) + 5.0).astype(np.float32)
+
+
+class TestPcaProjection:
+    def test_transform_shape_and_dtype(self, vectors):
+        proj = PcaProjection.fit(vectors, max_dimensions=32)
+        out = proj.transform(vectors, 16)
+        assert out.shape == (400, 16)
+        assert out.dtype == np.float32
+        assert proj.input_dimensions == 64
+
+    def test_components_capped_by_sample_size(self, vectors):
+        proj = PcaProjection.fit(vectors[:10], max_dimensions=32)
+        assert proj.max_dimensions == 10
+
+    def test_components_orthonormal(self, vectors):
+        proj = PcaProjection.fit(vectors, max_dimensions=16)
+        np.testing.assert_allclose(proj.components @ proj.components.T, np.eye(16), atol=1e-4)
+
+    def test_retained_variance_monotonic(self, vectors):
+        proj = PcaProjection.fit(vectors, max_dimensions=32)
+        retained = [proj.retained_variance(k) for k in (1, 4, 8, 32)]
+        assert retained == sorted(retained)
+        assert retained[2] > 0.99  # the data has rank 8 plus noise
+
+    def test_prefix_of_components_is_smaller_projection(self, vectors):
+        proj = PcaProjection.fit(vectors, max_dimensions=32)
+        np.testing.assert_allclose(
+            proj.transform(vectors, 8), proj.transform(vectors, 32)[:, :8], rtol=1e-5, atol=1e-4,
+        )
+
+    def test_rejects_out_of_range_dimensions(self, vectors):
+        proj = PcaProjection.fit(vectors, max_dimensions=16)
+        with pytest.raises(ValueError, match="1..16"):
+            proj.transform(vectors, 32)
+
+    def test_save_and_load(self, vectors, tmp_path):
+        proj = PcaProjection.fit(vectors, max_dimensions=16)
+        proj.save(tmp_path / "model.pca.npz")
+        loaded = PcaProjection.load(tmp_path / "model.pca.npz")
+        np.testing.assert_array_equal(loaded.transform(vectors, 8), proj.transform(vectors, 8))
+
+    def test_digest_names_the_fit(self, vectors, tmp_path):
+        proj = PcaProjection.fit(vectors, max_dimensions=16)
+        proj.save(tmp_path / "model.pca.npz")
+        assert PcaProjection.load(tmp_path / "model.pca.npz").digest == proj.digest
+        assert PcaProjection.fit(vectors[:200], max_dimensions=16).digest != proj.digest
+
+
+class TestEvaluation:
+    def test_recall_perfect_for_identical_spaces(self, vectors):
+        assert recall_at_k(vectors, vectors.copy(), k=5) == 1.0
+
+    def test_heldout_recall_high_when_rank_preserved(self, vectors):
+        train, heldout = vectors[:300], vectors[300:]
+        proj = PcaProjection.fit(train, max_dimensions=16)
+        reports = evaluate(proj, heldout, [2, 8], k=5)
+        assert [r.dimensions for r in reports] == [2, 8]
+        assert reports[1].recall_at_k > 0.8
+        assert reports[1].recall_at_k >= reports[0].recall_at_k
+
+
+def test_load_embedded_chunks(tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text(
+        '{"chunk_text": "a", "section_type": "OTHER", "clause_number": null,'
+        ' "chunk_index": 0, "metadata": {}, "embedding": [1.0, 2.0]}\n'
+        "\n"
+        '{"chunk_text": "b", "section_type": "SECTION_C", "clause_number": "1",'
+        ' "chunk_index": 1, "metadata": {}, "embedding": [3.0, 4.0]}\n'
+    )
+    records, matrix = load_embedded_chunks(path)
+    assert [r["chunk_text"] for r in records] == ["a", "b"]
+    assert "embedding" not in records[0]
+    np.testing.assert_array_equal(matrix, np.array([[1, 2], [3, 4]], dtype=np.float32))
@@ -0,0 +1,103 @@
+"""
+Tests for reduced-precision embedding representations and rescoring.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.quantization import (
+    Precision,
+    ScalarQuantizer,
+    hamming_distances,
+    quantize,
+    rescore,
+    to_binary,
+)
+
+
+@pytest.fixture(scope="module")
+def vectors() -> np.ndarray:
+    return np.random.default_rng(7).standard_normal((500, 64)).astype(np.float32)
+
+
+def _normalized(v: np.ndarray) -> np.ndarray:
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+class TestScalarQuantizer:
+    def test_round_trip_error_small(self, vectors):
+        q = ScalarQuantizer.fit(vectors)
+        codes = q.quantize(vectors)
+        assert codes.dtype == np.int8
+        assert codes.shape == vectors.shape
+        # One quantization step is (max - min) / 255 per dimension.
+        assert np.all(np.abs(q.dequantize(codes) - vectors) <= q.scales / 2 + 1e-6)
+
+    def test_out_of_range_values_clipped(self, vectors):
+        q = ScalarQuantizer.fit(vectors)
+        codes = q.quantize(vectors * 10)
+        assert codes.min() == -128
+        assert codes.max() == 127
+
+    def test_scores_match_dequantized_dot(self, vectors):
+        q = ScalarQuantizer.fit(vectors)
+        codes = q.quantize(vectors)
+        query = vectors[3]
+        np.testing.assert_allclose(
+            q.scores(query, codes), q.dequantize(codes) @ query, rtol=1e-4, atol=1e-3,
+        )
+
+    def test_save_and_load(self, vectors, tmp_path):
+        q = ScalarQuantizer.fit(vectors)
+        q.save(tmp_path / "model.int8.npz")
+        loaded = ScalarQuantizer.load(tmp_path / "model.int8.npz")
+        np.testing.assert_array_equal(loaded.quantize(vectors), q.quantize(vectors))
+
+
+class TestBinary:
+    def test_packs_sign_bits(self):
+        bits = to_binary(np.array([[1.0, -1.0, 0.5, -0.5, 2, 2, -2, -2, 3]]))
+        assert bits.shape == (1, 2)
+        assert bits[0, 0] == 0b10101100
+        assert bits[0, 1] == 0b10000000
+
+    def test_hamming_distance(self):
+        codes = to_binary(np.array([[1, 1, 1, 1], [-1, -1, -1, -1], [1, -1, 1, -1]]))
+        query = to_binary(np.array([1, 1, 1, 1]))
+        assert hamming_distances(query, codes).tolist() == [0, 4, 2]
+
+
+class TestQuantize:
+    def test_sizes(self, vectors):
+        q = ScalarQuantizer.fit(vectors)
+        assert quantize(vectors, Precision.FLOAT32).nbytes == vectors.nbytes
+        assert quantize(vectors, Precision.FLOAT16).nbytes == vectors.nbytes // 2
+        assert quantize(vectors, Precision.INT8, q).nbytes == vectors.nbytes // 4
+        assert quantize(vectors, Precision.BINARY).nbytes == vectors.nbytes // 32
+
+    def test_int8_requires_quantizer(self, vectors):
+        with pytest.raises(ValueError):
+            quantize(vectors, "int8")
+
+
+class TestRescore:
+    def test_binary_first_pass_then_rescore_recovers_exact_top1(self, vectors):
+        """A wide binary shortlist rescored at full precision finds the true nearest vector."""
+        query = vectors[42] + 0.05 * np.random.default_rng(0).standard_normal(64).astype(np.float32)
+        codes = to_binary(vectors)
+        shortlist = np.argsort(hamming_distances(to_binary(query), codes))[:50]
+
+        results = rescore(query, shortlist, vectors, top_k=5)
+
+        exact = np.argsort(-(_normalized(vectors) @ _normalized(query)))
+        in_shortlist = set(shortlist.tolist())
+        assert results[0][0] == 42
+        assert [r[0] for r in results] == [i for i in exact.tolist() if i in in_shortlist][:5]
+        assert results[0][1] == pytest.approx(
+            float(_normalized(vectors[42]) @ _normalized(query)), rel=1e-5,
+        )
+
+    def test_empty_candidates(self, vectors):
+        assert rescore(vectors[0], [], vectors, top_k=3) == []
@@ -0,0 +1,195 @@
+"""
+Tests for the distilled query encoder: student construction, distillation,
+the service's query path and the student-vs-teacher evaluation.
+
+A tiny 4-layer BERT with random weights is the teacher, so nothing is
+downloaded.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings import query_encoder
+from forge_nlp.embeddings.embedding_cache import EmbeddingCache
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+from forge_nlp.embeddings.model_registry import ModelRegistry
+from forge_nlp.embeddings.query_encoder import (
+    distill,
+    evaluate,
+    is_query_encoder,
+    kept_layers,
+    query_like_spans,
+    read_manifest,
+    student_from_teacher,
+)
+
+_CORPUS = [
+    "The Contractor shall deliver monthly status reports to the Contracting Officer.",
+    "All stored contract data must be protected with AES-256 encryption at rest.",
+    "The platform shall support a minimum of 500 concurrent users without degradation.",
+    "Option periods may be exercised by written notice within 30 days of expiration.",
+    "The user interface shall conform to WCAG 2.1 Level AA accessibility guidelines.",
+    "Invoices shall be submitted electronically through the Wide Area WorkFlow system.",
+]
+
+
+@pytest.fixture(scope="module")
+def teacher_model(tmp_path_factory, char_tokenizer) -> str:
+    """Path of a saved 4-layer, 32-dim SentenceTransformer built from scratch."""
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel
+
+    root = tmp_path_factory.mktemp("teacher")
+    torch.manual_seed(0)
+    bert = BertModel(BertConfig(
+        vocab_size=len(char_tokenizer), hidden_size=32, num_hidden_layers=4,
+        num_attention_heads=2, intermediate_size=64, max_position_embeddings=256,
+        initializer_range=0.5,  # large weights so every layer changes the output
+    ))
+    bert.save_pretrained(root / "bert")
+    char_tokenizer.save_pretrained(root / "bert")
+    transformer = models.Transformer(str(root / "bert"), max_seq_length=256)
+    model = SentenceTransformer(modules=[transformer, models.Pooling(32, "mean")])
+    model.save(str(root / "st"))
+    return str(root / "st")
+
+
+@pytest.fixture(scope="module")
+def encoder_dir(teacher_model, tmp_path_factory):
+    teacher = EmbeddingService(model_name=teacher_model, registry=ModelRegistry())
+    out = tmp_path_factory.mktemp("query_encoders") / "tiny"
+    return distill(teacher, _CORPUS, out, num_layers=2, epochs=2, batch_size=8)
+
+
+class TestStudent:
+    def test_kept_layers(self):
+        assert kept_layers(12, 4) == [0, 4, 7, 11]
+        assert kept_layers(12, 12) == list(range(12))
+        assert kept_layers(12, 1) == [11]
+        with pytest.raises(ValueError):
+            kept_layers(12, 0)
+        with pytest.raises(ValueError):
+            kept_layers(4, 5)
+
+    def test_student_keeps_size_and_leaves_teacher(self, teacher_model):
+        from sentence_transformers import SentenceTransformer
+
+        teacher = SentenceTransformer(teacher_model)
+        student = student_from_teacher(teacher, 2)
+        assert len(student[0].auto_model.encoder.layer) == 2
+        assert len(teacher[0].auto_model.encoder.layer) == 4
+        assert student.encode(_CORPUS[:2]).shape == (2, 32)
+
+    def test_query_like_spans(self):
+        spans = query_like_spans(_CORPUS, per_text=3, seed=1)
+        assert spans == query_like_spans(_CORPUS, per_text=3, seed=1)
+        assert len(spans) == len(set(spans))
+        for span in spans:
+            assert 3 <= len(span.split()) <= 16
+            assert any(span in text for text in _CORPUS)
+
+
+class TestDistill:
+    def test_layout_and_manifest(self, encoder_dir, teacher_model):
+        assert is_query_encoder(encoder_dir)
+        assert (encoder_dir / "model.safetensors").exists()
+        manifest = read_manifest(encoder_dir)
+        assert manifest["teacher"] == teacher_model
+        assert manifest["dimensions"] == 32
+        assert manifest["layers"] == [0, 3]
+        assert len(manifest["weights_sha256"]) == 64
+        assert not encoder_dir.with_name(encoder_dir.name + ".tmp").exists()
+
+    def test_training_moves_student_towards_teacher(self, teacher_model, tmp_path):
+        from sentence_transformers import SentenceTransformer
+
+        teacher = EmbeddingService(model_name=teacher_model, registry=ModelRegistry())
+        queries = query_like_spans(_CORPUS, seed=5)
+        target = teacher.encode(queries)
+        untrained = student_from_teacher(SentenceTransformer(teacher_model), 1).encode(queries)
+        out = distill(teacher, _CORPUS, tmp_path / "enc", num_layers=1, epochs=8,
+                      batch_size=8, learning_rate=3e-4)
+        trained = SentenceTransformer(str(out)).encode(queries)
+        assert np.mean((trained - target) ** 2) < np.mean((untrained - target) ** 2)
+
+
+class TestServiceQueryPath:
+    def test_embed_queries_uses_student(self, encoder_dir, teacher_model):
+        from sentence_transformers import SentenceTransformer
+
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry(),
+                               query_encoder=encoder_dir)
+        assert svc.query_encoder == encoder_dir
+        expected = SentenceTransformer(str(encoder_dir)).encode(_CORPUS[:2])
+        np.testing.assert_allclose(svc.embed_queries(_CORPUS[:2]), expected, atol=1e-5)
+        # Documents still go through the full model.
+        [chunk] = svc.embed_chunks([DocumentChunk(_CORPUS[0], "SECTION_C", None, 0)])
+        np.testing.assert_allclose(chunk.embedding, svc.embed_batch(_CORPUS[:1])[0], atol=1e-6)
+
+    def test_falls_back_to_model(self, teacher_model):
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry())
+        assert svc.query_encoder is None
+        assert svc.query_cache_namespace == svc.cache_namespace
+        np.testing.assert_allclose(svc.embed_queries(_CORPUS[:2]), svc.embed_batch(_CORPUS[:2]))
+
+    def test_default_dir(self, encoder_dir, teacher_model, tmp_path, monkeypatch):
+        import shutil
+
+        monkeypatch.setattr(query_encoder, "_DEFAULT_QUERY_ENCODER_ROOT", tmp_path)
+        shutil.copytree(encoder_dir, query_encoder.default_query_encoder_dir(teacher_model))
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry())
+        assert svc.query_encoder == query_encoder.default_query_encoder_dir(teacher_model)
+
+    def test_other_teacher_rejected(self, encoder_dir, teacher_model, tmp_path):
+        import shutil
+
+        other = tmp_path / "other"
+        shutil.copytree(encoder_dir, other)
+        manifest = read_manifest(other)
+        manifest["teacher"] = "other/model"
+        (other / "query_encoder.json").write_text(json.dumps(manifest))
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry(),
+                               query_encoder=other)
+        with pytest.raises(ValueError, match="distilled from other/model"):
+            svc.embed_queries(["x"])
+
+    def test_missing_encoder(self, teacher_model, tmp_path):
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry(),
+                               query_encoder=tmp_path)
+        with pytest.raises(FileNotFoundError, match="query_encoder distill"):
+            svc.embed_queries(["x"])
+
+    def test_query_vectors_cached_apart(self, encoder_dir, teacher_model):
+        cache = EmbeddingCache()
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry(),
+                               cache=cache, query_encoder=encoder_dir)
+        assert svc.query_cache_namespace.startswith(f"{svc.cache_namespace}#query@")
+        document = svc.embed_batch(_CORPUS[:1])
+        query = svc.embed_queries(_CORPUS[:1])
+        assert not np.allclose(document, query)
+        assert cache.stats().misses == 2
+        np.testing.assert_allclose(svc.embed_queries(_CORPUS[:1]), query)
+        assert cache.stats().hits == 1
+
+
+class TestEvaluate:
+    def test_report(self, encoder_dir, teacher_model):
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry(),
+                               query_encoder=encoder_dir)
+        queries = query_like_spans(_CORPUS, seed=3)
+        report = evaluate(svc, queries, svc.embed_array(_CORPUS), k=2)
+        assert report.queries == len(queries) and report.chunks == len(_CORPUS)
+        assert 0 <= report.recall_at_k <= 1
+        assert -1 <= report.mean_cosine <= 1
+        assert report.student_p50_ms > 0 and report.teacher_p50_ms > 0
+
+    def test_requires_encoder(self, teacher_model):
+        svc = EmbeddingService(model_name=teacher_model, registry=ModelRegistry())
+        with pytest.raises(ValueError, match="No query encoder"):
+            evaluate(svc, ["x"], np.zeros((1, 32), dtype=np.float32))
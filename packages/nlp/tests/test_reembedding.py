@@ -0,0 +1,159 @@
+"""
+Tests for the background re-embedding job.
+
+The job runs against ``InMemoryDbClient`` and a stand-in service whose
+vectors encode the chunk text length and a per-model tag, so nothing is
+downloaded.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.embedding_service import EmbeddedChunkBatch
+from forge_nlp.pipeline.ingestion_pipeline import InMemoryDbClient
+from forge_nlp.pipeline.reembedding import ReembedCheckpoint, ReembeddingJob
+
+
+class _TaggedService:
+    """Embeds each chunk as ``[len(text), tag]`` under version ``model-<tag>``."""
+
+    def __init__(self, tag: float, on_batch=None) -> None:
+        self.tag = tag
+        self.batches: list[int] = []
+        self.on_batch = on_batch
+
+    def embedding_version(self, dimensions: int | None = None) -> str:
+        return f"model-{self.tag:g}"
+
+    def embed_chunks(self, chunks: list[DocumentChunk]) -> EmbeddedChunkBatch:
+        self.batches.append(len(chunks))
+        if self.on_batch is not None:
+            self.on_batch(len(self.batches))
+        vectors = [[len(c.chunk_text), self.tag] for c in chunks]
+        return EmbeddedChunkBatch(chunks, np.array(vectors), self.embedding_version())
+
+
+def _ingest(db: InMemoryDbClient, service: _TaggedService, n: int) -> list[str]:
+    chunks = [
+        DocumentChunk(chunk_text="x" * (i + 1), section_type="SECTION_C",
+                      clause_number=None, chunk_index=i)
+        for i in range(n)
+    ]
+    return db.store_chunks("contract-1", "doc.docx", service.embed_chunks(chunks))
+
+
+@pytest.fixture()
+def db() -> InMemoryDbClient:
+    db = InMemoryDbClient()
+    _ingest(db, _TaggedService(1), 25)
+    return db
+
+
+class TestReembeddingJob:
+    def test_reembeds_everything_then_switches(self, db, tmp_path):
+        new = _TaggedService(2)
+        job = ReembeddingJob(db, new, tmp_path / "ckpt.json", batch_size=10)
+        some_id = next(iter(db.chunks))
+        assert db.chunk_embedding(some_id)[1] == 1
+
+        progress = job.run()
+
+        assert progress.activated and progress.chunks_done == 25
+        assert new.batches == [10, 10, 5]
+        assert db.get_active_embedding_version() == "model-2"
+        assert set(db.embeddings["model-2"]) == set(db.chunks)
+        assert set(db.embeddings["model-1"]) == set(db.chunks)  # old version kept
+        for cid, row in db.chunks.items():
+            assert db.chunk_embedding(cid).tolist() == [len(row["chunk_text"]), 2.0]
+
+    def test_reads_stay_on_old_version_until_done(self, db, tmp_path):
+        seen: list[str | None] = []
+        new = _TaggedService(2, on_batch=lambda _: seen.append(db.get_active_embedding_version()))
+        ReembeddingJob(db, new, tmp_path / "ckpt.json", batch_size=10).run()
+        assert seen == ["model-1"] * 3
+        assert db.get_active_embedding_version() == "model-2"
+
+    def test_without_activate(self, db, tmp_path):
+        ReembeddingJob(db, _TaggedService(2), tmp_path / "c.json", activate=False).run()
+        assert db.get_active_embedding_version() == "model-1"
+        assert len(db.embeddings["model-2"]) == 25
+
+    def test_resumes_from_checkpoint(self, db, tmp_path):
+        path = tmp_path / "ckpt.json"
+        job: ReembeddingJob
+
+        def stop_after_two(batches: int) -> None:
+            if batches == 2:
+                job.stop()
+
+        first = _TaggedService(2, on_batch=stop_after_two)
+        job = ReembeddingJob(db, first, path, batch_size=10)
+        progress = job.run()
+        assert not progress.activated
+        assert progress.chunks_done == 20
+        saved = ReembedCheckpoint.load(path)
+        assert saved.last_chunk_id == sorted(db.chunks)[19]
+        assert db.get_active_embedding_version() == "model-1"
+
+        second = _TaggedService(2)
+        progress = ReembeddingJob(db, second, path, batch_size=10).run()
+        assert second.batches == [5]
+        assert progress.activated and progress.chunks_done == 25
+
+    def test_checkpoint_for_other_version_discarded(self, db, tmp_path):
+        path = tmp_path / "ckpt.json"
+        ReembedCheckpoint(version="model-9", last_chunk_id="~", main_pass_done=True).save(path)
+        progress = ReembeddingJob(db, _TaggedService(2), path, batch_size=10).run()
+        assert progress.version == "model-2"
+        assert progress.chunks_done == 25
+
+    def test_catches_chunks_ingested_during_main_pass(self, db, tmp_path):
+        old = _TaggedService(1)
+        late: list[str] = []
+
+        def ingest_midway(batches: int) -> None:
+            if batches == 1:
+                late.extend(_ingest(db, old, 5))
+
+        new = _TaggedService(2, on_batch=ingest_midway)
+        progress = ReembeddingJob(db, new, tmp_path / "ckpt.json", batch_size=10).run()
+        assert progress.chunks_done == 30
+        assert all(cid in db.embeddings["model-2"] for cid in late)
+
+    def test_concurrent_workers(self, db, tmp_path):
+        new = _TaggedService(2)
+        progress = ReembeddingJob(db, new, tmp_path / "c.json", batch_size=4, workers=3).run()
+        assert progress.chunks_done == 25
+        assert sum(new.batches) == 25
+        assert ReembedCheckpoint.load(tmp_path / "c.json").last_chunk_id == max(db.chunks)
+
+    def test_rate_limit(self, db, tmp_path):
+        job = ReembeddingJob(db, _TaggedService(2), tmp_path / "c.json", batch_size=10,
+                             max_chunks_per_s=200)
+        start = time.monotonic()
+        job.run()
+        # Batches go out at 0, 50 and 100 ms for 10 chunks each at 200/s.
+        assert time.monotonic() - start >= 0.09
+
+    def test_stop_interrupts_throttle(self, db, tmp_path):
+        job = ReembeddingJob(db, _TaggedService(2), tmp_path / "c.json", batch_size=1,
+                             max_chunks_per_s=0.5)
+        thread = threading.Thread(target=job.run)
+        thread.start()
+        time.sleep(0.05)
+        job.stop()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+        assert job.progress().chunks_done == 1
+
+    def test_invalid_settings(self, db, tmp_path):
+        with pytest.raises(ValueError):
+            ReembeddingJob(db, _TaggedService(2), tmp_path / "c.json", batch_size=0)
+        with pytest.raises(ValueError):
+            ReembeddingJob(db, _TaggedService(2), tmp_path / "c.json", max_chunks_per_s=0)
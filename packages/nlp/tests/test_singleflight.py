@@ -0,0 +1,86 @@
+"""
+Tests for sharing in-flight computations between identical concurrent calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from forge_nlp.embeddings.singleflight import SingleFlight
+
+
+class _SlowCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        return self.calls
+
+
+class TestSingleFlight:
+    async def test_identical_concurrent_calls_share_one_computation(self):
+        flight: SingleFlight[int] = SingleFlight()
+        fn = _SlowCounter()
+
+        pending = [asyncio.ensure_future(flight.do("q", fn)) for _ in range(5)]
+        await asyncio.sleep(0)
+        fn.release.set()
+        results = await asyncio.gather(*pending)
+
+        assert fn.calls == 1
+        assert results == [1] * 5
+        stats = flight.stats()
+        assert stats.calls == 5
+        assert stats.shared == 4
+        assert stats.in_flight == 0
+
+    async def test_different_keys_run_separately(self):
+        flight: SingleFlight[int] = SingleFlight()
+        fn = _SlowCounter()
+        fn.release.set()
+
+        await asyncio.gather(flight.do("a", fn), flight.do("b", fn))
+
+        assert fn.calls == 2
+        assert flight.stats().shared == 0
+
+    async def test_finished_flights_are_not_cached(self):
+        flight: SingleFlight[int] = SingleFlight()
+        fn = _SlowCounter()
+        fn.release.set()
+
+        assert await flight.do("q", fn) == 1
+        assert await flight.do("q", fn) == 2
+
+    async def test_errors_reach_every_waiter(self):
+        flight: SingleFlight[int] = SingleFlight()
+        gate = asyncio.Event()
+
+        async def boom() -> int:
+            await gate.wait()
+            raise RuntimeError("encode failed")
+
+        pending = [asyncio.ensure_future(flight.do("q", boom)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flight: SingleFlight[int] = SingleFlight()
+        fn = _SlowCounter()
+
+        first = asyncio.ensure_future(flight.do("q", fn))
+        second = asyncio.ensure_future(flight.do("q", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        fn.release.set()
+
+        assert await second == 1
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,159 @@
+"""
+Tests for model snapshots: build, memory-mapped load and service integration.
+
+A tiny BERT with random weights is assembled locally so nothing is downloaded.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from forge_nlp.chunking.clause_chunker import DocumentChunk
+from forge_nlp.embeddings.embedding_service import EmbeddingService
+from forge_nlp.embeddings.model_registry import ModelRegistry
+from forge_nlp.embeddings.snapshot import (
+    build_snapshot,
+    default_snapshot_dir,
+    is_snapshot,
+    load_snapshot,
+    read_manifest,
+)
+
+_TEXTS = ["The contractor shall deliver monthly reports.", "52.204-21 Basic Safeguarding"]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory, char_tokenizer) -> str:
+    """Path of a saved 32-dim SentenceTransformer built from scratch."""
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel
+
+    root = tmp_path_factory.mktemp("tiny")
+    torch.manual_seed(0)
+    bert = BertModel(BertConfig(
+        vocab_size=len(char_tokenizer), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, max_position_embeddings=128,
+    ))
+    bert.save_pretrained(root / "bert")
+    char_tokenizer.save_pretrained(root / "bert")
+    transformer = models.Transformer(str(root / "bert"), max_seq_length=128)
+    model = SentenceTransformer(modules=[transformer, models.Pooling(32, "mean")])
+    model.save(str(root / "st"))
+    return str(root / "st")
+
+
+@pytest.fixture(scope="module")
+def snapshot(tiny_model, tmp_path_factory) -> Path:
+    return build_snapshot(tiny_model, tmp_path_factory.mktemp("snapshots") / "tiny")
+
+
+def _mapped_ranges(file: Path) -> list[tuple[int, int]]:
+    ranges = []
+    with open("/proc/self/maps") as fh:
+        for line in fh:
+            if line.rstrip().endswith(str(file)):
+                start, end = line.split()[0].split("-")
+                ranges.append((int(start, 16), int(end, 16)))
+    return ranges
+
+
+class TestBuildSnapshot:
+    def test_layout_and_manifest(self, snapshot, tiny_model):
+        assert is_snapshot(snapshot)
+        assert (snapshot / "model.safetensors").exists()
+        assert not list(snapshot.glob("*.bin"))
+        manifest = read_manifest(snapshot)
+        assert manifest["model_name"] == tiny_model
+        assert manifest["dimensions"] == 32
+        assert len(manifest["weights_sha256"]) == 64
+        assert not snapshot.with_name(snapshot.name + ".tmp").exists()
+
+    def test_rebuild_replaces(self, tiny_model, tmp_path):
+        out = build_snapshot(tiny_model, tmp_path / "snap")
+        (out / "stale").write_text("x")
+        build_snapshot(tiny_model, out)
+        assert not (out / "stale").exists()
+
+    def test_default_dir_per_model(self):
+        assert default_snapshot_dir("nlpaueb/legal-bert-base-uncased").name == (
+            "nlpaueb__legal-bert-base-uncased"
+        )
+
+
+class TestLoadSnapshot:
+    def test_same_embeddings_as_source(self, snapshot, tiny_model):
+        from sentence_transformers import SentenceTransformer
+
+        expected = SentenceTransformer(tiny_model).encode(_TEXTS)
+        actual = load_snapshot(snapshot, tiny_model).encode(_TEXTS)
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/maps")
+    def test_weights_memory_mapped(self, snapshot):
+        model = load_snapshot(snapshot)
+        ranges = _mapped_ranges((snapshot / "model.safetensors").resolve())
+        assert ranges
+        for name, param in model[0].auto_model.named_parameters():
+            assert any(a <= param.data_ptr() < b for a, b in ranges), name
+
+    def test_weights_read_once(self, snapshot, monkeypatch):
+        import safetensors.torch
+        from transformers import PreTrainedModel
+
+        def from_pretrained(cls, *args, **kwargs):
+            raise AssertionError("snapshot weights loaded by transformers")
+
+        reads = []
+        load_file = safetensors.torch.load_file
+        monkeypatch.setattr(PreTrainedModel, "from_pretrained", classmethod(from_pretrained))
+        monkeypatch.setattr(
+            safetensors.torch, "load_file", lambda f, **kw: reads.append(f) or load_file(f, **kw)
+        )
+        load_snapshot(snapshot)
+        assert [Path(f).name for f in reads] == ["model.safetensors"]
+
+    def test_other_model_rejected(self, snapshot):
+        with pytest.raises(ValueError, match="expected other/model"):
+            load_snapshot(snapshot, "other/model")
+
+    def test_missing_snapshot(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="snapshot build"):
+            load_snapshot(tmp_path)
+
+
+class TestServiceSnapshot:
+    def test_service_loads_from_snapshot(self, snapshot, tiny_model):
+        registry = ModelRegistry()
+        svc = EmbeddingService(model_name=tiny_model, snapshot=snapshot, registry=registry)
+        assert svc.snapshot == snapshot
+        [loaded] = registry.loaded()
+        assert loaded.load_seconds > 0
+        baseline = EmbeddingService(model_name=tiny_model, registry=ModelRegistry())
+        assert baseline.snapshot is None
+        np.testing.assert_allclose(svc.embed_batch(_TEXTS), baseline.embed_batch(_TEXTS), atol=1e-6)
+
+    def test_embedding_version_names_weights(self, snapshot, tiny_model):
+        svc = EmbeddingService(model_name=tiny_model, snapshot=snapshot, registry=ModelRegistry())
+        digest = read_manifest(snapshot)["weights_sha256"]
+        assert svc.embedding_version() == f"{tiny_model}@{digest[:12]}"
+        assert svc.cache_namespace == svc.embedding_version()
+        [chunk] = svc.embed_chunks([DocumentChunk(_TEXTS[0], "SECTION_C", None, 0)])
+        assert chunk.embedding_version == svc.embedding_version()
+
+    def test_manifest_read_once(self, snapshot, tiny_model, monkeypatch):
+        import forge_nlp.embeddings.embedding_service as service_module
+
+        svc = EmbeddingService(model_name=tiny_model, snapshot=snapshot, registry=ModelRegistry())
+        version = svc.embedding_version()
+
+        def read_manifest(path):
+            raise AssertionError("manifest read again")
+
+        monkeypatch.setattr(service_module, "read_manifest", read_manifest)
+        assert svc.embedding_version() == version
+        svc.embed_chunks([DocumentChunk(_TEXTS[0], "SECTION_C", None, 0)])
@@ -0,0 +1,124 @@
+"""
+Tests for the binary embedding wire formats.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from forge_nlp.embeddings.wire_format import (
+    MEDIA_FRAME,
+    MEDIA_JSON,
+    MEDIA_NPY,
+    WireFormatError,
+    decode_frame,
+    encode_frame,
+    encode_ndjson_line,
+    encode_npy,
+    ndjson_batches,
+    negotiate,
+)
+
+
+class TestNegotiate:
+    @pytest.mark.parametrize(("accept", "expected"), [
+        (None, MEDIA_JSON),
+        ("*/*", MEDIA_JSON),
+        ("application/json", MEDIA_JSON),
+        ("application/octet-stream", MEDIA_FRAME),
+        ("application/x-npy;q=0.9, application/json;q=0.5", MEDIA_NPY),
+        ("text/html, application/octet-stream", MEDIA_FRAME),
+    ])
+    def test_picks_first_supported_type(self, accept, expected):
+        assert negotiate(accept) == expected
+
+
+class TestFrame:
+    def test_float32_round_trip_with_metadata(self):
+        vectors = np.random.default_rng(0).standard_normal((64, 768)).astype(np.float32)
+        meta = {"model": "legal-bert", "chunks": [{"chunk_index": i} for i in range(64)]}
+
+        data = encode_frame(vectors, meta)
+        decoded, decoded_meta = decode_frame(data)
+
+        np.testing.assert_array_equal(decoded, vectors)
+        assert decoded_meta == meta
+
+    def test_raw_payload_is_little_endian_float32(self):
+        """The data section should be exactly rows × cols × 4 bytes."""
+        vectors = np.arange(6, dtype=np.float32).reshape(2, 3)
+        data = encode_frame(vectors)
+        assert data[:4] == b"FEMB"
+        assert data[-24:] == vectors.astype("<f4").tobytes()
+
+    @pytest.mark.parametrize("dtype", [np.float16, np.int8, np.uint8])
+    def test_compact_dtypes(self, dtype):
+        vectors = np.arange(12).reshape(3, 4).astype(dtype)
+        decoded, _ = decode_frame(encode_frame(vectors))
+        assert decoded.dtype == np.dtype(dtype)
+        np.testing.assert_array_equal(decoded, vectors)
+
+    def test_truncated_frame_rejected(self):
+        data = encode_frame(np.ones((2, 4), dtype=np.float32))
+        with pytest.raises(WireFormatError):
+            decode_frame(data[:-1])
+
+    def test_float64_rejected(self):
+        with pytest.raises(WireFormatError):
+            encode_frame(np.ones((1, 2), dtype=np.float64))
+
+
+class TestNpy:
+    def test_np_load_reads_it(self):
+        vectors = np.random.default_rng(1).standard_normal((3, 8)).astype(np.float32)
+        np.testing.assert_array_equal(np.load(io.BytesIO(encode_npy(vectors))), vectors)
+
+
+async def _pieces(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(stream, batch_size: int, **kwargs) -> list[list[dict]]:
+    return [batch async for batch in ndjson_batches(stream, batch_size, **kwargs)]
+
+
+class TestNdjson:
+    async def test_batches_across_arbitrary_splits(self):
+        body = b"".join(encode_ndjson_line({"i": i}) for i in range(10))
+        for size in (1, 7, len(body)):
+            batches = await _collect(_pieces(body, size), 4)
+            assert [[o["i"] for o in b] for b in batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    async def test_last_line_without_newline_and_blank_lines(self):
+        batches = await _collect(_pieces(b'{"a": 1}\n\n{"a": 2}', 3), 10)
+        assert batches == [[{"a": 1}, {"a": 2}]]
+
+    async def test_line_is_compact_json(self):
+        line = encode_ndjson_line({"a": [1, 2], "b": "x"})
+        assert line.endswith(b"\n") and line.count(b"\n") == 1
+        assert json.loads(line) == {"a": [1, 2], "b": "x"}
+
+    async def test_yields_before_stream_ends(self):
+        async def stream():
+            yield b'{"a": 1}\n{"a": 2}\n'
+            raise AssertionError("read past the first batch")
+
+        batches = ndjson_batches(stream(), 2)
+        assert await batches.__anext__() == [{"a": 1}, {"a": 2}]
+
+    @pytest.mark.parametrize(("body", "match"), [
+        (b'{"a": 1}\nnot json\n', "Line 2: invalid JSON"),
+        (b"[1, 2]\n", "Line 1: expected a JSON object"),
+    ])
+    async def test_bad_lines_rejected(self, body, match):
+        with pytest.raises(WireFormatError, match=match):
+            await _collect(_pieces(body, 4), 10)
+
+    async def test_overlong_line_rejected(self):
+        with pytest.raises(WireFormatError, match="exceeds 16 bytes"):
+            await _collect(_pieces(b'{"a": "' + b"x" * 64, 8), 10, max_line_bytes=16)